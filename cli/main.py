@@ -37,6 +37,8 @@ from cli.utils import (
 )
 from tradingagents.default_config import DEFAULT_CONFIG
 from tradingagents.graph.trading_graph import TradingAgentsGraph
+from tradingagents.graph.streaming import TokenStreamAccumulator, iter_stream_events
+from tradingagents.utils.tool_memo import tool_memo_scope
 from tradingagents.utils.logging_manager import get_logger
 
 # 加载环境变量
@@ -49,6 +51,11 @@ DEFAULT_MAX_CONTENT_LENGTH = 200
 DEFAULT_MAX_DISPLAY_MESSAGES = 12
 DEFAULT_REFRESH_RATE = 4
 DEFAULT_API_KEY_DISPLAY_LENGTH = 12
+DEFAULT_STREAM_RENDER_INTERVAL = 0.25  # 流式输出时界面的最小重绘间隔（秒）
+DEFAULT_STREAM_TAIL_LINES = 30  # 正在生成的报告只显示最后若干行
+
+# 图节点名与界面中智能体名称不一致的映射
+STREAM_NODE_AGENTS = {"Risk Judge": "Portfolio Manager"}
 
 # 初始化日志系统
 logger = get_logger("cli")
@@ -150,6 +157,16 @@ app = typer.Typer(
 
 # Create a deque to store recent messages with a maximum length
 class MessageBuffer:
+    SECTION_TITLES = {
+        "market_report": "Market Analysis",
+        "sentiment_report": "Social Sentiment",
+        "news_report": "News Analysis",
+        "fundamentals_report": "Fundamentals Analysis",
+        "investment_plan": "Research Team Decision",
+        "trader_investment_plan": "Trading Team Plan",
+        "final_trade_decision": "Portfolio Management Decision",
+    }
+
     def __init__(self, max_length=DEFAULT_MESSAGE_BUFFER_SIZE):
         self.messages = deque(maxlen=max_length)
         self.tool_calls = deque(maxlen=max_length)
@@ -203,6 +220,21 @@ class MessageBuffer:
             self.report_sections[section_name] = content
             self._update_current_report()
 
+    def update_live_report(self, section_name, agent, content):
+        """
+        显示正在流式生成的报告内容（只显示末尾部分）
+        Show a report section while it is still being generated; the node's
+        final output replaces it through update_report_section.
+        """
+        if section_name not in self.SECTION_TITLES:
+            return
+        lines = content.splitlines()
+        if len(lines) > DEFAULT_STREAM_TAIL_LINES:
+            content = "...\n" + "\n".join(lines[-DEFAULT_STREAM_TAIL_LINES:])
+        self.current_report = (
+            f"### {self.SECTION_TITLES[section_name]} · {agent} (generating...)\n{content}"
+        )
+
     def _update_current_report(self):
         # For the panel display, only show the most recently updated section
         latest_section = None
@@ -216,17 +248,8 @@ class MessageBuffer:
                
         if latest_section and latest_content:
             # Format the current section for display
-            section_titles = {
-                "market_report": "Market Analysis",
-                "sentiment_report": "Social Sentiment",
-                "news_report": "News Analysis",
-                "fundamentals_report": "Fundamentals Analysis",
-                "investment_plan": "Research Team Decision",
-                "trader_investment_plan": "Trading Team Plan",
-                "final_trade_decision": "Portfolio Management Decision",
-            }
             self.current_report = (
-                f"### {section_titles[latest_section]}\n{latest_content}"
+                f"### {self.SECTION_TITLES[latest_section]}\n{latest_content}"
             )
 
         # Update the final complete report
@@ -1141,7 +1164,9 @@ def run_analysis():
     # Now start the display layout
     layout = create_layout()
 
-    with Live(layout, refresh_per_second=DEFAULT_REFRESH_RATE) as live:
+    # 同一次运行中参数相同的工具调用复用缓存结果
+    with Live(layout, refresh_per_second=DEFAULT_REFRESH_RATE) as live, \
+            tool_memo_scope(selections["analysis_date"]) as tool_memo:
         # Initial display
         update_display(layout)
 
@@ -1241,7 +1266,7 @@ def run_analysis():
         init_agent_state = graph.propagator.create_initial_state(
             selections["ticker"], selections["analysis_date"]
         )
-        args = graph.propagator.get_graph_args()
+        args = graph.propagator.get_graph_args(stream_tokens=True)
 
         ui.show_success("数据获取准备完成")
 
@@ -1264,7 +1289,24 @@ def run_analysis():
         # 跟踪已完成的分析师，避免重复提示
         completed_analysts = set()
 
-        for chunk in graph.graph.stream(init_agent_state, **args):
+        # 按节点累积LLM token，实时显示正在生成的报告
+        token_accumulator = TokenStreamAccumulator()
+        last_stream_render = 0.0
+
+        for mode, chunk in iter_stream_events(graph.graph.stream(init_agent_state, **args)):
+            if mode == "messages":
+                update = token_accumulator.feed(*chunk)
+                if update is not None and update.section:
+                    agent = STREAM_NODE_AGENTS.get(update.node, update.node)
+                    if message_buffer.agent_status.get(agent) == "pending":
+                        message_buffer.update_agent_status(agent, "in_progress")
+                    message_buffer.update_live_report(update.section, agent, update.text)
+                    now = time.monotonic()
+                    if now - last_stream_render >= DEFAULT_STREAM_RENDER_INTERVAL:
+                        update_display(layout)
+                        last_stream_render = now
+                continue
+
             if len(chunk["messages"]) > 0:
                 # Get the last message from the chunk
                 last_message = chunk["messages"][-1]
@@ -1600,6 +1642,11 @@ def run_analysis():
         # 记录总执行时间
         total_time = time.time() - start_time
         ui.show_user_message(f"⏱️ 总分析时间: {total_time:.1f}秒", "dim")
+        memo_summary = tool_memo.summary()
+        if memo_summary["saved_calls"]:
+            ui.show_user_message(
+                f"♻️ 工具缓存: 复用 {memo_summary['saved_calls']}/{memo_summary['tool_calls']} 次调用"
+                f"，约节省 {memo_summary['saved_seconds']:.1f}秒", "dim")
 
         update_display(layout)
 
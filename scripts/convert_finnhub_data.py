@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Finnhub离线数据转换脚本
+
+把 finnhub_data/<data_type>/*_data_formatted.json 一次性导入按日期索引的
+SQLite存储（finnhub_data/finnhub_store.db）。之后 get_data_in_range 直接按日期区间查询，
+JSON文件有变化时会自动重新导入。
+
+使用方法:
+    python scripts/convert_finnhub_data.py
+    python scripts/convert_finnhub_data.py --data-dir /path/to/data
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.dataflows.finnhub_store import get_finnhub_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把离线Finnhub JSON数据导入按日期索引的存储')
+    parser.add_argument('--data-dir', type=str,
+                        help='数据目录（默认使用TRADINGAGENTS_DATA_DIR或项目根目录下的data）')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or os.getenv('TRADINGAGENTS_DATA_DIR') or str(project_root / "data")
+    if not os.path.isdir(os.path.join(data_dir, "finnhub_data")):
+        print(f"❌ 未找到Finnhub数据目录: {os.path.join(data_dir, 'finnhub_data')}")
+        sys.exit(1)
+
+    start = time.time()
+    store = get_finnhub_store(data_dir)
+    stats = store.convert_directory(data_dir)
+
+    for data_type, count in stats.items():
+        print(f"✅ {data_type}: {count} 个文件")
+    print(f"📦 存储位置: {store.db_path}，耗时 {time.time() - start:.1f}秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+记忆向量后端基准测试
+对比ChromaDB与NumPy向量索引（内存/内存映射）的导入、写入和top-k查询耗时
+
+用法:
+    python scripts/development/benchmark_memory_backends.py --rows 20000 --dim 1024 --queries 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.vector_index import NumpyVectorCollection
+
+# ChromaDB单次add的条数上限以内分批写入
+ADD_BATCH_SIZE = 1000
+
+
+def run_backend(collection, vectors: np.ndarray, queries: np.ndarray, top_k: int):
+    """写入全部向量后逐条查询，返回(写入秒数, 平均查询毫秒数, 第一条查询结果ID)"""
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), ADD_BATCH_SIZE):
+        batch = vectors[offset:offset + ADD_BATCH_SIZE]
+        ids = [str(offset + i) for i in range(len(batch))]
+        collection.add(
+            documents=[f"situation {i}" for i in ids],
+            metadatas=[{"recommendation": f"advice {i}"} for i in ids],
+            embeddings=batch.tolist(),
+            ids=ids,
+        )
+    add_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_ids = None
+    for query in queries:
+        result = collection.query(query_embeddings=[query.tolist()], n_results=top_k)
+        if first_ids is None:
+            first_ids = result["ids"][0]
+    query_ms = (time.perf_counter() - start) / len(queries) * 1000
+    return add_seconds, query_ms, first_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="记忆向量后端基准测试")
+    parser.add_argument("--rows", type=int, default=20000, help="写入的记忆条数")
+    parser.add_argument("--dim", type=int, default=1024, help="向量维度")
+    parser.add_argument("--queries", type=int, default=200, help="查询次数")
+    parser.add_argument("--top-k", type=int, default=2, help="每次查询返回条数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vectors = rng.normal(size=(args.rows, args.dim)).astype(np.float32)
+    queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+    print(f"数据规模: {args.rows}条 x {args.dim}维，查询{args.queries}次 top-{args.top_k}\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results["numpy (内存)"] = run_backend(
+            NumpyVectorCollection("bench"), vectors, queries, args.top_k)
+        results["numpy (内存映射)"] = run_backend(
+            NumpyVectorCollection("bench", os.path.join(tmp_dir, "numpy")), vectors, queries, args.top_k)
+
+        try:
+            start = time.perf_counter()
+            import chromadb
+            from chromadb.config import Settings
+            import_seconds = time.perf_counter() - start
+            print(f"chromadb导入耗时: {import_seconds:.2f}s")
+
+            settings = Settings(anonymized_telemetry=False, allow_reset=True)
+            client = chromadb.EphemeralClient(settings=settings)
+            # 与NumPy后端一致使用余弦距离
+            collection = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+            results["chromadb (内存)"] = run_backend(collection, vectors, queries, args.top_k)
+
+            client = chromadb.PersistentClient(path=os.path.join(tmp_dir, "chroma"), settings=settings)
+            collection = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+            results["chromadb (持久化)"] = run_backend(collection, vectors, queries, args.top_k)
+        except ImportError:
+            print("chromadb未安装，跳过ChromaDB对比")
+
+    print(f"\n{'后端':<20}{'写入(s)':>10}{'查询(ms)':>12}  首次查询结果")
+    for name, (add_seconds, query_ms, first_ids) in results.items():
+        print(f"{name:<20}{add_seconds:>10.2f}{query_ms:>12.3f}  {first_ids}")
+
+
+if __name__ == "__main__":
+    main()
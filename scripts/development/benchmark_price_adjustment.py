@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+复权价格计算基准测试
+对比原TushareProvider._calculate_forward_adjusted_prices的逐行实现与向量化实现
+
+用法:
+    python scripts/development/benchmark_price_adjustment.py --rows 2500 --symbols 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.price_adjustment import forward_adjust
+
+
+def legacy_forward_adjust(data: pd.DataFrame) -> pd.DataFrame:
+    """原逐行实现（list.insert + iloc赋值），仅用于对比"""
+    adjusted_data = data.copy().sort_values('trade_date').reset_index(drop=True)
+    for col in ('close', 'open', 'high', 'low'):
+        adjusted_data[f'{col}_raw'] = adjusted_data[col].copy()
+
+    adjusted_closes = [float(adjusted_data.iloc[-1]['close'])]
+    for i in range(len(adjusted_data) - 2, -1, -1):
+        pct_change = float(adjusted_data.iloc[i + 1]['pct_chg']) / 100.0
+        adjusted_closes.insert(0, adjusted_closes[0] / (1 + pct_change))
+    adjusted_data['close'] = adjusted_closes
+
+    for i in range(len(adjusted_data)):
+        if adjusted_data.iloc[i]['close_raw'] != 0:
+            ratio = adjusted_data.iloc[i]['close'] / adjusted_data.iloc[i]['close_raw']
+            adjusted_data.iloc[i, adjusted_data.columns.get_loc('open')] = adjusted_data.iloc[i]['open_raw'] * ratio
+            adjusted_data.iloc[i, adjusted_data.columns.get_loc('high')] = adjusted_data.iloc[i]['high_raw'] * ratio
+            adjusted_data.iloc[i, adjusted_data.columns.get_loc('low')] = adjusted_data.iloc[i]['low_raw'] * ratio
+
+    adjusted_data['price_type'] = 'forward_adjusted'
+    return adjusted_data
+
+
+def make_daily_frame(symbol: str, rows: int, seed: int) -> pd.DataFrame:
+    """生成带除权跳空的模拟日线数据"""
+    rng = np.random.default_rng(seed)
+    pct_chg = rng.normal(0, 2, rows).clip(-10, 10)
+    close = 10 * np.cumprod(1 + pct_chg / 100)
+    # 每250个交易日模拟一次10送3除权
+    for i in range(250, rows, 250):
+        close[i:] /= 1.3
+    spread = np.abs(rng.normal(0, 0.01, rows))
+    return pd.DataFrame({
+        'ts_code': symbol,
+        'trade_date': pd.bdate_range('2010-01-04', periods=rows),
+        'open': close * (1 - spread / 2),
+        'high': close * (1 + spread),
+        'low': close * (1 - spread),
+        'close': close,
+        'pct_chg': pct_chg,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="复权价格计算基准测试")
+    parser.add_argument('--rows', type=int, default=2500, help='每只股票的交易日数量')
+    parser.add_argument('--symbols', type=int, default=20, help='股票数量')
+    args = parser.parse_args()
+
+    frames = [make_daily_frame(f'{i:06d}.SZ', args.rows, i) for i in range(args.symbols)]
+    long_frame = pd.concat(frames, ignore_index=True)
+
+    print(f"📊 数据规模: {args.symbols}只股票 × {args.rows}个交易日")
+
+    start = time.perf_counter()
+    legacy = [legacy_forward_adjust(frame) for frame in frames]
+    legacy_time = time.perf_counter() - start
+    print(f"🐢 逐行实现（逐只股票）: {legacy_time:.3f}秒")
+
+    start = time.perf_counter()
+    vectorized = [forward_adjust(frame) for frame in frames]
+    per_symbol_time = time.perf_counter() - start
+    print(f"⚡ 向量化实现（逐只股票）: {per_symbol_time:.3f}秒")
+
+    start = time.perf_counter()
+    batched = forward_adjust(long_frame)
+    batch_time = time.perf_counter() - start
+    print(f"⚡ 向量化实现（长表一次计算）: {batch_time:.3f}秒")
+
+    for col in ('open', 'high', 'low', 'close'):
+        expected = np.concatenate([frame[col].to_numpy() for frame in legacy])
+        np.testing.assert_allclose(np.concatenate([frame[col].to_numpy() for frame in vectorized]), expected, rtol=1e-9)
+        np.testing.assert_allclose(batched[col].to_numpy(), expected, rtol=1e-9)
+
+    print(f"✅ 结果一致，加速比: 逐只 {legacy_time / per_symbol_time:.1f}x, 长表 {legacy_time / batch_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
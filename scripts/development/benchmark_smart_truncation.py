@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+智能截断基准测试
+对比原FinancialSituationMemory._smart_text_truncation的逐句拼接实现与按token前缀累加的实现
+
+用法:
+    python scripts/development/benchmark_smart_truncation.py --chars 200000 --max-tokens 8192 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.text_truncation import EstimatedTokenCounter, smart_truncate
+
+
+def legacy_smart_truncation(text, max_length=8192):
+    """原实现（按字符，每句都重新拼接并计算长度），仅用于对比"""
+    if len(text) <= max_length:
+        return text, False
+
+    sentences = text.split('。')
+    if len(sentences) > 1:
+        truncated = ""
+        for sentence in sentences:
+            if len(truncated + sentence + '。') <= max_length - 50:
+                truncated += sentence + '。'
+            else:
+                break
+        if len(truncated) > max_length // 2:
+            return truncated, True
+
+    paragraphs = text.split('\n')
+    if len(paragraphs) > 1:
+        truncated = ""
+        for paragraph in paragraphs:
+            if len(truncated + paragraph + '\n') <= max_length - 50:
+                truncated += paragraph + '\n'
+            else:
+                break
+        if len(truncated) > max_length // 2:
+            return truncated, True
+
+    front_part = text[:max_length // 2]
+    back_part = text[-(max_length // 2 - 100):]
+    return front_part + "\n...[内容截断]...\n" + back_part, True
+
+
+def make_report(chars: int, sentence_chars: int) -> str:
+    """生成模拟的四份分析报告拼接文本"""
+    sentence = ("市场技术面显示成交量放大，MACD金叉，RSI处于" + "中性区间" * max(1, sentence_chars // 4))[:sentence_chars]
+    parts = []
+    total = 0
+    i = 0
+    while total < chars:
+        piece = f"{sentence}{i}。" + ("\n" if i % 10 == 9 else "")
+        parts.append(piece)
+        total += len(piece)
+        i += 1
+    return "".join(parts)[:chars]
+
+
+def timed(func, *args, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="智能截断基准测试")
+    parser.add_argument("--chars", type=int, default=200000, help="输入文本字符数")
+    parser.add_argument("--max-tokens", type=int, nargs="+", default=[8192, 50000],
+                        help="token上限（原实现按字符），可指定多个")
+    parser.add_argument("--repeat", type=int, default=5, help="每种实现重复次数")
+    args = parser.parse_args()
+
+    counter = EstimatedTokenCounter()
+    print(f"输入: {args.chars}字符\n")
+    print(f"{'上限':>8}{'句长':>6}{'原实现(ms)':>14}{'新实现(ms)':>14}{'新实现策略':>12}{'保留token':>12}")
+    for max_tokens in args.max_tokens:
+        for sentence_chars in (10, 40, 200):
+            text = make_report(args.chars, sentence_chars)
+            legacy_ms, _ = timed(legacy_smart_truncation, text, max_tokens, repeat=args.repeat)
+            new_ms, (truncated, _, strategy) = timed(smart_truncate, text, max_tokens, counter,
+                                                     repeat=args.repeat)
+            print(f"{max_tokens:>8}{sentence_chars:>6}{legacy_ms:>14.2f}{new_ms:>14.2f}"
+                  f"{strategy:>12}{counter.count(truncated):>12}")
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,29 @@
 Finnhub数据下载脚本
 
 这个脚本用于从Finnhub API下载新闻数据、内部人情绪数据和内部人交易数据。
-支持批量下载和增量更新。
+多只股票并发下载，所有线程共享一个按套餐配额设置的令牌桶；
+下载进度记录在台账中，中断后重新运行会从中断处继续。
+支持增量更新（只下载磁盘上已有数据之后的日期）。
 
 使用方法:
     python scripts/download_finnhub_data.py --data-type news --symbols AAPL,TSLA,MSFT
     python scripts/download_finnhub_data.py --all
     python scripts/download_finnhub_data.py --force-refresh
+    python scripts/download_finnhub_data.py --all --incremental --workers 8 --rate-limit 60
 """
 
 import os
 import sys
 import json
 import argparse
+import hashlib
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent.parent
@@ -36,16 +42,159 @@ except ImportError as e:
     print("请确保在项目根目录运行此脚本")
     sys.exit(1)
 
+# 免费套餐每分钟60次调用
+DEFAULT_CALLS_PER_MINUTE = 60
+DEFAULT_WORKERS = 8
+# 429时的最大重试次数
+MAX_RETRIES = 5
+
+# 数据类型 -> 存储目录
+DATA_TYPE_DIRS = {
+    'news': 'news_data',
+    'sentiment': 'insider_senti',
+    'transactions': 'insider_trans',
+}
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶，所有下载线程共享同一份API配额
+    
+    突发令牌计入每分钟配额（补充速率为calls_per_minute减去桶容量），任意60秒内的请求数不超过calls_per_minute
+    """
+    
+    def __init__(self, calls_per_minute: float, burst: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.capacity = burst or max(1, int(calls_per_minute // 6))
+        self.rate = max(calls_per_minute - self.capacity, 1) / 60.0
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """取一个令牌，没有令牌时阻塞等待"""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                # 容差避免补充速率不是整数时浮点误差导致令牌永远差一点凑不满
+                if now >= self._paused_until and self.tokens >= 1 - 1e-9:
+                    self.tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self.tokens) / self.rate)
+            self._sleep(wait)
+    
+    def pause(self, seconds: float):
+        """遇到429时所有线程一起暂停，并清空已积累的令牌"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self.tokens = 0.0
+
+
+class ProgressLedger:
+    """
+    下载进度台账
+    
+    记录本次任务（股票、数据类型、参数相同）已完成的(数据类型, 股票)，
+    中断后重新运行时跳过已完成的部分；全部完成后删除台账
+    """
+    
+    def __init__(self, path: Path, signature: str):
+        self.path = Path(path)
+        self.signature = signature
+        self.completed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        
+        if self.path.exists():
+            try:
+                stored = json.loads(self.path.read_text(encoding='utf-8'))
+                if stored.get('signature') == signature:
+                    self.completed = stored.get('completed', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ 读取下载台账失败，重新开始: {e}")
+    
+    @staticmethod
+    def make_signature(**params) -> str:
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _key(data_type: str, symbol: str) -> str:
+        return f"{data_type}:{symbol}"
+    
+    def is_done(self, data_type: str, symbol: str) -> bool:
+        return self._key(data_type, symbol) in self.completed
+    
+    def mark_done(self, data_type: str, symbol: str, status: str):
+        with self._lock:
+            self.completed[self._key(data_type, symbol)] = status
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps({'signature': self.signature, 'completed': self.completed},
+                                           ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+    
+    def finish(self):
+        with self._lock:
+            if self.path.exists():
+                self.path.unlink()
+
+
+def _write_json(file_path: Path, data: Any):
+    """先写临时文件再替换，避免中断时留下半个文件"""
+    tmp_path = file_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def _read_json(file_path: Path) -> Any:
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_news(existing: List[Dict], new_items: List[Dict]) -> List[Dict]:
+    """合并新闻（按URL去重，没有URL时按时间+标题），按时间倒序"""
+    merged = {}
+    for item in existing + new_items:
+        key = item.get('url') or f"{item.get('datetime')}|{item.get('headline')}"
+        merged[key] = item
+    return sorted(merged.values(), key=lambda x: x.get('datetime', 0), reverse=True)
+
+
+def _merge_records(existing: Dict, new_data: Dict, key_func: Callable[[Dict], Any]) -> Dict:
+    """合并 {'data': [...], 'symbol': ...} 格式的数据，新下载的记录覆盖同键的旧记录"""
+    merged = {}
+    for record in existing.get('data', []) + new_data.get('data', []):
+        merged[key_func(record)] = record
+    result = dict(existing)
+    result.update({k: v for k, v in new_data.items() if k != 'data'})
+    result['data'] = list(merged.values())
+    return result
+
+
 class FinnhubDataDownloader:
     """Finnhub数据下载器"""
     
-    def __init__(self, api_key: str = None, data_dir: str = None):
+    def __init__(self, api_key: str = None, data_dir: str = None,
+                 calls_per_minute: float = DEFAULT_CALLS_PER_MINUTE, workers: int = DEFAULT_WORKERS,
+                 incremental: bool = False, resume: bool = True):
         """
         初始化下载器
         
         Args:
             api_key: Finnhub API密钥
             data_dir: 数据存储目录
+            calls_per_minute: 每分钟允许的API调用次数（按套餐配额设置）
+            workers: 并发下载线程数
+            incremental: 是否只下载磁盘上已有数据之后的日期
+            resume: 是否根据下载台账跳过上次中断前已完成的部分
         """
         # 获取API密钥
         self.api_key = api_key or os.getenv('FINNHUB_API_KEY')
@@ -67,15 +216,31 @@ class FinnhubDataDownloader:
             logger.info(f"🔍 数据目录来源: {'环境变量' if env_data_dir else '项目根目录'}")
         
         self.base_url = "https://finnhub.io/api/v1"
-        self.session = requests.Session()
+        self.rate_limiter = TokenBucket(calls_per_minute)
+        self.workers = max(1, workers)
+        self.incremental = incremental
+        self.resume = resume
+        self._local = threading.local()
         
         logger.info(f"📁 数据目录: {self.data_dir}")
         logger.info(f"🔑 API密钥: {self.api_key[:8]}...")
+        logger.info(f"⚙️ 并发线程: {self.workers}，配额: {calls_per_minute}次/分钟，增量模式: {incremental}")
+    
+    @property
+    def session(self) -> requests.Session:
+        """每个线程使用独立的Session"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
     
     def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         发送API请求
         
+        每次请求前从共享令牌桶取令牌；遇到429时所有线程按Retry-After（默认指数退避）一起暂停后重试
+        
         Args:
             endpoint: API端点
             params: 请求参数
@@ -83,26 +248,158 @@ class FinnhubDataDownloader:
         Returns:
             API响应数据
         """
-        params['token'] = self.api_key
+        params = dict(params, token=self.api_key)
         url = f"{self.base_url}/{endpoint}"
         
+        for attempt in range(MAX_RETRIES + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=30)
+                
+                # 检查API限制
+                if response.status_code == 429:
+                    retry_after = response.headers.get('Retry-After')
+                    wait = float(retry_after) if retry_after and retry_after.isdigit() else min(60, 2 ** (attempt + 2))
+                    logger.warning(f"⚠️ API调用频率限制，全部线程暂停{wait:.0f}秒后重试 ({attempt + 1}/{MAX_RETRIES})")
+                    self.rate_limiter.pause(wait)
+                    continue
+                
+                response.raise_for_status()
+                return response.json()
+                
+            except requests.exceptions.RequestException as e:
+                logger.error(f"❌ API请求失败: {e}")
+                return {}
+        
+        logger.error(f"❌ API调用频率限制重试{MAX_RETRIES}次仍失败: {endpoint}")
+        return {}
+    
+    def _data_file(self, data_type: str, symbol: str) -> Path:
+        directory = Path(self.data_dir) / "finnhub_data" / DATA_TYPE_DIRS[data_type]
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"{symbol}_data_formatted.json"
+    
+    def _should_skip(self, file_path: Path, symbol: str, force_refresh: bool) -> bool:
+        """文件已存在且有效、且不是强制刷新/增量模式时跳过"""
+        if force_refresh or self.incremental or not file_path.exists():
+            return False
+        # 检查文件是否有内容
         try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            # 检查API限制
-            if response.status_code == 429:
-                logger.warning("⚠️ API调用频率限制，等待60秒...")
-                time.sleep(60)
-                return self._make_request(endpoint, params)
-            
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ API请求失败: {e}")
-            return {}
+            file_size = file_path.stat().st_size
+            if file_size > 10:  # 文件大小大于10字节才认为有效
+                logger.info(f"📄 {symbol} 数据文件已存在且有效 (大小: {file_size} 字节)，跳过下载")
+                return True
+            logger.warning(f"⚠️ {symbol} 数据文件存在但为空 (大小: {file_size} 字节)，重新下载")
+        except Exception as e:
+            logger.warning(f"⚠️ 检查 {symbol} 文件状态失败: {e}，重新下载")
+        return False
+    
+    def _download_news_symbol(self, symbol: str, days: int, force_refresh: bool) -> str:
+        """下载单只股票的新闻，返回状态"""
+        file_path = self._data_file('news', symbol)
+        if self._should_skip(file_path, symbol, force_refresh):
+            return 'skipped'
+        
+        # 计算日期范围；增量模式从已有最新新闻的日期开始
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        existing = _read_json(file_path) if self.incremental and not force_refresh else None
+        if isinstance(existing, list) and existing:
+            latest = max(item.get('datetime', 0) for item in existing)
+            start_date = max(start_date, datetime.fromtimestamp(latest))
+        else:
+            existing = []
+        
+        logger.info(f"📥 下载 {symbol} 的新闻数据 ({start_date:%Y-%m-%d} ~ {end_date:%Y-%m-%d})...")
+        params = {
+            'symbol': symbol,
+            'from': start_date.strftime('%Y-%m-%d'),
+            'to': end_date.strftime('%Y-%m-%d')
+        }
+        news_data = self._make_request('company-news', params)
+        
+        if isinstance(news_data, dict):
+            if news_data:
+                logger.warning(f"⚠️ {symbol} API返回字典而非列表: {news_data}")
+            else:
+                logger.warning(f"⚠️ {symbol} 新闻数据下载失败或为空")
+            return 'failed'
+        
+        # 格式化数据
+        formatted_data = [
+            {
+                'datetime': item.get('datetime', 0),
+                'headline': item.get('headline', ''),
+                'summary': item.get('summary', ''),
+                'url': item.get('url', ''),
+                'source': item.get('source', ''),
+                'category': item.get('category', ''),
+                'sentiment': item.get('sentiment', {})
+            }
+            for item in news_data
+        ]
+        if not formatted_data and not existing:
+            logger.warning(f"⚠️ {symbol} 新闻数据下载失败或为空")
+            return 'empty'
+        
+        merged = _merge_news(existing, formatted_data)
+        _write_json(file_path, merged)
+        logger.info(f"✅ {symbol} 新闻数据已保存: 新下载 {len(formatted_data)} 条, 共 {len(merged)} 条")
+        return 'ok'
+    
+    def _download_records_symbol(self, data_type: str, endpoint: str, symbol: str, force_refresh: bool,
+                                 date_func: Callable[[Dict], str], key_func: Callable[[Dict], Any]) -> str:
+        """下载单只股票的内部人情绪/交易数据（{'data': [...]}格式），返回状态"""
+        file_path = self._data_file(data_type, symbol)
+        if self._should_skip(file_path, symbol, force_refresh):
+            return 'skipped'
+        
+        params = {'symbol': symbol}
+        existing = _read_json(file_path) if self.incremental and not force_refresh else None
+        if isinstance(existing, dict) and existing.get('data'):
+            # 增量模式：从已有最新记录的日期开始
+            params['from'] = max(date_func(record) for record in existing['data'])
+            params['to'] = datetime.now().strftime('%Y-%m-%d')
+        else:
+            existing = None
+        
+        data = self._make_request(endpoint, params)
+        if not data or 'data' not in data:
+            logger.warning(f"⚠️ {symbol} {data_type} 数据下载失败")
+            return 'failed'
+        
+        if existing is not None:
+            data = _merge_records(existing, data, key_func)
+        _write_json(file_path, data)
+        logger.info(f"✅ {symbol} {data_type} 数据已保存: {len(data.get('data', []))} 条")
+        return 'ok'
     
-    def download_news_data(self, symbols: List[str], days: int = 7, force_refresh: bool = False):
+    def _run(self, data_type: str, symbols: List[str], task: Callable[[str], str],
+             ledger: Optional[ProgressLedger] = None) -> Dict[str, str]:
+        """并发执行单只股票的下载任务，完成一只记一只台账"""
+        pending = [s for s in symbols if not (ledger and self.resume and ledger.is_done(data_type, s))]
+        if len(pending) < len(symbols):
+            logger.info(f"⏩ {data_type}: 台账显示 {len(symbols) - len(pending)} 只股票已完成，从中断处继续")
+        
+        results: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='finnhub') as executor:
+            futures = {executor.submit(task, symbol): symbol for symbol in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                symbol = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    logger.error(f"❌ {symbol} {data_type} 下载异常: {e}")
+                    status = 'error'
+                results[symbol] = status
+                # 失败的任务不记入台账，下次运行会重试
+                if ledger and status in ('ok', 'skipped', 'empty'):
+                    ledger.mark_done(data_type, symbol, status)
+                logger.info(f"📊 {data_type} 进度: {done}/{len(pending)} ({symbol}: {status})")
+        return results
+    
+    def download_news_data(self, symbols: List[str], days: int = 7, force_refresh: bool = False,
+                           ledger: Optional[ProgressLedger] = None) -> Dict[str, str]:
         """
         下载新闻数据
         
@@ -110,162 +407,45 @@ class FinnhubDataDownloader:
             symbols: 股票代码列表
             days: 下载多少天的数据
             force_refresh: 是否强制刷新
+            ledger: 下载进度台账
         """
-        logger.info(f"📰 开始下载新闻数据，股票: {symbols}, 天数: {days}")
-        
-        # 创建目录
-        news_dir = Path(self.data_dir) / "finnhub_data" / "news_data"
-        news_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 计算日期范围
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        for symbol in symbols:
-            logger.info(f"📰 下载 {symbol} 的新闻数据...")
-            
-            # 检查文件是否存在且有效
-            file_path = news_dir / f"{symbol}_data_formatted.json"
-            if file_path.exists() and not force_refresh:
-                # 检查文件是否有内容
-                try:
-                    file_size = file_path.stat().st_size
-                    if file_size > 10:  # 文件大小大于10字节才认为有效
-                        logger.info(f"📄 {symbol} 数据文件已存在且有效 (大小: {file_size} 字节)，跳过下载")
-                        continue
-                    else:
-                        logger.warning(f"⚠️ {symbol} 数据文件存在但为空 (大小: {file_size} 字节)，重新下载")
-                except Exception as e:
-                    logger.warning(f"⚠️ 检查 {symbol} 文件状态失败: {e}，重新下载")
-
-            logger.info(f"📥 开始下载 {symbol} 的新闻数据...")
-            
-            # 下载新闻数据
-            params = {
-                'symbol': symbol,
-                'from': start_date.strftime('%Y-%m-%d'),
-                'to': end_date.strftime('%Y-%m-%d')
-            }
-            
-            news_data = self._make_request('company-news', params)
-
-            logger.info(f"🔍 API响应类型: {type(news_data)}, 长度: {len(news_data) if isinstance(news_data, list) else 'N/A'}")
-
-            if news_data and isinstance(news_data, list) and len(news_data) > 0:
-                # 格式化数据
-                formatted_data = []
-                for item in news_data:
-                    formatted_item = {
-                        'datetime': item.get('datetime', 0),
-                        'headline': item.get('headline', ''),
-                        'summary': item.get('summary', ''),
-                        'url': item.get('url', ''),
-                        'source': item.get('source', ''),
-                        'category': item.get('category', ''),
-                        'sentiment': item.get('sentiment', {})
-                    }
-                    formatted_data.append(formatted_item)
-
-                # 保存数据
-                try:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(formatted_data, f, ensure_ascii=False, indent=2)
-
-                    # 验证文件保存
-                    if file_path.exists():
-                        file_size = file_path.stat().st_size
-                        logger.info(f"✅ {symbol} 新闻数据已保存: {len(formatted_data)} 条, 文件大小: {file_size} 字节")
-                    else:
-                        logger.error(f"❌ {symbol} 文件保存失败，文件不存在")
-
-                except Exception as e:
-                    logger.error(f"❌ {symbol} 文件保存异常: {e}")
-
-            elif news_data and isinstance(news_data, dict):
-                logger.warning(f"⚠️ {symbol} API返回字典而非列表: {news_data}")
-            else:
-                logger.warning(f"⚠️ {symbol} 新闻数据下载失败或为空")
-            
-            # 避免API限制
-            time.sleep(1)
+        logger.info(f"📰 开始下载新闻数据，股票: {len(symbols)}只, 天数: {days}")
+        return self._run('news', symbols, lambda s: self._download_news_symbol(s, days, force_refresh), ledger)
     
-    def download_insider_sentiment(self, symbols: List[str], force_refresh: bool = False):
+    def download_insider_sentiment(self, symbols: List[str], force_refresh: bool = False,
+                                   ledger: Optional[ProgressLedger] = None) -> Dict[str, str]:
         """
         下载内部人情绪数据
         
         Args:
             symbols: 股票代码列表
             force_refresh: 是否强制刷新
+            ledger: 下载进度台账
         """
-        logger.info(f"💭 开始下载内部人情绪数据，股票: {symbols}")
-        
-        # 创建目录
-        sentiment_dir = Path(self.data_dir) / "finnhub_data" / "insider_senti"
-        sentiment_dir.mkdir(parents=True, exist_ok=True)
-        
-        for symbol in symbols:
-            logger.info(f"💭 下载 {symbol} 的内部人情绪数据...")
-            
-            # 检查文件是否存在
-            file_path = sentiment_dir / f"{symbol}_data_formatted.json"
-            if file_path.exists() and not force_refresh:
-                logger.info(f"📄 {symbol} 情绪数据文件已存在，跳过下载")
-                continue
-            
-            # 下载情绪数据
-            params = {'symbol': symbol}
-            sentiment_data = self._make_request('stock/insider-sentiment', params)
-            
-            if sentiment_data and 'data' in sentiment_data:
-                # 保存数据
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(sentiment_data, f, ensure_ascii=False, indent=2)
-                
-                logger.info(f"✅ {symbol} 内部人情绪数据已保存")
-            else:
-                logger.warning(f"⚠️ {symbol} 内部人情绪数据下载失败")
-            
-            # 避免API限制
-            time.sleep(1)
+        logger.info(f"💭 开始下载内部人情绪数据，股票: {len(symbols)}只")
+        return self._run('sentiment', symbols, lambda s: self._download_records_symbol(
+            'sentiment', 'stock/insider-sentiment', s, force_refresh,
+            date_func=lambda r: f"{r.get('year', 0):04d}-{r.get('month', 1):02d}-01",
+            key_func=lambda r: (r.get('year'), r.get('month')),
+        ), ledger)
     
-    def download_insider_transactions(self, symbols: List[str], force_refresh: bool = False):
+    def download_insider_transactions(self, symbols: List[str], force_refresh: bool = False,
+                                      ledger: Optional[ProgressLedger] = None) -> Dict[str, str]:
         """
         下载内部人交易数据
         
         Args:
             symbols: 股票代码列表
             force_refresh: 是否强制刷新
+            ledger: 下载进度台账
         """
-        logger.info(f"💰 开始下载内部人交易数据，股票: {symbols}")
-        
-        # 创建目录
-        trans_dir = Path(self.data_dir) / "finnhub_data" / "insider_trans"
-        trans_dir.mkdir(parents=True, exist_ok=True)
-        
-        for symbol in symbols:
-            logger.info(f"💰 下载 {symbol} 的内部人交易数据...")
-            
-            # 检查文件是否存在
-            file_path = trans_dir / f"{symbol}_data_formatted.json"
-            if file_path.exists() and not force_refresh:
-                logger.info(f"📄 {symbol} 交易数据文件已存在，跳过下载")
-                continue
-            
-            # 下载交易数据
-            params = {'symbol': symbol}
-            trans_data = self._make_request('stock/insider-transactions', params)
-            
-            if trans_data and 'data' in trans_data:
-                # 保存数据
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(trans_data, f, ensure_ascii=False, indent=2)
-                
-                logger.info(f"✅ {symbol} 内部人交易数据已保存")
-            else:
-                logger.warning(f"⚠️ {symbol} 内部人交易数据下载失败")
-            
-            # 避免API限制
-            time.sleep(1)
+        logger.info(f"💰 开始下载内部人交易数据，股票: {len(symbols)}只")
+        return self._run('transactions', symbols, lambda s: self._download_records_symbol(
+            'transactions', 'stock/insider-transactions', s, force_refresh,
+            date_func=lambda r: r.get('filingDate') or r.get('transactionDate') or '1970-01-01',
+            key_func=lambda r: r.get('id') or (r.get('name'), r.get('filingDate'), r.get('transactionDate'),
+                                               r.get('change'), r.get('share'), r.get('transactionCode')),
+        ), ledger)
 
 def main():
     """主函数"""
@@ -302,6 +482,24 @@ def main():
                        type=str,
                        help='数据存储目录')
     
+    parser.add_argument('--workers',
+                       type=int,
+                       default=DEFAULT_WORKERS,
+                       help='并发下载线程数')
+    
+    parser.add_argument('--rate-limit',
+                       type=float,
+                       default=DEFAULT_CALLS_PER_MINUTE,
+                       help='每分钟API调用次数上限（按Finnhub套餐配额设置）')
+    
+    parser.add_argument('--incremental',
+                       action='store_true',
+                       help='增量更新：只下载磁盘上已有数据之后的日期')
+    
+    parser.add_argument('--no-resume',
+                       action='store_true',
+                       help='忽略下载台账，重新下载全部股票')
+    
     args = parser.parse_args()
     
     # 解析股票代码
@@ -311,7 +509,11 @@ def main():
         # 创建下载器
         downloader = FinnhubDataDownloader(
             api_key=args.api_key,
-            data_dir=args.data_dir
+            data_dir=args.data_dir,
+            calls_per_minute=args.rate_limit,
+            workers=args.workers,
+            incremental=args.incremental,
+            resume=not args.no_resume
         )
         
         # 确定要下载的数据类型
@@ -325,16 +527,32 @@ def main():
         logger.info(f"📋 数据类型: {data_types}")
         logger.info(f"🔄 强制刷新: {args.force_refresh}")
         
+        logger.info(f"📈 增量模式: {args.incremental}")
+        
+        # 下载进度台账：参数相同的任务中断后重新运行会跳过已完成的股票
+        ledger = ProgressLedger(
+            Path(downloader.data_dir) / "finnhub_data" / ".download_ledger.json",
+            ProgressLedger.make_signature(symbols=sorted(symbols), data_types=data_types, days=args.days,
+                                          force_refresh=args.force_refresh, incremental=args.incremental),
+        )
+        
         # 下载数据
+        failed = []
         for data_type in data_types:
             if data_type == 'news':
-                downloader.download_news_data(symbols, args.days, args.force_refresh)
+                results = downloader.download_news_data(symbols, args.days, args.force_refresh, ledger)
             elif data_type == 'sentiment':
-                downloader.download_insider_sentiment(symbols, args.force_refresh)
+                results = downloader.download_insider_sentiment(symbols, args.force_refresh, ledger)
             elif data_type == 'transactions':
-                downloader.download_insider_transactions(symbols, args.force_refresh)
+                results = downloader.download_insider_transactions(symbols, args.force_refresh, ledger)
+            failed.extend(f"{data_type}:{symbol}" for symbol, status in results.items()
+                          if status in ('failed', 'error'))
         
-        logger.info("🎉 数据下载完成！")
+        if failed:
+            logger.warning(f"⚠️ {len(failed)} 个下载任务失败，重新运行将只重试这些任务: {', '.join(failed[:20])}")
+        else:
+            ledger.finish()
+            logger.info("🎉 数据下载完成！")
         
     except Exception as e:
         logger.error(f"❌ 下载失败: {e}")
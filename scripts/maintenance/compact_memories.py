@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆集合压缩脚本
+
+合并各智能体记忆集合中情况近似重复的条目，并按时间衰减的保留分数执行条数上限。
+记忆后端与持久化目录沿用 MEMORY_BACKEND / MEMORY_BACKEND_DIR / MEMORY_PERSISTENT / MEMORY_PERSIST_DIR 配置。
+
+使用方法:
+    python scripts/maintenance/compact_memories.py
+    python scripts/maintenance/compact_memories.py --max-size 2000 --threshold 0.95
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.agents.utils.memory import FinancialSituationMemory
+from tradingagents.default_config import DEFAULT_CONFIG
+
+MEMORY_NAMES = ["bull_memory", "bear_memory", "trader_memory", "invest_judge_memory", "risk_manager_memory"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='压缩智能体记忆集合')
+    parser.add_argument('--names', nargs='+', default=MEMORY_NAMES, help='要压缩的记忆集合')
+    parser.add_argument('--threshold', type=float, help='近似重复的余弦相似度阈值（默认MEMORY_DEDUP_THRESHOLD）')
+    parser.add_argument('--max-size', type=int, help='每个集合的条数上限，0表示不限制（默认MEMORY_MAX_SIZE）')
+    parser.add_argument('--half-life-days', type=float, help='保留分数的时间衰减半衰期（默认MEMORY_HALF_LIFE_DAYS）')
+    args = parser.parse_args()
+
+    for name in args.names:
+        memory = FinancialSituationMemory(name, DEFAULT_CONFIG.copy())
+        stats = memory.compact(similarity_threshold=args.threshold, max_size=args.max_size,
+                               half_life_days=args.half_life_days)
+        print(f"✅ {name}: {stats['before']} -> {stats['after']}条 "
+              f"(合并{stats['merged']}, 淘汰{stats['evicted']}, 丢弃空向量{stats['dropped_empty']})")
+
+
+if __name__ == '__main__':
+    main()
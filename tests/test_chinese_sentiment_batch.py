@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中文财经情绪批量评分测试
+验证词典自动机评分与逐词匹配一致，以及三类情绪数据并发获取
+"""
+
+import os
+import random
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.chinese_finance_utils import (
+    NEGATIVE_WORDS,
+    POSITIVE_WORDS,
+    ChineseFinanceDataAggregator,
+    score_texts_sentiment,
+)
+
+
+def _reference(text):
+    if not text:
+        return 0
+    positive = sum(1 for word in POSITIVE_WORDS if word in text)
+    negative = sum(1 for word in NEGATIVE_WORDS if word in text)
+    if positive + negative == 0:
+        return 0
+    return (positive - negative) / (positive + negative)
+
+
+def test_batch_scores_match_keyword_loop():
+    rng = random.Random(0)
+    vocabulary = sorted(POSITIVE_WORDS | NEGATIVE_WORDS) + ['创新', '新高', '股价', '公司', '今日', '低']
+    texts = [''.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 10))) for _ in range(2000)]
+
+    assert score_texts_sentiment(texts) == [_reference(t) for t in texts]
+    aggregator = ChineseFinanceDataAggregator()
+    assert [aggregator._analyze_text_sentiment(t) for t in texts[:50]] == [_reference(t) for t in texts[:50]]
+
+
+def test_sub_collections_run_concurrently():
+    aggregator = ChineseFinanceDataAggregator()
+
+    def slow(result):
+        def collect(ticker, days):
+            time.sleep(0.2)
+            return result
+        return collect
+
+    aggregator._get_finance_news_sentiment = slow({'sentiment_score': 0.5, 'confidence': 1.0})
+    aggregator._get_stock_forum_sentiment = slow({'sentiment_score': 0, 'confidence': 0})
+    aggregator._get_media_coverage_sentiment = slow({'sentiment_score': -0.5, 'confidence': 1.0})
+
+    start = time.monotonic()
+    summary = aggregator.get_stock_sentiment_summary('AAPL')
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5
+    assert summary['overall_sentiment']['sentiment_score'] == 0
+    assert summary['news_sentiment']['sentiment_score'] == 0.5
+
+
+def test_failure_in_sub_collection_returns_fallback():
+    aggregator = ChineseFinanceDataAggregator()
+
+    def boom(ticker, days):
+        raise RuntimeError('network down')
+
+    aggregator._get_stock_forum_sentiment = boom
+    summary = aggregator.get_stock_sentiment_summary('AAPL')
+    assert 'network down' in summary['error']
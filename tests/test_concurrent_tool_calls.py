@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发工具调用测试
+验证同一轮的多个工具调用并发执行、结果保持调用顺序，且单个调用失败不影响其他调用
+"""
+
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from langchain_core.tools import tool
+
+from tradingagents.agents.utils.google_tool_handler import GoogleToolCallHandler
+
+
+def _make_tools(delay, tracker):
+    def track():
+        with tracker['lock']:
+            tracker['active'] += 1
+            tracker['peak'] = max(tracker['peak'], tracker['active'])
+        time.sleep(delay)
+        with tracker['lock']:
+            tracker['active'] -= 1
+
+    @tool
+    def get_market_data(ticker: str) -> str:
+        """获取行情数据"""
+        track()
+        return f"market:{ticker}"
+
+    @tool
+    def get_indicators(ticker: str) -> str:
+        """获取技术指标"""
+        track()
+        return f"indicators:{ticker}"
+
+    @tool
+    def get_news(ticker: str) -> str:
+        """获取新闻"""
+        track()
+        raise RuntimeError("news source down")
+
+    return [get_market_data, get_indicators, get_news]
+
+
+def test_tool_calls_run_concurrently_in_order(monkeypatch):
+    monkeypatch.setenv('TOOL_CALL_MAX_WORKERS', '4')
+    tracker = {'lock': threading.Lock(), 'active': 0, 'peak': 0}
+    tools = _make_tools(0.2, tracker)
+    tool_calls = [
+        {'name': 'get_news', 'args': {'ticker': 'AAPL'}, 'id': '1'},
+        {'name': 'get_market_data', 'args': {'ticker': 'AAPL'}, 'id': '2'},
+        {'name': 'missing_tool', 'args': {}, 'id': '3'},
+        {'name': 'get_indicators', 'args': {'ticker': 'AAPL'}, 'id': '4'},
+    ]
+
+    start = time.monotonic()
+    results = GoogleToolCallHandler._execute_tool_calls(tool_calls, tools, "测试分析师")
+    elapsed = time.monotonic() - start
+
+    assert tracker['peak'] == 3
+    assert elapsed < 0.5
+    assert results[0].startswith("工具执行失败")
+    assert results[1] == "market:AAPL"
+    assert results[2] == "未找到工具: missing_tool"
+    assert results[3] == "indicators:AAPL"
+
+
+def test_tool_call_workers_are_bounded(monkeypatch):
+    monkeypatch.setenv('TOOL_CALL_MAX_WORKERS', '1')
+    tracker = {'lock': threading.Lock(), 'active': 0, 'peak': 0}
+    tools = _make_tools(0.01, tracker)
+    tool_calls = [{'name': 'get_market_data', 'args': {'ticker': str(i)}, 'id': str(i)} for i in range(4)]
+
+    results = GoogleToolCallHandler._execute_tool_calls(tool_calls, tools, "测试分析师")
+
+    assert tracker['peak'] == 1
+    assert results == [f"market:{i}" for i in range(4)]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置快照测试
+验证配置文件只在修改或保存后重新解析，以及按(供应商, 模型)的定价和模型查找
+"""
+
+import json
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.config.config_manager import ConfigManager, PricingConfig
+from tradingagents.config.config_snapshot import JsonFileSnapshot
+
+
+def test_snapshot_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps([1, 2]), encoding='utf-8')
+    builds = []
+
+    def build(data):
+        builds.append(data)
+        return data
+
+    snapshot = JsonFileSnapshot(path, build, check_interval=0)
+    assert snapshot.get() == [1, 2]
+    assert snapshot.get() == [1, 2]
+    assert len(builds) == 1
+
+    path.write_text(json.dumps([1, 2, 3]), encoding='utf-8')
+    assert snapshot.get() == [1, 2, 3]
+    assert len(builds) == 2
+
+    snapshot.invalidate()
+    snapshot.get()
+    assert len(builds) == 3
+
+    path.unlink()
+    assert snapshot.get() is None
+
+
+def test_snapshot_skips_stat_within_check_interval(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text('{"a": 1}', encoding='utf-8')
+    snapshot = JsonFileSnapshot(path, lambda data: data, check_interval=3600)
+    assert snapshot.get() == {'a': 1}
+
+    path.write_text('{"a": 2, "b": 0}', encoding='utf-8')
+    assert snapshot.get() == {'a': 1}
+    snapshot.invalidate()
+    assert snapshot.get() == {'a': 2, 'b': 0}
+
+
+def test_config_manager_lookups_use_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setenv('DASHSCOPE_API_KEY', 'env-key')
+    manager = ConfigManager(str(tmp_path))
+    # 首次访问加载快照
+    manager.calculate_cost('dashscope', 'qwen-turbo', 1000, 1000)
+    manager.get_enabled_models()
+
+    # 热路径上不再打开配置文件
+    def fail_open(*args, **kwargs):
+        raise AssertionError('config file opened on the request path')
+
+    with monkeypatch.context() as patched:
+        patched.setattr('builtins.open', fail_open)
+        assert manager.calculate_cost('dashscope', 'qwen-turbo', 1000, 0) > 0
+        model = manager.get_model_by_name('dashscope', 'qwen-turbo')
+        assert model.api_key == 'env-key'
+        assert any(m.model_name == 'qwen-turbo' for m in manager.get_enabled_models())
+        assert manager.load_settings()['max_usage_records'] == 10000
+
+    # 返回的是副本，修改不影响快照
+    model.api_key = 'changed'
+    assert manager.get_model_by_name('dashscope', 'qwen-turbo').api_key == 'env-key'
+
+    pricing = manager.load_pricing()
+    pricing.append(PricingConfig('test_provider', 'test_model', 1.0, 2.0))
+    assert manager.calculate_cost('test_provider', 'test_model', 1000, 1000) == 0.0
+    manager.save_pricing(pricing)
+    assert manager.calculate_cost('test_provider', 'test_model', 1000, 1000) == 3.0
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Finnhub批量下载脚本测试
+验证共享令牌桶限速、429全体退避、下载台账断点续传以及增量更新
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+_spec = importlib.util.spec_from_file_location(
+    "download_finnhub_data", os.path.join(project_root, "scripts", "download_finnhub_data.py"))
+downloader_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(downloader_module)
+
+TokenBucket = downloader_module.TokenBucket
+ProgressLedger = downloader_module.ProgressLedger
+FinnhubDataDownloader = downloader_module.FinnhubDataDownloader
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    calls = []
+    responder = None
+    lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with FakeSession.lock:
+            FakeSession.calls.append((url.rsplit('/v1/', 1)[1], dict(params)))
+        return FakeSession.responder(url, params)
+
+
+def _downloader(tmp_path, monkeypatch, responder, **kwargs):
+    FakeSession.calls = []
+    FakeSession.responder = staticmethod(responder)
+    monkeypatch.setattr(downloader_module.requests, "Session", FakeSession)
+    kwargs.setdefault("calls_per_minute", 60000)
+    return FinnhubDataDownloader(api_key="test-key-123", data_dir=str(tmp_path), workers=4, **kwargs)
+
+
+def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=5, clock=clock, sleep=clock.sleep)
+    times = []
+    for _ in range(150):
+        bucket.acquire()
+        times.append(clock.now)
+    # 突发令牌计入配额：任意60秒窗口内不超过60次
+    assert max(sum(1 for t in times if start <= t < start + 60) for start in times) <= 60
+    assert 59 <= times[59] <= 61
+
+    bucket.pause(30)
+    start = clock.now
+    bucket.acquire()
+    assert clock.now - start >= 30
+
+
+def test_ledger_resumes_matching_run_only(tmp_path):
+    path = tmp_path / "ledger.json"
+    ledger = ProgressLedger(path, "sig-a")
+    ledger.mark_done("news", "AAPL", "ok")
+
+    assert ProgressLedger(path, "sig-a").is_done("news", "AAPL")
+    assert not ProgressLedger(path, "sig-b").is_done("news", "AAPL")
+    ledger.finish()
+    assert not path.exists()
+
+
+def test_concurrent_download_skips_completed_and_retries_429(tmp_path, monkeypatch):
+    throttled = {"MSFT": 1}
+
+    def responder(url, params):
+        symbol = params["symbol"]
+        if throttled.get(symbol):
+            throttled[symbol] -= 1
+            return FakeResponse({}, status_code=429, headers={"Retry-After": "0"})
+        return FakeResponse([{"datetime": 1700000000, "headline": f"{symbol} news", "url": f"u/{symbol}"}])
+
+    downloader = _downloader(tmp_path, monkeypatch, responder)
+    ledger = ProgressLedger(tmp_path / "ledger.json", "sig")
+    ledger.mark_done("news", "AAPL", "ok")
+
+    results = downloader.download_news_data(["AAPL", "MSFT", "TSLA"], days=7, ledger=ledger)
+
+    assert results == {"MSFT": "ok", "TSLA": "ok"}
+    assert sorted(p["symbol"] for _, p in FakeSession.calls) == ["MSFT", "MSFT", "TSLA"]
+    assert ledger.is_done("news", "MSFT") and ledger.is_done("news", "TSLA")
+    saved = json.loads((tmp_path / "finnhub_data" / "news_data" / "TSLA_data_formatted.json").read_text())
+    assert saved[0]["headline"] == "TSLA news"
+
+
+def test_incremental_fetches_only_newer_dates(tmp_path, monkeypatch):
+    news_dir = tmp_path / "finnhub_data" / "news_data"
+    news_dir.mkdir(parents=True)
+    old_ts = int(datetime.now().timestamp()) - 86400
+    (news_dir / "AAPL_data_formatted.json").write_text(json.dumps([{"datetime": old_ts, "headline": "old", "url": "u/1"}]))
+    trans_dir = tmp_path / "finnhub_data" / "insider_trans"
+    trans_dir.mkdir(parents=True)
+    (trans_dir / "AAPL_data_formatted.json").write_text(json.dumps(
+        {"symbol": "AAPL", "data": [{"id": "a", "filingDate": "2024-03-01"}]}))
+
+    def responder(url, params):
+        if url.endswith("company-news"):
+            return FakeResponse([{"datetime": old_ts + 60, "headline": "new", "url": "u/2"},
+                                 {"datetime": old_ts, "headline": "old", "url": "u/1"}])
+        return FakeResponse({"symbol": "AAPL", "data": [{"id": "a", "filingDate": "2024-03-01"},
+                                                        {"id": "b", "filingDate": "2024-03-05"}]})
+
+    downloader = _downloader(tmp_path, monkeypatch, responder, incremental=True)
+    downloader.download_news_data(["AAPL"], days=30)
+    downloader.download_insider_transactions(["AAPL"])
+
+    news_params = FakeSession.calls[0][1]
+    assert news_params["from"] == datetime.fromtimestamp(old_ts).strftime("%Y-%m-%d")
+    assert [n["headline"] for n in json.loads((news_dir / "AAPL_data_formatted.json").read_text())] == ["new", "old"]
+    assert FakeSession.calls[1][1]["from"] == "2024-03-01"
+    trans = json.loads((trans_dir / "AAPL_data_formatted.json").read_text())
+    assert [r["id"] for r in trans["data"]] == ["a", "b"]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线Finnhub索引存储测试
+验证日期区间查询结果与直接过滤JSON一致、JSON变化后自动重新导入以及一次性转换
+"""
+
+import json
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.finnhub_store import get_finnhub_store, json_data_path
+from tradingagents.dataflows.finnhub_utils import get_data_in_range
+
+
+def _write(data_dir, ticker, data_type, data, period=None):
+    path = json_data_path(data_dir, ticker, data_type, period)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+
+def _reference(data, start, end):
+    return {k: v for k, v in data.items() if start <= k <= end and len(v) > 0}
+
+
+NEWS = {
+    f"2024-03-{day:02d}": ([{"headline": f"新闻{day}", "summary": "s"}] if day % 3 else [])
+    for day in range(1, 31)
+}
+
+
+def test_range_query_matches_json_filter(tmp_path):
+    data_dir = str(tmp_path)
+    _write(data_dir, "AAPL", "news_data", NEWS)
+
+    for start, end in (("2024-03-05", "2024-03-12"), ("2024-02-01", "2024-04-01"), ("2024-03-07", "2024-03-07")):
+        assert get_data_in_range("AAPL", start, end, "news_data", data_dir) == _reference(NEWS, start, end)
+    assert os.path.exists(os.path.join(data_dir, "finnhub_data", "finnhub_store.db"))
+
+
+def test_reimports_when_json_changes(tmp_path):
+    data_dir = str(tmp_path)
+    path = _write(data_dir, "AAPL", "insider_senti", {"2024-01-02": [{"change": 1}]})
+    assert get_data_in_range("AAPL", "2024-01-01", "2024-01-31", "insider_senti", data_dir) == {
+        "2024-01-02": [{"change": 1}]}
+
+    _write(data_dir, "AAPL", "insider_senti", {"2024-01-02": [{"change": 2}], "2024-01-03": [{"change": 3}]})
+    os.utime(path, (1e9, 1e9))
+    assert get_data_in_range("AAPL", "2024-01-01", "2024-01-31", "insider_senti", data_dir) == {
+        "2024-01-02": [{"change": 2}], "2024-01-03": [{"change": 3}]}
+
+
+def test_missing_and_invalid_files(tmp_path):
+    data_dir = str(tmp_path)
+    assert get_data_in_range("MSFT", "2024-01-01", "2024-01-31", "news_data", data_dir) == {}
+    assert not os.path.exists(os.path.join(data_dir, "finnhub_data"))
+
+    path = json_data_path(data_dir, "TSLA", "news_data")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert get_data_in_range("TSLA", "2024-01-01", "2024-01-31", "news_data", data_dir) == {}
+
+
+def test_convert_directory(tmp_path):
+    data_dir = str(tmp_path)
+    _write(data_dir, "AAPL", "news_data", NEWS)
+    _write(data_dir, "AAPL", "fin_as_reported", {"2023-12-31": [{"eps": 1.2}]}, period="annual")
+    _write(data_dir, "NVDA", "insider_trans", {"2024-03-01": [{"share": 10}]})
+
+    store = get_finnhub_store(data_dir)
+    assert store.convert_directory(data_dir) == {"fin_as_reported": 1, "insider_trans": 1, "news_data": 1}
+    assert store.source_state("fin_as_reported", "AAPL", "annual") is not None
+    assert get_data_in_range("AAPL", "2023-01-01", "2023-12-31", "fin_as_reported", data_dir,
+                             period="annual") == {"2023-12-31": [{"eps": 1.2}]}
+
+    # 转换后删除JSON文件仍可查询
+    os.remove(json_data_path(data_dir, "NVDA", "insider_trans"))
+    assert get_data_in_range("NVDA", "2024-03-01", "2024-03-31", "insider_trans", data_dir) == {
+        "2024-03-01": [{"share": 10}]}
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM token流式输出测试
+验证messages流按节点累积为报告章节、回调节流，以及流式调用的token用量统计
+"""
+
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGenerationChunk
+
+from tradingagents.graph.streaming import (
+    ThrottledTokenCallback,
+    TokenStreamAccumulator,
+    TokenUpdate,
+    iter_stream_events,
+)
+from tradingagents.llm_adapters.stream_usage import StreamUsage
+
+
+def test_accumulator_tracks_each_node_call():
+    accumulator = TokenStreamAccumulator()
+    market = {"langgraph_node": "Market Analyst"}
+
+    assert accumulator.feed(AIMessageChunk(content="市场", id="run-1"), market).text == "市场"
+    update = accumulator.feed(AIMessageChunk(content="分析", id="run-1"), market)
+    assert update.text == "市场分析"
+    assert update.delta == "分析"
+    assert update.section == "market_report"
+
+    # 工具消息和无文本的块不产生更新
+    assert accumulator.feed(ToolMessage(content="data", tool_call_id="1"), market) is None
+    assert accumulator.feed(AIMessageChunk(content="", id="run-1"), market) is None
+
+    # 同一节点的新一次调用重新开始
+    assert accumulator.feed(AIMessageChunk(content="报告", id="run-2"), market).text == "报告"
+    # 未流式输出的完整消息
+    update = accumulator.feed(AIMessage(content="交易计划", id="run-3"), {"langgraph_node": "Trader"})
+    assert update.text == "交易计划"
+    assert update.section == "trader_investment_plan"
+
+
+def test_graph_stream_yields_tokens_per_node():
+    pytest.importorskip("langgraph")
+    from typing import TypedDict
+
+    from langchain_core.language_models import GenericFakeChatModel
+    from langgraph.graph import END, START, StateGraph
+
+    class State(TypedDict):
+        market_report: str
+
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="看涨 趋势 明确")]))
+
+    def market_analyst(state):
+        return {"market_report": llm.invoke("分析").content}
+
+    builder = StateGraph(State)
+    builder.add_node("Market Analyst", market_analyst)
+    builder.add_edge(START, "Market Analyst")
+    builder.add_edge("Market Analyst", END)
+    graph = builder.compile()
+
+    accumulator = TokenStreamAccumulator()
+    updates, final_state = [], None
+    for mode, payload in iter_stream_events(
+            graph.stream({"market_report": ""}, stream_mode=["values", "messages"])):
+        if mode == "messages":
+            update = accumulator.feed(*payload)
+            if update:
+                updates.append(update)
+        else:
+            final_state = payload
+
+    assert len(updates) > 1
+    assert all(u.section == "market_report" for u in updates)
+    assert updates[-1].text == "看涨 趋势 明确"
+    assert final_state["market_report"] == "看涨 趋势 明确"
+
+
+def test_throttled_callback_flushes_on_node_switch():
+    received = []
+    throttled = ThrottledTokenCallback(received.append, min_interval=3600)
+
+    throttled(TokenUpdate("Market Analyst", "market_report", "a", "a"))
+    throttled(TokenUpdate("Market Analyst", "market_report", "ab", "b"))
+    assert [u.text for u in received] == ["a"]
+
+    # 切换节点时先发送上一节点被节流的更新
+    throttled(TokenUpdate("News Analyst", "news_report", "n", "n"))
+    assert [u.text for u in received] == ["a", "ab", "n"]
+
+    throttled(TokenUpdate("News Analyst", "news_report", "nm", "m"))
+    throttled.flush()
+    assert received[-1].text == "nm"
+
+
+def test_throttled_callback_ignores_callback_errors():
+    def fail(update):
+        raise RuntimeError("display closed")
+
+    ThrottledTokenCallback(fail)(TokenUpdate("Trader", None, "x", "x"))
+
+
+def test_stream_usage_collects_chunk_usage():
+    usage = StreamUsage()
+    chunks = [
+        ChatGenerationChunk(message=AIMessageChunk(content="你好")),
+        ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata={"input_tokens": 12, "output_tokens": 5, "total_tokens": 17})),
+    ]
+    assert not usage
+    assert [c.text for c in usage.collect(chunks)] == ["你好", ""]
+    assert usage
+    assert usage.as_chat_result().llm_output["token_usage"] == {"prompt_tokens": 12, "completion_tokens": 5}
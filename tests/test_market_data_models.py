@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情数据模型测试
+验证各数据源DataFrame的列名统一、缓存序列化与文本渲染
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.market_data_models import (
+    CompanyProfile,
+    FinancialMetrics,
+    PriceBarSeries,
+)
+
+
+def test_from_frame_normalizes_tushare_columns():
+    data = pd.DataFrame({
+        'ts_code': ['000001.SZ'] * 3,
+        'trade_date': ['20240105', '20240103', '20240104'],
+        'open': [10.2, 10.0, 10.1],
+        'high': [10.5, 10.3, 10.4],
+        'low': [10.0, 9.8, 9.9],
+        'close': [10.4, 10.1, 10.2],
+        'vol': [3000, 1000, 2000],
+        'pct_chg': [1.96, 0.5, 0.99],
+    })
+    series = PriceBarSeries.from_frame('000001', data, source='tushare')
+
+    assert list(series.bars.columns) == ['date', 'open', 'high', 'low', 'close', 'volume', 'pct_change']
+    assert list(series.bars['close']) == [10.1, 10.2, 10.4]
+    assert series.total_volume == 6000
+
+
+def test_from_frame_normalizes_akshare_chinese_columns():
+    data = pd.DataFrame({
+        '日期': ['2024-01-02', '2024-01-03'],
+        '开盘': [5.0, 5.1],
+        '收盘': [5.1, 5.3],
+        '最高': [5.2, 5.4],
+        '最低': [4.9, 5.0],
+        '成交量': [100, 200],
+        '成交额': [510.0, 1060.0],
+    })
+    series = PriceBarSeries.from_frame('600000', data, source='akshare')
+
+    assert series.high == pytest.approx(5.4)
+    assert series.low == pytest.approx(4.9)
+    assert list(series.bars['amount']) == [510.0, 1060.0]
+
+
+def test_from_frame_uses_named_index():
+    data = pd.DataFrame(
+        {'close': [1.0, 2.0], 'volume': [10, 20]},
+        index=pd.Index(pd.to_datetime(['2024-01-02', '2024-01-03']), name='datetime'),
+    )
+    series = PriceBarSeries.from_frame('000001', data, source='tdx')
+    assert 'date' in series.bars.columns
+    assert series.latest_quote().trade_date == '2024-01-03'
+
+
+def test_latest_quote_from_last_two_bars():
+    data = pd.DataFrame({
+        'date': ['2024-01-02', '2024-01-03'],
+        'close': [10.0, 11.0],
+        'volume': [100, 200],
+    })
+    quote = PriceBarSeries.from_frame('000001', data, name='平安银行').latest_quote()
+
+    assert quote.price == pytest.approx(11.0)
+    assert quote.prev_close == pytest.approx(10.0)
+    assert quote.change == pytest.approx(1.0)
+    assert quote.change_pct == pytest.approx(10.0)
+    assert quote.name == '平安银行'
+
+
+def test_empty_series_has_no_quote():
+    series = PriceBarSeries.from_frame('000001', pd.DataFrame())
+    assert series.empty
+    assert series.latest_quote() is None
+    assert series.to_report().startswith('❌')
+
+
+def test_dict_round_trip_preserves_bars():
+    data = pd.DataFrame({
+        'date': ['2024-01-02', '2024-01-03'],
+        'open': [1.0, 2.0],
+        'close': [1.5, 2.5],
+    })
+    series = PriceBarSeries.from_frame('000001', data, '2024-01-01', '2024-01-03', source='tushare')
+    restored = PriceBarSeries.from_dict(series.to_dict())
+
+    pd.testing.assert_frame_equal(restored.bars, series.bars)
+    assert restored.start_date == '2024-01-01'
+    assert restored.source == 'tushare'
+
+
+def test_to_report_contains_price_summary():
+    data = pd.DataFrame({
+        'date': ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'],
+        'high': [10.5, 10.6, 10.8, 11.2],
+        'low': [9.5, 9.9, 10.0, 10.5],
+        'close': [10.0, 10.2, 10.5, 11.0],
+        'volume': [100, 100, 100, 100],
+    })
+    report = PriceBarSeries.from_frame('000001', data, '2024-01-01', '2024-01-05',
+                                       name='平安银行', source='tushare').to_report()
+
+    assert '平安银行(000001) - Tushare数据' in report
+    assert '💰 最新价格: ¥11.00' in report
+    assert '最高价: ¥11.20' in report
+    assert '最新3天数据' in report
+    assert '2024-01-02' not in report.split('最新3天数据')[1]
+
+
+def test_company_profile_validity_and_report():
+    profile = CompanyProfile.from_dict('000001', {'name': '平安银行', 'industry': '银行', 'area': '', 'extra': 1})
+    assert profile.is_valid
+    assert profile.area == '未知'
+    assert '股票名称: 平安银行' in profile.to_report()
+    assert '所属行业: 银行' in profile.to_report()
+
+    assert not CompanyProfile.from_dict('000001', {'name': '股票000001'}).is_valid
+    assert not CompanyProfile('000001').is_valid
+
+
+def test_financial_metrics_from_dict():
+    metrics = FinancialMetrics.from_dict({'pe': '12.0倍', 'roe': '8.0%（估算值）', 'custom': 1})
+    assert metrics.pe == '12.0倍'
+    assert metrics.pb == 'N/A'
+    assert metrics.extra == {'custom': 1}
+    assert metrics.is_estimated
+    assert metrics.to_dict()['custom'] == 1
+
+    assert not FinancialMetrics.from_dict({'pe': '12.0倍'}).is_estimated
+
+
+def test_tushare_bars_cache_company_profile(monkeypatch):
+    from tradingagents.dataflows import data_source_manager, tushare_adapter
+
+    class FakeAdapter:
+        def get_stock_data(self, symbol, start_date, end_date):
+            return pd.DataFrame({'trade_date': ['20240102', '20240103'], 'close': [10.0, 10.5]})
+
+    info_calls = []
+    manager = data_source_manager.DataSourceManager.__new__(data_source_manager.DataSourceManager)
+    manager._profile_cache = {}
+    manager._get_tushare_stock_info = lambda symbol: info_calls.append(symbol) or {'name': '平安银行'}
+    monkeypatch.setattr(tushare_adapter, 'get_tushare_adapter', lambda: FakeAdapter())
+
+    for _ in range(2):
+        series = manager._get_tushare_bars('000001', '2024-01-01', '2024-01-03')
+        assert series.name == '平安银行'
+    assert info_calls == ['000001']
+    assert manager.get_company_profile('000001').name == '平安银行'
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆批量embedding测试
+验证add_situations按提供商上限分批请求、逐条智能截断，以及阿里百炼长度受限时整批降级
+"""
+
+import importlib.util
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils import embedding_cache
+from tradingagents.utils.embedding_cache import EmbeddingCache
+
+
+def _load_memory_module():
+    path = os.path.join(project_root, 'tradingagents', 'agents', 'utils', 'memory.py')
+    spec = importlib.util.spec_from_file_location('memory_batch_under_test', path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        pytest.skip(f'记忆模块依赖未安装: {e}')
+    return module
+
+
+class FakeEmbeddings:
+    """按文本长度生成向量，记录每次请求的输入"""
+
+    def __init__(self, fail_on=None):
+        self.inputs = []
+        self.fail_on = fail_on
+
+    def create(self, model, input):
+        self.inputs.append(list(input) if isinstance(input, list) else input)
+        texts = input if isinstance(input, list) else [input]
+        if self.fail_on is not None and self.fail_on in texts:
+            raise RuntimeError('connection reset')
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), 1.0]) for i, t in enumerate(texts)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.fixture
+def memory_module(tmp_path, monkeypatch):
+    module = _load_memory_module()
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setattr(embedding_cache, '_embedding_cache', EmbeddingCache(str(tmp_path / 'embeddings.db')))
+    return module
+
+
+def _openai_memory(module, name, fake):
+    memory = module.FinancialSituationMemory(name, {'llm_provider': 'openai', 'backend_url': 'https://api.openai.com/v1'})
+    memory.client = SimpleNamespace(embeddings=fake)
+    return memory
+
+
+def test_add_situations_batches_and_dedups(memory_module, monkeypatch):
+    monkeypatch.setenv('MEMORY_EMBEDDING_BATCH_SIZE', '4')
+    fake = FakeEmbeddings()
+    memory = _openai_memory(memory_module, 'batch_add_test', fake)
+
+    situations = [f'情况{i}' * (i + 1) for i in range(9)] + ['情况0']
+    memory.add_situations([(s, f'建议{i}') for i, s in enumerate(situations)])
+
+    assert [len(batch) for batch in fake.inputs] == [4, 4, 1]
+    assert memory.situation_collection.count() == 10
+    stored = memory.situation_collection.get(ids=['0', '9'], include=['embeddings'])
+    assert list(stored['embeddings'][0]) == list(stored['embeddings'][1]) == [3.0, 1.0]
+
+    # 已缓存的文本不再请求
+    assert memory.get_embeddings(situations[:3]) == [[3.0 * (i + 1), 1.0] for i in range(3)]
+    assert len(fake.inputs) == 3
+
+
+def test_failed_batch_falls_back_to_single_requests(memory_module):
+    fake = FakeEmbeddings(fail_on='坏文本')
+    memory = _openai_memory(memory_module, 'batch_fallback_test', fake)
+
+    vectors = memory.get_embeddings(['好文本', '坏文本', ''])
+
+    assert fake.inputs[0] == ['好文本', '坏文本']
+    assert fake.inputs[1:] == ['好文本', '坏文本']
+    assert vectors[0] == [3.0, 1.0]
+    assert not any(vectors[1]) and not any(vectors[2])
+
+
+def test_dashscope_batch_truncates_items_and_uses_fallback(memory_module, monkeypatch):
+    from tradingagents.utils.embedding_cache import get_embedding_cache
+
+    import dashscope
+
+    calls = []
+
+    def fake_call(model, input):
+        calls.append(list(input))
+        return SimpleNamespace(status_code=400, code='InvalidParameter', message='input length exceed limit', output=None)
+
+    monkeypatch.setenv('DASHSCOPE_API_KEY', 'test-key')
+    monkeypatch.setattr(dashscope, 'api_key', 'test-key', raising=False)
+    monkeypatch.setattr(dashscope.TextEmbedding, 'call', staticmethod(fake_call))
+    memory = memory_module.FinancialSituationMemory('batch_dashscope_test', {'llm_provider': 'dashscope', 'backend_url': ''})
+    fallback = FakeEmbeddings()
+    memory.fallback_available = True
+    memory.fallback_client = SimpleNamespace(embeddings=fallback)
+    memory.fallback_embedding = 'text-embedding-3-small'
+
+    long_text = '长' * 20000
+    texts = [f'文本{i}' for i in range(11)] + [long_text]
+    vectors = memory.get_embeddings(texts)
+
+    assert [len(batch) for batch in calls] == [10, 2]
+    assert len(calls[1][1]) < 8192
+    assert [len(batch) for batch in fallback.inputs] == [10, 2]
+    assert vectors[0] == [3.0, 1.0]
+    assert vectors[-1][0] < 8192
+    # 降级模型的向量不写入阿里百炼模型的缓存键
+    assert get_embedding_cache().get_many('dashscope', memory.embedding, texts) == [None] * len(texts)
+
+
+def test_truncated_batch_text_is_cached_under_embedded_text(memory_module):
+    from tradingagents.utils.embedding_cache import get_embedding_cache
+
+    fake = FakeEmbeddings()
+    memory = _openai_memory(memory_module, 'batch_truncation_cache_test', fake)
+    long_text = '长' * 40000
+    truncated = memory._smart_text_truncation(long_text)[0]
+    assert len(truncated) < len(long_text)
+
+    vector = memory.get_embeddings([long_text])[0]
+    assert vector == [float(len(truncated)), 1.0]
+
+    # 缓存键为实际送入模型的截断文本：逐条路径（不截断）不会读到截断文本的向量
+    cache = get_embedding_cache()
+    provider = memory._embedding_cache_provider()
+    assert cache.get(provider, memory.embedding, long_text) is None
+    assert cache.get(provider, memory.embedding, truncated) == vector
+    assert memory.get_embeddings([long_text]) == [vector]
+    assert len(fake.inputs) == 1
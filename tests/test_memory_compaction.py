@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆压缩测试
+验证近似重复聚类、建议合并、按时间衰减的条数上限、两种记忆后端上的压缩，以及写入中断时不丢失记忆
+"""
+
+import importlib.util
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.memory_compaction import cluster_near_duplicates, compact_entries
+from tradingagents.utils.vector_index import NumpyVectorCollection
+
+DAY = 86400.0
+
+
+def test_cluster_near_duplicates_across_chunks():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(5, 32))
+    rows = np.vstack([centers[i % 5] + rng.normal(scale=0.01, size=32) for i in range(40)])
+
+    labels = cluster_near_duplicates(rows, threshold=0.99, chunk_size=7)
+
+    assert len(set(labels)) == 5
+    for i in range(40):
+        assert labels[i] == i % 5  # 代表为每簇第一次出现的行
+
+
+def test_compact_merges_duplicates_and_keeps_newest_situation():
+    now = 1000 * DAY
+    embeddings = [[1.0, 0.0], [0.999, 0.01], [0.0, 1.0], [0.0, 0.0]]
+    metadatas = [
+        {'recommendation': '减仓', 'created_at': now - 3 * DAY},
+        {'recommendation': '观望', 'created_at': now - 1 * DAY},
+        {'recommendation': '加仓', 'created_at': now - 2 * DAY},
+        {'recommendation': '失败', 'created_at': now},
+    ]
+    documents, merged_metadatas, vectors, stats = compact_entries(
+        ['0', '1', '2', '3'], ['旧情况', '新情况', '其他', '空'], metadatas, embeddings,
+        similarity_threshold=0.99, max_size=10, now=now)
+
+    assert stats == {'before': 4, 'dropped_empty': 1, 'clusters': 2, 'after': 2, 'merged': 1, 'evicted': 0}
+    assert documents == ['其他', '新情况']
+    assert merged_metadatas[1]['recommendation'] == '观望\n\n减仓'
+    assert merged_metadatas[1]['merged_count'] == 2
+    assert merged_metadatas[1]['first_seen'] == now - 3 * DAY
+    assert np.allclose(vectors[1], [0.999, 0.01])
+
+
+def test_size_cap_prefers_recent_and_frequently_merged_entries():
+    now = 1000 * DAY
+    embeddings = np.eye(4)
+    metadatas = [
+        {'recommendation': 'a', 'created_at': now - 400 * DAY, 'merged_count': 1},
+        {'recommendation': 'b', 'created_at': now - 10 * DAY, 'merged_count': 1},
+        {'recommendation': 'c', 'created_at': now - 30 * DAY, 'merged_count': 20},
+        {'recommendation': 'd'},  # 没有时间戳的旧条目
+    ]
+    documents, _, _, stats = compact_entries(['0', '1', '2', '3'], ['a', 'b', 'c', 'd'], metadatas,
+                                             embeddings, max_size=2, half_life_days=180, now=now)
+
+    assert stats['evicted'] == 2
+    assert documents == ['c', 'b']
+
+
+def test_numpy_collection_delete_rewrites_files(tmp_path):
+    directory = str(tmp_path / 'mem')
+    collection = NumpyVectorCollection('delete_test', directory)
+    collection.add(documents=['a', 'b', 'c'], embeddings=np.eye(3).tolist(), ids=['0', '1', '2'])
+    collection.delete(ids=['0', '2'])
+    collection.add(documents=['d'], embeddings=[[0.0, 0.0, 1.0]], ids=['5'])
+
+    reopened = NumpyVectorCollection('delete_test', directory)
+    assert reopened.get()['ids'] == ['1', '5']
+    assert reopened.query(query_embeddings=[[0.0, 1.0, 0.0]], n_results=1)['documents'] == [['b']]
+
+
+def test_numpy_collection_rewrite_is_crash_safe(tmp_path, monkeypatch):
+    directory = str(tmp_path / 'mem')
+    collection = NumpyVectorCollection('rewrite_test', directory)
+    collection.add(documents=['a', 'b', 'c'], embeddings=np.eye(3).tolist(), ids=['0', '1', '2'])
+
+    # 模拟新一代文件写完、header替换前进程中断：旧header和旧文件保持完整
+    def crash(*args, **kwargs):
+        raise OSError('simulated crash')
+
+    monkeypatch.setattr(os, 'replace', crash)
+    with pytest.raises(OSError):
+        collection.delete(ids=['0'])
+    monkeypatch.undo()
+    assert collection.count() == 3
+
+    reopened = NumpyVectorCollection('rewrite_test', directory)
+    assert reopened.get()['ids'] == ['0', '1', '2']
+    assert reopened.query(query_embeddings=[[1.0, 0.0, 0.0]], n_results=1)['documents'] == [['a']]
+
+    reopened.upsert(documents=['b2', 'd'], embeddings=[[0.0, 0.0, 1.0], [1.0, 1.0, 0.0]], ids=['1', '3'])
+    again = NumpyVectorCollection('rewrite_test', directory)
+    assert again.get()['documents'] == ['a', 'b2', 'c', 'd']
+    assert again.query(query_embeddings=[[0.0, 0.0, 1.0]], n_results=2)['ids'] == [['1', '2']]
+    assert sorted(f for f in os.listdir(directory) if not f.startswith('header')) == \
+        ['records.1.jsonl', 'vectors.1.f32']
+
+
+def _load_memory_module():
+    path = os.path.join(project_root, 'tradingagents', 'agents', 'utils', 'memory.py')
+    spec = importlib.util.spec_from_file_location('memory_compaction_under_test', path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        pytest.skip(f'记忆模块依赖未安装: {e}')
+    return module
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'chroma'])
+def test_memory_compact_and_auto_compaction(backend, tmp_path, monkeypatch):
+    module = _load_memory_module()
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('MEMORY_EMBEDDING_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('MEMORY_MAX_SIZE', '0')
+    config = {'llm_provider': 'openai', 'backend_url': 'https://api.openai.com/v1',
+              'memory_backend': backend, 'memory_backend_dir': str(tmp_path / 'vectors')}
+
+    def create(model, input):
+        # 同一主题（第一个字符）的情况向量几乎相同
+        texts = input if isinstance(input, list) else [input]
+        vectors = [[float(ord(t[0]) % 5 == k) for k in range(5)] + [0.001 * len(t)] for t in texts]
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=v) for i, v in enumerate(vectors)])
+
+    memory = module.FinancialSituationMemory(f'compact_{backend}_memory', config)
+    memory.client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    memory.add_situations([('A情况', '建议1'), ('B情况', '建议2')])
+    memory.add_situations([('A情况更新', '建议3')])
+
+    stats = memory.compact(similarity_threshold=0.99)
+    assert (stats['before'], stats['after'], stats['merged']) == (3, 2, 1)
+    assert sorted(memory.situation_collection.get()['ids']) == ['0', '1']
+    best = memory.get_memories('A情况更新', n_matches=1)[0]
+    assert best['situation'] == 'A情况更新'
+    assert best['recommendation'] == '建议3\n\n建议1'
+
+    # 超过上限10%时写入后自动压缩
+    monkeypatch.setenv('MEMORY_MAX_SIZE', '2')
+    memory.add_situations([('C情况', '建议4')])
+    assert memory.situation_collection.count() == 2
+
+
+def test_interrupted_compaction_keeps_all_memories(tmp_path, monkeypatch):
+    module = _load_memory_module()
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('MEMORY_EMBEDDING_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('MEMORY_MAX_SIZE', '0')
+    config = {'llm_provider': 'openai', 'backend_url': 'https://api.openai.com/v1',
+              'memory_backend': 'numpy', 'memory_backend_dir': str(tmp_path / 'vectors')}
+
+    def create(model, input):
+        texts = input if isinstance(input, list) else [input]
+        vectors = [[float(ord(t[0]) % 5 == k) for k in range(5)] for t in texts]
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=v) for i, v in enumerate(vectors)])
+
+    memory = module.FinancialSituationMemory('interrupted_compact_memory', config)
+    memory.client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    memory.add_situations([('A情况', '建议1'), ('B情况', '建议2'), ('A情况更新', '建议3')])
+
+    def fail_delete(ids):
+        raise RuntimeError('simulated crash')
+
+    monkeypatch.setattr(memory.situation_collection, 'delete', fail_delete)
+    with pytest.raises(RuntimeError):
+        memory.compact(similarity_threshold=0.99)
+
+    # 合并结果已覆盖写入编号0-1，未删除的编号2只是重复条目，没有记忆丢失
+    stored = memory.situation_collection.get()
+    assert sorted(stored['ids']) == ['0', '1', '2']
+    recommendations = {metadata['recommendation'] for metadata in stored['metadatas']}
+    assert {'建议2', '建议3\n\n建议1'} <= recommendations
+
+
+def test_auto_compaction_is_disabled_by_default(monkeypatch):
+    from tradingagents.utils.memory_compaction import get_compaction_settings
+
+    monkeypatch.delenv('MEMORY_MAX_SIZE', raising=False)
+    assert get_compaction_settings()['max_size'] == 0
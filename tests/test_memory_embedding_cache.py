@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆embedding共享缓存测试
+验证内存层/持久层命中、按最近访问淘汰，以及多个记忆实例对相同文本只调用一次嵌入服务
+"""
+
+import importlib.util
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils import embedding_cache
+from tradingagents.utils.embedding_cache import EmbeddingCache
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    db_path = str(tmp_path / 'embeddings.db')
+    cache = EmbeddingCache(db_path, max_memory_entries=10, max_disk_entries=100)
+    cache.put('dashscope', 'text-embedding-v3', '市场震荡', [0.5, 0.25])
+
+    assert cache.get('dashscope', 'text-embedding-v3', '市场震荡') == [0.5, 0.25]
+    assert cache.get('openai@x', 'text-embedding-v3', '市场震荡') is None
+    assert cache.get('dashscope', 'other-model', '市场震荡') is None
+
+    # 新进程只能命中持久层
+    reopened = EmbeddingCache(db_path, max_memory_entries=10, max_disk_entries=100)
+    assert reopened.get('dashscope', 'text-embedding-v3', '市场震荡') == [0.5, 0.25]
+    assert reopened.get('dashscope', 'text-embedding-v3', '市场震荡') == [0.5, 0.25]
+    stats = reopened.stats()
+    assert (stats['disk_hits'], stats['memory_hits'], stats['misses']) == (1, 1, 0)
+
+
+def test_memory_tier_stores_float32_arrays():
+    import numpy as np
+
+    cache = EmbeddingCache(None, max_memory_entries=10)
+    cache.put('p', 'm', '文本', [0.1] * 1024)
+
+    stored = next(iter(cache._memory.values()))
+    assert stored.dtype == np.float32 and stored.nbytes == 4096
+    vector = cache.get('p', 'm', '文本')
+    assert vector == [float(np.float32(0.1))] * 1024
+    vector[0] = 9.0  # 返回副本，不影响缓存内容
+    assert cache.get('p', 'm', '文本')[0] != 9.0
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'embeddings.db'), max_memory_entries=1, max_disk_entries=10)
+    for i in range(10):
+        cache.put('p', 'm', f'text-{i}', [float(i)])
+    cache.get_many('p', 'm', ['text-0', 'text-1'])  # 刷新访问时间
+    cache.put('p', 'm', 'text-10', [10.0])
+
+    fresh = EmbeddingCache(cache.db_path, max_memory_entries=1, max_disk_entries=10)
+    assert fresh.stats()['disk_entries'] == 9
+    assert fresh.get('p', 'm', 'text-0') == [0.0]
+    assert fresh.get('p', 'm', 'text-10') == [10.0]
+    assert fresh.get('p', 'm', 'text-2') is None
+
+
+def _load_memory_module():
+    path = os.path.join(project_root, 'tradingagents', 'agents', 'utils', 'memory.py')
+    spec = importlib.util.spec_from_file_location('memory_under_test', path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        pytest.skip(f'记忆模块依赖未安装: {e}')
+    return module
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.inputs = []
+
+    def create(self, model, input):
+        self.inputs.append(input)
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(t)), 1.0]) for t in texts])
+
+
+def test_memories_share_embeddings_across_instances(tmp_path, monkeypatch):
+    memory_module = _load_memory_module()
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setattr(embedding_cache, '_embedding_cache',
+                        EmbeddingCache(str(tmp_path / 'embeddings.db')))
+
+    config = {'llm_provider': 'openai', 'backend_url': 'https://api.openai.com/v1'}
+    fake = FakeEmbeddings()
+    memories = []
+    for name in ('bull_memory_cache_test', 'bear_memory_cache_test', 'trader_memory_cache_test'):
+        memory = memory_module.FinancialSituationMemory(name, config)
+        memory.client = SimpleNamespace(embeddings=fake)
+        memories.append(memory)
+
+    situation = '市场报告\n情绪报告\n新闻报告\n基本面报告'
+    vectors = [memory.get_embedding(situation) for memory in memories]
+
+    assert fake.inputs == [situation]
+    assert vectors[0] == vectors[1] == vectors[2]
+    assert memories[2].get_last_text_info()['strategy'] == 'embedding_cache_hit'
+
+
+def test_fallback_embeddings_are_not_cached_under_primary_model(tmp_path, monkeypatch):
+    import dashscope
+
+    memory_module = _load_memory_module()
+    monkeypatch.setenv('DASHSCOPE_API_KEY', 'test-key')
+    monkeypatch.setattr(dashscope, 'api_key', 'test-key', raising=False)
+    monkeypatch.setattr(dashscope.TextEmbedding, 'call', staticmethod(
+        lambda model, input: SimpleNamespace(status_code=400, code='InvalidParameter',
+                                             message='input length exceed limit', output=None)))
+    cache = EmbeddingCache(str(tmp_path / 'embeddings.db'))
+    monkeypatch.setattr(embedding_cache, '_embedding_cache', cache)
+
+    memory = memory_module.FinancialSituationMemory('fallback_cache_test', {'llm_provider': 'dashscope', 'backend_url': ''})
+    fallback = FakeEmbeddings()
+    memory.fallback_available = True
+    memory.fallback_client = SimpleNamespace(embeddings=fallback)
+    memory.fallback_embedding = 'text-embedding-3-small'
+
+    assert memory.get_embedding('长文本') == [3.0, 1.0]
+    assert cache.get('dashscope', memory.embedding, '长文本') is None
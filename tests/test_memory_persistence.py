@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChromaDB记忆持久化测试
+验证持久化模式下记忆在重启后保留，以及其他进程写入的记忆能被当前进程读到且编号不冲突
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+MEMORY_PATH = os.path.join(project_root, 'tradingagents', 'agents', 'utils', 'memory.py')
+CONFIG = {'llm_provider': 'openai', 'backend_url': 'https://api.openai.com/v1'}
+
+# 子进程与测试共用的假嵌入服务：向量由文本中的数字决定
+FAKE_CLIENT_SOURCE = textwrap.dedent('''
+    from types import SimpleNamespace
+
+    def _vector(text):
+        digits = [int(ch) for ch in text if ch.isdigit()] or [0]
+        return [float(digits[0]), 1.0]
+
+    def _create(model, input):
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=_vector(t)) for i, t in enumerate(texts)])
+
+    fake_client = SimpleNamespace(embeddings=SimpleNamespace(create=_create))
+''')
+
+
+def _load_memory_module(module_name):
+    spec = importlib.util.spec_from_file_location(module_name, MEMORY_PATH)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        pytest.skip(f'记忆模块依赖未安装: {e}')
+    return module
+
+
+def _new_memory(module, name='persist_test_memory'):
+    namespace = {}
+    exec(FAKE_CLIENT_SOURCE, namespace)
+    memory = module.FinancialSituationMemory(name, CONFIG)
+    memory.client = namespace['fake_client']
+    return memory
+
+
+@pytest.fixture
+def persist_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('MEMORY_PERSISTENT', 'true')
+    monkeypatch.setenv('MEMORY_PERSIST_DIR', str(tmp_path / 'chroma'))
+    monkeypatch.setenv('MEMORY_EMBEDDING_CACHE_ENABLED', 'false')
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    return tmp_path / 'chroma'
+
+
+def test_memories_survive_restart(persist_env):
+    memory = _new_memory(_load_memory_module('memory_persist_first'))
+    memory.add_situations([('情况1', '建议1'), ('情况5', '建议5')])
+    assert os.path.isdir(persist_env)
+
+    # 重新加载模块相当于新进程启动
+    restarted = _new_memory(_load_memory_module('memory_persist_second'))
+    assert restarted.situation_collection.count() == 2
+    assert restarted.get_memories('情况5', n_matches=1)[0]['recommendation'] == '建议5'
+
+
+def test_writes_from_other_process_are_visible(persist_env):
+    memory = _new_memory(_load_memory_module('memory_persist_reader'))
+    memory.add_situations([('情况1', '建议1')])
+    assert memory.get_memories('情况9', n_matches=1)[0]['recommendation'] == '建议1'
+
+    script = FAKE_CLIENT_SOURCE + textwrap.dedent(f'''
+        import importlib.util, sys
+        sys.path.insert(0, {project_root!r})
+        spec = importlib.util.spec_from_file_location('memory_child', {MEMORY_PATH!r})
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        memory = module.FinancialSituationMemory('persist_test_memory', {CONFIG!r})
+        memory.client = fake_client
+        memory.add_situations([('情况9', '建议9')])
+    ''')
+    subprocess.run([sys.executable, '-c', script], check=True, env=os.environ.copy(),
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    assert memory.get_memories('情况9', n_matches=1)[0]['recommendation'] == '建议9'
+    memory.add_situations([('情况4', '建议4')])
+    stored = memory.situation_collection.get()
+    assert sorted(stored['ids']) == ['0', '1', '2']
+
+
+def test_write_lock_timeout_skips_write(persist_env):
+    module = _load_memory_module('memory_persist_lock_timeout')
+    memory = _new_memory(module)
+
+    def acquire_timeout(timeout=None):
+        raise module.FileLockTimeout(str(persist_env))
+
+    manager = memory.vector_store
+    original_acquire = manager._process_lock.acquire
+    manager._process_lock.acquire = acquire_timeout
+    try:
+        with pytest.raises(module.FileLockTimeout):
+            memory.add_situations([('情况1', '建议1')])
+    finally:
+        manager._process_lock.acquire = original_acquire
+    assert memory.situation_collection.count() == 0
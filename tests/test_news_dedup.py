@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+新闻近似去重测试
+验证MinHash+LSH能识别改写/转载的新闻，并按来源权威性和发布时间保留一篇
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.news_dedup import (
+    NearDuplicateDetector,
+    deduplicate_near_duplicates,
+    shingles,
+)
+from tradingagents.dataflows.realtime_news_utils import NewsItem, RealtimeNewsAggregator
+
+
+def _item(title, source, minutes_ago, content=''):
+    return NewsItem(
+        title=title,
+        content=content,
+        source=source,
+        publish_time=datetime(2025, 1, 2, 12, 0) - timedelta(minutes=minutes_ago),
+        url='',
+        urgency='low',
+        relevance_score=1.0,
+    )
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles('Apple, Inc.!') == shingles('apple inc')
+    assert shingles('') == []
+
+
+def test_cluster_groups_rewritten_titles():
+    detector = NearDuplicateDetector()
+    texts = [
+        'Apple beats earnings estimates as iPhone sales surge in China',
+        'Tesla recalls 200,000 vehicles over rear camera issue',
+        '贵州茅台发布2024年三季度报告 净利润同比增长15%',
+        'Apple Beats Earnings Estimates, as iPhone Sales Surge in China!',
+        '贵州茅台发布2024年第三季度报告，净利润同比增长15%',
+        'Nvidia shares hit record high ahead of AI conference',
+    ]
+    groups = sorted(sorted(g) for g in detector.cluster(texts))
+    assert groups == [[0, 3], [1], [2, 4], [5]]
+
+
+def test_keeps_most_authoritative_then_earliest():
+    items = [
+        _item('Fed holds rates steady, signals two cuts later this year', 'Yahoo', 30),
+        _item('Fed holds rates steady; signals two cuts later this year', 'Reuters', 10),
+        _item('Fed Holds Rates Steady, Signals Two Cuts Later This Year', 'Reuters', 20),
+        _item('Oil prices climb after OPEC+ extends output cuts', 'CNBC', 5),
+    ]
+    kept, clusters = deduplicate_near_duplicates(
+        items,
+        text_func=lambda n: n.title,
+        rank_func=lambda n: (-{'Reuters': 3, 'CNBC': 2}.get(n.source, 0), n.publish_time),
+    )
+
+    assert kept == [items[2], items[3]]
+    assert len(clusters) == 1
+    assert clusters[0].representative is items[2]
+    assert clusters[0].size == 3
+
+
+def test_aggregator_merges_near_duplicates():
+    aggregator = RealtimeNewsAggregator()
+    items = [
+        _item('NVIDIA unveils next-generation Blackwell AI chips', 'Reuters', 15, 'NVIDIA on Tuesday unveiled'),
+        _item('Nvidia Unveils Next Generation Blackwell AI Chips', 'Yahoo', 5, 'NVIDIA on Tuesday unveiled'),
+        _item('Microsoft expands Azure data centers in Asia', 'CNBC', 3),
+    ]
+    unique = aggregator._deduplicate_news(items)
+
+    assert [n.source for n in unique] == ['Reuters', 'CNBC']
+    assert unique[0].duplicate_sources == ['Yahoo']
+    assert len(aggregator.last_duplicate_clusters) == 1
+
+
+def test_scales_to_thousands_of_items():
+    import random
+    rng = random.Random(0)
+    vocabulary = [f'word{i}' for i in range(2000)]
+    texts = [' '.join(rng.choice(vocabulary) for _ in range(12)) for _ in range(3000)]
+    # 每100条中挑一条做大小写/标点改写
+    rewritten = [texts[i].title().replace(' ', ', ', 1) for i in range(0, 3000, 100)]
+
+    groups = NearDuplicateDetector().cluster(texts + rewritten)
+    merged = [sorted(g) for g in groups if len(g) > 1]
+
+    assert len(groups) == 3000
+    assert sorted(merged) == [[i, 3000 + k] for k, i in enumerate(range(0, 3000, 100))]
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+新闻相关性过滤器自动机测试
+验证关键词自动机评分、批量过滤结果与逐关键词子串匹配完全一致
+"""
+
+import os
+import random
+import sys
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.keyword_matcher import KeywordAutomaton
+from tradingagents.utils.news_filter import NewsRelevanceFilter
+from tradingagents.utils.enhanced_news_filter import EnhancedNewsFilter
+
+
+def _reference_score(f, title, content):
+    """逐关键词子串匹配的参考实现"""
+    score = 0
+    title_lower, content_lower = title.lower(), content.lower()
+    if f.company_name in title:
+        score += 50
+    elif f.company_name in content:
+        score += 25
+    if f.stock_code in title:
+        score += 40
+    elif f.stock_code in content:
+        score += 20
+    for kw in f.strong_keywords:
+        if kw in title_lower:
+            score += 30
+        elif kw in content_lower:
+            score += 15
+    for kw in f.include_keywords:
+        if kw in title_lower:
+            score += 15
+        elif kw in content_lower:
+            score += 8
+    for kw in f.exclude_keywords:
+        if kw in title_lower:
+            score -= 40
+        elif kw in content_lower:
+            score -= 20
+    if f.company_name not in title and f.stock_code not in title:
+        if any(kw in title_lower for kw in f.exclude_keywords):
+            score -= 30
+    return max(0, min(100, score))
+
+
+def _reference_filter(f, news_df, min_score):
+    rows = []
+    for _, row in news_df.iterrows():
+        title = row.get('新闻标题', row.get('标题', ''))
+        content = row.get('新闻内容', row.get('内容', ''))
+        score = _reference_score(f, title, content)
+        if score >= min_score:
+            row_dict = row.to_dict()
+            row_dict['relevance_score'] = score
+            rows.append(row_dict)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values('relevance_score', ascending=False)
+
+
+def _random_news(f, count, seed=0):
+    rng = random.Random(seed)
+    words = (f.strong_keywords + f.include_keywords + f.exclude_keywords +
+             [f.company_name, f.stock_code, 'ETF', 'st', '今日', '市场', '资金', '银行', '上涨', '600'])
+    def text(n):
+        return ''.join(rng.choice(words) for _ in range(rng.randint(0, n)))
+    return pd.DataFrame({
+        '新闻标题': [text(4) for _ in range(count)],
+        '新闻内容': [text(12) for _ in range(count)],
+        '发布时间': pd.date_range('2025-01-01', periods=count, freq='h'),
+        '阅读数': list(range(count)),
+    }, index=range(100, 100 + count))
+
+
+def test_automaton_matches_overlapping_keywords():
+    automaton = KeywordAutomaton(['业绩', '业绩预告', '重组', '资产重组', 'st'])
+    assert automaton.find('公司发布资产重组及业绩预告') == {'业绩', '业绩预告', '重组', '资产重组'}
+    assert automaton.find('ST') == frozenset()
+    assert automaton.find('') == frozenset()
+
+
+def test_scores_match_reference():
+    f = NewsRelevanceFilter('600036', '招商银行')
+    news = _random_news(f, 500)
+    titles, contents = news['新闻标题'].tolist(), news['新闻内容'].tolist()
+
+    expected = [_reference_score(f, t, c) for t, c in zip(titles, contents)]
+    assert f.score_texts(titles, contents).tolist() == expected
+    assert [f.calculate_relevance_score(t, c) for t, c in zip(titles, contents)] == expected
+
+
+def test_filter_news_matches_reference():
+    f = NewsRelevanceFilter('600036', '招商银行')
+    news = _random_news(f, 300, seed=1)
+
+    for min_score in (0, 30, 60):
+        pd.testing.assert_frame_equal(f.filter_news(news, min_score), _reference_filter(f, news, min_score))
+
+
+def test_filter_news_alternate_columns_and_empty_result():
+    f = NewsRelevanceFilter('600036', '招商银行')
+    news = pd.DataFrame({'标题': ['招商银行发布年报', '银行ETF上涨'], '内容': ['净利润增长', '成分股普涨']})
+
+    result = f.filter_news(news, min_score=30)
+    pd.testing.assert_frame_equal(result, _reference_filter(f, news, 30))
+    assert result['标题'].tolist() == ['招商银行发布年报']
+    assert f.filter_news(news, min_score=101).empty
+
+
+def test_keyword_changes_rebuild_automaton():
+    f = NewsRelevanceFilter('600036', '招商银行')
+    assert f.calculate_relevance_score('招商银行新闻', '') == 50
+    f.include_keywords.append('新闻')
+    assert f.calculate_relevance_score('招商银行新闻', '') == 65
+
+
+def test_enhanced_filter_uses_rule_engine():
+    f = EnhancedNewsFilter('600036', '招商银行', use_semantic=False, use_local_model=False)
+    news = _random_news(f, 200, seed=2)
+
+    result = f.filter_news_enhanced(news, min_score=20)
+    reference = _reference_filter(f, news, 50).rename(columns={'relevance_score': 'rule_score'})
+    assert result['rule_score'].tolist() == reference['rule_score'].tolist()
+    assert (result['final_score'] == result['rule_score'] * 0.4).all()
+    assert list(result.columns[-4:]) == ['rule_score', 'semantic_score', 'classification_score', 'final_score']
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量新闻库测试
+验证按URL/内容哈希去重、(股票, 新闻源)水位线以及聚合器只拉取增量新闻
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.news_store import NewsStore, news_key
+from tradingagents.dataflows.realtime_news_utils import NewsItem, NewsSourceError, RealtimeNewsAggregator
+
+
+def _news(title, minutes_ago, url='', source='FinnHub'):
+    return NewsItem(
+        title=title,
+        content='',
+        source=source,
+        publish_time=datetime.fromtimestamp(time.time() - minutes_ago * 60),
+        url=url,
+        urgency='low',
+        relevance_score=1.0,
+    )
+
+
+def test_news_key_prefers_url():
+    assert news_key('https://a/1', 'x', 'y') == news_key('https://a/1', 'z', '')
+    assert news_key('', 'Title', 'body') == news_key('', ' title ', 'body')
+    assert news_key('', 'Title', 'body') != news_key('', 'Title', 'other')
+
+
+def test_add_news_dedupes_and_advances_watermark(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'), min_refresh_seconds=60)
+    now = datetime.now()
+
+    items = [_news('AAPL beats earnings estimates', 30, 'https://n/1'), _news('AAPL launches new iPhone', 10)]
+    assert store.add_news('AAPL', 'FinnHub', items, fetched_at=now, covered_since=now - timedelta(hours=6)) == 2
+    assert store.add_news('AAPL', 'FinnHub', items[:1], fetched_at=now, covered_since=now - timedelta(hours=1)) == 0
+
+    watermark = store.get_watermark('AAPL', 'FinnHub')
+    assert watermark.covered_since <= now - timedelta(hours=6) + timedelta(seconds=1)
+    assert abs((watermark.latest_publish_time - items[1].publish_time).total_seconds()) < 1e-3
+    assert [n.title for n in store.get_news('AAPL', now - timedelta(hours=1))] == [
+        'AAPL launches new iPhone', 'AAPL beats earnings estimates']
+    assert store.get_news('MSFT', now - timedelta(hours=1)) == []
+
+
+def test_plan_fetch(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'), min_refresh_seconds=60, overlap_minutes=10)
+    now = datetime.now()
+
+    assert store.plan_fetch('AAPL', 'FinnHub', 6, now) == 6
+    store.add_news('AAPL', 'FinnHub', [], fetched_at=now, covered_since=now - timedelta(hours=6))
+
+    assert store.plan_fetch('AAPL', 'FinnHub', 6, now + timedelta(seconds=30)) is None
+    assert store.plan_fetch('AAPL', 'FinnHub', 6, now + timedelta(minutes=20)) == 1
+    assert store.plan_fetch('AAPL', 'FinnHub', 6, now + timedelta(hours=3)) == 4
+    # 请求的窗口超出已覆盖区间时全量拉取
+    assert store.plan_fetch('AAPL', 'FinnHub', 24, now + timedelta(minutes=20)) == 24
+
+
+def test_aggregator_fetches_only_increments(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'), min_refresh_seconds=60)
+    aggregator = RealtimeNewsAggregator(source_timeout=1.0, news_store=store)
+    aggregator.finnhub_key = 'key'
+    aggregator.alpha_vantage_key = None
+    aggregator.newsapi_key = None
+
+    calls = []
+    batches = [[_news('AAPL beats earnings estimates', 30, 'https://n/1')],
+               [_news('AAPL beats earnings estimates', 30, 'https://n/1'), _news('AAPL opens new store in Mumbai', 1)]]
+
+    def finnhub(ticker, hours_back):
+        calls.append(hours_back)
+        return batches[len(calls) - 1]
+
+    aggregator._get_finnhub_realtime_news = finnhub
+    aggregator._get_chinese_finance_news = lambda ticker, hours_back: []
+
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL', hours_back=6)
+    assert [n.title for n in news] == ['AAPL beats earnings estimates']
+    assert calls == [6]
+
+    # 刚拉取过：直接使用新闻库
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL', hours_back=6)
+    assert metadata['sources']['FinnHub']['status'] == 'cached'
+    assert len(news) == 1 and calls == [6]
+
+    # 超过刷新间隔：只请求水位线之后的增量
+    store.min_refresh_seconds = 0
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL', hours_back=6)
+    assert calls == [6, 1]
+    assert metadata['sources']['FinnHub']['new'] == 1
+    assert [n.title for n in news] == ['AAPL opens new store in Mumbai', 'AAPL beats earnings estimates']
+
+
+def test_failed_fetch_does_not_advance_watermark(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'), min_refresh_seconds=0)
+    aggregator = RealtimeNewsAggregator(source_timeout=1.0, news_store=store)
+    aggregator.finnhub_key = 'key'
+    aggregator.alpha_vantage_key = None
+    aggregator.newsapi_key = None
+
+    calls = []
+
+    def finnhub(ticker, hours_back):
+        calls.append(hours_back)
+        if len(calls) == 1:
+            raise RuntimeError('HTTP 502')
+        return [_news('AAPL beats earnings estimates', 120, 'https://n/1')]
+
+    def chinese(ticker, hours_back):
+        # 部分子来源失败：已获取的新闻入库，但不推进水位线
+        raise NewsSourceError('东方财富: timeout', items=[_news('苹果公司发布最新季度财报数据', 30, source='财联社')])
+
+    aggregator._get_finnhub_realtime_news = finnhub
+    aggregator._get_chinese_finance_news = chinese
+
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL', hours_back=6)
+    assert metadata['sources']['FinnHub']['status'] == 'error'
+    assert metadata['sources']['中文财经']['status'] == 'partial'
+    assert [n.title for n in news] == ['苹果公司发布最新季度财报数据']
+    assert store.get_watermark('AAPL', 'FinnHub') is None
+    assert store.get_watermark('AAPL', '中文财经') is None
+
+    # 失败后的下一次拉取仍请求完整窗口
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL', hours_back=6)
+    assert calls == [6, 6]
+    assert metadata['sources']['FinnHub']['status'] == 'ok'
+    assert store.get_watermark('AAPL', 'FinnHub') is not None
+    assert {n.title for n in news} == {'AAPL beats earnings estimates', '苹果公司发布最新季度财报数据'}
+
+
+def test_chinese_finance_source_succeeds_for_us_ticker(tmp_path, monkeypatch):
+    from tradingagents.dataflows import akshare_utils
+
+    requested = []
+    monkeypatch.setattr(akshare_utils, 'get_stock_news_em', lambda code, *a, **kw: requested.append(code))
+    store = NewsStore(str(tmp_path / 'news.db'), min_refresh_seconds=0)
+    aggregator = RealtimeNewsAggregator(source_timeout=1.0, news_store=store)
+    aggregator.finnhub_key = aggregator.alpha_vantage_key = aggregator.newsapi_key = None
+
+    # 美股代码不请求东方财富；没有失败的子来源时推进水位线
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL', hours_back=6)
+    assert requested == []
+    assert metadata['sources']['中文财经']['status'] == 'empty'
+    assert store.get_watermark('AAPL', '中文财经') is not None
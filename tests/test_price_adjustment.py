@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+复权价格计算测试
+验证向量化前复权/后复权结果与逐行回推实现一致
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.price_adjustment import adjust_prices, backward_adjust, forward_adjust
+
+
+def _make_frame(symbol='000001.SZ', rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    pct_chg = rng.normal(0, 2, rows)
+    close = 10 * np.cumprod(1 + pct_chg / 100)
+    close[rows // 2:] /= 1.5  # 模拟除权跳空
+    return pd.DataFrame({
+        'ts_code': symbol,
+        'trade_date': pd.bdate_range('2024-01-02', periods=rows),
+        'open': close * 0.99,
+        'high': close * 1.02,
+        'low': close * 0.98,
+        'close': close,
+        'pct_chg': pct_chg,
+    })
+
+
+def _reference_forward(frame):
+    """逐行回推的参考实现"""
+    closes = [frame['close'].iloc[-1]]
+    for i in range(len(frame) - 2, -1, -1):
+        closes.insert(0, closes[0] / (1 + frame['pct_chg'].iloc[i + 1] / 100))
+    return np.array(closes)
+
+
+def test_forward_adjust_matches_reference():
+    frame = _make_frame()
+    result = forward_adjust(frame)
+
+    expected_close = _reference_forward(frame)
+    np.testing.assert_allclose(result['close'], expected_close, rtol=1e-12)
+
+    ratio = expected_close / frame['close'].to_numpy()
+    np.testing.assert_allclose(result['open'], frame['open'] * ratio, rtol=1e-12)
+    np.testing.assert_allclose(result['high'], frame['high'] * ratio, rtol=1e-12)
+    np.testing.assert_allclose(result['low'], frame['low'] * ratio, rtol=1e-12)
+
+    # 最后一天价格不变，原始价格列保留
+    assert result['close'].iloc[-1] == pytest.approx(frame['close'].iloc[-1])
+    np.testing.assert_allclose(result['close_raw'], frame['close'])
+    assert (result['price_type'] == 'forward_adjusted').all()
+
+
+def test_forward_adjust_removes_ex_rights_gap():
+    frame = _make_frame()
+    result = forward_adjust(frame)
+    returns = result['close'].pct_change().iloc[1:] * 100
+    np.testing.assert_allclose(returns, frame['pct_chg'].iloc[1:], rtol=1e-9)
+
+
+def test_backward_adjust_anchors_first_close():
+    frame = _make_frame()
+    result = backward_adjust(frame)
+    assert result['close'].iloc[0] == pytest.approx(frame['close'].iloc[0])
+    returns = result['close'].pct_change().iloc[1:] * 100
+    np.testing.assert_allclose(returns, frame['pct_chg'].iloc[1:], rtol=1e-9)
+
+
+def test_long_format_matches_per_symbol():
+    """长表一次计算与逐只股票计算结果一致"""
+    frames = [_make_frame(f'00000{i}.SZ', rows=40 + i * 10, seed=i) for i in range(3)]
+    # 打乱顺序，验证内部会按(股票, 日期)排序
+    long_frame = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=1)
+
+    batched = forward_adjust(long_frame)
+    for frame in frames:
+        symbol = frame['ts_code'].iloc[0]
+        single = forward_adjust(frame)
+        part = batched[batched['ts_code'] == symbol].reset_index(drop=True)
+        np.testing.assert_allclose(part['close'], single['close'], rtol=1e-12)
+        np.testing.assert_allclose(part['low'], single['low'], rtol=1e-12)
+
+
+def test_adj_factor_source():
+    frame = _make_frame(rows=5)
+    frame['adj_factor'] = [1.0, 1.0, 1.5, 1.5, 1.5]
+
+    forward = adjust_prices(frame, method='forward', source='adj_factor')
+    np.testing.assert_allclose(forward['close'], frame['close'] * frame['adj_factor'] / 1.5)
+
+    backward = adjust_prices(frame, method='backward')
+    np.testing.assert_allclose(backward['close'], frame['close'] * frame['adj_factor'])
+
+
+def test_missing_source_column_raises():
+    frame = _make_frame().drop(columns=['pct_chg'])
+    with pytest.raises(ValueError):
+        forward_adjust(frame)
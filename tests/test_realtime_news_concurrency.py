@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时新闻并发聚合测试
+验证各新闻源并发获取、单源截止时间以及耗时/超时元数据
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.realtime_news_utils import NewsItem, RealtimeNewsAggregator
+
+
+def _news(title, source, minutes_ago=0):
+    return NewsItem(
+        title=title,
+        content='',
+        source=source,
+        publish_time=datetime.fromtimestamp(time.time() - minutes_ago * 60),
+        url='',
+        urgency='low',
+        relevance_score=1.0,
+    )
+
+
+def _make_aggregator(delays, source_timeout=0.3):
+    aggregator = RealtimeNewsAggregator(source_timeout=source_timeout)
+    aggregator.finnhub_key = 'key'
+    aggregator.alpha_vantage_key = 'key'
+    aggregator.newsapi_key = None
+
+    def delayed(name, items):
+        def fetch(ticker, hours_back):
+            time.sleep(delays[name])
+            return items
+        return fetch
+
+    aggregator._get_finnhub_realtime_news = delayed('FinnHub', [_news('AAPL beats earnings estimates', 'FinnHub', 5)])
+    aggregator._get_alpha_vantage_news = delayed('Alpha Vantage', [_news('AAPL launches new product line', 'AV', 1)])
+    aggregator._get_chinese_finance_news = delayed('中文财经', [_news('苹果公司发布最新季度财报数据', '东方财富', 2)])
+    return aggregator
+
+
+def test_sources_are_fetched_concurrently():
+    aggregator = _make_aggregator({'FinnHub': 0.2, 'Alpha Vantage': 0.2, '中文财经': 0.2}, source_timeout=1.0)
+
+    start = time.monotonic()
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL', max_news=10)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5
+    assert len(news) == 3
+    assert [n.source for n in news] == ['AV', '东方财富', 'FinnHub']
+    assert metadata['sources']['FinnHub']['status'] == 'ok'
+    assert metadata['sources']['NewsAPI']['status'] == 'skipped'
+    assert metadata['timed_out'] == []
+
+
+def test_slow_source_times_out_without_blocking():
+    aggregator = _make_aggregator({'FinnHub': 0.05, 'Alpha Vantage': 2.0, '中文财经': 0.05}, source_timeout=0.3)
+
+    start = time.monotonic()
+    news, metadata = aggregator.get_realtime_stock_news_with_metadata('AAPL')
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 1.0
+    assert {n.source for n in news} == {'FinnHub', '东方财富'}
+    assert metadata['timed_out'] == ['Alpha Vantage']
+    assert metadata['sources']['Alpha Vantage']['status'] == 'timeout'
+    assert metadata['sources']['FinnHub']['latency'] < 0.3
+    assert aggregator.last_fetch_metadata is metadata
+
+
+def test_failing_source_is_reported():
+    aggregator = _make_aggregator({'FinnHub': 0.0, 'Alpha Vantage': 0.0, '中文财经': 0.0})
+
+    def boom(ticker, hours_back):
+        raise RuntimeError('connection reset')
+
+    aggregator._get_alpha_vantage_news = boom
+    news = aggregator.get_realtime_stock_news('AAPL')
+
+    assert len(news) == 2
+    stats = aggregator.last_fetch_metadata['sources']['Alpha Vantage']
+    assert stats['status'] == 'error'
+    assert 'connection reset' in stats['error']
+
+
+def test_duplicates_keep_higher_priority_source():
+    aggregator = _make_aggregator({'FinnHub': 0.1, 'Alpha Vantage': 0.0, '中文财经': 0.0})
+    aggregator._get_alpha_vantage_news = lambda ticker, hours_back: [_news('AAPL beats earnings estimates', 'AV')]
+
+    news = aggregator.get_realtime_stock_news('AAPL')
+    sources = [n.source for n in news if n.title == 'AAPL beats earnings estimates']
+    # 即使FinnHub更晚返回，合并顺序仍按新闻源优先级
+    assert sources == ['FinnHub']
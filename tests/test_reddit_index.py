@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reddit离线数据日期索引测试
+验证按日期字节偏移读取的结果与逐行扫描一致，索引持久化并在文件变化后重建
+"""
+
+import json
+import os
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows import reddit_utils
+from tradingagents.dataflows.reddit_utils import (
+    INDEX_DIR_NAME,
+    fetch_top_from_category,
+    fetch_top_from_category_range,
+    ticker_to_company,
+)
+
+
+def _scan_reference(category, date, max_limit, query, data_path):
+    """逐行扫描的参考实现"""
+    files = os.listdir(os.path.join(data_path, category))
+    limit = max_limit // len(files)
+    result = []
+    for data_file in files:
+        if not data_file.endswith(".jsonl"):
+            continue
+        posts = []
+        with open(os.path.join(data_path, category, data_file), "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                parsed = json.loads(line)
+                post_date = datetime.utcfromtimestamp(parsed["created_utc"]).strftime("%Y-%m-%d")
+                if post_date != date:
+                    continue
+                if "company" in category and query:
+                    terms = ticker_to_company[query].split(" OR ") + [query]
+                    if not any(re.search(t, parsed["title"], re.IGNORECASE) or
+                               re.search(t, parsed["selftext"], re.IGNORECASE) for t in terms):
+                        continue
+                posts.append({"title": parsed["title"], "content": parsed["selftext"], "url": parsed["url"],
+                              "upvotes": parsed["ups"], "posted_date": post_date})
+        posts.sort(key=lambda x: x["upvotes"], reverse=True)
+        result.extend(posts[:limit])
+    return result
+
+
+def _write_dataset(root, seed=0):
+    rng = random.Random(seed)
+    words = ["apple", "Tesla", "market", "Facebook", "rally", "Meta", "earnings", "AAPL", "fed", "TSLA"]
+    base = datetime(2024, 5, 1).timestamp()
+    for category in ("global_news", "company_news"):
+        os.makedirs(os.path.join(root, category))
+        for sub in ("stocks", "investing", "wallstreetbets"):
+            with open(os.path.join(root, category, f"{sub}.jsonl"), "w") as f:
+                for i in range(300):
+                    post = {
+                        "created_utc": base + rng.randint(0, 12 * 86400),
+                        "title": " ".join(rng.choice(words) for _ in range(5)),
+                        "selftext": " ".join(rng.choice(words) for _ in range(rng.randint(0, 8))),
+                        "url": f"https://reddit.com/{sub}/{i}",
+                        "ups": rng.randint(0, 50),
+                    }
+                    f.write(json.dumps(post) + "\n")
+                    if i % 50 == 0:
+                        f.write("\n")
+        with open(os.path.join(root, category, "README.txt"), "w") as f:
+            f.write("not data")
+
+
+def test_range_matches_line_scan(tmp_path):
+    root = str(tmp_path)
+    _write_dataset(root)
+    dates = [(datetime(2024, 5, 1) + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(14)]
+
+    for category, query in (("global_news", None), ("company_news", "AAPL"), ("company_news", "META")):
+        result = fetch_top_from_category_range(category, dates, 20, query, data_path=root)
+        for date in dates:
+            assert result[date] == _scan_reference(category, date, 20, query, root)
+            assert fetch_top_from_category(category, date, 20, query, data_path=root) == result[date]
+
+
+def test_index_persisted_and_rebuilt_on_change(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    _write_dataset(root)
+    index_file = os.path.join(root, INDEX_DIR_NAME, "global_news", "stocks.jsonl.index.json")
+
+    fetch_top_from_category("global_news", "2024-05-02", 20, data_path=root)
+    assert os.path.exists(index_file)
+    # 索引目录不能放进分类目录，否则会改变文件数和每个子版块的配额
+    assert sorted(os.listdir(os.path.join(root, "global_news"))) == [
+        "README.txt", "investing.jsonl", "stocks.jsonl", "wallstreetbets.jsonl"]
+
+    # 已有索引时不再逐行扫描
+    reddit_utils._loaded_indexes.clear()
+    monkeypatch.setattr(reddit_utils, "_build_date_index", lambda path: (_ for _ in ()).throw(AssertionError(path)))
+    fetch_top_from_category("global_news", "2024-05-03", 20, data_path=root)
+    monkeypatch.undo()
+
+    data_file = os.path.join(root, "global_news", "stocks.jsonl")
+    with open(data_file, "a") as f:
+        f.write(json.dumps({"created_utc": datetime(2024, 6, 1, 12).timestamp(), "title": "new post",
+                            "selftext": "", "url": "u", "ups": 1}) + "\n")
+    os.utime(data_file, (1e9, 1e9))
+    posts = fetch_top_from_category("global_news", "2024-06-01", 20, data_path=root)
+    assert [p["title"] for p in posts] == ["new post"]
+
+
+def test_company_news_report_covers_look_back_window(tmp_path, monkeypatch):
+    from tradingagents.dataflows import interface
+
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "reddit_data"))
+    _write_dataset(os.path.join(root, "reddit_data"))
+    monkeypatch.setattr(interface, "DATA_DIR", root)
+
+    report = interface.get_reddit_company_news("TSLA", "2024-05-08", 3, 20)
+    posts = [p for d in ("2024-05-05", "2024-05-06", "2024-05-07", "2024-05-08")
+             for p in _scan_reference("company_news", d, 20, "TSLA", os.path.join(root, "reddit_data"))]
+
+    assert report.startswith("##TSLA News Reddit, from 2024-05-05 to 2024-05-09 00:00:00:")
+    assert report.count("### ") == len(posts) > 0
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+技术指标窗口查询测试
+验证get_stock_stats_indicators_window只加载一次数据，且输出文本与逐日查询的原实现一致
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+stockstats = pytest.importorskip('stockstats')
+
+from tradingagents.dataflows import interface
+from tradingagents.dataflows.stockstats_utils import StockstatsUtils
+
+
+SYMBOL = 'TEST'
+
+
+@pytest.fixture
+def offline_data_dir(tmp_path, monkeypatch):
+    rng = np.random.default_rng(7)
+    rows = 260
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, rows))
+    # 与yfinance离线数据一致：带时区偏移的日期字符串（跨越夏令时切换）
+    dates = pd.bdate_range('2024-01-02', periods=rows).tz_localize('America/New_York')
+    data = pd.DataFrame({
+        'Date': dates.astype(str),
+        'Open': close * 0.99,
+        'High': close * 1.02,
+        'Low': close * 0.97,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, rows),
+    })
+    price_dir = tmp_path / 'market_data' / 'price_data'
+    price_dir.mkdir(parents=True)
+    data.to_csv(price_dir / f'{SYMBOL}-YFin-data-2015-01-01-2025-03-25.csv', index=False)
+    monkeypatch.setattr(interface, 'DATA_DIR', str(tmp_path))
+    return price_dir
+
+
+def _legacy_window_lines(price_dir, indicator, curr_date, look_back_days):
+    """原实现：逐日读取CSV、stockstats计算并匹配日期"""
+    csv_path = price_dir / f'{SYMBOL}-YFin-data-2015-01-01-2025-03-25.csv'
+    dates_in_df = pd.to_datetime(pd.read_csv(csv_path)['Date'], utc=True).astype(str).str[:10]
+
+    end = datetime.strptime(curr_date, '%Y-%m-%d')
+    before = end - relativedelta(days=look_back_days)
+    lines = ''
+    while end >= before:
+        day = end.strftime('%Y-%m-%d')
+        if day in dates_in_df.values:
+            df = stockstats.wrap(pd.read_csv(csv_path))
+            df[indicator]
+            matching = df[df['Date'].str.startswith(day)]
+            value = matching[indicator].values[0] if not matching.empty \
+                else 'N/A: Not a trading day (weekend or holiday)'
+            lines += f'{day}: {value}\n'
+        end = end - relativedelta(days=1)
+    return lines
+
+
+@pytest.mark.parametrize('indicator', ['rsi', 'macd', 'close_50_sma', 'boll_ub', 'atr', 'mfi'])
+def test_window_matches_legacy_per_day_output(offline_data_dir, indicator):
+    result = interface.get_stock_stats_indicators_window(SYMBOL, indicator, '2024-06-28', 30, False)
+    expected = _legacy_window_lines(offline_data_dir, indicator, '2024-06-28', 30)
+
+    lines = result.split('\n\n')[1]
+    assert result.startswith(f'## {indicator} values from 2024-05-29 to 2024-06-28:')
+    actual_values = [line.split(': ') for line in lines.strip().split('\n')]
+    expected_values = [line.split(': ') for line in expected.strip().split('\n')]
+    assert [d for d, _ in actual_values] == [d for d, _ in expected_values]
+    np.testing.assert_allclose([float(v) for _, v in actual_values],
+                               [float(v) for _, v in expected_values], rtol=1e-10)
+
+
+def test_window_loads_data_once(offline_data_dir, monkeypatch):
+    calls = []
+    original = StockstatsUtils.load_price_data
+
+    def counting_load(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(StockstatsUtils, 'load_price_data', staticmethod(counting_load))
+    interface.get_stock_stats_indicators_window(SYMBOL, 'rsi', '2024-06-28', 60, False)
+    assert len(calls) == 1
+
+
+def test_unsupported_indicator_still_rejected(offline_data_dir):
+    with pytest.raises(ValueError):
+        interface.get_stock_stats_indicators_window(SYMBOL, 'not_an_indicator', '2024-06-28', 5, False)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通达信连接池测试
+使用模拟的pytdx API验证连接分配、失效替换和并行分页
+"""
+
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pytest
+
+from tradingagents.dataflows import tdx_utils
+from tradingagents.dataflows.tdx_utils import TdxConnectionPool, TDX_MAX_BARS_PER_REQUEST
+
+
+SERVERS = [
+    {'ip': '10.0.0.1', 'port': 7709},
+    {'ip': '10.0.0.2', 'port': 7709},
+    {'ip': '10.0.0.3', 'port': 7709},
+]
+
+
+class FakeTdxApi:
+    """模拟的TdxHq_API"""
+
+    dead_servers = set()
+    total_bars = 2000
+    security_list_calls = 0
+
+    def __init__(self):
+        self.ip = None
+        self.alive = False
+        self.calls = 0
+
+    def connect(self, ip, port, time_out=None):
+        if ip in self.dead_servers:
+            return False
+        self.ip = ip
+        self.alive = True
+        return self
+
+    def disconnect(self):
+        self.alive = False
+
+    def get_security_count(self, market):
+        return 100 if self.alive else None
+
+    def get_security_bars(self, category, market, code, start, count):
+        if not self.alive:
+            return None
+        self.calls += 1
+        # 第0条是最新的K线，每页内部按时间升序返回
+        newest = self.total_bars - 1
+        indexes = range(max(newest - start - count + 1, 0), newest - start + 1)
+        return [{'datetime': f'bar-{i:05d}', 'close': float(i)} for i in indexes]
+
+    def get_security_list(self, market, start):
+        if not self.alive:
+            return None
+        FakeTdxApi.security_list_calls += 1
+        return [{'code': f'{i:06d}', 'name': f'深市{i}'} for i in range(start, start + 1000)]
+
+    def get_security_quotes(self, stocks):
+        if not self.alive:
+            return None
+        return [{'code': code, 'price': 10.0, 'last_close': 9.0} for _, code in stocks]
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_api():
+    FakeTdxApi.dead_servers = set()
+    FakeTdxApi.security_list_calls = 0
+    yield
+
+
+def test_pool_spreads_connections_across_servers():
+    """连接应分散到不同服务器"""
+    pool = TdxConnectionPool(SERVERS, size=3, api_factory=FakeTdxApi)
+    assert pool.start() == 3
+
+    conns = [pool.acquire() for _ in range(3)]
+    assert {c.server['ip'] for c in conns} == {s['ip'] for s in SERVERS}
+    for c in conns:
+        pool.release(c)
+    pool.close()
+
+
+def test_pool_skips_dead_servers():
+    """不可用的服务器不应占用连接"""
+    FakeTdxApi.dead_servers = {'10.0.0.1'}
+    pool = TdxConnectionPool(SERVERS, size=2, api_factory=FakeTdxApi)
+    assert pool.start() == 2
+
+    conns = [pool.acquire() for _ in range(2)]
+    assert all(c.server['ip'] != '10.0.0.1' for c in conns)
+    pool.close()
+
+
+def test_broken_connection_is_replaced():
+    """调用失败的连接被丢弃，并在另一个连接上重试"""
+    pool = TdxConnectionPool(SERVERS, size=2, api_factory=FakeTdxApi)
+    pool.start()
+
+    conn = pool.acquire()
+    conn.api.alive = False
+    pool.release(conn)
+
+    # 第一次拿到失效连接返回None，run会换连接重试
+    result = pool.run(lambda api, stocks: api.get_security_quotes(stocks), [(0, '000001')])
+    assert result[0]['code'] == '000001'
+    assert pool.health_check() == 2
+
+
+def test_health_check_replaces_dead_sockets():
+    """健康检查替换空闲的失效连接"""
+    pool = TdxConnectionPool(SERVERS, size=3, api_factory=FakeTdxApi, health_check_interval=0)
+    pool.start()
+
+    conn = pool.acquire()
+    conn.api.alive = False
+    pool.release(conn)
+
+    assert pool.health_check() == 3
+    conns = [pool.acquire() for _ in range(3)]
+    assert all(c.api.alive for c in conns)
+
+
+def test_all_servers_down_raises():
+    FakeTdxApi.dead_servers = {s['ip'] for s in SERVERS}
+    pool = TdxConnectionPool(SERVERS, size=2, api_factory=FakeTdxApi)
+    assert pool.start() == 0
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+
+
+def test_map_preserves_order_and_runs_in_parallel():
+    """map结果保持顺序，并同时使用多个连接"""
+    pool = TdxConnectionPool(SERVERS, size=3, api_factory=FakeTdxApi)
+    pool.start()
+
+    used = set()
+    lock = threading.Lock()
+
+    def fetch(api, item):
+        with lock:
+            used.add(id(api))
+        time.sleep(0.01)
+        return item * 2
+
+    assert pool.map(fetch, list(range(20))) == [i * 2 for i in range(20)]
+    assert len(used) > 1
+
+
+def test_fetch_bars_pages_long_history():
+    """长历史按800条分页并行获取，拼接后按时间升序且无重复"""
+    provider = tdx_utils.TongDaXinDataProvider.__new__(tdx_utils.TongDaXinDataProvider)
+    provider.pool = TdxConnectionPool(SERVERS, size=3, api_factory=FakeTdxApi)
+    provider.pool.start()
+    provider.connected = True
+
+    count = TDX_MAX_BARS_PER_REQUEST * 2 + 100
+    bars = provider._fetch_bars(9, 0, '000001', count)
+
+    closes = [bar['close'] for bar in bars]
+    assert len(closes) == count
+    assert closes == sorted(closes)
+    assert closes[-1] == FakeTdxApi.total_bars - 1
+
+
+def test_realtime_batch_groups_quotes():
+    """批量实时行情按批次请求并以代码为键返回"""
+    provider = tdx_utils.TongDaXinDataProvider.__new__(tdx_utils.TongDaXinDataProvider)
+    provider.pool = TdxConnectionPool(SERVERS, size=2, api_factory=FakeTdxApi)
+    provider.pool.start()
+    provider.connected = True
+    provider._get_stock_names = lambda codes: {code: f'股票{code}' for code in codes}
+
+    codes = [f'{i:06d}' for i in range(1, 200)]
+    quotes = provider.get_real_time_data_batch(codes)
+
+    assert set(quotes) == set(codes)
+    assert quotes['000001']['change'] == pytest.approx(1.0)
+
+
+def test_realtime_batch_resolves_names_once(monkeypatch):
+    """批量行情的股票名称按批次解析，证券列表只加载一次"""
+    monkeypatch.setattr(tdx_utils, '_stock_name_cache', {})
+    monkeypatch.setattr(tdx_utils, '_security_list_names', None)
+    monkeypatch.setattr(tdx_utils, '_get_stock_names_from_mongodb', lambda codes: {})
+    provider = tdx_utils.TongDaXinDataProvider.__new__(tdx_utils.TongDaXinDataProvider)
+    provider.pool = TdxConnectionPool(SERVERS, size=2, api_factory=FakeTdxApi)
+    provider.pool.start()
+    provider.connected = True
+
+    codes = ['000001', '000005', '001500', '600000', '600001']
+    quotes = provider.get_real_time_data_batch(codes)
+
+    assert quotes['000001']['name'] == '平安银行'  # 常用股票映射
+    assert quotes['000005']['name'] == '深市5'
+    assert quotes['001500']['name'] == '深市1500'
+    assert quotes['600000']['name'] == '浦发银行'
+    assert quotes['600001']['name'] == '股票600001'
+    assert FakeTdxApi.security_list_calls == 2
+
+    provider.get_real_time_data_batch(['000006', '000007'])
+    assert FakeTdxApi.security_list_calls == 2
+
+
+def test_provider_access_skips_pings_and_closes_replaced_pool(monkeypatch):
+    """获取提供器不逐个探测连接；重新创建提供器前关闭旧连接池"""
+    provider = tdx_utils.TongDaXinDataProvider.__new__(tdx_utils.TongDaXinDataProvider)
+    provider.pool = TdxConnectionPool(SERVERS, size=2, api_factory=FakeTdxApi)
+    provider.pool.start()
+    provider.connected = True
+    provider.exapi = None
+    pings = []
+    monkeypatch.setattr(provider.pool, '_ping', lambda conn: pings.append(conn) or True)
+    monkeypatch.setattr(tdx_utils, '_tdx_provider', provider)
+
+    assert tdx_utils.get_tdx_provider() is provider
+    assert pings == []
+
+    old_pool = provider.pool
+    provider.connected = False
+    replacement = object()
+    monkeypatch.setattr(tdx_utils, 'TongDaXinDataProvider', lambda: replacement)
+    assert tdx_utils.get_tdx_provider() is replacement
+    assert old_pool._closed and provider.pool is None
+
+
+def test_technical_indicators_include_macd_and_bollinger():
+    """60根K线时输出MACD和布林带的全部分量"""
+    import numpy as np
+    import pandas as pd
+
+    closes = 10 + np.sin(np.arange(60) / 5.0)
+    df = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=60, freq='D'),
+        'open': closes, 'high': closes + 0.2, 'low': closes - 0.2, 'close': closes,
+        'volume': np.full(60, 1000.0),
+    })
+    provider = tdx_utils.TongDaXinDataProvider.__new__(tdx_utils.TongDaXinDataProvider)
+
+    indicators = provider.get_stock_technical_indicators('000001', df=df)
+
+    for key in ('MA5', 'MA20', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+                'BB_Upper', 'BB_Middle', 'BB_Lower'):
+        assert indicators.get(key) is not None, key
+    assert indicators['BB_Lower'] < indicators['BB_Middle'] < indicators['BB_Upper']
+    assert indicators['MACD_Histogram'] == pytest.approx(indicators['MACD'] - indicators['MACD_Signal'])
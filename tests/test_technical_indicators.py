@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+技术指标引擎测试
+验证向量化计算结果与stockstats一致，以及按(股票代码, 复权方式, 最后一根K线)缓存
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.technical_indicators import (
+    IndicatorEngine,
+    compute_indicators,
+    normalize_bars,
+)
+
+MARKET_ANALYST_INDICATORS = [
+    'close_50_sma', 'close_200_sma', 'close_10_ema',
+    'macd', 'macds', 'macdh', 'rsi',
+    'boll', 'boll_ub', 'boll_lb', 'atr', 'vwma', 'mfi',
+]
+
+
+def _make_bars(rows=300, seed=0, start='2024-01-01'):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, rows))
+    return pd.DataFrame({
+        'Date': pd.bdate_range(start, periods=rows).strftime('%Y-%m-%d'),
+        'Open': close * 0.99,
+        'High': close * 1.02,
+        'Low': close * 0.97,
+        'Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, rows),
+    })
+
+
+def test_matches_stockstats():
+    stockstats = pytest.importorskip('stockstats')
+    bars = _make_bars()
+    result = compute_indicators(bars, MARKET_ANALYST_INDICATORS + ['rsi_6', 'close_5_sma'])
+
+    wrapped = stockstats.wrap(bars.copy())
+    for name in MARKET_ANALYST_INDICATORS + ['rsi_6', 'close_5_sma']:
+        np.testing.assert_allclose(result[name].to_numpy(), np.asarray(wrapped[name], dtype=float),
+                                   rtol=1e-10, atol=1e-10, err_msg=name)
+
+
+def test_unknown_indicator_falls_back_to_stockstats():
+    stockstats = pytest.importorskip('stockstats')
+    bars = _make_bars(rows=80)
+    result = compute_indicators(bars, ['kdjk', 'rsi'])
+    np.testing.assert_allclose(result['kdjk'], np.asarray(stockstats.wrap(bars.copy())['kdjk'], dtype=float))
+
+
+def test_group_members_are_computed_together():
+    result = compute_indicators(_make_bars(rows=60), ['macdh'])
+    assert list(result.columns[:1]) == ['macdh']
+    assert {'macd', 'macds'} <= set(result.columns)
+    np.testing.assert_allclose(result['macdh'], result['macd'] - result['macds'])
+
+
+def test_normalize_bars_sorts_and_lowercases():
+    bars = _make_bars(rows=10).iloc[::-1]
+    frame = normalize_bars(bars)
+    assert isinstance(frame.index, pd.DatetimeIndex)
+    assert frame.index.is_monotonic_increasing
+    assert {'open', 'high', 'low', 'close', 'volume'} <= set(frame.columns)
+    # 原数据不被修改
+    assert 'Close' in bars.columns
+
+
+def test_engine_caches_by_last_bar():
+    engine = IndicatorEngine(max_entries=4)
+    bars = _make_bars(rows=100)
+
+    first = engine.compute(bars, ['rsi', 'macd'], symbol='AAPL')
+    second = engine.compute(bars, ['macd'], symbol='AAPL')
+    assert engine.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+    np.testing.assert_allclose(first['macd'], second['macd'])
+
+    # 新指标合并到同一缓存项
+    engine.compute(bars, ['atr'], symbol='AAPL')
+    assert engine.stats()['entries'] == 1
+    engine.compute(bars, ['rsi', 'atr'], symbol='AAPL')
+    assert engine.stats()['hits'] == 2
+
+    # 新增一根K线或复权方式不同时重新计算
+    engine.compute(_make_bars(rows=101), ['rsi'], symbol='AAPL')
+    engine.compute(bars, ['rsi'], symbol='AAPL', adjust='forward')
+    assert engine.stats()['entries'] == 3
+
+
+def test_engine_detects_different_start_with_same_last_bar():
+    engine = IndicatorEngine()
+    long_bars = _make_bars(rows=100)
+    short_bars = long_bars.iloc[50:]
+
+    engine.compute(long_bars, ['close_10_ema'], symbol='AAPL')
+    short = engine.compute(short_bars, ['close_10_ema'], symbol='AAPL')
+    expected = compute_indicators(short_bars, ['close_10_ema'])
+    np.testing.assert_allclose(short['close_10_ema'], expected['close_10_ema'])
+
+
+def test_engine_recomputes_when_intraday_bar_updates():
+    engine = IndicatorEngine()
+    bars = _make_bars(rows=100)
+    engine.compute(bars, ['rsi', 'close_10_ema'], symbol='AAPL')
+
+    # 盘中最后一根K线的时间不变，价格和成交量更新
+    updated = bars.copy()
+    updated.loc[updated.index[-1], ['Close', 'High']] *= 1.05
+    updated.loc[updated.index[-1], 'Volume'] += 1000
+    result = engine.compute(updated, ['rsi', 'close_10_ema'], symbol='AAPL')
+
+    expected = compute_indicators(updated, ['rsi', 'close_10_ema'])
+    np.testing.assert_allclose(result['close_10_ema'], expected['close_10_ema'])
+    assert engine.stats()['hits'] == 0
+
+
+def test_engine_evicts_oldest_entries():
+    engine = IndicatorEngine(max_entries=2)
+    bars = _make_bars(rows=30)
+    for symbol in ('A', 'B', 'C'):
+        engine.compute(bars, ['rsi'], symbol=symbol)
+    assert engine.stats()['entries'] == 2
+
+
+def test_latest_returns_last_values():
+    engine = IndicatorEngine()
+    bars = _make_bars(rows=30)
+    latest = engine.latest(bars, ['close_5_sma'])
+    assert latest['close_5_sma'] == pytest.approx(bars['Close'].tail(5).mean())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地文本模型注册表测试
+验证模型共享加载、批量编码和embedding内容哈希缓存，以及增强过滤器的批量语义评分
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils import text_models
+from tradingagents.utils.text_models import DEFAULT_SENTENCE_MODEL, TextModelRegistry
+
+
+class FakeSentenceModel:
+    """按字符计数生成向量的假模型，记录每次encode调用"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), 8), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for ch in text:
+                vectors[i, ord(ch) % 8] += 1
+            vectors[i, 7] += 0.5
+        return vectors
+
+
+def _registry_with_fake_model(monkeypatch):
+    registry = TextModelRegistry()
+    model = FakeSentenceModel()
+    registry.register('sentence', DEFAULT_SENTENCE_MODEL, model)
+    monkeypatch.setattr(text_models, '_text_model_registry', registry)
+    return registry, model
+
+
+def test_encode_batches_and_caches_by_content(monkeypatch):
+    registry, model = _registry_with_fake_model(monkeypatch)
+
+    first = registry.encode(['a', 'b', 'a'])
+    second = registry.encode(['b', 'c'])
+
+    assert model.calls == [['a', 'b'], ['c']]
+    assert np.array_equal(first[0], first[2])
+    assert np.array_equal(first[1], second[0])
+    assert registry.embedding_cache.stats()['entries'] == 3
+
+
+def test_model_loaded_once_and_failures_remembered(monkeypatch):
+    loads = []
+
+    def failing_loader(name):
+        loads.append(name)
+        raise ImportError('sentence_transformers')
+
+    monkeypatch.setattr(text_models, '_load_sentence_model', failing_loader)
+    registry = TextModelRegistry()
+
+    assert registry.get_sentence_model('m') is None
+    assert registry.encode(['x'], 'm') is None
+    assert loads == ['m']
+
+
+def test_enhanced_filter_scores_all_rows_in_one_batch(monkeypatch):
+    from tradingagents.utils.enhanced_news_filter import EnhancedNewsFilter
+
+    registry, model = _registry_with_fake_model(monkeypatch)
+    first = EnhancedNewsFilter('600036', '招商银行', use_semantic=True)
+    second = EnhancedNewsFilter('000001', '平安银行', use_semantic=True)
+    assert first.sentence_model is second.sentence_model is model
+
+    titles = ['招商银行发布年报', '银行ETF上涨', '平安银行回购']
+    contents = ['净利润增长', '成分股普涨', '']
+    model.calls.clear()
+    batch = first.calculate_semantic_similarities(titles, contents)
+
+    assert len(model.calls) == 1 and len(model.calls[0]) == 3
+    assert batch == pytest.approx([first.calculate_semantic_similarity(t, c) for t, c in zip(titles, contents)])
+    assert len(model.calls) == 1  # 单条评分命中缓存
+
+    news = pd.DataFrame({'新闻标题': titles, '新闻内容': contents})
+    result = first.filter_news_enhanced(news, min_score=0)
+    assert sorted(result['semantic_score']) == pytest.approx(sorted(batch))
+    assert len(model.calls) == 1
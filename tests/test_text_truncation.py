@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按token预算的智能截断测试
+验证句子/段落边界截断、首尾保留，以及结果不超过模型token上限
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.text_truncation import (
+    TRUNCATION_MARKER, EstimatedTokenCounter, get_embedding_token_limit, smart_truncate
+)
+
+counter = EstimatedTokenCounter()
+
+
+def test_estimated_counter():
+    assert counter.count('') == 0
+    assert counter.count('市场情绪') == 4
+    assert counter.count('market') == 2
+    assert counter.prefix_chars('市场abcdefgh', 3) == 6
+    assert counter.suffix_chars('市场abcdefgh', 1) == 4
+    assert counter.prefix_chars('市场', 10) == 2
+
+
+def test_short_text_is_untouched():
+    assert smart_truncate('短文本。', 100, counter) == ('短文本。', False, 'none')
+
+
+def test_sentence_boundary_within_budget():
+    text = '。'.join(f'第{i}句市场分析内容' for i in range(5000))
+    truncated, was_truncated, strategy = smart_truncate(text, 8192, counter)
+
+    assert was_truncated and strategy == 'sentence'
+    assert truncated.endswith('。') and text.startswith(truncated)
+    assert 8192 // 2 < counter.count(truncated) <= 8192 - 50
+    # 再多一句就会超出预算
+    next_sentence = text[len(truncated):].split('。')[0] + '。'
+    assert counter.count(truncated + next_sentence) > 8192 - 50
+
+
+def test_paragraph_boundary_when_no_sentences():
+    text = '\n'.join('line %d of the english market report' % i for i in range(20000))
+    truncated, was_truncated, strategy = smart_truncate(text, 2048, counter)
+
+    assert was_truncated and strategy == 'paragraph'
+    assert truncated.endswith('\n') and counter.count(truncated) <= 2048
+
+
+def test_head_and_tail_kept_without_boundaries():
+    text = '首' * 100 + '中' * 20000 + '尾' * 100
+    truncated, was_truncated, strategy = smart_truncate(text, 1000, counter)
+
+    assert was_truncated and strategy == 'head_tail'
+    assert truncated.startswith('首' * 100) and truncated.endswith('尾' * 100)
+    assert TRUNCATION_MARKER in truncated
+    assert counter.count(truncated) <= 1000
+
+
+def test_model_token_limits():
+    assert get_embedding_token_limit('text-embedding-v3') == 8192
+    assert get_embedding_token_limit('text-embedding-v2') == 2048
+    assert get_embedding_token_limit('unknown-model') == 8192
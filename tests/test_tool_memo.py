@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工具结果运行内缓存测试
+验证相同参数的重复调用复用结果、失败结果不缓存、并发相同调用只执行一次，以及运行范围隔离
+"""
+
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from typing import Annotated
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import tool
+
+from tradingagents.utils.tool_memo import get_current_tool_memo, memoize_tool, tool_memo_scope
+
+
+def _make_tool(calls, result=lambda ticker: f"行情数据 {ticker}", delay=0.0):
+    @tool
+    @memoize_tool()
+    def get_stock_market_data_unified(
+        ticker: Annotated[str, "股票代码"],
+        start_date: Annotated[str, "开始日期"] = "2025-01-01",
+    ) -> str:
+        """获取行情数据"""
+        calls.append(ticker)
+        time.sleep(delay)
+        return result(ticker)
+
+    return get_stock_market_data_unified
+
+
+def test_repeated_calls_use_run_memo():
+    calls = []
+    market_tool = _make_tool(calls)
+
+    with tool_memo_scope("2025-06-30") as memo:
+        assert get_current_tool_memo() is memo
+        first = market_tool.invoke({"ticker": "aapl"})
+        # 参数规范化：代码大小写、空白和显式传入的默认值
+        assert market_tool.invoke({"ticker": " AAPL", "start_date": "2025-01-01"}) == first
+        market_tool.invoke({"ticker": "AAPL", "start_date": "2025-03-01"})
+
+    assert calls == ["aapl", "AAPL"]
+    summary = memo.summary()
+    assert summary["tool_calls"] == 3
+    assert summary["saved_calls"] == 1
+    assert summary["saved_by_tool"] == {"get_stock_market_data_unified": 1}
+
+    # 运行结束后不再缓存，新的运行使用新的缓存
+    assert get_current_tool_memo() is None
+    market_tool.invoke({"ticker": "AAPL"})
+    with tool_memo_scope("2025-07-01"):
+        market_tool.invoke({"ticker": "AAPL"})
+    assert len(calls) == 4
+
+
+def test_failed_results_are_not_cached():
+    calls = []
+    market_tool = _make_tool(calls, result=lambda ticker: f"❌ 获取{ticker}数据失败")
+
+    with tool_memo_scope("2025-06-30") as memo:
+        market_tool.invoke({"ticker": "AAPL"})
+        market_tool.invoke({"ticker": "AAPL"})
+
+    assert len(calls) == 2
+    assert memo.summary()["saved_calls"] == 0
+
+
+def test_concurrent_identical_calls_execute_once():
+    calls = []
+    market_tool = _make_tool(calls, delay=0.1)
+
+    with tool_memo_scope("2025-06-30") as memo:
+        # 子线程通过contextvars继承运行缓存
+        with ContextThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: market_tool.invoke({"ticker": "AAPL"}), range(4)))
+
+    assert calls == ["AAPL"]
+    assert len(set(results)) == 1
+    assert memo.summary()["saved_calls"] == 3
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Token使用记录存储测试
+验证批量写入、按天汇总统计、明细条数上限、多线程并发写入和旧版usage.json迁移
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.config.config_manager import ConfigManager, TokenTracker
+from tradingagents.config.usage_store import UsageStore
+
+
+def _record(provider='dashscope', cost=0.1, timestamp=None, session_id='s1'):
+    return {
+        'timestamp': timestamp or datetime.now().isoformat(),
+        'provider': provider,
+        'model_name': 'qwen-turbo',
+        'input_tokens': 100,
+        'output_tokens': 50,
+        'cost': cost,
+        'session_id': session_id,
+        'analysis_type': 'stock_analysis',
+    }
+
+
+def test_pending_records_are_counted_before_flush(tmp_path):
+    store = UsageStore(tmp_path / 'usage.db', flush_interval=3600)
+    store.add(_record(cost=0.1))
+    store.add(_record(provider='openai', cost=0.2, session_id='s2'))
+
+    stats = store.provider_statistics(1)
+    assert stats['dashscope']['requests'] == 1 and stats['openai']['input_tokens'] == 100
+    assert abs(store.session_cost('s2') - 0.2) < 1e-9
+
+    store.flush()
+    stats = store.provider_statistics(1)
+    assert sum(s['requests'] for s in stats.values()) == 2
+    assert len(store.load_records()) == 2
+    store.close()
+
+
+def test_rollups_survive_trimming_and_respect_period(tmp_path):
+    store = UsageStore(tmp_path / 'usage.db', max_records=3, flush_interval=3600)
+    old = (datetime.now() - timedelta(days=40)).isoformat()
+    store.add(_record(timestamp=old, cost=5.0))
+    for _ in range(5):
+        store.add(_record(cost=0.1))
+    store.flush()
+
+    assert len(store.load_records()) == 3
+    assert store.provider_statistics(30)['dashscope']['requests'] == 5
+    assert store.provider_statistics(60)['dashscope']['requests'] == 6
+    store.close()
+
+
+def test_concurrent_writers(tmp_path):
+    store = UsageStore(tmp_path / 'usage.db', flush_interval=0.01, batch_size=10)
+
+    def write():
+        for _ in range(200):
+            store.add(_record(cost=0.01))
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.close()
+
+    reopened = UsageStore(tmp_path / 'usage.db')
+    assert reopened.provider_statistics(1)['dashscope']['requests'] == 800
+    assert abs(reopened.session_cost('s1') - 8.0) < 1e-6
+
+
+def test_config_manager_migrates_usage_json(tmp_path):
+    legacy = [_record(cost=0.5, session_id='legacy')]
+    (tmp_path / 'usage.json').write_text(json.dumps(legacy), encoding='utf-8')
+
+    manager = ConfigManager(str(tmp_path))
+    assert not (tmp_path / 'usage.json').exists()
+    assert [r.session_id for r in manager.load_usage_records()] == ['legacy']
+
+    manager.add_usage_record('dashscope', 'qwen-turbo', 1000, 500, 'new')
+    assert manager.get_usage_statistics(1)['total_requests'] == 2
+    assert TokenTracker(manager).get_session_cost('legacy') == 0.5
+
+    manager.save_usage_records([])
+    assert manager.load_usage_records() == []
+    assert manager.get_usage_statistics(30)['total_requests'] == 0
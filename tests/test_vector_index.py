@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NumPy向量索引测试
+验证余弦top-k与暴力计算一致、内存映射持久化与中断写入恢复，以及记忆模块通过配置使用该后端
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.vector_index import NumpyVectorCollection, HEADER_FILE, RECORDS_FILE
+
+
+def _random_collection(directory=None, rows=600, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(rows, dim))
+    collection = NumpyVectorCollection('test_collection', directory)
+    ids = [str(i) for i in range(rows)]
+    collection.add(documents=[f'doc{i}' for i in ids], embeddings=vectors.tolist(), ids=ids,
+                   metadatas=[{'recommendation': f'rec{i}'} for i in ids])
+    return collection, vectors
+
+
+def test_top_k_matches_brute_force_cosine():
+    collection, vectors = _random_collection()
+    query = np.random.default_rng(1).normal(size=vectors.shape[1])
+
+    result = collection.query(query_embeddings=[query.tolist()], n_results=5)
+
+    cosine = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    expected = np.argsort(-cosine)[:5]
+    assert result['ids'][0] == [str(i) for i in expected]
+    assert result['distances'][0] == pytest.approx(1 - cosine[expected], abs=1e-5)
+    assert result['metadatas'][0][0] == {'recommendation': f'rec{expected[0]}'}
+
+
+def test_duplicate_ids_are_ignored_and_zero_query_returns_nothing():
+    collection = NumpyVectorCollection('dups')
+    collection.add(documents=['a', 'b'], embeddings=[[1.0, 0.0], [0.0, 1.0]], ids=['0', '0'])
+    collection.add(documents=['c'], embeddings=[[1.0, 1.0]], ids=['0'])
+
+    assert collection.count() == 1
+    assert collection.query(query_embeddings=[[0.0, 0.0]], n_results=1)['ids'] == [[]]
+
+
+def test_persistence_and_interrupted_write_recovery(tmp_path):
+    directory = str(tmp_path / 'mem')
+    collection, vectors = _random_collection(directory, rows=300)
+
+    # 模拟写入records后、提交header前进程中断
+    with open(os.path.join(directory, RECORDS_FILE), 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 'orphan', 'document': 'x', 'metadata': {}}) + '\n')
+
+    reopened = NumpyVectorCollection('test_collection', directory)
+    assert reopened.count() == 300
+    query = vectors[42].tolist()
+    assert reopened.query(query_embeddings=[query], n_results=1)['ids'] == [['42']]
+
+    reopened.add(documents=['new'], embeddings=[[1.0] * vectors.shape[1]], ids=['300'])
+    again = NumpyVectorCollection('test_collection', directory)
+    assert again.count() == 301
+    assert again.get(ids=['300'])['documents'] == ['new']
+    with open(os.path.join(directory, HEADER_FILE), 'r', encoding='utf-8') as f:
+        assert json.load(f)['count'] == 301
+
+    # 另一个实例写入后，原实例读到最新数据
+    collection.add(documents=['other'], embeddings=[[-1.0] * vectors.shape[1]], ids=['301'])
+    assert again.count() == 302
+
+
+def test_memory_uses_numpy_backend_from_config(tmp_path, monkeypatch):
+    path = os.path.join(project_root, 'tradingagents', 'agents', 'utils', 'memory.py')
+    spec = importlib.util.spec_from_file_location('memory_numpy_backend', path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        pytest.skip(f'记忆模块依赖未安装: {e}')
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('MEMORY_EMBEDDING_CACHE_ENABLED', 'false')
+    config = {'llm_provider': 'openai', 'backend_url': 'https://api.openai.com/v1',
+              'memory_backend': 'numpy', 'memory_backend_dir': str(tmp_path / 'vectors')}
+
+    def create(model, input):
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(t)), 1.0])
+                                     for i, t in enumerate(texts)])
+
+    memory = module.FinancialSituationMemory('numpy_backend_memory', config)
+    memory.client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    assert isinstance(memory.situation_collection, NumpyVectorCollection)
+
+    memory.add_situations([('短', '建议A'), ('很长很长的情况描述', '建议B')])
+    matches = memory.get_memories('很长很长的情况描述', n_matches=2)
+    assert [m['recommendation'] for m in matches] == ['建议B', '建议A']
+    assert matches[0]['similarity'] == pytest.approx(1.0, abs=1e-6)
@@ -26,12 +26,12 @@ def _get_company_name_for_social_media(ticker: str, market_info: dict) -> str:
     try:
         if market_info['is_china']:
             # 中国A股：使用统一接口获取股票信息
-            from tradingagents.dataflows.interface import get_china_stock_info_unified
-            stock_info = get_china_stock_info_unified(ticker)
+            from tradingagents.dataflows.data_source_manager import get_data_source_manager
+            profile = get_data_source_manager().get_company_profile(ticker)
 
-            # 解析股票名称
-            if "股票名称:" in stock_info:
-                company_name = stock_info.split("股票名称:")[1].split("\n")[0].strip()
+            # 使用结构化的公司信息
+            if profile.name:
+                company_name = profile.name
                 logger.debug(f"📊 [社交媒体分析师] 从统一接口获取中国股票名称: {ticker} -> {company_name}")
                 return company_name
             else:
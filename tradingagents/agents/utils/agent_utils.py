@@ -17,6 +17,7 @@ from langchain_core.messages import HumanMessage
 # 导入统一日志系统和工具日志装饰器
 from tradingagents.utils.logging_init import get_logger
 from tradingagents.utils.tool_logging import log_tool_call, log_analysis_step
+from tradingagents.utils.tool_memo import memoize_tool
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -58,6 +59,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_reddit_news(
         curr_date: Annotated[str, "Date you want to get news for in yyyy-mm-dd format"],
     ) -> str:
@@ -75,6 +77,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_finnhub_news(
         ticker: Annotated[
             str,
@@ -107,6 +110,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_reddit_stock_info(
         ticker: Annotated[
             str,
@@ -129,6 +133,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_chinese_social_sentiment(
         ticker: Annotated[str, "Ticker of a company. e.g. AAPL, TSM"],
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
@@ -197,6 +202,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_china_market_overview(
         curr_date: Annotated[str, "当前日期，格式 yyyy-mm-dd"],
     ) -> str:
@@ -242,6 +248,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_YFin_data(
         symbol: Annotated[str, "ticker symbol of the company"],
         start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
@@ -263,6 +270,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_YFin_data_online(
         symbol: Annotated[str, "ticker symbol of the company"],
         start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
@@ -284,6 +292,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_stockstats_indicators_report(
         symbol: Annotated[str, "ticker symbol of the company"],
         indicator: Annotated[
@@ -313,6 +322,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_stockstats_indicators_report_online(
         symbol: Annotated[str, "ticker symbol of the company"],
         indicator: Annotated[
@@ -342,6 +352,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_finnhub_company_insider_sentiment(
         ticker: Annotated[str, "ticker symbol for the company"],
         curr_date: Annotated[
@@ -366,6 +377,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_finnhub_company_insider_transactions(
         ticker: Annotated[str, "ticker symbol"],
         curr_date: Annotated[
@@ -390,6 +402,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_simfin_balance_sheet(
         ticker: Annotated[str, "ticker symbol"],
         freq: Annotated[
@@ -414,6 +427,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_simfin_cashflow(
         ticker: Annotated[str, "ticker symbol"],
         freq: Annotated[
@@ -438,6 +452,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_simfin_income_stmt(
         ticker: Annotated[str, "ticker symbol"],
         freq: Annotated[
@@ -464,6 +479,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_google_news(
         query: Annotated[str, "Query to search with"],
         curr_date: Annotated[str, "Curr date in yyyy-mm-dd format"],
@@ -484,6 +500,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_realtime_stock_news(
         ticker: Annotated[str, "Ticker of a company. e.g. AAPL, TSM"],
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
@@ -505,6 +522,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_stock_news_openai(
         ticker: Annotated[str, "the company's ticker"],
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
@@ -524,6 +542,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     def get_global_news_openai(
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
     ):
@@ -561,12 +580,12 @@ class Toolkit:
             logger.debug(f"📊 [DEBUG] 检测到中国A股代码: {ticker}")
             # 使用统一接口获取中国股票名称
             try:
-                from tradingagents.dataflows.interface import get_china_stock_info_unified
-                stock_info = get_china_stock_info_unified(ticker)
+                from tradingagents.dataflows.data_source_manager import get_data_source_manager
+                profile = get_data_source_manager().get_company_profile(ticker)
 
-                # 解析股票名称
-                if "股票名称:" in stock_info:
-                    company_name = stock_info.split("股票名称:")[1].split("\n")[0].strip()
+                # 使用结构化的公司信息
+                if profile.name:
+                    company_name = profile.name
                 else:
                     company_name = f"股票代码{ticker}"
 
@@ -614,8 +633,8 @@ class Toolkit:
             return f"错误：{ticker} 不是有效的中国A股代码格式"
 
         try:
-            # 使用统一数据源接口获取股票数据（默认Tushare，支持备用数据源）
-            from tradingagents.dataflows.interface import get_china_stock_data_unified
+            # 使用统一数据源接口获取结构化K线（支持缓存和备用数据源）
+            from tradingagents.dataflows.optimized_china_data import get_optimized_china_data_provider
             logger.debug(f"📊 [DEBUG] 正在获取 {ticker} 的股票数据...")
 
             # 获取最近30天的数据用于基本面分析
@@ -623,25 +642,20 @@ class Toolkit:
             end_date = datetime.strptime(curr_date, '%Y-%m-%d')
             start_date = end_date - timedelta(days=30)
 
-            stock_data = get_china_stock_data_unified(
+            analyzer = get_optimized_china_data_provider()
+            bars = analyzer.get_stock_bars(
                 ticker,
                 start_date.strftime('%Y-%m-%d'),
                 end_date.strftime('%Y-%m-%d')
             )
 
-            logger.debug(f"📊 [DEBUG] 股票数据获取完成，长度: {len(stock_data) if stock_data else 0}")
-
-            if not stock_data or "获取失败" in stock_data or "❌" in stock_data:
-                return f"无法获取股票 {ticker} 的基本面数据：{stock_data}"
-
-            # 调用真正的基本面分析
-            from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+            if bars is None:
+                return f"无法获取股票 {ticker} 的基本面数据：❌ 所有数据源都无法获取{ticker}的数据"
 
-            # 创建分析器实例
-            analyzer = OptimizedChinaDataProvider()
+            logger.debug(f"📊 [DEBUG] 股票数据获取完成，K线条数: {len(bars.bars)}")
 
             # 生成真正的基本面分析报告
-            fundamentals_report = analyzer._generate_fundamentals_report(ticker, stock_data)
+            fundamentals_report = analyzer._generate_fundamentals_report(ticker, bars)
 
             logger.debug(f"📊 [DEBUG] 中国基本面分析报告生成完成")
             logger.debug(f"📊 [DEBUG] get_china_fundamentals 结果长度: {len(fundamentals_report)}")
@@ -695,6 +709,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     @log_tool_call(tool_name="get_stock_fundamentals_unified", log_args=True)
     def get_stock_fundamentals_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -758,23 +773,25 @@ class Toolkit:
                 logger.info(f"🇨🇳 [统一基本面工具] 处理A股数据...")
                 logger.info(f"🔍 [股票代码追踪] 进入A股处理分支，ticker: '{ticker}'")
 
+                from tradingagents.dataflows.optimized_china_data import get_optimized_china_data_provider
+                analyzer = get_optimized_china_data_provider()
+                bars = None
+
                 try:
-                    # 获取股票价格数据
-                    from tradingagents.dataflows.interface import get_china_stock_data_unified
-                    logger.info(f"🔍 [股票代码追踪] 调用 get_china_stock_data_unified，传入参数: ticker='{ticker}', start_date='{start_date}', end_date='{end_date}'")
-                    stock_data = get_china_stock_data_unified(ticker, start_date, end_date)
-                    logger.info(f"🔍 [股票代码追踪] get_china_stock_data_unified 返回结果前200字符: {stock_data[:200] if stock_data else 'None'}")
+                    # 获取结构化K线，文本只在这里渲染一次
+                    logger.info(f"🔍 [股票代码追踪] 调用 get_stock_bars，传入参数: ticker='{ticker}', start_date='{start_date}', end_date='{end_date}'")
+                    bars = analyzer.get_stock_bars(ticker, start_date, end_date)
+                    stock_data = bars.to_report() if bars is not None else f"❌ 所有数据源都无法获取{ticker}的数据"
+                    logger.info(f"🔍 [股票代码追踪] A股价格数据前200字符: {stock_data[:200]}")
                     result_data.append(f"## A股价格数据\n{stock_data}")
                 except Exception as e:
-                    logger.error(f"🔍 [股票代码追踪] get_china_stock_data_unified 调用失败: {e}")
+                    logger.error(f"🔍 [股票代码追踪] get_stock_bars 调用失败: {e}")
                     result_data.append(f"## A股价格数据\n获取失败: {e}")
 
                 try:
-                    # 获取基本面数据
-                    from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
-                    analyzer = OptimizedChinaDataProvider()
+                    # 获取基本面数据，直接复用结构化K线
                     logger.info(f"🔍 [股票代码追踪] 调用 OptimizedChinaDataProvider._generate_fundamentals_report，传入参数: ticker='{ticker}'")
-                    fundamentals_data = analyzer._generate_fundamentals_report(ticker, stock_data if 'stock_data' in locals() else "")
+                    fundamentals_data = analyzer._generate_fundamentals_report(ticker, bars)
                     logger.info(f"🔍 [股票代码追踪] _generate_fundamentals_report 返回结果前200字符: {fundamentals_data[:200] if fundamentals_data else 'None'}")
                     result_data.append(f"## A股基本面数据\n{fundamentals_data}")
                 except Exception as e:
@@ -881,6 +898,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     @log_tool_call(tool_name="get_stock_market_data_unified", log_args=True)
     def get_stock_market_data_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -971,6 +989,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     @log_tool_call(tool_name="get_stock_news_unified", log_args=True)
     def get_stock_news_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -1102,6 +1121,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool()
     @log_tool_call(tool_name="get_stock_sentiment_unified", log_args=True)
     def get_stock_sentiment_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
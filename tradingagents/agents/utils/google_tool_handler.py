@@ -11,9 +11,21 @@ Google模型工具调用统一处理器
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from tradingagents.config.env_utils import parse_int_env
 
 logger = logging.getLogger(__name__)
 
+# 同一轮工具调用的默认并发线程数（工具多为网络请求，分析师每轮通常调用2-4个）
+DEFAULT_TOOL_CALL_MAX_WORKERS = 4
+
+
+def get_tool_call_max_workers() -> int:
+    """工具调用并发线程数，可通过环境变量 TOOL_CALL_MAX_WORKERS 调整（1表示顺序执行）"""
+    return max(1, parse_int_env('TOOL_CALL_MAX_WORKERS', DEFAULT_TOOL_CALL_MAX_WORKERS))
+
+
 class GoogleToolCallHandler:
     """Google模型工具调用统一处理器"""
     
@@ -130,75 +142,18 @@ class GoogleToolCallHandler:
         try:
             # 执行工具调用
             tool_messages = []
-            tool_results = []
             
             logger.info(f"[{analyst_name}] 🔧 开始执行 {len(result.tool_calls)} 个工具调用...")
             
-            for i, tool_call in enumerate(result.tool_calls):
-                tool_name = tool_call.get('name')
-                tool_args = tool_call.get('args', {})
-                tool_id = tool_call.get('id')
-                
-                logger.info(f"[{analyst_name}] 🛠️ 执行工具 {i+1}/{len(result.tool_calls)}: {tool_name}")
-                logger.info(f"[{analyst_name}] 参数: {tool_args}")
-                logger.debug(f"[{analyst_name}] 🔧 工具调用详情: {tool_call}")
-                
-                # 找到对应的工具并执行
-                tool_result = None
-                available_tools = []
-                
-                for tool in tools:
-                    current_tool_name = GoogleToolCallHandler._get_tool_name(tool)
-                    available_tools.append(current_tool_name)
-                    
-                    if current_tool_name == tool_name:
-                        try:
-                            logger.debug(f"[{analyst_name}] 🔧 找到工具: {tool.__class__.__name__}")
-                            logger.debug(f"[{analyst_name}] 🔧 工具类型检查...")
-                            
-                            # 检查工具类型并相应调用
-                            if hasattr(tool, 'invoke'):
-                                # LangChain工具，使用invoke方法
-                                logger.info(f"[{analyst_name}] 🚀 正在调用LangChain工具.invoke()...")
-                                tool_result = tool.invoke(tool_args)
-                                logger.info(f"[{analyst_name}] ✅ LangChain工具执行成功，结果长度: {len(str(tool_result))} 字符")
-                                logger.debug(f"[{analyst_name}] 🔧 工具结果类型: {type(tool_result)}")
-                            elif callable(tool):
-                                # 普通Python函数，直接调用
-                                logger.info(f"[{analyst_name}] 🚀 正在调用Python函数工具...")
-                                tool_result = tool(**tool_args)
-                                logger.info(f"[{analyst_name}] ✅ Python函数工具执行成功，结果长度: {len(str(tool_result))} 字符")
-                                logger.debug(f"[{analyst_name}] 🔧 工具结果类型: {type(tool_result)}")
-                            else:
-                                logger.error(f"[{analyst_name}] ❌ 工具类型不支持: {type(tool)}")
-                                tool_result = f"工具类型不支持: {type(tool)}"
-                            break
-                        except Exception as tool_error:
-                            logger.error(f"[{analyst_name}] ❌ 工具执行失败: {tool_error}")
-                            logger.error(f"[{analyst_name}] ❌ 异常类型: {type(tool_error).__name__}")
-                            logger.error(f"[{analyst_name}] ❌ 异常详情: {str(tool_error)}")
-                            
-                            # 记录详细的异常堆栈
-                            import traceback
-                            error_traceback = traceback.format_exc()
-                            logger.error(f"[{analyst_name}] ❌ 工具执行异常堆栈:\n{error_traceback}")
-                            
-                            tool_result = f"工具执行失败: {str(tool_error)}"
-                
-                logger.debug(f"[{analyst_name}] 🔧 可用工具列表: {available_tools}")
-                
-                if tool_result is None:
-                    tool_result = f"未找到工具: {tool_name}"
-                    logger.warning(f"[{analyst_name}] ⚠️ 未找到工具: {tool_name}")
-                    logger.debug(f"[{analyst_name}] ⚠️ 工具名称不匹配，期望: {tool_name}, 可用: {available_tools}")
-                
+            # 同一轮的工具调用相互独立，并发执行；结果按调用顺序返回
+            tool_results = GoogleToolCallHandler._execute_tool_calls(result.tool_calls, tools, analyst_name)
+            for tool_call, tool_result in zip(result.tool_calls, tool_results):
                 # 创建工具消息
                 tool_message = ToolMessage(
                     content=str(tool_result),
-                    tool_call_id=tool_id
+                    tool_call_id=tool_call.get('id')
                 )
                 tool_messages.append(tool_message)
-                tool_results.append(tool_result)
                 logger.debug(f"[{analyst_name}] 🔧 创建工具消息，ID: {tool_message.tool_call_id}")
             
             logger.info(f"[{analyst_name}] 🔧 工具调用完成，成功: {len(tool_results)}, 总计: {len(result.tool_calls)}")
@@ -362,6 +317,91 @@ class GoogleToolCallHandler:
             report = f"{analyst_name}调用了工具 {tool_names} 但处理失败: {str(e)}"
             return report, [result]
     
+    @staticmethod
+    def _execute_tool_calls(tool_calls: List[Dict[str, Any]], tools: List[Any], analyst_name: str) -> List[Any]:
+        """
+        并发执行同一轮的多个工具调用
+        
+        线程数不超过get_tool_call_max_workers()；每个调用的异常单独转换为错误结果，
+        不影响其他调用。返回结果与tool_calls顺序一致
+        """
+        if len(tool_calls) <= 1:
+            return [GoogleToolCallHandler._execute_tool_call(tc, tools, analyst_name) for tc in tool_calls]
+        
+        max_workers = min(get_tool_call_max_workers(), len(tool_calls))
+        logger.info(f"[{analyst_name}] ⚡ 并发执行 {len(tool_calls)} 个工具调用（线程数: {max_workers}）")
+        # ContextThreadPoolExecutor把当前上下文（回调、运行配置）带入工作线程
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda tc: GoogleToolCallHandler._execute_tool_call(tc, tools, analyst_name),
+                tool_calls,
+            ))
+    
+    @staticmethod
+    def _execute_tool_call(tool_call: Dict[str, Any], tools: List[Any], analyst_name: str) -> Any:
+        """执行单个工具调用，失败时返回错误信息而不是抛出异常"""
+        try:
+            tool_name = tool_call.get('name')
+            tool_args = tool_call.get('args', {})
+            
+            logger.info(f"[{analyst_name}] 🛠️ 执行工具: {tool_name}")
+            logger.info(f"[{analyst_name}] 参数: {tool_args}")
+            logger.debug(f"[{analyst_name}] 🔧 工具调用详情: {tool_call}")
+            
+            # 找到对应的工具并执行
+            tool_result = None
+            available_tools = []
+            
+            for tool in tools:
+                current_tool_name = GoogleToolCallHandler._get_tool_name(tool)
+                available_tools.append(current_tool_name)
+                
+                if current_tool_name == tool_name:
+                    try:
+                        logger.debug(f"[{analyst_name}] 🔧 找到工具: {tool.__class__.__name__}")
+                        logger.debug(f"[{analyst_name}] 🔧 工具类型检查...")
+                        
+                        # 检查工具类型并相应调用
+                        if hasattr(tool, 'invoke'):
+                            # LangChain工具，使用invoke方法
+                            logger.info(f"[{analyst_name}] 🚀 正在调用LangChain工具.invoke()...")
+                            tool_result = tool.invoke(tool_args)
+                            logger.info(f"[{analyst_name}] ✅ LangChain工具执行成功，结果长度: {len(str(tool_result))} 字符")
+                            logger.debug(f"[{analyst_name}] 🔧 工具结果类型: {type(tool_result)}")
+                        elif callable(tool):
+                            # 普通Python函数，直接调用
+                            logger.info(f"[{analyst_name}] 🚀 正在调用Python函数工具...")
+                            tool_result = tool(**tool_args)
+                            logger.info(f"[{analyst_name}] ✅ Python函数工具执行成功，结果长度: {len(str(tool_result))} 字符")
+                            logger.debug(f"[{analyst_name}] 🔧 工具结果类型: {type(tool_result)}")
+                        else:
+                            logger.error(f"[{analyst_name}] ❌ 工具类型不支持: {type(tool)}")
+                            tool_result = f"工具类型不支持: {type(tool)}"
+                        break
+                    except Exception as tool_error:
+                        logger.error(f"[{analyst_name}] ❌ 工具执行失败: {tool_error}")
+                        logger.error(f"[{analyst_name}] ❌ 异常类型: {type(tool_error).__name__}")
+                        logger.error(f"[{analyst_name}] ❌ 异常详情: {str(tool_error)}")
+                        
+                        # 记录详细的异常堆栈
+                        import traceback
+                        error_traceback = traceback.format_exc()
+                        logger.error(f"[{analyst_name}] ❌ 工具执行异常堆栈:\n{error_traceback}")
+                        
+                        tool_result = f"工具执行失败: {str(tool_error)}"
+            
+            logger.debug(f"[{analyst_name}] 🔧 可用工具列表: {available_tools}")
+            
+            if tool_result is None:
+                tool_result = f"未找到工具: {tool_name}"
+                logger.warning(f"[{analyst_name}] ⚠️ 未找到工具: {tool_name}")
+                logger.debug(f"[{analyst_name}] ⚠️ 工具名称不匹配，期望: {tool_name}, 可用: {available_tools}")
+            
+            return tool_result
+        except Exception as e:
+            logger.error(f"[{analyst_name}] ❌ 工具调用处理失败: {e}")
+            return f"工具执行失败: {str(e)}"
+    
     @staticmethod
     def _get_tool_name(tool) -> str:
         """安全地获取工具名称"""
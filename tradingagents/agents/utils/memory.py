@@ -1,17 +1,53 @@
-import chromadb
-from chromadb.config import Settings
 from openai import OpenAI
 import dashscope
 from dashscope import TextEmbedding
 import os
 import threading
+import time
 import hashlib
+from contextlib import contextmanager
 from typing import Dict, Optional
 
+from tradingagents.config.env_utils import parse_bool_env, parse_int_env
+from tradingagents.utils.embedding_cache import get_embedding_cache
+from tradingagents.utils.memory_compaction import compact_entries, get_compaction_settings
+from tradingagents.utils.text_truncation import get_embedding_token_limit, smart_truncate
+from tradingagents.utils.vector_index import get_numpy_vector_store
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("agents.utils.memory")
 
+# 批量embedding：单次请求的最大条数（阿里百炼text-embedding-v3每次最多10条）和总字符数
+EMBEDDING_BATCH_LIMITS = {"dashscope": 10, "openai": 256}
+EMBEDDING_BATCH_MAX_CHARS = 100000
+
+# 跨进程文件锁（持久化模式下多个工作进程共用同一目录）
+try:
+    from filelock import FileLock, Timeout as FileLockTimeout
+    FILELOCK_AVAILABLE = True
+except ImportError:
+    FILELOCK_AVAILABLE = False
+
+# 持久化目录中的写锁文件和写入代次文件（其他进程据此判断是否需要重新加载索引）
+WRITE_LOCK_FILE = ".memory_write.lock"
+GENERATION_FILE = ".memory_generation"
+
+
+def get_memory_persist_dir() -> Optional[str]:
+    """
+    记忆持久化目录（MEMORY_PERSISTENT=true时启用）
+
+    目录由MEMORY_PERSIST_DIR指定，默认在数据缓存目录下；未启用时返回None（使用内存模式）
+    """
+    if not parse_bool_env('MEMORY_PERSISTENT', False):
+        return None
+    persist_dir = os.getenv('MEMORY_PERSIST_DIR')
+    if not persist_dir:
+        from tradingagents.default_config import DEFAULT_CONFIG
+        persist_dir = os.path.join(DEFAULT_CONFIG['data_cache_dir'], 'chroma_memory')
+    return os.path.abspath(persist_dir)
+
 
 class ChromaDBManager:
     """单例ChromaDB管理器，避免并发创建集合的冲突"""
@@ -31,6 +67,24 @@ class ChromaDBManager:
 
     def __init__(self):
         if not self._initialized:
+            # 延迟导入：使用numpy记忆后端时不加载chromadb
+            import chromadb
+            from chromadb.config import Settings
+
+            self.persist_dir = None
+            self._write_lock = threading.RLock()
+            self._process_lock = None
+            self._generation = None
+            persist_dir = get_memory_persist_dir()
+            if persist_dir:
+                try:
+                    self._open_persistent_client(persist_dir)
+                    self._initialized = True
+                    return
+                except Exception as e:
+                    logger.error(f"❌ [ChromaDB] 持久化模式初始化失败，改用内存模式: {e}")
+                    self.persist_dir = None
+
             try:
                 # 自动检测操作系统版本并使用最优配置
                 import platform
@@ -77,11 +131,91 @@ class ChromaDBManager:
                     logger.warning(f"⚠️ [ChromaDB] 使用最简配置初始化: {backup_error}")
                 self._initialized = True
 
+    def _open_persistent_client(self, persist_dir: str):
+        """打开（或重新打开）持久化客户端"""
+        import chromadb
+        from chromadb.api.client import SharedSystemClient
+        from chromadb.config import Settings
+
+        os.makedirs(persist_dir, exist_ok=True)
+        if self.persist_dir is None:
+            if FILELOCK_AVAILABLE:
+                self._process_lock = FileLock(os.path.join(persist_dir, WRITE_LOCK_FILE))
+            else:
+                logger.warning(f"⚠️ [ChromaDB] filelock未安装，多进程并发写入记忆可能冲突")
+        # chromadb按路径缓存客户端实例，清理后才能读到其他进程写入的索引
+        SharedSystemClient.clear_system_cache()
+        self._generation = self._read_generation(persist_dir)
+        self._client = chromadb.PersistentClient(
+            path=persist_dir,
+            settings=Settings(allow_reset=True, anonymized_telemetry=False)
+        )
+        self._collections.clear()
+        self.persist_dir = persist_dir
+        logger.info(f"📚 [ChromaDB] 持久化模式初始化完成: {persist_dir}")
+
+    @staticmethod
+    def _read_generation(persist_dir: str) -> Optional[str]:
+        try:
+            with open(os.path.join(persist_dir, GENERATION_FILE), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _refresh_if_stale(self):
+        """其他进程写入过记忆时重新打开客户端（调用方持有self._lock）"""
+        if self.persist_dir and self._read_generation(self.persist_dir) != self._generation:
+            logger.info(f"📚 [ChromaDB] 检测到其他进程写入记忆，重新加载集合")
+            self._open_persistent_client(self.persist_dir)
+
+    @contextmanager
+    def write_lock(self):
+        """
+        记忆写入锁：进程内线程互斥；持久化模式下同时持有跨进程文件锁，
+        退出时更新写入代次，通知其他进程重新加载
+
+        Raises:
+            FileLockTimeout: 60秒内未获得跨进程文件锁（不在无锁状态下写入，避免编号冲突）
+        """
+        with self._write_lock:
+            if self._process_lock is None:
+                yield
+                return
+            try:
+                self._process_lock.acquire(timeout=60)
+            except FileLockTimeout:
+                logger.error(f"❌ [ChromaDB] 等待记忆写锁超时，放弃本次写入: {self.persist_dir}")
+                raise
+            try:
+                with self._lock:
+                    self._refresh_if_stale()
+                yield
+            finally:
+                try:
+                    generation = f"{os.getpid()}-{time.time_ns()}"
+                    with open(os.path.join(self.persist_dir, GENERATION_FILE), 'w', encoding='utf-8') as f:
+                        f.write(generation)
+                    self._generation = generation
+                finally:
+                    self._process_lock.release()
+
+    def _warm_up(self, name: str, collection):
+        """加载持久化集合的向量索引，避免首次查询时才加载"""
+        try:
+            count = collection.count()
+            if count > 0:
+                sample = collection.get(limit=1, include=["embeddings"])
+                collection.query(query_embeddings=[list(sample["embeddings"][0])], n_results=1)
+            logger.info(f"📚 [ChromaDB] 预热集合 {name}: {count}条记忆")
+        except Exception as e:
+            logger.warning(f"⚠️ [ChromaDB] 预热集合失败 {name}: {e}")
+
     def get_or_create_collection(self, name: str):
         """线程安全地获取或创建集合"""
         with self._lock:
+            self._refresh_if_stale()
             if name in self._collections:
-                logger.info(f"📚 [ChromaDB] 使用缓存集合: {name}")
+                logger.debug(f"📚 [ChromaDB] 使用缓存集合: {name}")
                 return self._collections[name]
 
             try:
@@ -102,6 +236,9 @@ class ChromaDBManager:
                         logger.error(f"❌ [ChromaDB] 集合操作失败: {name}, 错误: {final_error}")
                         raise final_error
 
+            if self.persist_dir:
+                self._warm_up(name, collection)
+
             # 缓存集合
             self._collections[name] = collection
             return collection
@@ -290,66 +427,230 @@ class FinancialSituationMemory:
                 self.client = "DISABLED"
                 logger.warning(f"⚠️ 未找到OPENAI_API_KEY，记忆功能已禁用")
 
+        # 所有记忆实例共享的embedding缓存（禁用时为None）
+        self.embedding_cache = get_embedding_cache()
+
+        # 向量存储后端（默认ChromaDB）
+        self.name = name
+        self.vector_store = self._create_vector_store(config)
+        self.vector_store.get_or_create_collection(name)
+
+    @staticmethod
+    def _create_vector_store(config):
+        """
+        按配置选择记忆后端
+
+        memory_backend（或环境变量MEMORY_BACKEND）为"numpy"时使用进程内NumPy向量索引，
+        memory_backend_dir（或MEMORY_BACKEND_DIR）指定其持久化目录；默认使用ChromaDB
+        """
+        backend = (config.get("memory_backend") or os.getenv("MEMORY_BACKEND") or "chroma").lower()
+        if backend == "numpy":
+            return get_numpy_vector_store(config.get("memory_backend_dir") or os.getenv("MEMORY_BACKEND_DIR"))
+        if backend != "chroma":
+            logger.warning(f"⚠️ 未知的记忆后端 {backend}，使用ChromaDB")
         # 使用单例ChromaDB管理器
-        self.chroma_manager = ChromaDBManager()
-        self.situation_collection = self.chroma_manager.get_or_create_collection(name)
+        return ChromaDBManager()
 
-    def _smart_text_truncation(self, text, max_length=8192):
-        """智能文本截断，保持语义完整性和缓存兼容性"""
-        if len(text) <= max_length:
-            return text, False  # 返回原文本和是否截断的标志
-        
-        # 尝试在句子边界截断
-        sentences = text.split('。')
-        if len(sentences) > 1:
-            truncated = ""
-            for sentence in sentences:
-                if len(truncated + sentence + '。') <= max_length - 50:  # 留50字符余量
-                    truncated += sentence + '。'
-                else:
-                    break
-            if len(truncated) > max_length // 2:  # 至少保留一半内容
-                logger.info(f"📝 智能截断：在句子边界截断，保留{len(truncated)}/{len(text)}字符")
-                return truncated, True
-        
-        # 尝试在段落边界截断
-        paragraphs = text.split('\n')
-        if len(paragraphs) > 1:
-            truncated = ""
-            for paragraph in paragraphs:
-                if len(truncated + paragraph + '\n') <= max_length - 50:
-                    truncated += paragraph + '\n'
-                else:
-                    break
-            if len(truncated) > max_length // 2:
-                logger.info(f"📝 智能截断：在段落边界截断，保留{len(truncated)}/{len(text)}字符")
-                return truncated, True
-        
-        # 最后选择：保留前半部分和后半部分的关键信息
-        front_part = text[:max_length//2]
-        back_part = text[-(max_length//2-100):]  # 留100字符给连接符
-        truncated = front_part + "\n...[内容截断]...\n" + back_part
-        logger.warning(f"⚠️ 强制截断：保留首尾关键信息，{len(text)}字符截断为{len(truncated)}字符")
-        return truncated, True
+    @property
+    def situation_collection(self):
+        """当前集合（持久化模式下其他进程写入后会重新加载）"""
+        return self.vector_store.get_or_create_collection(self.name)
+
+    def _smart_text_truncation(self, text, max_tokens=None):
+        """
+        智能文本截断，保持语义完整性和缓存兼容性
+
+        按embedding模型的token上限（max_tokens为None时）在句子或段落边界截断，否则保留首尾关键信息
+        """
+        max_tokens = max_tokens or get_embedding_token_limit(self.embedding)
+        truncated, was_truncated, strategy = smart_truncate(text, max_tokens)
+        if strategy == "sentence":
+            logger.info(f"📝 智能截断：在句子边界截断，保留{len(truncated)}/{len(text)}字符")
+        elif strategy == "paragraph":
+            logger.info(f"📝 智能截断：在段落边界截断，保留{len(truncated)}/{len(text)}字符")
+        elif strategy == "head_tail":
+            logger.warning(f"⚠️ 强制截断：保留首尾关键信息，{len(text)}字符截断为{len(truncated)}字符")
+        return truncated, was_truncated  # 返回文本和是否截断的标志
+
+    def _uses_dashscope(self):
+        """是否通过阿里百炼计算embedding"""
+        return (self.llm_provider == "dashscope" or
+                self.llm_provider == "alibaba" or
+                (self.llm_provider in ("google", "deepseek", "openrouter") and self.client is None))
+
+    def _embedding_cache_provider(self):
+        """缓存键中的提供商部分：同名模型在不同服务端点上的向量不混用"""
+        if self._uses_dashscope():
+            return "dashscope"
+        return f"{self.llm_provider}@{self.config.get('backend_url', '')}"
 
     def get_embedding(self, text):
+        """Get embedding for a text, reusing the shared embedding cache for identical text"""
+
+        cache = self.embedding_cache
+        if cache is None or self.client == "DISABLED" or not text or not isinstance(text, str):
+            return self._compute_embedding(text)
+
+        provider = self._embedding_cache_provider()
+        cached = cache.get(provider, self.embedding, text)
+        if cached is not None:
+            logger.debug(f"✅ embedding缓存命中，维度: {len(cached)}")
+            self._last_text_info = {
+                'original_length': len(text),
+                'processed_length': len(text),
+                'was_truncated': False,
+                'was_skipped': False,
+                'provider': self.llm_provider,
+                'strategy': 'embedding_cache_hit'
+            }
+            return cached
+
+        embedding, model = self._compute_embedding_with_model(text)
+        # 只缓存缓存键对应模型算出的向量：降级模型的向量维度不同，零向量表示失败或禁用
+        if model == self.embedding and any(embedding):
+            cache.put(provider, self.embedding, text, embedding)
+        return embedding
+
+    def _embedding_batch_size(self):
+        """单次批量请求的最大条数（可由MEMORY_EMBEDDING_BATCH_SIZE覆盖）"""
+        limit = EMBEDDING_BATCH_LIMITS["dashscope" if self._uses_dashscope() else "openai"]
+        override = parse_int_env('MEMORY_EMBEDDING_BATCH_SIZE', 0)
+        return min(override, limit) if override > 0 else limit
+
+    @staticmethod
+    def _iter_batches(texts, max_items, max_chars=EMBEDDING_BATCH_MAX_CHARS):
+        """按条数和总字符数切分批次"""
+        batch, batch_chars = [], 0
+        for text in texts:
+            if batch and (len(batch) >= max_items or batch_chars + len(text) > max_chars):
+                yield batch
+                batch, batch_chars = [], 0
+            batch.append(text)
+            batch_chars += len(text)
+        if batch:
+            yield batch
+
+    def _request_embeddings(self, texts):
+        """
+        一次请求计算一批文本的embedding（阿里百炼长度受限时整批降级到OpenAI）
+
+        Returns:
+            tuple: (与texts等长的向量列表, 实际使用的模型名)；请求失败时为(None, None)
+        """
+        if self._uses_dashscope():
+            import dashscope
+            from dashscope import TextEmbedding
+
+            if not getattr(dashscope, 'api_key', None):
+                logger.warning(f"⚠️ DashScope API密钥未设置，记忆功能降级")
+                return None, None
+            try:
+                response = TextEmbedding.call(model=self.embedding, input=texts)
+                if response.status_code == 200:
+                    items = sorted(response.output['embeddings'], key=lambda item: item['text_index'])
+                    return [item['embedding'] for item in items], self.embedding
+                error_msg = f"{response.code} - {response.message}"
+            except Exception as e:
+                error_msg = str(e)
+
+            if not any(keyword in error_msg.lower() for keyword in ['length', 'token', 'limit', 'exceed', 'too long']):
+                logger.error(f"❌ DashScope批量embedding失败: {error_msg}")
+                return None, None
+            logger.warning(f"⚠️ DashScope长度限制: {error_msg}")
+            if not self.fallback_available:
+                return None, None
+            logger.info(f"💡 尝试使用OpenAI降级处理本批{len(texts)}条文本")
+            client, model = self.fallback_client, self.fallback_embedding
+        else:
+            client, model = self.client, self.embedding
+
+        try:
+            response = client.embeddings.create(model=model, input=texts)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)], model
+        except Exception as e:
+            logger.error(f"❌ {self.llm_provider}批量embedding失败: {str(e)}")
+            return None, None
+
+    def get_embeddings(self, texts):
+        """
+        批量计算embedding
+
+        超过模型token上限的文本先逐条智能截断，并以截断后实际送入模型的文本作为缓存键（与逐条路径一致）；
+        命中共享缓存的文本和重复文本不再请求，其余文本按提供商的批量上限分批请求。
+        某一批失败时，该批改为逐条计算（逐条路径自带降级逻辑）
+
+        Returns:
+            list: 与texts等长的向量列表，无法计算的位置为零向量
+        """
+        results = [None] * len(texts)
+        pending = {}  # 实际送入模型的文本（智能截断后） -> 位置列表
+        truncated_inputs = {}
+        for i, text in enumerate(texts):
+            if (self.client == "DISABLED" or not text or not isinstance(text, str) or
+                    (self.enable_embedding_length_check and len(text) > self.max_embedding_length)):
+                # 与单条路径一致：禁用、无效或超过长度限制时返回零向量
+                results[i] = self.get_embedding(text)
+            else:
+                if text not in truncated_inputs:
+                    truncated_inputs[text] = self._smart_text_truncation(text)[0]
+                pending.setdefault(truncated_inputs[text], []).append(i)
+
+        cache = self.embedding_cache
+        provider = self._embedding_cache_provider() if cache is not None else None
+        if pending and cache is not None:
+            for text, vector in zip(list(pending), cache.get_many(provider, self.embedding, list(pending))):
+                if vector is not None:
+                    for i in pending.pop(text):
+                        results[i] = vector
+
+        if pending:
+            unique_texts = list(pending)
+            computed = {}
+            batch_size = self._embedding_batch_size()
+            for batch in self._iter_batches(unique_texts, batch_size):
+                vectors, model = self._request_embeddings(batch)
+                if vectors is None or len(vectors) != len(batch):
+                    logger.warning(f"⚠️ 批量embedding失败，本批{len(batch)}条改为逐条计算")
+                    vectors = [self._compute_embedding(text) for text in batch]
+                elif cache is not None and model == self.embedding:
+                    # 整批降级到OpenAI时向量维度不同，不写入阿里百炼模型的缓存键
+                    cache.put_many(provider, self.embedding, batch, vectors)
+                computed.update(zip(batch, vectors))
+
+            for text, positions in pending.items():
+                for i in positions:
+                    results[i] = computed[text]
+            logger.info(f"📦 批量embedding完成: {len(texts)}条文本，请求{len(unique_texts)}条")
+
+        return results
+
+    def _compute_embedding(self, text):
         """Get embedding for a text using the configured provider"""
+        return self._compute_embedding_with_model(text)[0]
+
+    def _compute_embedding_with_model(self, text):
+        """
+        计算embedding并返回产生该向量的模型
+
+        Returns:
+            tuple: (向量, 模型名)；降级到OpenAI时模型名为fallback_embedding，返回零向量时为None
+        """
 
         # 检查记忆功能是否被禁用
         if self.client == "DISABLED":
             # 内存功能已禁用，返回空向量
             logger.debug(f"⚠️ 记忆功能已禁用，返回空向量")
-            return [0.0] * 1024  # 返回1024维的零向量
+            return [0.0] * 1024, None  # 返回1024维的零向量
 
         # 验证输入文本
         if not text or not isinstance(text, str):
             logger.warning(f"⚠️ 输入文本为空或无效，返回空向量")
-            return [0.0] * 1024
+            return [0.0] * 1024, None
 
         text_length = len(text)
         if text_length == 0:
             logger.warning(f"⚠️ 输入文本长度为0，返回空向量")
-            return [0.0] * 1024
+            return [0.0] * 1024, None
         
         # 检查是否启用长度限制
         if self.enable_embedding_length_check and text_length > self.max_embedding_length:
@@ -364,7 +665,7 @@ class FinancialSituationMemory:
                 'strategy': 'length_limit_skip',
                 'max_length': self.max_embedding_length
             }
-            return [0.0] * 1024
+            return [0.0] * 1024, None
         
         # 记录文本信息（不进行任何截断）
         if text_length > 8192:
@@ -380,11 +681,7 @@ class FinancialSituationMemory:
             'strategy': 'no_truncation_with_fallback'  # 标记策略
         }
 
-        if (self.llm_provider == "dashscope" or
-            self.llm_provider == "alibaba" or
-            (self.llm_provider == "google" and self.client is None) or
-            (self.llm_provider == "deepseek" and self.client is None) or
-            (self.llm_provider == "openrouter" and self.client is None)):
+        if self._uses_dashscope():
             # 使用阿里百炼的嵌入模型
             try:
                 # 导入DashScope模块
@@ -394,7 +691,7 @@ class FinancialSituationMemory:
                 # 检查DashScope API密钥是否可用
                 if not hasattr(dashscope, 'api_key') or not dashscope.api_key:
                     logger.warning(f"⚠️ DashScope API密钥未设置，记忆功能降级")
-                    return [0.0] * 1024  # 返回空向量
+                    return [0.0] * 1024, None  # 返回空向量
 
                 # 尝试调用DashScope API
                 response = TextEmbedding.call(
@@ -407,7 +704,7 @@ class FinancialSituationMemory:
                     # 成功获取embedding
                     embedding = response.output['embeddings'][0]['embedding']
                     logger.debug(f"✅ DashScope embedding成功，维度: {len(embedding)}")
-                    return embedding
+                    return embedding, self.embedding
                 else:
                     # API返回错误状态码
                     error_msg = f"{response.code} - {response.message}"
@@ -426,17 +723,17 @@ class FinancialSituationMemory:
                                 )
                                 embedding = response.data[0].embedding
                                 logger.info(f"✅ OpenAI降级成功，维度: {len(embedding)}")
-                                return embedding
+                                return embedding, self.fallback_embedding
                             except Exception as fallback_error:
                                 logger.error(f"❌ OpenAI降级失败: {str(fallback_error)}")
                                 logger.info(f"💡 所有降级选项失败，记忆功能降级")
-                                return [0.0] * 1024
+                                return [0.0] * 1024, None
                         else:
                             logger.info(f"💡 无可用降级选项，记忆功能降级")
-                            return [0.0] * 1024
+                            return [0.0] * 1024, None
                     else:
                         logger.error(f"❌ DashScope API错误: {error_msg}")
-                        return [0.0] * 1024  # 返回空向量而不是抛出异常
+                        return [0.0] * 1024, None  # 返回空向量而不是抛出异常
 
             except Exception as e:
                 error_str = str(e).lower()
@@ -455,14 +752,14 @@ class FinancialSituationMemory:
                             )
                             embedding = response.data[0].embedding
                             logger.info(f"✅ OpenAI降级成功，维度: {len(embedding)}")
-                            return embedding
+                            return embedding, self.fallback_embedding
                         except Exception as fallback_error:
                             logger.error(f"❌ OpenAI降级失败: {str(fallback_error)}")
                             logger.info(f"💡 所有降级选项失败，记忆功能降级")
-                            return [0.0] * 1024
+                            return [0.0] * 1024, None
                     else:
                         logger.info(f"💡 无可用降级选项，记忆功能降级")
-                        return [0.0] * 1024
+                        return [0.0] * 1024, None
                 elif 'import' in error_str:
                     logger.error(f"❌ DashScope包未安装: {str(e)}")
                 elif 'connection' in error_str:
@@ -473,16 +770,16 @@ class FinancialSituationMemory:
                     logger.error(f"❌ DashScope embedding异常: {str(e)}")
                 
                 logger.warning(f"⚠️ 记忆功能降级，返回空向量")
-                return [0.0] * 1024
+                return [0.0] * 1024, None
         else:
             # 使用OpenAI兼容的嵌入模型
             if self.client is None:
                 logger.warning(f"⚠️ 嵌入客户端未初始化，返回空向量")
-                return [0.0] * 1024  # 返回空向量
+                return [0.0] * 1024, None  # 返回空向量
             elif self.client == "DISABLED":
                 # 内存功能已禁用，返回空向量
                 logger.debug(f"⚠️ 内存功能已禁用，返回空向量")
-                return [0.0] * 1024  # 返回1024维的零向量
+                return [0.0] * 1024, None  # 返回1024维的零向量
 
             # 尝试调用OpenAI兼容的embedding API
             try:
@@ -492,7 +789,7 @@ class FinancialSituationMemory:
                 )
                 embedding = response.data[0].embedding
                 logger.debug(f"✅ {self.llm_provider} embedding成功，维度: {len(embedding)}")
-                return embedding
+                return embedding, self.embedding
 
             except Exception as e:
                 error_str = str(e).lower()
@@ -523,7 +820,7 @@ class FinancialSituationMemory:
                         logger.error(f"❌ {self.llm_provider} embedding异常: {str(e)}")
                 
                 logger.warning(f"⚠️ 记忆功能降级，返回空向量")
-                return [0.0] * 1024
+                return [0.0] * 1024, None
 
     def get_embedding_config_status(self):
         """获取向量缓存配置状态"""
@@ -532,7 +829,8 @@ class FinancialSituationMemory:
             'max_embedding_length': self.max_embedding_length,
             'max_embedding_length_formatted': f"{self.max_embedding_length:,}字符",
             'provider': self.llm_provider,
-            'client_status': 'DISABLED' if self.client == "DISABLED" else 'ENABLED'
+            'client_status': 'DISABLED' if self.client == "DISABLED" else 'ENABLED',
+            'embedding_cache': self.embedding_cache.stats() if self.embedding_cache else None
         }
 
     def get_last_text_info(self):
@@ -542,25 +840,70 @@ class FinancialSituationMemory:
     def add_situations(self, situations_and_advice):
         """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
 
-        situations = []
-        advice = []
-        ids = []
-        embeddings = []
+        situations = [situation for situation, _ in situations_and_advice]
+        advice = [recommendation for _, recommendation in situations_and_advice]
+        if not situations:
+            return
+        embeddings = self.get_embeddings(situations)
 
-        offset = self.situation_collection.count()
+        # 编号和写入在写锁内完成，多个进程共用持久化目录时编号不会冲突
+        created_at = time.time()
+        with self.vector_store.write_lock():
+            collection = self.situation_collection
+            offset = collection.count()
+            collection.add(
+                documents=situations,
+                metadatas=[{"recommendation": rec, "created_at": created_at} for rec in advice],
+                embeddings=embeddings,
+                ids=[str(offset + i) for i in range(len(situations))],
+            )
+            total = offset + len(situations)
 
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
-            situations.append(situation)
-            advice.append(recommendation)
-            ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
+        # 设置了MEMORY_MAX_SIZE且超过条数上限10%时自动压缩（默认0表示不限制、不自动压缩）
+        max_size = get_compaction_settings()['max_size']
+        if max_size and total > max_size * 1.1:
+            self.compact()
 
-        self.situation_collection.add(
-            documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
-            embeddings=embeddings,
-            ids=ids,
-        )
+    def compact(self, similarity_threshold=None, max_size=None, half_life_days=None):
+        """
+        压缩记忆集合：合并情况近似重复的记忆，并按时间衰减的保留分数执行条数上限
+
+        参数为None时使用MEMORY_DEDUP_THRESHOLD、MEMORY_MAX_SIZE、MEMORY_HALF_LIFE_DAYS的配置
+
+        Returns:
+            Dict: 压缩统计（before/after/merged/evicted/dropped_empty）
+        """
+        settings = get_compaction_settings()
+        with self.vector_store.write_lock():
+            collection = self.situation_collection
+            data = collection.get(include=["documents", "metadatas", "embeddings"])
+            if not len(data['ids']):
+                return {'before': 0, 'after': 0, 'clusters': 0, 'merged': 0, 'evicted': 0, 'dropped_empty': 0}
+
+            documents, metadatas, embeddings, stats = compact_entries(
+                data['ids'], data['documents'], data['metadatas'], data['embeddings'],
+                similarity_threshold=similarity_threshold if similarity_threshold is not None else settings['similarity_threshold'],
+                max_size=max_size if max_size is not None else settings['max_size'],
+                half_life_days=half_life_days if half_life_days is not None else settings['half_life_days'],
+            )
+            # 重新从0编号，保持add_situations按条数编号的约定：先覆盖写入保留的条目，再删除多出的编号，
+            # 中途失败时最多留下重复条目（下次压缩会合并），不会丢失记忆
+            new_ids = [str(i) for i in range(len(documents))]
+            if documents:
+                collection.upsert(
+                    documents=documents,
+                    metadatas=metadatas,
+                    embeddings=embeddings.tolist(),
+                    ids=new_ids,
+                )
+            kept = set(new_ids)
+            stale_ids = [id_ for id_ in data['ids'] if id_ not in kept]
+            if stale_ids:
+                collection.delete(ids=stale_ids)
+
+        logger.info(f"🗜️ [记忆压缩] {self.name}: {stats['before']} -> {stats['after']}条 "
+                    f"(合并{stats['merged']}, 淘汰{stats['evicted']}, 丢弃空向量{stats['dropped_empty']})")
+        return stats
 
     def get_memories(self, current_situation, n_matches=1):
         """Find matching recommendations using embeddings with smart truncation handling"""
@@ -7,9 +7,10 @@
 import json
 import os
 import re
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -27,6 +28,18 @@ except ImportError:
     MONGODB_AVAILABLE = False
     MongoDBStorage = None
 
+from .config_snapshot import JsonFileSnapshot
+from .usage_store import UsageStore
+
+# 供应商对应的API密钥环境变量
+PROVIDER_API_KEY_ENV = {
+    "dashscope": "DASHSCOPE_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "google": "GOOGLE_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "deepseek": "DEEPSEEK_API_KEY"
+}
+
 
 @dataclass
 class ModelConfig:
@@ -73,8 +86,19 @@ class ConfigManager:
         self.models_file = self.config_dir / "models.json"
         self.pricing_file = self.config_dir / "pricing.json"
         self.usage_file = self.config_dir / "usage.json"
+        self.usage_db_file = self.config_dir / "usage.db"
         self.settings_file = self.config_dir / "settings.json"
 
+        # 配置文件快照：按文件修改时间失效，保存时显式失效
+        self._models_snapshot = JsonFileSnapshot(
+            self.models_file, self._build_models_snapshot, default=[], description="模型配置")
+        self._pricing_snapshot = JsonFileSnapshot(
+            self.pricing_file, self._build_pricing_snapshot, default=([], {}), description="定价配置")
+        self._settings_snapshot = JsonFileSnapshot(
+            self.settings_file, lambda data: data, default={}, description="设置")
+        self._resolved_models = None  # (缓存键, 模型列表, 按(供应商, 模型)的索引)
+        self._resolved_models_lock = threading.Lock()
+
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
 
@@ -84,6 +108,26 @@ class ConfigManager:
 
         self._init_default_configs()
 
+        self.usage_store = UsageStore(
+            self.usage_db_file,
+            max_records=self.load_settings().get("max_usage_records", 10000)
+        )
+        self._migrate_usage_json()
+
+    def _migrate_usage_json(self):
+        """把旧版usage.json中的记录导入使用记录数据库（仅在数据库为空时执行一次）"""
+        if not self.usage_file.exists():
+            return
+        try:
+            if self.usage_store.is_empty():
+                with open(self.usage_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.usage_store.replace_all(asdict(UsageRecord(**item)) for item in data)
+                logger.info(f"✅ 已迁移{len(data)}条使用记录到 {self.usage_db_file}")
+            self.usage_file.rename(self.usage_file.with_suffix(".json.migrated"))
+        except Exception as e:
+            logger.error(f"迁移使用记录失败: {e}")
+
     def _load_env_file(self):
         """加载.env文件（保持向后兼容）"""
         # 尝试从项目根目录加载.env文件
@@ -95,15 +139,7 @@ class ConfigManager:
 
     def _get_env_api_key(self, provider: str) -> str:
         """从环境变量获取API密钥"""
-        env_key_map = {
-            "dashscope": "DASHSCOPE_API_KEY",
-            "openai": "OPENAI_API_KEY",
-            "google": "GOOGLE_API_KEY",
-            "anthropic": "ANTHROPIC_API_KEY",
-            "deepseek": "DEEPSEEK_API_KEY"
-        }
-
-        env_key = env_key_map.get(provider.lower())
+        env_key = PROVIDER_API_KEY_ENV.get(provider.lower())
         if env_key:
             api_key = os.getenv(env_key, "")
             # 对OpenAI密钥进行格式验证（始终启用）
@@ -281,38 +317,69 @@ class ConfigManager:
             }
             self.save_settings(default_settings)
     
+    @staticmethod
+    def _build_models_snapshot(data) -> List[ModelConfig]:
+        if data is None:
+            raise FileNotFoundError("models.json不存在")
+        return [ModelConfig(**item) for item in data]
+
+    @staticmethod
+    def _build_pricing_snapshot(data):
+        if data is None:
+            raise FileNotFoundError("pricing.json不存在")
+        pricing = [PricingConfig(**item) for item in data]
+        index = {}
+        for item in pricing:
+            index.setdefault((item.provider, item.model_name), item)
+        return pricing, index
+
+    def _get_resolved_models(self):
+        """
+        合并.env密钥和OpenAI开关后的模型列表及(供应商, 模型)索引
+
+        模型文件、设置或相关环境变量不变时直接复用
+        """
+        raw_models = self._models_snapshot.get()
+        openai_enabled = self.load_settings().get("openai_enabled", False)
+        cache_key = (self._models_snapshot.version, openai_enabled,
+                     tuple(os.getenv(env_key, "") for env_key in PROVIDER_API_KEY_ENV.values()))
+        resolved = self._resolved_models
+        if resolved is not None and resolved[0] == cache_key:
+            return resolved[1], resolved[2]
+
+        with self._resolved_models_lock:
+            models = [replace(model) for model in raw_models]
+            # 合并.env中的API密钥（优先级更高）
+            for model in models:
+                env_api_key = self._get_env_api_key(model.provider)
+                if env_api_key:
+                    model.api_key = env_api_key
+                    # 如果.env中有API密钥，自动启用该模型
+                    if not model.enabled:
+                        model.enabled = True
+
+                # 特殊处理OpenAI模型
+                if model.provider.lower() == "openai":
+                    # 检查OpenAI是否在配置中启用
+                    if not openai_enabled:
+                        model.enabled = False
+                        logger.info(f"🔒 OpenAI模型已禁用: {model.model_name}")
+                    # 如果有API密钥但格式不正确，禁用模型（验证始终启用）
+                    elif model.api_key and not self.validate_openai_api_key_format(model.api_key):
+                        model.enabled = False
+                        logger.warning(f"⚠️ OpenAI模型因密钥格式不正确而禁用: {model.model_name}")
+
+            index = {}
+            for model in models:
+                index.setdefault((model.provider, model.model_name), model)
+            self._resolved_models = (cache_key, models, index)
+            return models, index
+
     def load_models(self) -> List[ModelConfig]:
         """加载模型配置，优先使用.env中的API密钥"""
         try:
-            with open(self.models_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                models = [ModelConfig(**item) for item in data]
-
-                # 获取设置
-                settings = self.load_settings()
-                openai_enabled = settings.get("openai_enabled", False)
-
-                # 合并.env中的API密钥（优先级更高）
-                for model in models:
-                    env_api_key = self._get_env_api_key(model.provider)
-                    if env_api_key:
-                        model.api_key = env_api_key
-                        # 如果.env中有API密钥，自动启用该模型
-                        if not model.enabled:
-                            model.enabled = True
-                    
-                    # 特殊处理OpenAI模型
-                    if model.provider.lower() == "openai":
-                        # 检查OpenAI是否在配置中启用
-                        if not openai_enabled:
-                            model.enabled = False
-                            logger.info(f"🔒 OpenAI模型已禁用: {model.model_name}")
-                        # 如果有API密钥但格式不正确，禁用模型（验证始终启用）
-                        elif model.api_key and not self.validate_openai_api_key_format(model.api_key):
-                            model.enabled = False
-                            logger.warning(f"⚠️ OpenAI模型因密钥格式不正确而禁用: {model.model_name}")
-
-                return models
+            models, _ = self._get_resolved_models()
+            return [replace(model) for model in models]
         except Exception as e:
             logger.error(f"加载模型配置失败: {e}")
             return []
@@ -323,18 +390,14 @@ class ConfigManager:
             data = [asdict(model) for model in models]
             with open(self.models_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            self._models_snapshot.invalidate()
         except Exception as e:
             logger.error(f"保存模型配置失败: {e}")
     
     def load_pricing(self) -> List[PricingConfig]:
         """加载定价配置"""
-        try:
-            with open(self.pricing_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return [PricingConfig(**item) for item in data]
-        except Exception as e:
-            logger.error(f"加载定价配置失败: {e}")
-            return []
+        pricing, _ = self._pricing_snapshot.get()
+        return [replace(item) for item in pricing]
     
     def save_pricing(self, pricing: List[PricingConfig]):
         """保存定价配置"""
@@ -342,27 +405,22 @@ class ConfigManager:
             data = [asdict(price) for price in pricing]
             with open(self.pricing_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            self._pricing_snapshot.invalidate()
         except Exception as e:
             logger.error(f"保存定价配置失败: {e}")
     
     def load_usage_records(self) -> List[UsageRecord]:
         """加载使用记录"""
         try:
-            if not self.usage_file.exists():
-                return []
-            with open(self.usage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [UsageRecord(**item) for item in data]
+            return [UsageRecord(**item) for item in self.usage_store.load_records()]
         except Exception as e:
             logger.error(f"加载使用记录失败: {e}")
             return []
     
     def save_usage_records(self, records: List[UsageRecord]):
-        """保存使用记录"""
+        """保存使用记录（替换全部记录）"""
         try:
-            data = [asdict(record) for record in records]
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.usage_store.replace_all(asdict(record) for record in records)
         except Exception as e:
             logger.error(f"保存使用记录失败: {e}")
     
@@ -389,31 +447,22 @@ class ConfigManager:
             if success:
                 return record
             else:
-                logger.error(f"⚠️ MongoDB保存失败，回退到JSON文件存储")
+                logger.error(f"⚠️ MongoDB保存失败，回退到本地存储")
         
-        # 回退到JSON文件存储
-        records = self.load_usage_records()
-        records.append(record)
-        
-        # 限制记录数量
-        settings = self.load_settings()
-        max_records = settings.get("max_usage_records", 10000)
-        if len(records) > max_records:
-            records = records[-max_records:]
-        
-        self.save_usage_records(records)
+        # 回退到本地存储：追加写入，由后台线程批量提交
+        self.usage_store.add(asdict(record))
         return record
     
     def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> float:
         """计算使用成本"""
-        pricing_configs = self.load_pricing()
+        pricing_configs, pricing_index = self._pricing_snapshot.get()
 
-        for pricing in pricing_configs:
-            if pricing.provider == provider and pricing.model_name == model_name:
-                input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
-                output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
-                total_cost = input_cost + output_cost
-                return round(total_cost, 6)
+        pricing = pricing_index.get((provider, model_name))
+        if pricing is not None:
+            input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
+            output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
+            total_cost = input_cost + output_cost
+            return round(total_cost, 6)
 
         # 只在找不到配置时输出调试信息
         logger.warning(f"⚠️ [calculate_cost] 未找到匹配的定价配置: {provider}/{model_name}")
@@ -426,9 +475,9 @@ class ConfigManager:
     def load_settings(self) -> Dict[str, Any]:
         """加载设置，合并.env中的配置"""
         try:
-            if self.settings_file.exists():
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
+            cached_settings = self._settings_snapshot.get()
+            if cached_settings is not None:
+                settings = dict(cached_settings)
             else:
                 # 如果设置文件不存在，创建默认设置
                 settings = {
@@ -501,21 +550,22 @@ class ConfigManager:
         try:
             with open(self.settings_file, 'w', encoding='utf-8') as f:
                 json.dump(settings, f, ensure_ascii=False, indent=2)
+            self._settings_snapshot.invalidate()
+            if getattr(self, "usage_store", None) is not None:
+                self.usage_store.max_records = settings.get("max_usage_records", 10000)
         except Exception as e:
             logger.error(f"保存设置失败: {e}")
     
     def get_enabled_models(self) -> List[ModelConfig]:
         """获取启用的模型"""
-        models = self.load_models()
-        return [model for model in models if model.enabled and model.api_key]
+        models, _ = self._get_resolved_models()
+        return [replace(model) for model in models if model.enabled and model.api_key]
     
     def get_model_by_name(self, provider: str, model_name: str) -> Optional[ModelConfig]:
         """根据名称获取模型配置"""
-        models = self.load_models()
-        for model in models:
-            if model.provider == provider and model.model_name == model_name:
-                return model
-        return None
+        _, index = self._get_resolved_models()
+        model = index.get((provider, model_name))
+        return replace(model) if model is not None else None
     
     def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
         """获取使用统计"""
@@ -532,53 +582,23 @@ class ConfigManager:
                     stats["records_count"] = stats.get("total_requests", 0)
                     return stats
             except Exception as e:
-                logger.error(f"⚠️ MongoDB统计获取失败，回退到JSON文件: {e}")
+                logger.error(f"⚠️ MongoDB统计获取失败，回退到本地存储: {e}")
         
-        # 回退到JSON文件统计
-        records = self.load_usage_records()
-        
-        # 过滤最近N天的记录
-        from datetime import datetime, timedelta
-
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_records = []
-        for record in records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    recent_records.append(record)
-            except:
-                continue
-        
-        # 统计数据
-        total_cost = sum(record.cost for record in recent_records)
-        total_input_tokens = sum(record.input_tokens for record in recent_records)
-        total_output_tokens = sum(record.output_tokens for record in recent_records)
-        
-        # 按供应商统计
-        provider_stats = {}
-        for record in recent_records:
-            if record.provider not in provider_stats:
-                provider_stats[record.provider] = {
-                    "cost": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "requests": 0
-                }
-            provider_stats[record.provider]["cost"] += record.cost
-            provider_stats[record.provider]["input_tokens"] += record.input_tokens
-            provider_stats[record.provider]["output_tokens"] += record.output_tokens
-            provider_stats[record.provider]["requests"] += 1
+        # 回退到本地存储统计（读取按天汇总）
+        provider_stats = self.usage_store.provider_statistics(days)
+        total_cost = sum(stats["cost"] for stats in provider_stats.values())
+        total_input_tokens = sum(stats["input_tokens"] for stats in provider_stats.values())
+        total_output_tokens = sum(stats["output_tokens"] for stats in provider_stats.values())
+        total_requests = sum(stats["requests"] for stats in provider_stats.values())
         
         return {
             "period_days": days,
             "total_cost": round(total_cost, 4),
             "total_input_tokens": total_input_tokens,
             "total_output_tokens": total_output_tokens,
-            "total_requests": len(recent_records),
+            "total_requests": total_requests,
             "provider_stats": provider_stats,
-            "records_count": len(recent_records)
+            "records_count": total_requests
         }
     
     def get_data_dir(self) -> str:
@@ -700,9 +720,7 @@ class TokenTracker:
 
     def get_session_cost(self, session_id: str) -> float:
         """获取会话成本"""
-        records = self.config_manager.load_usage_records()
-        session_cost = sum(record.cost for record in records if record.session_id == session_id)
-        return session_cost
+        return self.config_manager.usage_store.session_cost(session_id)
 
     def estimate_cost(self, provider: str, model_name: str, estimated_input_tokens: int,
                      estimated_output_tokens: int) -> float:
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+配置文件快照
+缓存JSON配置文件的解析结果，按文件修改时间失效；保存配置时显式失效。
+两次检查之间不访问文件系统，请求路径上不再有配置文件读取
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 两次检查文件修改时间的最小间隔（秒）
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+class JsonFileSnapshot:
+    """
+    单个JSON文件的解析快照
+
+    build把解析后的JSON（文件不存在时为None）转换为快照对象（如列表和索引）；
+    构建失败时记录错误并缓存default，直到文件再次变化
+    """
+
+    def __init__(self, path: Path, build: Callable[[Any], Any], default: Any = None,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL, description: str = "配置"):
+        self.path = Path(path)
+        self.build = build
+        self.default = default
+        self.check_interval = check_interval
+        self.description = description
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self.version = 0  # 每次重新构建递增，供派生缓存判断是否过期
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> Any:
+        """返回当前快照，必要时按文件修改时间重新加载"""
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < self.check_interval:
+            return self._value
+
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded and now - self._checked_at < self.check_interval:
+                return self._value
+            stamp = self._file_stamp()
+            if not self._loaded or stamp != self._stamp:
+                self._value = self._load(stamp)
+                self._stamp = stamp
+                self._loaded = True
+                self.version += 1
+            self._checked_at = now
+            return self._value
+
+    def _load(self, stamp: Optional[Tuple[int, int]]) -> Any:
+        try:
+            data = None
+            if stamp is not None:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            return self.build(data)
+        except Exception as e:
+            logger.error(f"加载{self.description}失败: {e}")
+            return self.default
+
+    def invalidate(self):
+        """下次访问时重新检查文件（保存配置后调用）"""
+        with self._lock:
+            self._loaded = False
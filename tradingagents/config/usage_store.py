@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Token使用记录存储
+SQLite（WAL模式）追加写入，后台线程批量提交；按天/供应商/模型维护汇总表，
+统计查询读取汇总而不是逐条扫描记录。多个进程可同时写入同一数据库
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+DEFAULT_FLUSH_INTERVAL = 1.0  # 秒
+DEFAULT_BATCH_SIZE = 100
+
+RECORD_FIELDS = ("timestamp", "provider", "model_name", "input_tokens", "output_tokens",
+                 "cost", "session_id", "analysis_type")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    session_id TEXT,
+    analysis_type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_usage_records_timestamp ON usage_records (timestamp);
+CREATE INDEX IF NOT EXISTS idx_usage_records_session ON usage_records (session_id);
+CREATE TABLE IF NOT EXISTS usage_daily (
+    day TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    PRIMARY KEY (day, provider, model_name)
+) WITHOUT ROWID;
+"""
+
+_INSERT_RECORD = (
+    "INSERT INTO usage_records (timestamp, provider, model_name, input_tokens, output_tokens, "
+    "cost, session_id, analysis_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_UPSERT_DAILY = """
+INSERT INTO usage_daily (day, provider, model_name, requests, input_tokens, output_tokens, cost)
+VALUES (?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT (day, provider, model_name) DO UPDATE SET
+    requests = requests + 1,
+    input_tokens = input_tokens + excluded.input_tokens,
+    output_tokens = output_tokens + excluded.output_tokens,
+    cost = cost + excluded.cost
+"""
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"cost": 0, "input_tokens": 0, "output_tokens": 0, "requests": 0}
+
+
+class UsageStore:
+    """
+    追加写入的使用记录存储
+
+    add()只把记录放入内存队列，由后台线程按flush_interval或batch_size批量写入；
+    写入时在同一事务中更新按天汇总表，明细记录只保留最近max_records条（汇总不受影响）。
+    统计和会话成本查询会合并尚未写入的记录
+    """
+
+    def __init__(self, db_path: str, max_records: int = 10000,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db_path = str(db_path)
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_lock = threading.Lock()
+        # 写入与读取互斥，避免读到"已提交但仍在队列中"的记录被重复统计
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---------- 写入 ----------
+
+    def add(self, record: Dict[str, Any]):
+        """记录入队，立即返回"""
+        with self._pending_lock:
+            self._pending.append(record)
+            pending = len(self._pending)
+        if self._writer is None:
+            self._start_writer()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _start_writer(self):
+        with self._pending_lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._writer_loop, name="usage-store-writer", daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """把队列中的记录写入数据库"""
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            if not os.path.isdir(os.path.dirname(os.path.abspath(self.db_path))):
+                # 配置目录已被删除（如临时目录），没有可写入的位置
+                logger.debug(f"使用记录目录不存在，丢弃{len(batch)}条记录: {self.db_path}")
+                return
+            try:
+                with closing(self._connect()) as conn:
+                    with conn:
+                        self._write(conn, batch)
+                        self._trim(conn)
+            except sqlite3.Error as e:
+                logger.error(f"保存使用记录失败（丢弃{len(batch)}条）: {e}")
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, records: Iterable[Dict[str, Any]]):
+        records = list(records)
+        conn.executemany(_INSERT_RECORD, [tuple(r[f] for f in RECORD_FIELDS) for r in records])
+        conn.executemany(_UPSERT_DAILY, [
+            (r["timestamp"][:10], r["provider"], r["model_name"],
+             r["input_tokens"], r["output_tokens"], r["cost"])
+            for r in records
+        ])
+
+    def _trim(self, conn: sqlite3.Connection):
+        if not self.max_records or self.max_records <= 0:
+            return
+        row = conn.execute("SELECT id FROM usage_records ORDER BY id DESC LIMIT 1 OFFSET ?",
+                           (self.max_records - 1,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM usage_records WHERE id < ?", (row[0],))
+
+    def replace_all(self, records: Iterable[Dict[str, Any]]):
+        """用给定记录替换全部明细和汇总（清空记录、从旧格式迁移时使用）"""
+        with self._flush_lock:
+            with self._pending_lock:
+                self._pending = []
+            with closing(self._connect()) as conn:
+                with conn:
+                    conn.execute("DELETE FROM usage_records")
+                    conn.execute("DELETE FROM usage_daily")
+                    self._write(conn, records)
+                    self._trim(conn)
+
+    def close(self):
+        """停止后台线程并写入剩余记录"""
+        self._closed = True
+        self._wakeup.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"关闭使用记录存储失败: {e}")
+
+    # ---------- 查询 ----------
+
+    def _pending_snapshot(self) -> List[Dict[str, Any]]:
+        with self._pending_lock:
+            return list(self._pending)
+
+    def load_records(self) -> List[Dict[str, Any]]:
+        """按时间顺序返回保留的明细记录"""
+        with self._flush_lock:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    f"SELECT {', '.join(RECORD_FIELDS)} FROM usage_records ORDER BY id").fetchall()
+            records = [dict(zip(RECORD_FIELDS, row)) for row in rows]
+            records.extend(self._pending_snapshot())
+        if self.max_records and len(records) > self.max_records:
+            records = records[-self.max_records:]
+        return records
+
+    def provider_statistics(self, days: int = 30) -> Dict[str, Dict[str, Any]]:
+        """
+        最近days天按供应商的统计
+
+        起始日之后的整天读取汇总表，起始日当天的部分时段读取明细（按时间索引范围查询）
+        """
+        cutoff = datetime.now() - timedelta(days=days)
+        cutoff_ts = cutoff.isoformat()
+        cutoff_day = cutoff_ts[:10]
+        next_day = (cutoff.date() + timedelta(days=1)).isoformat()
+
+        stats: Dict[str, Dict[str, Any]] = {}
+
+        def accumulate(provider, requests, input_tokens, output_tokens, cost):
+            entry = stats.setdefault(provider, _empty_stats())
+            entry["requests"] += requests or 0
+            entry["input_tokens"] += input_tokens or 0
+            entry["output_tokens"] += output_tokens or 0
+            entry["cost"] += cost or 0
+
+        with self._flush_lock:
+            with closing(self._connect()) as conn:
+                for row in conn.execute(
+                        "SELECT provider, SUM(requests), SUM(input_tokens), SUM(output_tokens), SUM(cost) "
+                        "FROM usage_daily WHERE day > ? GROUP BY provider", (cutoff_day,)):
+                    accumulate(*row)
+                for row in conn.execute(
+                        "SELECT provider, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cost) "
+                        "FROM usage_records WHERE timestamp >= ? AND timestamp < ? GROUP BY provider",
+                        (cutoff_ts, next_day)):
+                    accumulate(*row)
+            for record in self._pending_snapshot():
+                if record["timestamp"] >= cutoff_ts:
+                    accumulate(record["provider"], 1, record["input_tokens"],
+                               record["output_tokens"], record["cost"])
+        return stats
+
+    def session_cost(self, session_id: str) -> float:
+        """会话的累计成本"""
+        with self._flush_lock:
+            with closing(self._connect()) as conn:
+                row = conn.execute("SELECT SUM(cost) FROM usage_records WHERE session_id = ?",
+                                   (session_id,)).fetchone()
+            pending = sum(r["cost"] for r in self._pending_snapshot() if r["session_id"] == session_id)
+        return (row[0] or 0) + pending
+
+    def is_empty(self) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM usage_daily LIMIT 1").fetchone() is None
@@ -8,12 +8,41 @@ import requests
 import json
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 import re
 from bs4 import BeautifulSoup
 import pandas as pd
 
+from tradingagents.utils.keyword_matcher import KeywordAutomaton
+
+# 情绪词典
+POSITIVE_WORDS = frozenset(['上涨', '增长', '利好', '看好', '买入', '推荐', '强势', '突破', '创新高'])
+NEGATIVE_WORDS = frozenset(['下跌', '下降', '利空', '看空', '卖出', '风险', '跌破', '创新低', '亏损'])
+
+# 正负面词典编译为同一个自动机，每条文本只扫描一遍
+_SENTIMENT_AUTOMATON = KeywordAutomaton(sorted(POSITIVE_WORDS) + sorted(NEGATIVE_WORDS))
+
+
+def score_texts_sentiment(texts: Sequence[str]) -> List[float]:
+    """
+    批量词典情绪评分
+    
+    每个情绪词在一条文本中最多计一次，评分为 (正面词数-负面词数)/(正面词数+负面词数)，
+    没有情绪词时为0
+    """
+    scores = []
+    for text in texts:
+        matches = _SENTIMENT_AUTOMATON.find(text) if text else frozenset()
+        positive_count = len(matches & POSITIVE_WORDS)
+        negative_count = len(matches & NEGATIVE_WORDS)
+        if positive_count + negative_count == 0:
+            scores.append(0)
+        else:
+            scores.append((positive_count - negative_count) / (positive_count + negative_count))
+    return scores
+
 
 class ChineseFinanceDataAggregator:
     """中国财经数据聚合器"""
@@ -31,14 +60,20 @@ class ChineseFinanceDataAggregator:
         整合多个可获取的中国财经数据源
         """
         try:
-            # 1. 获取财经新闻情绪
-            news_sentiment = self._get_finance_news_sentiment(ticker, days)
-            
-            # 2. 获取股吧讨论热度 (如果可以获取)
-            forum_sentiment = self._get_stock_forum_sentiment(ticker, days)
-            
-            # 3. 获取财经媒体报道
-            media_sentiment = self._get_media_coverage_sentiment(ticker, days)
+            # 三个数据源相互独立，并发获取
+            with ThreadPoolExecutor(max_workers=3, thread_name_prefix='cn-sentiment') as executor:
+                # 1. 获取财经新闻情绪
+                news_future = executor.submit(self._get_finance_news_sentiment, ticker, days)
+                
+                # 2. 获取股吧讨论热度 (如果可以获取)
+                forum_future = executor.submit(self._get_stock_forum_sentiment, ticker, days)
+                
+                # 3. 获取财经媒体报道
+                media_future = executor.submit(self._get_media_coverage_sentiment, ticker, days)
+                
+                news_sentiment = news_future.result()
+                forum_sentiment = forum_future.result()
+                media_sentiment = media_future.result()
             
             # 4. 综合分析
             overall_sentiment = self._calculate_overall_sentiment(
@@ -82,8 +117,10 @@ class ChineseFinanceDataAggregator:
             negative_count = 0
             neutral_count = 0
             
-            for item in news_items:
-                sentiment = self._analyze_text_sentiment(item.get('title', '') + ' ' + item.get('content', ''))
+            sentiments = self._analyze_texts_sentiment(
+                [item.get('title', '') + ' ' + item.get('content', '') for item in news_items]
+            )
+            for sentiment in sentiments:
                 if sentiment > 0.1:
                     positive_count += 1
                 elif sentiment < -0.1:
@@ -132,10 +169,9 @@ class ChineseFinanceDataAggregator:
                 return {'sentiment_score': 0, 'coverage_count': 0, 'confidence': 0}
             
             # 分析媒体报道的情绪倾向
-            sentiment_scores = []
-            for item in coverage_items:
-                score = self._analyze_text_sentiment(item.get('title', '') + ' ' + item.get('summary', ''))
-                sentiment_scores.append(score)
+            sentiment_scores = self._analyze_texts_sentiment(
+                [item.get('title', '') + ' ' + item.get('summary', '') for item in coverage_items]
+            )
             
             avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
             
@@ -169,22 +205,13 @@ class ChineseFinanceDataAggregator:
         # 可以集成Google News API或其他新闻聚合服务
         return []
     
+    def _analyze_texts_sentiment(self, texts: Sequence[str]) -> List[float]:
+        """批量中文文本情绪分析（词典自动机一次扫描）"""
+        return score_texts_sentiment(texts)
+    
     def _analyze_text_sentiment(self, text: str) -> float:
         """简单的中文文本情绪分析"""
-        if not text:
-            return 0
-        
-        # 简单的关键词情绪分析
-        positive_words = ['上涨', '增长', '利好', '看好', '买入', '推荐', '强势', '突破', '创新高']
-        negative_words = ['下跌', '下降', '利空', '看空', '卖出', '风险', '跌破', '创新低', '亏损']
-        
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
-        
-        if positive_count + negative_count == 0:
-            return 0
-        
-        return (positive_count - negative_count) / (positive_count + negative_count)
+        return score_texts_sentiment([text])[0]
     
     def _get_company_chinese_name(self, ticker: str) -> Optional[str]:
         """获取公司中文名称"""
@@ -20,6 +20,8 @@ warnings.filterwarnings('ignore')
 from tradingagents.utils.logging_init import setup_dataflow_logging
 logger = setup_dataflow_logging()
 
+from .market_data_models import CompanyProfile, PriceBarSeries
+
 
 class ChinaDataSource(Enum):
     """中国股票数据源枚举"""
@@ -29,6 +31,15 @@ class ChinaDataSource(Enum):
     TDX = "tdx"  # 中国股票数据，将被逐步淘汰
 
 
+# 备用数据源优先级: AKShare > Tushare > BaoStock > TDX
+FALLBACK_SOURCE_ORDER = [
+    ChinaDataSource.AKSHARE,
+    ChinaDataSource.TUSHARE,
+    ChinaDataSource.BAOSTOCK,
+    ChinaDataSource.TDX
+]
+
+
 
 
 
@@ -40,6 +51,7 @@ class DataSourceManager:
         self.default_source = self._get_default_source()
         self.available_sources = self._check_available_sources()
         self.current_source = self.default_source
+        self._profile_cache: Dict[str, CompanyProfile] = {}
 
         logger.info(f"📊 数据源管理器初始化完成")
         logger.info(f"   默认数据源: {self.default_source.value}")
@@ -392,128 +404,143 @@ class DataSourceManager:
                         }, exc_info=True)
             return self._try_fallback_sources(symbol, start_date, end_date)
     
-    def _get_tushare_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用Tushare获取数据 - 直接调用适配器，避免循环调用"""
+    # ==================== 结构化K线接口 ====================
+
+    def get_stock_bars(self, symbol: str, start_date: str = None, end_date: str = None) -> Optional[PriceBarSeries]:
+        """
+        获取结构化K线数据，当前数据源失败时按备用顺序降级
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            PriceBarSeries: K线序列，所有数据源都失败时返回None
+        """
+        sources = [self.current_source] + [
+            source for source in FALLBACK_SOURCE_ORDER
+            if source != self.current_source and source in self.available_sources
+        ]
+
+        for source in sources:
+            start_time = time.time()
+            try:
+                series = self._fetch_bars(source, symbol, start_date, end_date)
+            except Exception as e:
+                logger.error(f"❌ [{source.value}] 获取{symbol}K线失败: {e}, 耗时={time.time() - start_time:.2f}s")
+                continue
+
+            if series is not None and not series.empty:
+                logger.info(f"✅ [{source.value}] 获取{symbol}K线成功: {len(series.bars)}条, 耗时={time.time() - start_time:.2f}s")
+                return series
+            logger.warning(f"⚠️ [{source.value}] 未获取到{symbol}的K线数据")
+
+        logger.error(f"❌ 所有数据源都无法获取{symbol}的K线数据")
+        return None
+
+    def _fetch_bars(self, source: ChinaDataSource, symbol: str, start_date: str, end_date: str) -> Optional[PriceBarSeries]:
+        """从指定数据源获取K线"""
+        if source == ChinaDataSource.TUSHARE:
+            return self._get_tushare_bars(symbol, start_date, end_date)
+        elif source == ChinaDataSource.AKSHARE:
+            return self._get_akshare_bars(symbol, start_date, end_date)
+        elif source == ChinaDataSource.BAOSTOCK:
+            return self._get_baostock_bars(symbol, start_date, end_date)
+        elif source == ChinaDataSource.TDX:
+            return self._get_tdx_bars(symbol, start_date, end_date)
+        raise ValueError(f"不支持的数据源: {source.value}")
+
+    def _get_tushare_bars(self, symbol: str, start_date: str, end_date: str) -> Optional[PriceBarSeries]:
+        """使用Tushare获取K线 - 直接调用适配器，避免循环调用"""
         logger.debug(f"📊 [Tushare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
 
-        # 添加详细的股票代码追踪日志
-        logger.info(f"🔍 [股票代码追踪] _get_tushare_data 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
-        logger.info(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
-        logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
-        logger.info(f"🔍 [DataSourceManager详细日志] _get_tushare_data 开始执行")
-        logger.info(f"🔍 [DataSourceManager详细日志] 当前数据源: {self.current_source.value}")
+        from .tushare_adapter import get_tushare_adapter
 
-        start_time = time.time()
-        try:
-            # 直接调用适配器，避免循环调用interface
-            from .tushare_adapter import get_tushare_adapter
-            logger.info(f"🔍 [股票代码追踪] 调用 tushare_adapter，传入参数: symbol='{symbol}'")
-            logger.info(f"🔍 [DataSourceManager详细日志] 开始调用tushare_adapter...")
+        adapter = get_tushare_adapter()
+        data = adapter.get_stock_data(symbol, start_date, end_date)
+        if data is None or not isinstance(data, pd.DataFrame) or data.empty:
+            return None
 
-            adapter = get_tushare_adapter()
-            data = adapter.get_stock_data(symbol, start_date, end_date)
-
-            if data is not None and not data.empty:
-                # 获取股票基本信息
-                stock_info = adapter.get_stock_info(symbol)
-                stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
-
-                # 计算最新价格和涨跌幅
-                latest_data = data.iloc[-1]
-                latest_price = latest_data.get('close', 0)
-                prev_close = data.iloc[-2].get('close', latest_price) if len(data) > 1 else latest_price
-                change = latest_price - prev_close
-                change_pct = (change / prev_close * 100) if prev_close != 0 else 0
-
-                # 格式化数据报告
-                result = f"📊 {stock_name}({symbol}) - Tushare数据\n"
-                result += f"数据期间: {start_date} 至 {end_date}\n"
-                result += f"数据条数: {len(data)}条\n\n"
-
-                result += f"💰 最新价格: ¥{latest_price:.2f}\n"
-                result += f"📈 涨跌额: {change:+.2f} ({change_pct:+.2f}%)\n\n"
-
-                # 添加统计信息
-                result += f"📊 价格统计:\n"
-                result += f"   最高价: ¥{data['high'].max():.2f}\n"
-                result += f"   最低价: ¥{data['low'].min():.2f}\n"
-                result += f"   平均价: ¥{data['close'].mean():.2f}\n"
-                # 防御性获取成交量数据
-                volume_value = self._get_volume_safely(data)
-                result += f"   成交量: {volume_value:,.0f}股\n"
+        profile = self._profile_cache.get(symbol)
+        if profile is None:
+            profile = CompanyProfile.from_dict(symbol, self._get_tushare_stock_info(symbol))
+            if profile.is_valid:
+                self._profile_cache[symbol] = profile
+        return PriceBarSeries.from_frame(
+            symbol, data, start_date, end_date,
+            name=profile.name,
+            source=ChinaDataSource.TUSHARE.value
+        )
+
+    def _get_akshare_bars(self, symbol: str, start_date: str, end_date: str) -> Optional[PriceBarSeries]:
+        """使用AKShare获取K线"""
+        from .akshare_utils import get_akshare_provider
+
+        provider = get_akshare_provider()
+        data = provider.get_stock_data(symbol, start_date, end_date)
+        if data is None or data.empty:
+            return None
 
-                return result
-            else:
-                result = f"❌ 未获取到{symbol}的有效数据"
+        return PriceBarSeries.from_frame(symbol, data, start_date, end_date,
+                                         source=ChinaDataSource.AKSHARE.value)
 
-            duration = time.time() - start_time
-            logger.info(f"🔍 [DataSourceManager详细日志] interface调用完成，耗时: {duration:.3f}秒")
-            logger.info(f"🔍 [股票代码追踪] get_china_stock_data_tushare 返回结果前200字符: {result[:200] if result else 'None'}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果类型: {type(result)}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果长度: {len(result) if result else 0}")
+    def _get_baostock_bars(self, symbol: str, start_date: str, end_date: str) -> Optional[PriceBarSeries]:
+        """使用BaoStock获取K线"""
+        from .baostock_utils import get_baostock_provider
+
+        provider = get_baostock_provider()
+        data = provider.get_stock_data(symbol, start_date, end_date)
+        if data is None or data.empty:
+            return None
 
-            logger.debug(f"📊 [Tushare] 调用完成: 耗时={duration:.2f}s, 结果长度={len(result) if result else 0}")
+        return PriceBarSeries.from_frame(symbol, data, start_date, end_date,
+                                         source=ChinaDataSource.BAOSTOCK.value)
 
-            return result
+    def _get_tdx_bars(self, symbol: str, start_date: str, end_date: str) -> Optional[PriceBarSeries]:
+        """使用TDX获取K线 (已弃用)"""
+        logger.warning(f"⚠️ 警告: 正在使用已弃用的TDX数据源")
+        from .tdx_utils import get_tdx_provider
+
+        provider = get_tdx_provider()
+        data = provider.get_stock_history_data(symbol, start_date, end_date)
+        if data is None or data.empty:
+            return None
+
+        return PriceBarSeries.from_frame(symbol, data, start_date, end_date,
+                                         name=provider._get_stock_name(symbol),
+                                         source=ChinaDataSource.TDX.value)
+
+    # ==================== 文本报告（LLM工具边界） ====================
+
+    def _get_tushare_data(self, symbol: str, start_date: str, end_date: str) -> str:
+        """使用Tushare获取数据并渲染为报告"""
+        start_time = time.time()
+        try:
+            series = self._get_tushare_bars(symbol, start_date, end_date)
+            if series is None or series.empty:
+                return f"❌ 未获取到{symbol}的有效数据"
+
+            logger.debug(f"📊 [Tushare] 调用完成: 耗时={time.time() - start_time:.2f}s, 数据条数={len(series.bars)}")
+            return series.to_report()
         except Exception as e:
             duration = time.time() - start_time
             logger.error(f"❌ [Tushare] 调用失败: {e}, 耗时={duration:.2f}s", exc_info=True)
-            logger.error(f"❌ [DataSourceManager详细日志] 异常类型: {type(e).__name__}")
-            logger.error(f"❌ [DataSourceManager详细日志] 异常信息: {str(e)}")
-            import traceback
-            logger.error(f"❌ [DataSourceManager详细日志] 异常堆栈: {traceback.format_exc()}")
             raise
     
     def _get_akshare_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用AKShare获取数据"""
-        logger.debug(f"📊 [AKShare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
-
+        """使用AKShare获取数据并渲染为报告"""
         start_time = time.time()
         try:
-            # 这里需要实现AKShare的统一接口
-            from .akshare_utils import get_akshare_provider
-            provider = get_akshare_provider()
-            data = provider.get_stock_data(symbol, start_date, end_date)
-
+            series = self._get_akshare_bars(symbol, start_date, end_date)
             duration = time.time() - start_time
 
-            if data is not None and not data.empty:
-                result = f"股票代码: {symbol}\n"
-                result += f"数据期间: {start_date} 至 {end_date}\n"
-                result += f"数据条数: {len(data)}条\n\n"
-
-                # 显示最新3天数据，确保在各种显示环境下都能完整显示
-                display_rows = min(3, len(data))
-                result += f"最新{display_rows}天数据:\n"
-
-                # 使用pandas选项确保显示完整数据
-                with pd.option_context('display.max_rows', None,
-                                     'display.max_columns', None,
-                                     'display.width', None,
-                                     'display.max_colwidth', None):
-                    result += data.tail(display_rows).to_string(index=False)
-
-                # 如果数据超过3天，也显示一些统计信息
-                if len(data) > 3:
-                    latest_price = data.iloc[-1]['收盘'] if '收盘' in data.columns else data.iloc[-1].get('close', 'N/A')
-                    first_price = data.iloc[0]['收盘'] if '收盘' in data.columns else data.iloc[0].get('close', 'N/A')
-                    if latest_price != 'N/A' and first_price != 'N/A':
-                        try:
-                            change = float(latest_price) - float(first_price)
-                            change_pct = (change / float(first_price)) * 100
-                            result += f"\n\n📊 期间统计:\n"
-                            result += f"期间涨跌: {change:+.2f} ({change_pct:+.2f}%)\n"
-                            result += f"最高价: {data['最高'].max() if '最高' in data.columns else data.get('high', pd.Series()).max():.2f}\n"
-                            result += f"最低价: {data['最低'].min() if '最低' in data.columns else data.get('low', pd.Series()).min():.2f}"
-                        except (ValueError, TypeError):
-                            pass
-
-                logger.debug(f"📊 [AKShare] 调用成功: 耗时={duration:.2f}s, 数据条数={len(data)}, 结果长度={len(result)}")
-                return result
-            else:
-                result = f"❌ 未能获取{symbol}的股票数据"
+            if series is None or series.empty:
                 logger.warning(f"⚠️ [AKShare] 数据为空: 耗时={duration:.2f}s")
-                return result
+                return f"❌ 未能获取{symbol}的股票数据"
+
+            logger.debug(f"📊 [AKShare] 调用成功: 耗时={duration:.2f}s, 数据条数={len(series.bars)}")
+            return series.to_report()
 
         except Exception as e:
             duration = time.time() - start_time
@@ -521,30 +548,11 @@ class DataSourceManager:
             return f"❌ AKShare获取{symbol}数据失败: {e}"
     
     def _get_baostock_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用BaoStock获取数据"""
-        # 这里需要实现BaoStock的统一接口
-        from .baostock_utils import get_baostock_provider
-        provider = get_baostock_provider()
-        data = provider.get_stock_data(symbol, start_date, end_date)
-        
-        if data is not None and not data.empty:
-            result = f"股票代码: {symbol}\n"
-            result += f"数据期间: {start_date} 至 {end_date}\n"
-            result += f"数据条数: {len(data)}条\n\n"
-
-            # 显示最新3天数据，确保在各种显示环境下都能完整显示
-            display_rows = min(3, len(data))
-            result += f"最新{display_rows}天数据:\n"
-
-            # 使用pandas选项确保显示完整数据
-            with pd.option_context('display.max_rows', None,
-                                 'display.max_columns', None,
-                                 'display.width', None,
-                                 'display.max_colwidth', None):
-                result += data.tail(display_rows).to_string(index=False)
-            return result
-        else:
+        """使用BaoStock获取数据并渲染为报告"""
+        series = self._get_baostock_bars(symbol, start_date, end_date)
+        if series is None or series.empty:
             return f"❌ 未能获取{symbol}的股票数据"
+        return series.to_report()
     
     def _get_tdx_data(self, symbol: str, start_date: str, end_date: str) -> str:
         """使用TDX获取数据 (已弃用)"""
@@ -552,38 +560,11 @@ class DataSourceManager:
         from .tdx_utils import get_china_stock_data
         return get_china_stock_data(symbol, start_date, end_date)
     
-    def _get_volume_safely(self, data) -> float:
-        """安全地获取成交量数据，支持多种列名"""
-        try:
-            # 支持多种可能的成交量列名
-            volume_columns = ['volume', 'vol', 'turnover', 'trade_volume']
-
-            for col in volume_columns:
-                if col in data.columns:
-                    logger.info(f"✅ 找到成交量列: {col}")
-                    return data[col].sum()
-
-            # 如果都没找到，记录警告并返回0
-            logger.warning(f"⚠️ 未找到成交量列，可用列: {list(data.columns)}")
-            return 0
-
-        except Exception as e:
-            logger.error(f"❌ 获取成交量失败: {e}")
-            return 0
-
     def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str) -> str:
         """尝试备用数据源 - 避免递归调用"""
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源...")
 
-        # 备用数据源优先级: AKShare > Tushare > BaoStock > TDX
-        fallback_order = [
-            ChinaDataSource.AKSHARE,
-            ChinaDataSource.TUSHARE,
-            ChinaDataSource.BAOSTOCK,
-            ChinaDataSource.TDX
-        ]
-
-        for source in fallback_order:
+        for source in FALLBACK_SOURCE_ORDER:
             if source != self.current_source and source in self.available_sources:
                 try:
                     logger.info(f"🔄 尝试备用数据源: {source.value}")
@@ -620,9 +601,7 @@ class DataSourceManager:
         # 首先尝试当前数据源
         try:
             if self.current_source == ChinaDataSource.TUSHARE:
-                from .interface import get_china_stock_info_tushare
-                info_str = get_china_stock_info_tushare(symbol)
-                result = self._parse_stock_info_string(info_str, symbol)
+                result = self._get_tushare_stock_info(symbol)
 
                 # 检查是否获取到有效信息
                 if result.get('name') and result['name'] != f'股票{symbol}':
@@ -668,9 +647,7 @@ class DataSourceManager:
 
                 # 根据数据源类型获取股票信息
                 if source == ChinaDataSource.TUSHARE:
-                    from .interface import get_china_stock_info_tushare
-                    info_str = get_china_stock_info_tushare(symbol)
-                    result = self._parse_stock_info_string(info_str, symbol)
+                    result = self._get_tushare_stock_info(symbol)
                 elif source == ChinaDataSource.AKSHARE:
                     result = self._get_akshare_stock_info(symbol)
                 elif source == ChinaDataSource.BAOSTOCK:
@@ -785,34 +762,35 @@ class DataSourceManager:
             logger.error(f"❌ [股票信息] BaoStock获取失败: {e}")
             return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'baostock', 'error': str(e)}
 
-    def _parse_stock_info_string(self, info_str: str, symbol: str) -> Dict:
-        """解析股票信息字符串为字典"""
-        try:
-            info = {'symbol': symbol, 'source': self.current_source.value}
-            lines = info_str.split('\n')
-            
-            for line in lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if '股票名称' in key:
-                        info['name'] = value
-                    elif '所属行业' in key:
-                        info['industry'] = value
-                    elif '所属地区' in key:
-                        info['area'] = value
-                    elif '上市市场' in key:
-                        info['market'] = value
-                    elif '上市日期' in key:
-                        info['list_date'] = value
-            
-            return info
-            
-        except Exception as e:
-            logger.error(f"⚠️ 解析股票信息失败: {e}")
-            return {'symbol': symbol, 'name': f'股票{symbol}', 'source': self.current_source.value}
+    def _get_tushare_stock_info(self, symbol: str) -> Dict:
+        """使用Tushare获取股票基本信息"""
+        from .tushare_adapter import get_tushare_adapter
+
+        stock_info = get_tushare_adapter().get_stock_info(symbol) or {}
+        info = {'symbol': symbol, 'source': ChinaDataSource.TUSHARE.value}
+        for key in ('name', 'industry', 'area', 'market', 'list_date'):
+            if stock_info.get(key):
+                info[key] = stock_info[key]
+        return info
+
+    def get_company_profile(self, symbol: str) -> CompanyProfile:
+        """
+        获取结构化的公司基本信息，有效结果在进程内缓存
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            CompanyProfile: 公司基本信息（获取失败时name为默认值）
+        """
+        cached = self._profile_cache.get(symbol)
+        if cached is not None:
+            return cached
+
+        profile = CompanyProfile.from_dict(symbol, self.get_stock_info(symbol))
+        if profile.is_valid:
+            self._profile_cache[symbol] = profile
+        return profile
 
 
 # 全局数据源管理器实例
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+离线Finnhub数据的索引存储
+把 finnhub_data/<data_type>/<ticker>[_<period>]_data_formatted.json 导入按
+(数据类型, 股票, 周期, 日期) 建主键索引的SQLite库，日期区间查询直接走索引，
+不再每次加载并线性过滤整个JSON文件
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+STORE_FILE_NAME = "finnhub_store.db"
+JSON_SUFFIX = "_data_formatted.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    data_type TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    period TEXT NOT NULL,
+    date TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (data_type, ticker, period, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    data_type TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    period TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    PRIMARY KEY (data_type, ticker, period)
+);
+"""
+
+
+def json_data_path(data_dir: str, ticker: str, data_type: str, period: Optional[str] = None) -> str:
+    """原始JSON文件路径"""
+    file_name = f"{ticker}_{period}{JSON_SUFFIX}" if period else f"{ticker}{JSON_SUFFIX}"
+    return os.path.join(data_dir, "finnhub_data", data_type, file_name)
+
+
+class FinnhubStore:
+    """按日期索引的离线Finnhub数据库"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        # 已确认与JSON文件同步的数据集: (data_type, ticker, period) -> (size, mtime)
+        self._synced: Dict[Tuple[str, str, str], Tuple[int, float]] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """每个线程复用一个连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def source_state(self, data_type: str, ticker: str, period: Optional[str] = None) -> Optional[Tuple[int, float]]:
+        """已导入数据集对应JSON文件的(大小, 修改时间)，未导入时返回None"""
+        row = self._connection().execute(
+            "SELECT size, mtime FROM sources WHERE data_type = ? AND ticker = ? AND period = ?",
+            (data_type, ticker, period or ""),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def import_json(self, data_type: str, ticker: str, period: Optional[str], json_path: str) -> int:
+        """
+        导入（或重新导入）一个JSON文件，空值的日期不入库
+
+        Returns:
+            int: 导入的日期数
+        """
+        stat = os.stat(json_path)
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        period = period or ""
+        rows = [
+            (data_type, ticker, period, date, json.dumps(value, ensure_ascii=False))
+            for date, value in data.items() if len(value) > 0
+        ]
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM records WHERE data_type = ? AND ticker = ? AND period = ?",
+                         (data_type, ticker, period))
+            conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                         (data_type, ticker, period, stat.st_size, stat.st_mtime))
+        self._synced[(data_type, ticker, period)] = (stat.st_size, stat.st_mtime)
+        logger.debug(f"📦 [Finnhub存储] 导入 {data_type}/{ticker} {len(rows)} 个日期: {json_path}")
+        return len(rows)
+
+    def sync(self, data_type: str, ticker: str, period: Optional[str], json_path: str) -> bool:
+        """
+        确保数据集与JSON文件一致（首次访问或文件变化时导入）
+
+        Returns:
+            bool: 库中是否有该数据集
+        """
+        key = (data_type, ticker, period or "")
+        try:
+            stat = os.stat(json_path)
+        except FileNotFoundError:
+            # JSON已删除时继续使用库中已导入的数据
+            return key in self._synced or self.source_state(data_type, ticker, period) is not None
+
+        current = (stat.st_size, stat.st_mtime)
+        if self._synced.get(key) == current:
+            return True
+        if self.source_state(data_type, ticker, period) == current:
+            self._synced[key] = current
+            return True
+        self.import_json(data_type, ticker, period, json_path)
+        return True
+
+    def get_range(self, data_type: str, ticker: str, start_date: str, end_date: str,
+                  period: Optional[str] = None) -> Dict[str, Any]:
+        """按日期区间查询（闭区间，按日期升序）"""
+        rows = self._connection().execute(
+            "SELECT date, payload FROM records WHERE data_type = ? AND ticker = ? AND period = ? "
+            "AND date >= ? AND date <= ? ORDER BY date",
+            (data_type, ticker, period or "", start_date, end_date),
+        ).fetchall()
+        return {date: json.loads(payload) for date, payload in rows}
+
+    def convert_directory(self, data_dir: str) -> Dict[str, int]:
+        """
+        一次性导入 data_dir/finnhub_data 下的全部JSON文件
+
+        文件名格式为 <ticker>_data_formatted.json 或 <ticker>_<period>_data_formatted.json
+        （period为annual/quarterly）
+
+        Returns:
+            Dict: 数据类型 -> 导入的文件数
+        """
+        root = os.path.join(data_dir, "finnhub_data")
+        stats: Dict[str, int] = {}
+        if not os.path.isdir(root):
+            return stats
+
+        for data_type in sorted(os.listdir(root)):
+            type_dir = os.path.join(root, data_type)
+            if not os.path.isdir(type_dir):
+                continue
+            for file_name in sorted(os.listdir(type_dir)):
+                if not file_name.endswith(JSON_SUFFIX):
+                    continue
+                name = file_name[:-len(JSON_SUFFIX)]
+                ticker, period = name, None
+                for candidate in ("annual", "quarterly"):
+                    if name.endswith(f"_{candidate}"):
+                        ticker, period = name[:-len(candidate) - 1], candidate
+                try:
+                    self.sync(data_type, ticker, period, os.path.join(type_dir, file_name))
+                    stats[data_type] = stats.get(data_type, 0) + 1
+                except (OSError, ValueError) as e:
+                    logger.error(f"❌ [Finnhub存储] 导入失败 {file_name}: {e}")
+        return stats
+
+
+# 按数据目录缓存的存储实例
+_stores: Dict[str, FinnhubStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_finnhub_store(data_dir: str) -> FinnhubStore:
+    """获取数据目录对应的Finnhub存储（位于 data_dir/finnhub_data/finnhub_store.db）"""
+    db_path = os.path.abspath(os.path.join(data_dir, "finnhub_data", STORE_FILE_NAME))
+    store = _stores.get(db_path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(db_path)
+            if store is None:
+                store = FinnhubStore(db_path)
+                _stores[db_path] = store
+    return store
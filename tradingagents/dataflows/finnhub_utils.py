@@ -1,6 +1,8 @@
 import json
 import os
 
+from tradingagents.dataflows.finnhub_store import STORE_FILE_NAME, get_finnhub_store, json_data_path
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -18,17 +20,20 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
         period (str): Default to none, if there is a period specified, should be annual or quarterly.
     """
 
-    if period:
-        data_path = os.path.join(
-            data_dir,
-            "finnhub_data",
-            data_type,
-            f"{ticker}_{period}_data_formatted.json",
-        )
-    else:
-        data_path = os.path.join(
-            data_dir, "finnhub_data", data_type, f"{ticker}_data_formatted.json"
-        )
+    data_path = json_data_path(data_dir, ticker, data_type, period)
+
+    # 优先使用按日期索引的存储（首次访问或JSON文件变化时自动导入）
+    store_path = os.path.join(data_dir, "finnhub_data", STORE_FILE_NAME)
+    if os.path.exists(data_path) or os.path.exists(store_path):
+        try:
+            store = get_finnhub_store(data_dir)
+            if store.sync(data_type, ticker, period, data_path):
+                return store.get_range(data_type, ticker, start_date, end_date, period)
+        except json.JSONDecodeError as e:
+            logger.error(f"❌ [ERROR] JSON解析错误: {e}")
+            return {}
+        except Exception as e:
+            logger.warning(f"⚠️ Finnhub索引存储不可用，直接读取JSON文件: {e}")
 
     try:
         if not os.path.exists(data_path):
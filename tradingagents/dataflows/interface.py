@@ -1,7 +1,7 @@
-from typing import Annotated, Dict
+from typing import Annotated, Dict, List
 import time
 import os
-from .reddit_utils import fetch_top_from_category
+from .reddit_utils import fetch_top_from_category_range
 from .chinese_finance_utils import get_chinese_social_sentiment
 from .googlenews_utils import *
 from .finnhub_utils import get_data_in_range
@@ -50,7 +50,6 @@ from datetime import datetime
 import json
 import os
 import pandas as pd
-from tqdm import tqdm
 from openai import OpenAI
 
 # 尝试导入yfinance，如果失败则设置为None
@@ -387,6 +386,16 @@ def get_google_news(
     return f"## {query.replace('+', ' ')} Google News, from {before} to {curr_date}:\n\n{news_str}"
 
 
+def _date_range(before: str, end_date: datetime) -> List[str]:
+    """before到end_date（含）的日期字符串列表"""
+    curr_date = datetime.strptime(before, "%Y-%m-%d")
+    dates = []
+    while curr_date <= end_date:
+        dates.append(curr_date.strftime("%Y-%m-%d"))
+        curr_date += relativedelta(days=1)
+    return dates
+
+
 def get_reddit_global_news(
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     look_back_days: Annotated[int, "how many days to look back"],
@@ -405,26 +414,16 @@ def get_reddit_global_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
-    curr_date = datetime.strptime(before, "%Y-%m-%d")
-
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(desc=f"Getting Global News on {start_date}", total=total_iterations)
-
-    while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "global_news",
-            curr_date_str,
-            max_limit_per_day,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
-        curr_date += relativedelta(days=1)
-        pbar.update(1)
-
-    pbar.close()
+    # 整个回溯区间一次读取（每个文件只打开一次，通过日期索引定位）
+    dates = _date_range(before, start_date)
+    fetch_result = fetch_top_from_category_range(
+        "global_news",
+        dates,
+        max_limit_per_day,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
+    )
+    posts = [post for date in dates for post in fetch_result[date]]
+    curr_date = start_date + relativedelta(days=1)
 
     if len(posts) == 0:
         return ""
@@ -459,31 +458,17 @@ def get_reddit_company_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
-    curr_date = datetime.strptime(before, "%Y-%m-%d")
-
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(
-        desc=f"Getting Company News for {ticker} on {start_date}",
-        total=total_iterations,
+    # 整个回溯区间一次读取（每个文件只打开一次，通过日期索引定位）
+    dates = _date_range(before, start_date)
+    fetch_result = fetch_top_from_category_range(
+        "company_news",
+        dates,
+        max_limit_per_day,
+        ticker,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
     )
-
-    while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "company_news",
-            curr_date_str,
-            max_limit_per_day,
-            ticker,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
-        curr_date += relativedelta(days=1)
-
-        pbar.update(1)
-
-    pbar.close()
+    posts = [post for date in dates for post in fetch_result[date]]
+    curr_date = start_date + relativedelta(days=1)
 
     if len(posts) == 0:
         return ""
@@ -590,39 +575,48 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
+    # 只加载一次数据、计算一次完整指标序列，再按日期切片
+    data_dir = os.path.join(DATA_DIR, "market_data", "price_data")
+    indicator_values = None
     if not online:
         # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
+        data = StockstatsUtils.load_price_data(symbol, data_dir, online=False)
+        dates_in_df = set(pd.to_datetime(data["Date"], utc=True).astype(str).str[:10])
+    else:
+        data = None
+        dates_in_df = None
+        try:
+            data = StockstatsUtils.load_price_data(symbol, data_dir, online=True)
+        except Exception as e:
+            print(
+                f"Error getting stockstats indicator data for indicator {indicator}: {e}"
             )
-        )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
 
-            curr_date = curr_date - relativedelta(days=1)
-    else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
+    if data is not None:
+        try:
+            indicator_values = StockstatsUtils.get_indicator_series(
+                symbol, indicator, data, online=online
+            )
+        except Exception as e:
+            print(
+                f"Error getting stockstats indicator data for indicator {indicator}: {e}"
             )
 
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+    def value_on(date_str: str) -> str:
+        if indicator_values is None:
+            return ""
+        if date_str in indicator_values.index:
+            return str(indicator_values[date_str])
+        return StockstatsUtils.NOT_TRADING_DAY
 
-            curr_date = curr_date - relativedelta(days=1)
+    ind_string = ""
+    while curr_date >= before:
+        date_str = curr_date.strftime("%Y-%m-%d")
+        # offline only includes the trading dates
+        if dates_in_df is None or date_str in dates_in_df:
+            ind_string += f"{date_str}: {value_on(date_str)}\n"
+
+        curr_date = curr_date - relativedelta(days=1)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -1332,22 +1326,14 @@ def get_china_stock_info_unified(
         str: 股票基本信息
     """
     try:
-        from .data_source_manager import get_china_stock_info_unified
+        from .data_source_manager import get_data_source_manager
 
         logger.info(f"📊 [统一接口] 获取{ticker}基本信息...")
 
-        info = get_china_stock_info_unified(ticker)
-
-        if info and info.get('name'):
-            result = f"股票代码: {ticker}\n"
-            result += f"股票名称: {info.get('name', '未知')}\n"
-            result += f"所属地区: {info.get('area', '未知')}\n"
-            result += f"所属行业: {info.get('industry', '未知')}\n"
-            result += f"上市市场: {info.get('market', '未知')}\n"
-            result += f"上市日期: {info.get('list_date', '未知')}\n"
-            result += f"数据来源: {info.get('source', 'unknown')}\n"
+        profile = get_data_source_manager().get_company_profile(ticker)
 
-            return result
+        if profile.name:
+            return profile.to_report()
         else:
             return f"❌ 未能获取{ticker}的基本信息"
 
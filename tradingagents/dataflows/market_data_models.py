@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+行情数据模型
+数据提供器、缓存与分析模块之间传递的结构化数据对象，
+文本渲染只在面向LLM的工具边界进行（to_report）
+"""
+
+from dataclasses import dataclass, field, asdict, fields
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+
+# 各数据源列名 -> 标准列名（同一标准列取第一个出现的来源列）
+BAR_COLUMN_ALIASES = {
+    'date': ['date', 'trade_date', 'datetime', 'Date', '日期'],
+    'open': ['open', 'Open', '开盘'],
+    'high': ['high', 'High', '最高'],
+    'low': ['low', 'Low', '最低'],
+    'close': ['close', 'Close', '收盘'],
+    'volume': ['volume', 'vol', 'Volume', '成交量', 'turnover', 'trade_volume'],
+    'amount': ['amount', 'Amount', '成交额'],
+    'pct_change': ['pct_change', 'pct_chg', '涨跌幅'],
+}
+
+SOURCE_LABELS = {
+    'tushare': 'Tushare',
+    'akshare': 'AKShare',
+    'baostock': 'BaoStock',
+    'tdx': 'TDX',
+}
+
+
+@dataclass
+class StockQuote:
+    """单只股票的最新行情"""
+    symbol: str  # 股票代码
+    price: float  # 最新价格
+    prev_close: Optional[float] = None  # 前收盘价
+    change: Optional[float] = None  # 涨跌额
+    change_pct: Optional[float] = None  # 涨跌幅（%）
+    volume: Optional[float] = None  # 成交量
+    trade_date: Optional[str] = None  # 行情日期
+    name: Optional[str] = None  # 股票名称
+    source: str = "unknown"  # 数据来源
+
+
+@dataclass
+class PriceBarSeries:
+    """K线序列，bars使用标准列名：date/open/high/low/close/volume/amount/pct_change"""
+    symbol: str  # 股票代码
+    bars: pd.DataFrame  # 按日期升序的K线
+    start_date: Optional[str] = None  # 请求的开始日期
+    end_date: Optional[str] = None  # 请求的结束日期
+    name: Optional[str] = None  # 股票名称
+    source: str = "unknown"  # 数据来源
+
+    @classmethod
+    def from_frame(cls, symbol: str, data: pd.DataFrame, start_date: str = None,
+                   end_date: str = None, name: str = None, source: str = "unknown") -> 'PriceBarSeries':
+        """从任意数据源的DataFrame构造，统一列名并按日期排序"""
+        frame = data
+        if not any(alias in frame.columns for alias in BAR_COLUMN_ALIASES['date']) and frame.index.name:
+            frame = frame.reset_index()
+
+        columns = {}
+        for target, aliases in BAR_COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in frame.columns:
+                    columns[target] = frame[alias].to_numpy()
+                    break
+
+        bars = pd.DataFrame(columns)
+        if 'date' in bars.columns:
+            bars['date'] = pd.to_datetime(bars['date'])
+            bars = bars.sort_values('date', kind='mergesort')
+        bars = bars.reset_index(drop=True)
+
+        return cls(symbol=symbol, bars=bars, start_date=start_date, end_date=end_date,
+                   name=name, source=source)
+
+    @property
+    def empty(self) -> bool:
+        return self.bars is None or self.bars.empty or 'close' not in self.bars.columns
+
+    @property
+    def display_name(self) -> str:
+        return self.name or f'股票{self.symbol}'
+
+    @property
+    def high(self) -> float:
+        return float(self.bars['high'].max()) if 'high' in self.bars.columns else float('nan')
+
+    @property
+    def low(self) -> float:
+        return float(self.bars['low'].min()) if 'low' in self.bars.columns else float('nan')
+
+    @property
+    def mean_close(self) -> float:
+        return float(self.bars['close'].mean())
+
+    @property
+    def total_volume(self) -> float:
+        return float(self.bars['volume'].sum()) if 'volume' in self.bars.columns else 0.0
+
+    def latest_quote(self) -> Optional[StockQuote]:
+        """由最后两根K线计算最新行情"""
+        if self.empty:
+            return None
+
+        latest = self.bars.iloc[-1]
+        price = float(latest['close'])
+        prev_close = float(self.bars['close'].iloc[-2]) if len(self.bars) > 1 else price
+        change = price - prev_close
+        change_pct = (change / prev_close * 100) if prev_close != 0 else 0.0
+        trade_date = latest['date'].strftime('%Y-%m-%d') if 'date' in self.bars.columns else None
+
+        return StockQuote(
+            symbol=self.symbol,
+            price=price,
+            prev_close=prev_close,
+            change=change,
+            change_pct=change_pct,
+            volume=float(latest['volume']) if 'volume' in self.bars.columns else None,
+            trade_date=trade_date,
+            name=self.name,
+            source=self.source,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典（用于缓存）"""
+        bars = self.bars.copy()
+        if 'date' in bars.columns:
+            bars['date'] = bars['date'].dt.strftime('%Y-%m-%d')
+        return {
+            'symbol': self.symbol,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'name': self.name,
+            'source': self.source,
+            'bars': bars.to_dict(orient='list'),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PriceBarSeries':
+        bars = pd.DataFrame(data.get('bars', {}))
+        if 'date' in bars.columns:
+            bars['date'] = pd.to_datetime(bars['date'])
+        return cls(symbol=data['symbol'], bars=bars, start_date=data.get('start_date'),
+                   end_date=data.get('end_date'), name=data.get('name'),
+                   source=data.get('source', 'unknown'))
+
+    def to_report(self, display_rows: int = 3) -> str:
+        """渲染为提供给LLM的文本报告"""
+        if self.empty:
+            return f"❌ 未获取到{self.symbol}的有效数据"
+
+        quote = self.latest_quote()
+        source_label = SOURCE_LABELS.get(self.source, self.source)
+
+        result = f"📊 {self.display_name}({self.symbol}) - {source_label}数据\n"
+        result += f"数据期间: {self.start_date} 至 {self.end_date}\n"
+        result += f"数据条数: {len(self.bars)}条\n\n"
+
+        result += f"💰 最新价格: ¥{quote.price:.2f}\n"
+        result += f"📈 涨跌额: {quote.change:+.2f} ({quote.change_pct:+.2f}%)\n\n"
+
+        result += "📊 价格统计:\n"
+        result += f"   最高价: ¥{self.high:.2f}\n"
+        result += f"   最低价: ¥{self.low:.2f}\n"
+        result += f"   平均价: ¥{self.mean_close:.2f}\n"
+        result += f"   成交量: {self.total_volume:,.0f}股\n"
+
+        rows = min(display_rows, len(self.bars))
+        if rows > 0:
+            tail = self.bars.tail(rows).copy()
+            if 'date' in tail.columns:
+                tail['date'] = tail['date'].dt.strftime('%Y-%m-%d')
+            with pd.option_context('display.max_rows', None,
+                                   'display.max_columns', None,
+                                   'display.width', None,
+                                   'display.max_colwidth', None):
+                result += f"\n最新{rows}天数据:\n"
+                result += tail.to_string(index=False)
+
+        return result
+
+
+@dataclass
+class CompanyProfile:
+    """公司基本信息"""
+    symbol: str  # 股票代码
+    name: Optional[str] = None  # 股票名称
+    industry: str = "未知"  # 所属行业
+    area: str = "未知"  # 所属地区
+    market: str = "未知"  # 上市市场
+    list_date: str = "未知"  # 上市日期
+    source: str = "unknown"  # 数据来源
+
+    @classmethod
+    def from_dict(cls, symbol: str, info: Optional[Dict[str, Any]]) -> 'CompanyProfile':
+        info = info or {}
+        known = {f.name for f in fields(cls)} - {'symbol'}
+        values = {k: v for k, v in info.items() if k in known and v not in (None, '')}
+        return cls(symbol=symbol, **values)
+
+    @property
+    def is_valid(self) -> bool:
+        """是否获取到了真实名称（而不是默认的'股票XXXXXX'）"""
+        return bool(self.name) and self.name != f'股票{self.symbol}'
+
+    @property
+    def display_name(self) -> str:
+        return self.name or f'股票{self.symbol}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_report(self) -> str:
+        """渲染为提供给LLM的文本"""
+        result = f"股票代码: {self.symbol}\n"
+        result += f"股票名称: {self.name or '未知'}\n"
+        result += f"所属地区: {self.area}\n"
+        result += f"所属行业: {self.industry}\n"
+        result += f"上市市场: {self.market}\n"
+        result += f"上市日期: {self.list_date}\n"
+        result += f"数据来源: {self.source}\n"
+        return result
+
+
+@dataclass
+class FinancialMetrics:
+    """财务指标（取值为已格式化的展示值，如'12.3倍'、'8.5%'）"""
+    pe: str = "N/A"  # 市盈率
+    pb: str = "N/A"  # 市净率
+    ps: str = "N/A"  # 市销率
+    dividend_yield: str = "N/A"  # 股息收益率
+    roe: str = "N/A"  # 净资产收益率
+    roa: str = "N/A"  # 总资产收益率
+    gross_margin: str = "N/A"  # 毛利率
+    net_margin: str = "N/A"  # 净利率
+    debt_ratio: str = "N/A"  # 资产负债率
+    current_ratio: str = "N/A"  # 流动比率
+    quick_ratio: str = "N/A"  # 速动比率
+    cash_ratio: str = "N/A"  # 现金比率
+    fundamental_score: Any = "N/A"  # 基本面评分
+    valuation_score: Any = "N/A"  # 估值吸引力
+    growth_score: Any = "N/A"  # 成长潜力
+    risk_level: str = "N/A"  # 风险等级
+    data_source: str = ""  # 数据来源
+    extra: Dict[str, Any] = field(default_factory=dict)  # 其他指标
+
+    @classmethod
+    def from_dict(cls, metrics: Optional[Dict[str, Any]]) -> 'FinancialMetrics':
+        metrics = dict(metrics or {})
+        known = {f.name for f in fields(cls)} - {'extra'}
+        values = {k: metrics.pop(k) for k in list(metrics) if k in known}
+        return cls(extra=metrics, **values)
+
+    @property
+    def is_estimated(self) -> bool:
+        """是否包含估算值"""
+        return any("（估算值）" in str(v) for v in asdict(self).values() if isinstance(v, str))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        extra = data.pop('extra')
+        data.update(extra)
+        return data
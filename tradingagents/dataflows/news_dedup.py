@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+新闻近似去重工具
+基于字符shingle的MinHash签名和LSH分桶索引发现转载/改写的近似重复新闻，
+复杂度约为线性（签名计算O(n)，只对同桶的候选对做相似度校验）
+"""
+
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 大于2^32的最小素数；a < 2^31、x < 2^32 保证 a*x+b 不超出uint64范围
+_HASH_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+_PUNCTUATION = re.compile(r'[\W_]+', re.UNICODE)
+
+# 权威媒体优先级（数值越大越权威），同一簇内优先保留权威来源，其次保留最早发布的
+SOURCE_AUTHORITY = {
+    'reuters': 3,
+    'bloomberg': 3,
+    'the wall street journal': 3,
+    'wsj': 3,
+    'financial times': 3,
+    '财联社': 3,
+    '证券时报': 3,
+    '中国证券报': 3,
+    '上海证券报': 3,
+    'cnbc': 2,
+    'marketwatch': 2,
+    '东方财富': 2,
+    '新浪财经': 2,
+    'yahoo': 1,
+    'seekingalpha': 1,
+}
+
+
+def normalize_text(text: str) -> str:
+    """统一全角/半角、大小写，去掉标点和多余空白"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return _PUNCTUATION.sub(' ', text).strip()
+
+
+def shingles(text: str, size: int = 4) -> List[str]:
+    """
+    字符级shingle
+
+    去掉空格后按字符切分，对中文（无空格分词）和英文都适用
+    """
+    compact = normalize_text(text).replace(' ', '')
+    if not compact:
+        return []
+    if len(compact) <= size:
+        return [compact]
+    return [compact[i:i + size] for i in range(len(compact) - size + 1)]
+
+
+@dataclass
+class DuplicateCluster:
+    """一组近似重复的新闻"""
+    representative: Any  # 保留的新闻
+    duplicates: List[Any] = field(default_factory=list)  # 被合并的其他新闻
+
+    @property
+    def size(self) -> int:
+        return 1 + len(self.duplicates)
+
+
+class NearDuplicateDetector:
+    """
+    MinHash + LSH 近似重复检测
+
+    num_perm个哈希函数分成bands个band，每个band rows_per_band行；
+    两篇文本至少有一个band完全相同才成为候选对，再用签名估计的Jaccard相似度确认
+    """
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 4, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm({num_perm})必须能被bands({bands})整除")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """计算MinHash签名，文本为空时返回None"""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+        hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in set(grams)),
+                             dtype=np.uint64)
+        # (shingle数, num_perm) 的哈希矩阵，按列取最小值
+        permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % _HASH_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+    def similarity(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """由签名估计Jaccard相似度"""
+        return float(np.count_nonzero(sig_a == sig_b)) / self.num_perm
+
+    def cluster(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        对文本聚类
+
+        Returns:
+            List[List[int]]: 每个簇的下标列表（按下标升序），单独成簇的文本也包含在内
+        """
+        signatures = [self.signature(text) for text in texts]
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        checked = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            lo, hi = band * self.rows_per_band, (band + 1) * self.rows_per_band
+            for idx, sig in enumerate(signatures):
+                if sig is not None:
+                    buckets.setdefault(sig[lo:hi].tobytes(), []).append(idx)
+
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                # 每个成员只与桶内已有簇的代表比较，桶内簇数通常很少
+                representatives: List[int] = []
+                for member in members:
+                    matched = False
+                    for rep in representatives:
+                        if find(rep) == find(member):
+                            matched = True
+                            break
+                        pair = (rep, member)
+                        if pair in checked:
+                            continue
+                        checked.add(pair)
+                        if self.similarity(signatures[rep], signatures[member]) >= self.threshold:
+                            union(rep, member)
+                            matched = True
+                            break
+                    if not matched:
+                        representatives.append(member)
+
+        groups: Dict[int, List[int]] = {}
+        for idx in range(len(texts)):
+            groups.setdefault(find(idx), []).append(idx)
+        return list(groups.values())
+
+
+def source_authority(source: str) -> int:
+    """新闻来源的权威程度，未知来源为0"""
+    source = (source or '').lower()
+    for name, score in SOURCE_AUTHORITY.items():
+        if name in source:
+            return score
+    return 0
+
+
+def deduplicate_near_duplicates(items: Sequence[Any], text_func: Callable[[Any], str],
+                                rank_func: Callable[[Any], Tuple],
+                                detector: Optional[NearDuplicateDetector] = None
+                                ) -> Tuple[List[Any], List[DuplicateCluster]]:
+    """
+    近似去重
+
+    Args:
+        items: 新闻列表
+        text_func: 提取用于比较的文本（如标题+导语）
+        rank_func: 排序键，簇内取最小者作为保留项
+        detector: 检测器，默认使用NearDuplicateDetector()
+
+    Returns:
+        Tuple: (保留的新闻（保持原顺序）, 包含多于一篇新闻的簇)
+    """
+    detector = detector or NearDuplicateDetector()
+    groups = detector.cluster([text_func(item) for item in items])
+
+    keep = set()
+    clusters = []
+    for members in groups:
+        best = min(members, key=lambda idx: (rank_func(items[idx]), idx))
+        keep.add(best)
+        if len(members) > 1:
+            clusters.append(DuplicateCluster(
+                representative=items[best],
+                duplicates=[items[idx] for idx in members if idx != best],
+            ))
+
+    return [item for idx, item in enumerate(items) if idx in keep], clusters
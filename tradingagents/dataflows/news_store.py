@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+本地增量新闻库
+按(股票, 新闻源)记录水位线，工具调用只拉取水位线之后的新闻；
+新闻按URL（无URL时按内容哈希）去重入库，报告直接从库中组装
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from tradingagents.config.env_utils import parse_float_env, parse_int_env
+
+if TYPE_CHECKING:
+    from tradingagents.dataflows.realtime_news_utils import NewsItem
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 距上次拉取不足该秒数时直接使用库中数据
+DEFAULT_MIN_REFRESH_SECONDS = 300.0
+# 增量拉取时向前多覆盖的时间（分钟），兼顾发布时间略早于入库时间的新闻
+DEFAULT_OVERLAP_MINUTES = 10
+# 新闻保留天数
+DEFAULT_RETENTION_DAYS = 7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    ticker TEXT NOT NULL,
+    news_key TEXT NOT NULL,
+    source_name TEXT NOT NULL,
+    title TEXT,
+    content TEXT,
+    source TEXT,
+    publish_time REAL NOT NULL,
+    url TEXT,
+    urgency TEXT,
+    relevance_score REAL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, news_key)
+);
+CREATE INDEX IF NOT EXISTS idx_news_ticker_time ON news (ticker, publish_time);
+CREATE TABLE IF NOT EXISTS watermarks (
+    ticker TEXT NOT NULL,
+    source_name TEXT NOT NULL,
+    latest_publish_time REAL,
+    last_fetch_time REAL NOT NULL,
+    covered_since REAL NOT NULL,
+    PRIMARY KEY (ticker, source_name)
+);
+"""
+
+
+@dataclass
+class NewsWatermark:
+    """某只股票某个新闻源的拉取进度"""
+    ticker: str
+    source_name: str
+    latest_publish_time: Optional[datetime]  # 已入库新闻的最新发布时间
+    last_fetch_time: datetime  # 最近一次成功拉取的时间
+    covered_since: datetime  # 从该时间到last_fetch_time的新闻已完整入库
+
+
+def news_key(url: str, title: str, content: str) -> str:
+    """去重键：优先使用URL，没有URL时使用标题+内容的哈希"""
+    if url:
+        return f"url:{url.strip()}"
+    text = f"{(title or '').strip().lower()}\n{(content or '').strip()}"
+    return f"sha1:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+
+
+class NewsStore:
+    """基于SQLite的增量新闻库（多线程、多进程可共用同一文件）"""
+
+    def __init__(self, db_path: str, min_refresh_seconds: Optional[float] = None,
+                 overlap_minutes: Optional[int] = None):
+        self.db_path = db_path
+        self.min_refresh_seconds = (min_refresh_seconds if min_refresh_seconds is not None
+                                    else parse_float_env('NEWS_STORE_MIN_REFRESH_SECONDS', DEFAULT_MIN_REFRESH_SECONDS))
+        self.overlap = timedelta(minutes=overlap_minutes if overlap_minutes is not None
+                                 else parse_int_env('NEWS_STORE_OVERLAP_MINUTES', DEFAULT_OVERLAP_MINUTES))
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_watermark(self, ticker: str, source_name: str) -> Optional[NewsWatermark]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT latest_publish_time, last_fetch_time, covered_since FROM watermarks "
+                "WHERE ticker = ? AND source_name = ?", (ticker, source_name)
+            ).fetchone()
+        if row is None:
+            return None
+        return NewsWatermark(
+            ticker=ticker,
+            source_name=source_name,
+            latest_publish_time=datetime.fromtimestamp(row[0]) if row[0] is not None else None,
+            last_fetch_time=datetime.fromtimestamp(row[1]),
+            covered_since=datetime.fromtimestamp(row[2]),
+        )
+
+    def plan_fetch(self, ticker: str, source_name: str, hours_back: int,
+                   now: Optional[datetime] = None) -> Optional[int]:
+        """
+        计算本次需要向新闻源请求的回溯小时数
+
+        Returns:
+            Optional[int]: 需要拉取的小时数；库中数据足够新时返回None（无需拉取）
+        """
+        now = now or datetime.now()
+        watermark = self.get_watermark(ticker, source_name)
+        if watermark is None or watermark.covered_since > now - timedelta(hours=hours_back):
+            return hours_back
+
+        elapsed = now - watermark.last_fetch_time
+        if elapsed.total_seconds() < self.min_refresh_seconds:
+            return None
+
+        incremental_hours = math.ceil((elapsed + self.overlap).total_seconds() / 3600)
+        return max(1, min(hours_back, incremental_hours))
+
+    def add_news(self, ticker: str, source_name: str, items: Sequence["NewsItem"],
+                 fetched_at: datetime, covered_since: datetime, update_watermark: bool = True) -> int:
+        """
+        新闻入库并推进水位线
+
+        Args:
+            ticker: 股票代码
+            source_name: 新闻源名称
+            items: 本次拉取的新闻
+            fetched_at: 拉取时间
+            covered_since: 本次拉取覆盖的起始时间
+            update_watermark: 是否推进水位线（新闻源部分失败时为False，只入库已获取的新闻）
+
+        Returns:
+            int: 新入库的新闻条数（已存在的不重复写入）
+        """
+        rows = [
+            (ticker, news_key(item.url, item.title, item.content), source_name, item.title, item.content,
+             item.source, item.publish_time.timestamp(), item.url, item.urgency, item.relevance_score,
+             fetched_at.timestamp())
+            for item in items
+        ]
+        latest = max((row[6] for row in rows), default=None)
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO news VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            inserted = conn.total_changes - before
+
+            if not update_watermark:
+                logger.debug(f"[新闻库] {ticker}/{source_name} 拉取不完整，入库 {inserted}/{len(rows)} 条新闻，水位线不变")
+                return inserted
+
+            previous = conn.execute(
+                "SELECT latest_publish_time, last_fetch_time, covered_since FROM watermarks "
+                "WHERE ticker = ? AND source_name = ?", (ticker, source_name)
+            ).fetchone()
+            covered = covered_since.timestamp()
+            if previous is not None:
+                if previous[0] is not None:
+                    latest = previous[0] if latest is None else max(latest, previous[0])
+                # 与上次覆盖区间相连时，覆盖起点保持不变
+                if covered <= previous[1]:
+                    covered = min(covered, previous[2])
+            conn.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?)",
+                (ticker, source_name, latest, fetched_at.timestamp(), covered),
+            )
+
+        logger.debug(f"[新闻库] {ticker}/{source_name} 入库 {inserted}/{len(rows)} 条新闻")
+        return inserted
+
+    def get_news(self, ticker: str, since: datetime, source_name: Optional[str] = None) -> List["NewsItem"]:
+        """读取库中某时间之后的新闻（按发布时间倒序）"""
+        from tradingagents.dataflows.realtime_news_utils import NewsItem
+
+        query = ("SELECT title, content, source, publish_time, url, urgency, relevance_score "
+                 "FROM news WHERE ticker = ? AND publish_time >= ?")
+        params: list = [ticker, since.timestamp()]
+        if source_name is not None:
+            query += " AND source_name = ?"
+            params.append(source_name)
+        query += " ORDER BY publish_time DESC"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            NewsItem(title=title, content=content, source=source,
+                     publish_time=datetime.fromtimestamp(publish_time), url=url,
+                     urgency=urgency, relevance_score=relevance_score)
+            for title, content, source, publish_time, url, urgency, relevance_score in rows
+        ]
+
+    def prune(self, retention_days: Optional[int] = None) -> int:
+        """删除超过保留期的新闻，返回删除条数"""
+        retention_days = retention_days or parse_int_env('NEWS_STORE_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+        cutoff = (datetime.now() - timedelta(days=retention_days)).timestamp()
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM news WHERE publish_time < ?", (cutoff,)).rowcount
+            # 覆盖起点不早于保留期，避免把已删除的区间当作已覆盖
+            conn.execute("UPDATE watermarks SET covered_since = ? WHERE covered_since < ?", (cutoff, cutoff))
+        return deleted
+
+
+# 全局新闻库实例
+_news_store = None
+_news_store_lock = threading.Lock()
+
+
+def get_news_store() -> NewsStore:
+    """获取全局新闻库（路径由NEWS_STORE_PATH指定，默认在数据缓存目录下）"""
+    global _news_store
+    if _news_store is None:
+        with _news_store_lock:
+            if _news_store is None:
+                from tradingagents.default_config import DEFAULT_CONFIG
+                db_path = os.getenv('NEWS_STORE_PATH') or os.path.join(
+                    DEFAULT_CONFIG['data_cache_dir'], 'news_store.db')
+                store = NewsStore(db_path)
+                deleted = store.prune()
+                if deleted:
+                    logger.info(f"[新闻库] 清理过期新闻 {deleted} 条")
+                _news_store = store
+    return _news_store
@@ -5,17 +5,22 @@
 """
 
 import os
+import json
 import time
 import random
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from .cache_manager import get_cache
 from .config import get_config
+from .market_data_models import CompanyProfile, FinancialMetrics, PriceBarSeries, StockQuote
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+# 结构化K线缓存使用的数据源标识
+BARS_CACHE_SOURCE = "unified_bars"
+
 
 class OptimizedChinaDataProvider:
     """优化的A股数据提供器 - 集成缓存和Tushare数据接口"""
@@ -54,74 +59,89 @@ class OptimizedChinaDataProvider:
             格式化的股票数据字符串
         """
         logger.info(f"📈 获取A股数据: {symbol} ({start_date} 到 {end_date})")
-        
-        # 检查缓存（除非强制刷新）
-        if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date,
-                data_source="tdx"
-            )
-            
-            if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
-                if cached_data:
-                    logger.info(f"⚡ 从缓存加载A股数据: {symbol}")
-                    return cached_data
-        
-        # 缓存未命中，从Tushare数据接口获取
-        logger.info(f"🌐 从Tushare数据接口获取数据: {symbol}")
-        
+
         try:
-            # API限制处理
-            self._wait_for_rate_limit()
-            
-            # 调用统一数据源接口（默认Tushare，支持备用数据源）
-            from .data_source_manager import get_china_stock_data_unified
+            series = self.get_stock_bars(symbol, start_date, end_date, force_refresh)
+            if series is not None:
+                logger.info(f"✅ A股数据获取成功: {symbol}")
+                return series.to_report()
 
-            formatted_data = get_china_stock_data_unified(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date
-            )
+            error_msg = "数据源API调用失败"
+            logger.error(f"❌ 数据源API调用失败: {symbol}")
+        except Exception as e:
+            error_msg = f"Tushare数据接口调用异常: {str(e)}"
+            logger.error(f"❌ {error_msg}")
 
-            # 检查是否获取成功
-            if "❌" in formatted_data or "错误" in formatted_data:
-                logger.error(f"❌ 数据源API调用失败: {symbol}")
-                # 尝试从旧缓存获取数据
-                old_cache = self._try_get_old_cache(symbol, start_date, end_date)
-                if old_cache:
-                    logger.info(f"📁 使用过期缓存数据: {symbol}")
-                    return old_cache
-
-                # 生成备用数据
-                return self._generate_fallback_data(symbol, start_date, end_date, "数据源API调用失败")
-            
-            # 保存到缓存
+        # 尝试从旧缓存获取数据
+        old_cache = self._try_get_old_cache(symbol, start_date, end_date)
+        if old_cache:
+            logger.info(f"📁 使用过期缓存数据: {symbol}")
+            return old_cache
+
+        # 生成备用数据
+        return self._generate_fallback_data(symbol, start_date, end_date, error_msg)
+
+    def get_stock_bars(self, symbol: str, start_date: str, end_date: str,
+                       force_refresh: bool = False) -> Optional[PriceBarSeries]:
+        """
+        获取结构化的A股K线 - 优先使用缓存
+
+        Args:
+            symbol: 股票代码（6位数字）
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            force_refresh: 是否强制刷新缓存
+
+        Returns:
+            PriceBarSeries: K线序列，所有数据源都失败时返回None
+        """
+        if not force_refresh:
+            cached = self._load_cached_bars(symbol, start_date, end_date)
+            if cached is not None:
+                logger.info(f"⚡ 从缓存加载A股K线: {symbol}")
+                return cached
+
+        logger.info(f"🌐 从数据源获取K线: {symbol}")
+        self._wait_for_rate_limit()
+
+        # 调用统一数据源接口（支持备用数据源）
+        from .data_source_manager import get_data_source_manager
+        series = get_data_source_manager().get_stock_bars(symbol, start_date, end_date)
+
+        if series is not None:
             self.cache.save_stock_data(
                 symbol=symbol,
-                data=formatted_data,
+                data=json.dumps(series.to_dict(), ensure_ascii=False),
                 start_date=start_date,
                 end_date=end_date,
-                data_source="unified"  # 使用统一数据源标识
+                data_source=BARS_CACHE_SOURCE
             )
-            
-            logger.info(f"✅ A股数据获取成功: {symbol}")
-            return formatted_data
-            
+        return series
+
+    def _load_cached_bars(self, symbol: str, start_date: str, end_date: str) -> Optional[PriceBarSeries]:
+        """加载日期范围完全匹配的K线缓存"""
+        cache_key = self.cache.find_cached_stock_data(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            data_source=BARS_CACHE_SOURCE
+        )
+        if not cache_key:
+            return None
+
+        try:
+            cached_data = self.cache.load_stock_data(cache_key)
+            if not isinstance(cached_data, str):
+                return None
+            series = PriceBarSeries.from_dict(json.loads(cached_data))
         except Exception as e:
-            error_msg = f"Tushare数据接口调用异常: {str(e)}"
-            logger.error(f"❌ {error_msg}")
-            
-            # 尝试从旧缓存获取数据
-            old_cache = self._try_get_old_cache(symbol, start_date, end_date)
-            if old_cache:
-                logger.info(f"📁 使用过期缓存数据: {symbol}")
-                return old_cache
-            
-            # 生成备用数据
-            return self._generate_fallback_data(symbol, start_date, end_date, error_msg)
+            logger.warning(f"⚠️ K线缓存解析失败: {e}")
+            return None
+
+        # find_cached_stock_data会返回同一股票其他日期范围的缓存，需要核对
+        if series.start_date != start_date or series.end_date != end_date or series.empty:
+            return None
+        return series
     
     def get_fundamentals_data(self, symbol: str, force_refresh: bool = False) -> str:
         """
@@ -166,10 +186,10 @@ class OptimizedChinaDataProvider:
             current_date = datetime.now().strftime('%Y-%m-%d')
             start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
             
-            stock_data = self.get_stock_data(symbol, start_date, current_date)
+            bars = self.get_stock_bars(symbol, start_date, current_date)
             
             # 生成基本面分析报告
-            fundamentals_data = self._generate_fundamentals_report(symbol, stock_data)
+            fundamentals_data = self._generate_fundamentals_report(symbol, bars)
             
             # 保存到缓存
             self.cache.save_fundamentals_data(
@@ -186,74 +206,47 @@ class OptimizedChinaDataProvider:
             logger.error(f"❌ {error_msg}")
             return self._generate_fallback_fundamentals(symbol, error_msg)
     
-    def _generate_fundamentals_report(self, symbol: str, stock_data: str) -> str:
-        """基于股票数据生成真实的基本面分析报告"""
+    def _generate_fundamentals_report(self, symbol: str,
+                                      stock_data: Union[PriceBarSeries, str, None] = None,
+                                      profile: Optional[CompanyProfile] = None) -> str:
+        """
+        基于股票数据生成真实的基本面分析报告
+
+        Args:
+            symbol: 股票代码
+            stock_data: K线序列（兼容旧调用方式传入的文本报告）
+            profile: 公司基本信息，为空时从数据源管理器获取
+        """
 
         # 添加详细的股票代码追踪日志
         logger.debug(f"🔍 [股票代码追踪] _generate_fundamentals_report 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
-        logger.debug(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
-        logger.debug(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
-        logger.debug(f"🔍 [股票代码追踪] 接收到的股票数据前200字符: {stock_data[:200] if stock_data else 'None'}")
 
-        # 从股票数据中提取信息
-        company_name = "未知公司"
-        current_price = "N/A"
-        volume = "N/A"
-        change_pct = "N/A"
+        if isinstance(stock_data, PriceBarSeries):
+            quote = stock_data.latest_quote()
+        elif isinstance(stock_data, str) and stock_data:
+            quote = self._quote_from_legacy_report(symbol, stock_data)
+        else:
+            quote = None
 
-        # 首先尝试从统一接口获取股票基本信息
-        try:
-            logger.debug(f"🔍 [股票代码追踪] 尝试获取{symbol}的基本信息...")
-            from .interface import get_china_stock_info_unified
-            stock_info = get_china_stock_info_unified(symbol)
-            logger.debug(f"🔍 [股票代码追踪] 获取到的股票信息: {stock_info}")
-
-            if "股票名称:" in stock_info:
-                lines = stock_info.split('\n')
-                for line in lines:
-                    if "股票名称:" in line:
-                        company_name = line.split(':')[1].strip()
-                        logger.debug(f"🔍 [股票代码追踪] 从统一接口获取到股票名称: {company_name}")
-                        break
-        except Exception as e:
-            logger.warning(f"⚠️ 获取股票基本信息失败: {e}")
-
-        # 然后从股票数据中提取价格信息
-        if "股票名称:" in stock_data:
-            lines = stock_data.split('\n')
-            for line in lines:
-                if "股票名称:" in line and company_name == "未知公司":
-                    company_name = line.split(':')[1].strip()
-                elif "当前价格:" in line:
-                    current_price = line.split(':')[1].strip()
-                elif "涨跌幅:" in line:
-                    change_pct = line.split(':')[1].strip()
-                elif "成交量:" in line:
-                    volume = line.split(':')[1].strip()
-
-        # 尝试从股票数据表格中提取最新价格信息
-        if current_price == "N/A" and stock_data:
+        if profile is None:
             try:
-                lines = stock_data.split('\n')
-                for i, line in enumerate(lines):
-                    if "最新数据:" in line and i + 1 < len(lines):
-                        # 查找数据行
-                        for j in range(i + 1, min(i + 5, len(lines))):
-                            data_line = lines[j].strip()
-                            if data_line and not data_line.startswith('日期') and not data_line.startswith('-'):
-                                # 尝试解析数据行
-                                parts = data_line.split()
-                                if len(parts) >= 4:
-                                    try:
-                                        # 假设格式: 日期 股票代码 开盘 收盘 最高 最低 成交量 成交额...
-                                        current_price = parts[3]  # 收盘价
-                                        logger.debug(f"🔍 [股票代码追踪] 从数据表格提取到收盘价: {current_price}")
-                                        break
-                                    except (IndexError, ValueError):
-                                        continue
-                        break
+                from .data_source_manager import get_data_source_manager
+                profile = get_data_source_manager().get_company_profile(symbol)
             except Exception as e:
-                logger.debug(f"🔍 [股票代码追踪] 解析股票数据表格失败: {e}")
+                logger.warning(f"⚠️ 获取股票基本信息失败: {e}")
+                profile = CompanyProfile(symbol=symbol)
+
+        if profile.is_valid:
+            company_name = profile.name
+        elif quote and quote.name:
+            company_name = quote.name
+        else:
+            company_name = "未知公司"
+        logger.debug(f"🔍 [股票代码追踪] 股票名称: {company_name}, 最新行情: {quote}")
+
+        current_price = f"¥{quote.price:.2f}" if quote else "N/A"
+        change_pct = f"{quote.change_pct:+.2f}%" if quote and quote.change_pct is not None else "N/A"
+        volume = f"{quote.volume:,.0f}" if quote and quote.volume is not None else "N/A"
 
         # 根据股票代码判断行业和基本信息
         logger.debug(f"🔍 [股票代码追踪] 调用 _get_industry_info，传入参数: '{symbol}'")
@@ -261,16 +254,17 @@ class OptimizedChinaDataProvider:
         logger.debug(f"🔍 [股票代码追踪] _get_industry_info 返回结果: {industry_info}")
 
         logger.debug(f"🔍 [股票代码追踪] 调用 _estimate_financial_metrics，传入参数: '{symbol}'")
-        financial_estimates = self._estimate_financial_metrics(symbol, current_price)
+        metrics = FinancialMetrics.from_dict(self._estimate_financial_metrics(symbol, quote.price if quote else None))
+        financial_estimates = metrics.to_dict()
         logger.debug(f"🔍 [股票代码追踪] _estimate_financial_metrics 返回结果: {financial_estimates}")
 
         logger.debug(f"🔍 [股票代码追踪] 开始生成报告，使用股票代码: '{symbol}'")
         
         # 检查数据来源并生成相应说明
         data_source_note = ""
-        data_source = financial_estimates.get('data_source', '')
+        data_source = metrics.data_source
         
-        if any("（估算值）" in str(v) for v in financial_estimates.values() if isinstance(v, str)):
+        if metrics.is_estimated:
             data_source_note = "\n⚠️ **数据说明**: 部分财务指标为估算值，建议结合最新财报数据进行分析"
         elif data_source == "AKShare":
             data_source_note = "\n✅ **数据说明**: 财务指标基于AKShare真实财务数据计算"
@@ -294,22 +288,22 @@ class OptimizedChinaDataProvider:
 ## 💰 财务数据分析
 
 ### 估值指标
-- **市盈率(PE)**: {financial_estimates['pe']}
-- **市净率(PB)**: {financial_estimates['pb']}
-- **市销率(PS)**: {financial_estimates['ps']}
-- **股息收益率**: {financial_estimates['dividend_yield']}
+- **市盈率(PE)**: {metrics.pe}
+- **市净率(PB)**: {metrics.pb}
+- **市销率(PS)**: {metrics.ps}
+- **股息收益率**: {metrics.dividend_yield}
 
 ### 盈利能力指标
-- **净资产收益率(ROE)**: {financial_estimates['roe']}
-- **总资产收益率(ROA)**: {financial_estimates['roa']}
-- **毛利率**: {financial_estimates['gross_margin']}
-- **净利率**: {financial_estimates['net_margin']}
+- **净资产收益率(ROE)**: {metrics.roe}
+- **总资产收益率(ROA)**: {metrics.roa}
+- **毛利率**: {metrics.gross_margin}
+- **净利率**: {metrics.net_margin}
 
 ### 财务健康度
-- **资产负债率**: {financial_estimates['debt_ratio']}
-- **流动比率**: {financial_estimates['current_ratio']}
-- **速动比率**: {financial_estimates['quick_ratio']}
-- **现金比率**: {financial_estimates['cash_ratio']}
+- **资产负债率**: {metrics.debt_ratio}
+- **流动比率**: {metrics.current_ratio}
+- **速动比率**: {metrics.quick_ratio}
+- **现金比率**: {metrics.cash_ratio}
 
 ## 📈 行业分析
 
@@ -335,10 +329,10 @@ class OptimizedChinaDataProvider:
 ## 💡 投资建议
 
 ### 综合评分
-- **基本面评分**: {financial_estimates['fundamental_score']}/10
-- **估值吸引力**: {financial_estimates['valuation_score']}/10
-- **成长潜力**: {financial_estimates['growth_score']}/10
-- **风险等级**: {financial_estimates['risk_level']}
+- **基本面评分**: {metrics.fundamental_score}/10
+- **估值吸引力**: {metrics.valuation_score}/10
+- **成长潜力**: {metrics.growth_score}/10
+- **风险等级**: {metrics.risk_level}
 
 ### 操作建议
 {self._generate_investment_advice(financial_estimates, industry_info)}
@@ -455,12 +449,15 @@ class OptimizedChinaDataProvider:
 
         return info
 
-    def _estimate_financial_metrics(self, symbol: str, current_price: str) -> dict:
+    def _estimate_financial_metrics(self, symbol: str, current_price: Union[float, str, None]) -> dict:
         """获取真实财务指标（优先使用Tushare真实数据，失败时使用估算）"""
 
         # 提取价格数值
         try:
-            price_value = float(current_price.replace('¥', '').replace(',', ''))
+            if isinstance(current_price, (int, float)):
+                price_value = float(current_price)
+            else:
+                price_value = float(current_price.replace('¥', '').replace(',', ''))
         except:
             price_value = 10.0  # 默认值
 
@@ -1060,6 +1057,35 @@ class OptimizedChinaDataProvider:
 - 建议等待基本面改善或估值回落
 - 风险承受能力较低的投资者应避免"""
     
+    def _quote_from_legacy_report(self, symbol: str, stock_data: str) -> Optional[StockQuote]:
+        """兼容旧调用方式：从文本报告中提取最新价格（新代码请直接传入PriceBarSeries）"""
+        fields = {}
+        for line in stock_data.split('\n'):
+            for label in ("当前价格", "最新价格", "涨跌幅", "成交量", "股票名称"):
+                if f"{label}:" in line and label not in fields:
+                    fields[label] = line.split(':', 1)[1].strip()
+
+        price_text = fields.get("当前价格") or fields.get("最新价格")
+        if not price_text:
+            return None
+
+        def to_float(text):
+            try:
+                return float(text.replace('¥', '').replace(',', '').replace('%', '').replace('股', '').replace('手', '').split()[0])
+            except (ValueError, IndexError, AttributeError):
+                return None
+
+        price = to_float(price_text)
+        if price is None:
+            return None
+        return StockQuote(
+            symbol=symbol,
+            price=price,
+            change_pct=to_float(fields.get("涨跌幅")),
+            volume=to_float(fields.get("成交量")),
+            name=fields.get("股票名称"),
+        )
+
     def _try_get_old_cache(self, symbol: str, start_date: str, end_date: str) -> Optional[str]:
         """尝试获取过期的缓存数据作为备用"""
         try:
@@ -1077,7 +1103,9 @@ class OptimizedChinaDataProvider:
                         
                         cache_key = metadata_file.stem.replace('_meta', '')
                         cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
+                        if cached_data is not None and metadata.get('data_source') == BARS_CACHE_SOURCE:
+                            cached_data = PriceBarSeries.from_dict(json.loads(cached_data)).to_report()
+                        if isinstance(cached_data, str) and cached_data:
                             return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
                 except Exception:
                     continue
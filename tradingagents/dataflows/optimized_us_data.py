@@ -13,6 +13,7 @@ import yfinance as yf
 import pandas as pd
 from .cache_manager import get_cache
 from .config import get_config
+from .technical_indicators import get_indicator_engine
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -198,17 +199,15 @@ class OptimizedUSDataProvider:
         price_change = data['Close'].iloc[-1] - data['Close'].iloc[0]
         price_change_pct = (price_change / data['Close'].iloc[0]) * 100
         
-        # 计算技术指标
-        data['MA5'] = data['Close'].rolling(window=5).mean()
-        data['MA10'] = data['Close'].rolling(window=10).mean()
-        data['MA20'] = data['Close'].rolling(window=20).mean()
-        
-        # 计算RSI
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        # 计算技术指标（统一指标引擎，一次计算并缓存）
+        indicators = get_indicator_engine().compute(
+            data, ['close_5_sma', 'close_10_sma', 'close_20_sma', 'rsi_14'],
+            symbol=symbol, adjust='yfin'
+        )
+        data['MA5'] = indicators['close_5_sma'].to_numpy()
+        data['MA10'] = indicators['close_10_sma'].to_numpy()
+        data['MA20'] = indicators['close_20_sma'].to_numpy()
+        rsi = indicators['rsi_14']
         
         # 格式化输出
         result = f"""# {symbol} 美股数据分析
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+复权价格计算工具
+基于累计乘积向量化计算前复权/后复权OHLC价格，支持长表格式的多股票数据
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+ADJUST_FORWARD = 'forward'
+ADJUST_BACKWARD = 'backward'
+
+
+def _growth_from_pct_chg(data: pd.DataFrame) -> pd.Series:
+    """pct_chg（百分比）转换为每日增长因子，缺失值按0%处理"""
+    return 1.0 + pd.to_numeric(data['pct_chg'], errors='coerce').fillna(0.0) / 100.0
+
+
+def _adjusted_close_from_pct_chg(data: pd.DataFrame, method: str, keys) -> pd.Series:
+    """
+    基于pct_chg计算复权收盘价
+
+    前复权以每只股票最后一天的收盘价为基准：
+        adj_close[i] = close[last] / prod(growth[i+1..last])
+    后复权以每只股票第一天的收盘价为基准：
+        adj_close[i] = close[first] * prod(growth[1..i])
+    """
+    growth = _growth_from_pct_chg(data)
+    close = data['close'].astype(float)
+
+    if method == ADJUST_FORWARD:
+        # 反向累计乘积得到 prod(growth[i..last])，去掉当天自身即为 prod(growth[i+1..last])
+        reversed_growth = growth.iloc[::-1]
+        if keys is None:
+            suffix = reversed_growth.cumprod().iloc[::-1]
+            base = close.iloc[-1]
+        else:
+            suffix = reversed_growth.groupby(keys.iloc[::-1], sort=False).cumprod().iloc[::-1]
+            base = close.groupby(keys, sort=False).transform('last')
+        return base * growth / suffix
+
+    if keys is None:
+        prefix = growth.cumprod()
+        base = close.iloc[0] / growth.iloc[0]
+    else:
+        prefix = growth.groupby(keys, sort=False).cumprod()
+        first_growth = growth.groupby(keys, sort=False).transform('first')
+        base = close.groupby(keys, sort=False).transform('first') / first_growth
+    return base * prefix
+
+
+def _adjusted_close_from_adj_factor(data: pd.DataFrame, method: str, keys) -> pd.Series:
+    """
+    基于官方复权因子计算复权收盘价
+
+    后复权 = 收盘价 × 当日复权因子
+    前复权 = 收盘价 × 当日复权因子 / 最新复权因子
+    """
+    factor = pd.to_numeric(data['adj_factor'], errors='coerce')
+    if keys is None:
+        factor = factor.ffill().bfill()
+    else:
+        factor = factor.groupby(keys, sort=False).ffill()
+        factor = factor.groupby(keys, sort=False).bfill()
+    adjusted = data['close'].astype(float) * factor
+
+    if method == ADJUST_FORWARD:
+        latest = factor.iloc[-1] if keys is None else factor.groupby(keys, sort=False).transform('last')
+        adjusted = adjusted / latest
+    return adjusted
+
+
+def adjust_prices(data: pd.DataFrame, method: str = ADJUST_FORWARD,
+                  source: Optional[str] = None,
+                  symbol_col: str = 'ts_code',
+                  date_col: str = 'trade_date',
+                  keep_raw: bool = True) -> pd.DataFrame:
+    """
+    计算复权OHLC价格
+
+    Args:
+        data: 包含open/high/low/close以及pct_chg或adj_factor的DataFrame，
+              可以是多只股票的长表（按symbol_col区分）
+        method: 'forward'=前复权, 'backward'=后复权
+        source: 'pct_chg' 或 'adj_factor'，为空时优先使用adj_factor
+        symbol_col: 股票代码列名，不存在时按单只股票处理
+        date_col: 交易日期列名
+        keep_raw: 是否保留 *_raw 原始价格列
+
+    Returns:
+        DataFrame: 按(股票代码, 日期)排序、索引重置后的复权数据
+    """
+    if method not in (ADJUST_FORWARD, ADJUST_BACKWARD):
+        raise ValueError(f"不支持的复权方式: {method}")
+
+    if source is None:
+        source = 'adj_factor' if 'adj_factor' in data.columns else 'pct_chg'
+    if source not in ('pct_chg', 'adj_factor'):
+        raise ValueError(f"不支持的复权数据来源: {source}")
+    if source not in data.columns:
+        raise ValueError(f"缺少{source}列，无法计算复权价格")
+
+    if data.empty:
+        return data.copy()
+
+    grouped = symbol_col in data.columns and data[symbol_col].nunique() > 1
+    sort_cols = [symbol_col, date_col] if grouped else [date_col]
+    adjusted_data = data.sort_values(sort_cols, kind='mergesort').reset_index(drop=True)
+    keys = adjusted_data[symbol_col] if grouped else None
+
+    if keep_raw:
+        for col in PRICE_COLUMNS:
+            adjusted_data[f'{col}_raw'] = adjusted_data[col]
+
+    if source == 'pct_chg':
+        adjusted_close = _adjusted_close_from_pct_chg(adjusted_data, method, keys)
+    else:
+        adjusted_close = _adjusted_close_from_adj_factor(adjusted_data, method, keys)
+
+    # 其他价格按收盘价的调整比例缩放，收盘价为0时不调整
+    raw_close = adjusted_data['close'].astype(float).to_numpy()
+    adjusted_values = adjusted_close.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(raw_close != 0, adjusted_values / raw_close, 1.0)
+
+    for col in ('open', 'high', 'low'):
+        adjusted_data[col] = adjusted_data[col].astype(float).to_numpy() * ratio
+    adjusted_data['close'] = adjusted_values
+
+    adjusted_data['price_type'] = 'forward_adjusted' if method == ADJUST_FORWARD else 'backward_adjusted'
+    return adjusted_data
+
+
+def forward_adjust(data: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """计算前复权OHLC价格，参数同adjust_prices"""
+    return adjust_prices(data, method=ADJUST_FORWARD, **kwargs)
+
+
+def backward_adjust(data: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """计算后复权OHLC价格，参数同adjust_prices"""
+    return adjust_prices(data, method=ADJUST_BACKWARD, **kwargs)
@@ -6,16 +6,42 @@
 
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import time
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from tradingagents.config.env_utils import parse_bool_env, parse_float_env
+from tradingagents.dataflows.news_dedup import (
+    NearDuplicateDetector,
+    deduplicate_near_duplicates,
+    source_authority,
+)
+from tradingagents.dataflows.news_store import NewsStore, get_news_store
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+# 新闻源的截止时间（秒），同时作为HTTP请求超时；各新闻源同时开始，到时合并已返回的结果
+DEFAULT_NEWS_SOURCE_TIMEOUT = 8.0
+# 近似去重时参与比较的导语长度（字符）
+NEWS_LEAD_CHARS = 200
+
+
+
+class NewsSourceError(Exception):
+    """
+    新闻源获取失败（网络、接口错误等）
+
+    items为失败前已获取到的部分新闻；失败的新闻源不推进新闻库水位线，下次仍完整拉取该时间窗口
+    """
+
+    def __init__(self, message: str, items: Optional[List["NewsItem"]] = None):
+        super().__init__(message)
+        self.items = items or []
 
 
 @dataclass
@@ -28,12 +54,13 @@ class NewsItem:
     url: str
     urgency: str  # high, medium, low
     relevance_score: float
+    duplicate_sources: List[str] = field(default_factory=list)  # 被合并的近似重复新闻来源
 
 
 class RealtimeNewsAggregator:
     """实时新闻聚合器"""
     
-    def __init__(self):
+    def __init__(self, source_timeout: Optional[float] = None, news_store: Optional[NewsStore] = None):
         self.headers = {
             'User-Agent': 'TradingAgents-CN/1.0'
         }
@@ -43,74 +70,184 @@ class RealtimeNewsAggregator:
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
         
+        # 截止时间配置
+        self.source_timeout = source_timeout or parse_float_env('NEWS_SOURCE_TIMEOUT', DEFAULT_NEWS_SOURCE_TIMEOUT)
+        
+        # 最近一次聚合的元数据（各新闻源耗时、超时情况）
+        self.last_fetch_metadata: Dict[str, Any] = {}
+        
+        # 近似重复检测
+        self.near_duplicate_detector = NearDuplicateDetector(
+            threshold=parse_float_env('NEWS_NEAR_DUPLICATE_THRESHOLD', 0.6)
+        )
+        self.last_duplicate_clusters = []
+        
+        # 增量新闻库：设置后只拉取水位线之后的新闻，结果从库中组装
+        self.news_store = news_store
+        
+    def _get_news_sources(self) -> List[Tuple[str, Callable[[str, int], List[NewsItem]], Optional[str]]]:
+        """
+        新闻源列表（按优先级排序，去重时优先保留靠前来源的新闻）
+        
+        Returns:
+            List[Tuple]: (名称, 获取函数, 未启用原因)
+        """
+        return [
+            ('FinnHub', self._get_finnhub_realtime_news,
+             None if self.finnhub_key else 'FinnHub 密钥未配置'),
+            ('Alpha Vantage', self._get_alpha_vantage_news,
+             None if self.alpha_vantage_key else 'Alpha Vantage 密钥未配置'),
+            ('NewsAPI', self._get_newsapi_news,
+             None if self.newsapi_key else 'NewsAPI 密钥未配置'),
+            ('中文财经', self._get_chinese_finance_news, None),
+        ]
+    
+    def _fetch_sources_concurrently(self, ticker: str, hours_back: int) -> Tuple[List[NewsItem], Dict[str, Dict[str, Any]]]:
+        """
+        并发获取所有已配置的新闻源
+        
+        各新闻源同时开始，截止时间（source_timeout）到达时只合并已经返回的结果，未返回的新闻源记为超时；
+        设置了新闻库时只拉取水位线之后的新闻，返回的新闻从库中组装
+        
+        Returns:
+            Tuple: (按新闻源优先级合并的新闻列表, 各新闻源状态)
+        """
+        sources = self._get_news_sources()
+        source_stats: Dict[str, Dict[str, Any]] = {}
+        
+        active = [(name, func) for name, func, reason in sources if reason is None]
+        for name, _, reason in sources:
+            if reason is not None:
+                logger.info(f"[新闻聚合器] {reason}，跳过此新闻源")
+                source_stats[name] = {'status': 'skipped', 'count': 0, 'latency': 0.0}
+        
+        if not active:
+            return [], source_stats
+        
+        # 有新闻库时按水位线只拉取增量，库中数据足够新的新闻源不再请求
+        now = datetime.now()
+        fetch_hours: Dict[str, int] = {}
+        for name, _ in active:
+            hours = self.news_store.plan_fetch(ticker, name, hours_back, now) if self.news_store else hours_back
+            if hours is None:
+                source_stats[name] = {'status': 'cached', 'count': 0, 'latency': 0.0}
+                logger.info(f"[新闻聚合器] {name} 距上次拉取不足 {self.news_store.min_refresh_seconds:.0f}秒，使用新闻库数据")
+            else:
+                fetch_hours[name] = hours
+        
+        results = self._run_fetches(ticker, [(name, func) for name, func in active if name in fetch_hours],
+                                    fetch_hours, source_stats)
+        
+        if self.news_store is None:
+            # 按新闻源优先级合并
+            all_news = []
+            for name, _ in active:
+                all_news.extend(results.get(name, []))
+            return all_news, source_stats
+        
+        for name, items in results.items():
+            # 只有完整成功的拉取才推进水位线；部分失败的新闻源只入库已获取的新闻
+            complete = source_stats[name]['status'] in ('ok', 'empty')
+            inserted = self.news_store.add_news(ticker, name, items, fetched_at=now,
+                                                covered_since=now - timedelta(hours=fetch_hours[name]),
+                                                update_watermark=complete)
+            source_stats[name]['new'] = inserted
+        
+        # 按新闻源优先级从新闻库组装（超时/失败的新闻源也能使用此前入库的新闻）
+        since = now - timedelta(hours=hours_back)
+        all_news = []
+        for name, _ in active:
+            all_news.extend(self.news_store.get_news(ticker, since, source_name=name))
+        return all_news, source_stats
+    
+    def _run_fetches(self, ticker: str, sources: List[Tuple[str, Callable[[str, int], List[NewsItem]]]],
+                     fetch_hours: Dict[str, int], source_stats: Dict[str, Dict[str, Any]]) -> Dict[str, List[NewsItem]]:
+        """
+        在截止时间内并发执行各新闻源的获取函数
+        
+        Returns:
+            Dict: 按时返回的新闻源名称 -> 新闻列表（状态写入source_stats）
+        """
+        results: Dict[str, List[NewsItem]] = {}
+        if not sources:
+            return results
+        
+        futures = {}
+        start = time.monotonic()
+        deadline = start + self.source_timeout
+        
+        # 线程数等于新闻源数量，保证所有新闻源同时开始；慢新闻源不阻塞返回
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='news-source')
+        try:
+            for name, func in sources:
+                logger.info(f"[新闻聚合器] 尝试从 {name} 获取 {ticker} 的新闻")
+                futures[executor.submit(func, ticker, fetch_hours[name])] = name
+            
+            pending = set(futures)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    latency = time.monotonic() - start
+                    try:
+                        items = future.result() or []
+                        results[name] = items
+                        source_stats[name] = {'status': 'ok' if items else 'empty',
+                                              'count': len(items), 'latency': latency}
+                        if items:
+                            logger.info(f"[新闻聚合器] 成功从 {name} 获取 {len(items)} 条新闻，耗时: {latency:.2f}秒")
+                        else:
+                            logger.info(f"[新闻聚合器] {name} 未返回新闻，耗时: {latency:.2f}秒")
+                    except NewsSourceError as e:
+                        if e.items:
+                            results[name] = e.items
+                        source_stats[name] = {'status': 'partial' if e.items else 'error', 'count': len(e.items),
+                                              'latency': latency, 'error': str(e)}
+                        logger.error(f"[新闻聚合器] {name} 新闻获取失败（保留 {len(e.items)} 条）: {e}，耗时: {latency:.2f}秒")
+                    except Exception as e:
+                        source_stats[name] = {'status': 'error', 'count': 0, 'latency': latency, 'error': str(e)}
+                        logger.error(f"[新闻聚合器] {name} 新闻获取失败: {e}，耗时: {latency:.2f}秒")
+            
+            for future in pending:
+                name = futures[future]
+                future.cancel()
+                latency = time.monotonic() - start
+                source_stats[name] = {'status': 'timeout', 'count': 0, 'latency': latency}
+                logger.warning(f"[新闻聚合器] ⏰ {name} 超过截止时间 {latency:.2f}秒 未返回，忽略此新闻源")
+        finally:
+            executor.shutdown(wait=False)
+        
+        return results
+    
     def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
         """
         获取实时股票新闻
         优先级：专业API > 新闻API > 搜索引擎
+        各新闻源并发获取，本次的耗时与超时信息保存在 last_fetch_metadata 中
         
         Args:
             ticker: 股票代码
             hours_back: 回溯小时数
             max_news: 最大新闻数量，默认10条
         """
+        news, _ = self.get_realtime_stock_news_with_metadata(ticker, hours_back, max_news)
+        return news
+    
+    def get_realtime_stock_news_with_metadata(self, ticker: str, hours_back: int = 6,
+                                              max_news: int = 10) -> Tuple[List[NewsItem], Dict[str, Any]]:
+        """
+        获取实时股票新闻及聚合元数据
+        
+        Returns:
+            Tuple: (新闻列表, 元数据)，元数据包含各新闻源的状态、条数、耗时以及超时的新闻源
+        """
         logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
         start_time = datetime.now()
-        all_news = []
-        
-        # 1. FinnHub实时新闻 (最高优先级)
-        logger.info(f"[新闻聚合器] 尝试从 FinnHub 获取 {ticker} 的新闻")
-        finnhub_start = datetime.now()
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        finnhub_time = (datetime.now() - finnhub_start).total_seconds()
-        
-        if finnhub_news:
-            logger.info(f"[新闻聚合器] 成功从 FinnHub 获取 {len(finnhub_news)} 条新闻，耗时: {finnhub_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] FinnHub 未返回新闻，耗时: {finnhub_time:.2f}秒")
-            
-        all_news.extend(finnhub_news)
-        
-        # 2. Alpha Vantage新闻
-        logger.info(f"[新闻聚合器] 尝试从 Alpha Vantage 获取 {ticker} 的新闻")
-        av_start = datetime.now()
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        av_time = (datetime.now() - av_start).total_seconds()
-        
-        if av_news:
-            logger.info(f"[新闻聚合器] 成功从 Alpha Vantage 获取 {len(av_news)} 条新闻，耗时: {av_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] Alpha Vantage 未返回新闻，耗时: {av_time:.2f}秒")
-            
-        all_news.extend(av_news)
         
-        # 3. NewsAPI (如果配置了)
-        if self.newsapi_key:
-            logger.info(f"[新闻聚合器] 尝试从 NewsAPI 获取 {ticker} 的新闻")
-            newsapi_start = datetime.now()
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            newsapi_time = (datetime.now() - newsapi_start).total_seconds()
-            
-            if newsapi_news:
-                logger.info(f"[新闻聚合器] 成功从 NewsAPI 获取 {len(newsapi_news)} 条新闻，耗时: {newsapi_time:.2f}秒")
-            else:
-                logger.info(f"[新闻聚合器] NewsAPI 未返回新闻，耗时: {newsapi_time:.2f}秒")
-                
-            all_news.extend(newsapi_news)
-        else:
-            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
-        
-        # 4. 中文财经新闻源
-        logger.info(f"[新闻聚合器] 尝试获取 {ticker} 的中文财经新闻")
-        chinese_start = datetime.now()
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        chinese_time = (datetime.now() - chinese_start).total_seconds()
-        
-        if chinese_news:
-            logger.info(f"[新闻聚合器] 成功获取 {len(chinese_news)} 条中文财经新闻，耗时: {chinese_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] 未获取到中文财经新闻，耗时: {chinese_time:.2f}秒")
-            
-        all_news.extend(chinese_news)
+        all_news, source_stats = self._fetch_sources_concurrently(ticker, hours_back)
         
         # 去重和排序
         logger.info(f"[新闻聚合器] 开始对 {len(all_news)} 条新闻进行去重和排序")
@@ -138,7 +275,19 @@ class RealtimeNewsAggregator:
             sample_titles = [item.title for item in sorted_news[:3]]
             logger.info(f"[新闻聚合器] 新闻标题示例: {', '.join(sample_titles)}")
         
-        return sorted_news
+        metadata = {
+            'ticker': ticker,
+            'sources': source_stats,
+            'timed_out': [name for name, stat in source_stats.items() if stat['status'] == 'timeout'],
+            'source_timeout': self.source_timeout,
+            'total_news': len(all_news),
+            'unique_news': len(unique_news),
+            'near_duplicate_clusters': len(self.last_duplicate_clusters),
+            'total_time': total_time,
+        }
+        self.last_fetch_metadata = metadata
+        
+        return sorted_news, metadata
     
     def _get_finnhub_realtime_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取FinnHub实时新闻"""
@@ -159,7 +308,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
             
             news_data = response.json()
@@ -188,7 +337,7 @@ class RealtimeNewsAggregator:
             
         except Exception as e:
             logger.error(f"FinnHub新闻获取失败: {e}")
-            return []
+            raise
     
     def _get_alpha_vantage_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取Alpha Vantage新闻"""
@@ -204,7 +353,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -239,7 +388,7 @@ class RealtimeNewsAggregator:
             
         except Exception as e:
             logger.error(f"Alpha Vantage新闻获取失败: {e}")
-            return []
+            raise
     
     def _get_newsapi_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取NewsAPI新闻"""
@@ -264,7 +413,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -294,7 +443,7 @@ class RealtimeNewsAggregator:
             
         except Exception as e:
             logger.error(f"NewsAPI新闻获取失败: {e}")
-            return []
+            raise
     
     def _get_chinese_finance_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取中文财经新闻"""
@@ -302,6 +451,7 @@ class RealtimeNewsAggregator:
         logger.info(f"[中文财经新闻] 开始获取 {ticker} 的中文财经新闻，回溯时间: {hours_back}小时")
         start_time = datetime.now()
         
+        failures = []
         try:
             news_items = []
             
@@ -309,10 +459,12 @@ class RealtimeNewsAggregator:
             try:
                 logger.info(f"[中文财经新闻] 尝试导入 AKShare 工具")
                 from .akshare_utils import get_stock_news_em
+                from tradingagents.utils.stock_utils import StockUtils
                 
                 # 处理股票代码格式
-                # 如果是美股代码，不使用东方财富新闻
-                if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
+                # 如果是美股代码（带美股后缀或不带后缀的字母代码），不使用东方财富新闻
+                if (('.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']))
+                        or StockUtils.is_us_stock(ticker)):
                     logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
                 else:
                     # 处理A股和港股代码
@@ -379,13 +531,12 @@ class RealtimeNewsAggregator:
                         logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
             except Exception as ak_e:
                 logger.error(f"[中文财经新闻] 获取东方财富新闻失败: {ak_e}")
+                failures.append(f"东方财富: {ak_e}")
             
-            # 2. 财联社RSS (如果可用)
-            logger.info(f"[中文财经新闻] 开始获取财联社RSS新闻")
+            # 2. 补充RSS源（可选；只能添加RSS/Atom格式的源，财联社网页接口返回JSON，feedparser无法解析）
             rss_start_time = datetime.now()
             rss_sources = [
-                "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
-                # 可以添加更多RSS源
+                # 可以添加RSS源
             ]
             
             rss_success_count = 0
@@ -407,23 +558,27 @@ class RealtimeNewsAggregator:
                     else:
                         logger.info(f"[中文财经新闻] RSS源未返回相关新闻，耗时: {rss_item_time:.2f}秒")
                 except Exception as rss_e:
-                    logger.error(f"[中文财经新闻] 解析RSS源失败: {rss_e}")
+                    # 补充RSS源失败不影响整个新闻源的状态（水位线照常推进）
+                    logger.warning(f"[中文财经新闻] 解析RSS源失败: {rss_e}")
                     rss_error_count += 1
                     continue
             
             # 记录RSS获取总结
             rss_total_time = (datetime.now() - rss_start_time).total_seconds()
-            logger.info(f"[中文财经新闻] RSS新闻获取完成，成功源: {rss_success_count}个，失败源: {rss_error_count}个，获取新闻: {total_rss_items}条，总耗时: {rss_total_time:.2f}秒")
+            if rss_sources:
+                logger.info(f"[中文财经新闻] RSS新闻获取完成，成功源: {rss_success_count}个，失败源: {rss_error_count}个，获取新闻: {total_rss_items}条，总耗时: {rss_total_time:.2f}秒")
             
             # 记录中文财经新闻获取总结
             total_time = (datetime.now() - start_time).total_seconds()
             logger.info(f"[中文财经新闻] {ticker} 的中文财经新闻获取完成，总共获取 {len(news_items)} 条新闻，总耗时: {total_time:.2f}秒")
             
-            return news_items
-            
         except Exception as e:
             logger.error(f"[中文财经新闻] 中文财经新闻获取失败: {e}")
-            return []
+            raise NewsSourceError(f"中文财经新闻获取失败: {e}") from e
+        
+        if failures:
+            raise NewsSourceError("; ".join(failures), items=news_items)
+        return news_items
     
     def _parse_rss_feed(self, rss_url: str, ticker: str, hours_back: int) -> List[NewsItem]:
         """解析RSS源"""
@@ -439,6 +594,9 @@ class RealtimeNewsAggregator:
             feed = feedparser.parse(rss_url)
             
             if not feed or not feed.entries:
+                if getattr(feed, 'bozo', False):
+                    # 请求或解析失败（而不是没有新闻）
+                    raise RuntimeError(f"RSS源请求失败: {getattr(feed, 'bozo_exception', '未知错误')}")
                 logger.warning(f"[RSS解析] RSS源未返回有效内容")
                 return []
             
@@ -494,7 +652,7 @@ class RealtimeNewsAggregator:
             return []
         except Exception as e:
             logger.error(f"[RSS解析] 解析RSS源失败: {e}")
-            return []
+            raise
     
     def _assess_news_urgency(self, title: str, content: str) -> str:
         """评估新闻紧急程度"""
@@ -563,7 +721,11 @@ class RealtimeNewsAggregator:
         return 0.3  # 默认相关性
     
     def _deduplicate_news(self, news_items: List[NewsItem]) -> List[NewsItem]:
-        """去重新闻"""
+        """
+        去重新闻
+        1. 标题完全相同（忽略大小写）的直接去掉
+        2. 标题+导语近似重复（MinHash+LSH）的聚为一簇，保留最权威、最早发布的一篇
+        """
         logger.info(f"[新闻去重] 开始对 {len(news_items)} 条新闻进行去重处理")
         start_time = datetime.now()
         
@@ -592,10 +754,24 @@ class RealtimeNewsAggregator:
             seen_titles.add(title_key)
             unique_news.append(item)
         
+        # 近似重复：转载、改写标题或标点不同的同一篇新闻
+        unique_news, clusters = deduplicate_near_duplicates(
+            unique_news,
+            text_func=lambda item: f"{item.title} {(item.content or '')[:NEWS_LEAD_CHARS]}",
+            rank_func=lambda item: (-source_authority(item.source), item.publish_time.timestamp()),
+            detector=self.near_duplicate_detector,
+        )
+        for cluster in clusters:
+            cluster.representative.duplicate_sources = [dup.source for dup in cluster.duplicates]
+            logger.debug(f"[新闻去重] 近似重复簇: '{cluster.representative.title[:50]}...'，"
+                         f"合并 {len(cluster.duplicates)} 条，来源: {cluster.representative.duplicate_sources}")
+        near_duplicate_count = sum(len(cluster.duplicates) for cluster in clusters)
+        self.last_duplicate_clusters = clusters
+        
         # 记录去重结果
         time_taken = (datetime.now() - start_time).total_seconds()
         logger.info(f"[新闻去重] 去重完成，原始新闻: {len(news_items)}条，去重后: {len(unique_news)}条，")
-        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
+        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，近似重复: {near_duplicate_count}条，标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
         
         return unique_news
     
@@ -804,7 +980,13 @@ def get_realtime_stock_news(ticker: str, curr_date: str, hours_back: int = 6) ->
     
     # 如果不是A股或A股新闻获取失败，使用实时新闻聚合器
     logger.info(f"[新闻分析] ========== 步骤3: 实时新闻聚合器 ==========")
-    aggregator = RealtimeNewsAggregator()
+    news_store = None
+    if parse_bool_env('NEWS_STORE_ENABLED', True):
+        try:
+            news_store = get_news_store()
+        except Exception as e:
+            logger.warning(f"[新闻分析] 新闻库不可用，本次全量拉取: {e}")
+    aggregator = RealtimeNewsAggregator(news_store=news_store)
     logger.info(f"[新闻分析] 成功创建实时新闻聚合器实例")
     try:
         logger.info(f"[新闻分析] 尝试使用实时新闻聚合器获取 {ticker} 的新闻")
@@ -818,6 +1000,14 @@ def get_realtime_stock_news(ticker: str, curr_date: str, hours_back: int = 6) ->
         time_taken = (end_time - start_time).total_seconds()
         logger.info(f"[新闻分析] 聚合器调用结束时间: {end_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}")
         logger.info(f"[新闻分析] 聚合器调用耗时: {time_taken:.2f}秒")
+        fetch_metadata = aggregator.last_fetch_metadata
+        source_summary = ", ".join(
+            f"{name}: {stat['status']}({stat['latency']:.2f}秒)"
+            for name, stat in fetch_metadata.get('sources', {}).items()
+        )
+        logger.info(f"[新闻分析] 各新闻源状态: {source_summary}")
+        if fetch_metadata.get('timed_out'):
+            logger.warning(f"[新闻分析] 超时的新闻源: {', '.join(fetch_metadata['timed_out'])}")
         logger.info(f"[新闻分析] 聚合器返回数据类型: {type(news_items)}")
         logger.info(f"[新闻分析] 聚合器返回数据: {news_items}")
         
@@ -3,9 +3,11 @@ import time
 import json
 from datetime import datetime, timedelta
 from contextlib import contextmanager
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Dict, List, Tuple
 import os
 import re
+import threading
 
 ticker_to_company = {
     "AAPL": "Apple",
@@ -49,87 +51,164 @@ ticker_to_company = {
 }
 
 
-def fetch_top_from_category(
+# 日期索引目录（放在数据根目录下，避免改变各分类目录中的文件数）
+INDEX_DIR_NAME = ".reddit_index"
+
+# 已加载的索引: 数据文件路径 -> (文件大小, 修改时间, {日期: [行偏移]})
+_loaded_indexes: Dict[str, Tuple[int, float, Dict[str, List[int]]]] = {}
+_index_lock = threading.Lock()
+
+
+def _post_date(parsed_line: dict) -> str:
+    return datetime.utcfromtimestamp(parsed_line["created_utc"]).strftime("%Y-%m-%d")
+
+
+def _build_date_index(file_path: str) -> Dict[str, List[int]]:
+    """扫描一遍JSONL文件，记录每个日期（UTC）的帖子所在行的字节偏移"""
+    index: Dict[str, List[int]] = {}
+    offset = 0
+    with open(file_path, "rb") as f:
+        for line in f:
+            if line.strip():
+                index.setdefault(_post_date(json.loads(line)), []).append(offset)
+            offset += len(line)
+    return index
+
+
+def get_date_index(file_path: str, index_root: str) -> Dict[str, List[int]]:
+    """
+    获取JSONL文件的日期->字节偏移索引
+
+    索引持久化为 index_root 下的JSON文件，数据文件大小或修改时间变化时重建
+    """
+    stat = os.stat(file_path)
+    with _index_lock:
+        cached = _loaded_indexes.get(file_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+            return cached[2]
+
+    index_path = os.path.join(index_root, os.path.basename(file_path) + ".index.json")
+    index = None
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("size") == stat.st_size and stored.get("mtime") == stat.st_mtime:
+            index = stored["dates"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if index is None:
+        index = _build_date_index(file_path)
+        try:
+            os.makedirs(index_root, exist_ok=True)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"size": stat.st_size, "mtime": stat.st_mtime, "dates": index}, f)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            # 数据目录只读时只在内存中保留索引
+            pass
+
+    with _index_lock:
+        _loaded_indexes[file_path] = (stat.st_size, stat.st_mtime, index)
+    return index
+
+
+@lru_cache(maxsize=None)
+def _company_pattern(query: str) -> "re.Pattern":
+    """公司名称（及股票代码）的预编译正则，任一名称匹配即可"""
+    if "OR" in ticker_to_company[query]:
+        search_terms = ticker_to_company[query].split(" OR ")
+    else:
+        search_terms = [ticker_to_company[query]]
+
+    search_terms.append(query)
+    return re.compile("|".join(f"(?:{term})" for term in search_terms), re.IGNORECASE)
+
+
+def fetch_top_from_category_range(
     category: Annotated[
         str, "Category to fetch top post from. Collection of subreddits."
     ],
-    date: Annotated[str, "Date to fetch top posts from."],
-    max_limit: Annotated[int, "Maximum number of posts to fetch."],
+    dates: Annotated[List[str], "Dates to fetch top posts from."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch per date."],
     query: Annotated[str, "Optional query to search for in the subreddit."] = None,
     data_path: Annotated[
         str,
         "Path to the data folder. Default is 'reddit_data'.",
     ] = "reddit_data",
-):
-    base_path = data_path
+) -> Dict[str, List[dict]]:
+    """
+    一次读取多个日期的热门帖子
+
+    每个文件只打开一次，通过日期索引直接定位到相关行，不再逐行解析整个文件
 
-    all_content = []
+    Returns:
+        Dict: 日期 -> 帖子列表（与对每个日期调用fetch_top_from_category的结果相同）
+    """
+    base_path = data_path
+    category_path = os.path.join(base_path, category)
+    index_root = os.path.join(base_path, INDEX_DIR_NAME, category)
 
-    if max_limit < len(os.listdir(os.path.join(base_path, category))):
+    data_files = os.listdir(category_path)
+    if max_limit < len(data_files):
         raise ValueError(
             "REDDIT FETCHING ERROR: max limit is less than the number of files in the category. Will not be able to fetch any posts"
         )
 
-    limit_per_subreddit = max_limit // len(
-        os.listdir(os.path.join(base_path, category))
-    )
+    limit_per_subreddit = max_limit // len(data_files)
+    all_content: Dict[str, List[dict]] = {date: [] for date in dates}
 
-    for data_file in os.listdir(os.path.join(base_path, category)):
+    for data_file in data_files:
         # check if data_file is a .jsonl file
         if not data_file.endswith(".jsonl"):
             continue
 
-        all_content_curr_subreddit = []
-
-        with open(os.path.join(base_path, category, data_file), "rb") as f:
-            for i, line in enumerate(f):
-                # skip empty lines
-                if not line.strip():
-                    continue
-
-                parsed_line = json.loads(line)
+        file_path = os.path.join(category_path, data_file)
+        date_index = get_date_index(file_path, index_root)
+        wanted = [(offset, date) for date in all_content for offset in date_index.get(date, [])]
+        if not wanted:
+            continue
 
-                # select only lines that are from the date
-                post_date = datetime.utcfromtimestamp(
-                    parsed_line["created_utc"]
-                ).strftime("%Y-%m-%d")
-                if post_date != date:
-                    continue
+        per_date: Dict[str, List[dict]] = {date: [] for date in all_content}
+        with open(file_path, "rb") as f:
+            # 按偏移顺序读取，保持与顺序扫描相同的行序
+            for offset, date in sorted(wanted):
+                f.seek(offset)
+                parsed_line = json.loads(f.readline())
 
                 # if is company_news, check that the title or the content has the company's name (query) mentioned
                 if "company" in category and query:
-                    search_terms = []
-                    if "OR" in ticker_to_company[query]:
-                        search_terms = ticker_to_company[query].split(" OR ")
-                    else:
-                        search_terms = [ticker_to_company[query]]
-
-                    search_terms.append(query)
-
-                    found = False
-                    for term in search_terms:
-                        if re.search(
-                            term, parsed_line["title"], re.IGNORECASE
-                        ) or re.search(term, parsed_line["selftext"], re.IGNORECASE):
-                            found = True
-                            break
-
-                    if not found:
+                    pattern = _company_pattern(query)
+                    if not (pattern.search(parsed_line["title"]) or pattern.search(parsed_line["selftext"])):
                         continue
 
-                post = {
+                per_date[date].append({
                     "title": parsed_line["title"],
                     "content": parsed_line["selftext"],
                     "url": parsed_line["url"],
                     "upvotes": parsed_line["ups"],
-                    "posted_date": post_date,
-                }
+                    "posted_date": date,
+                })
 
-                all_content_curr_subreddit.append(post)
+        for date, posts in per_date.items():
+            # sort by upvotes in descending order
+            posts.sort(key=lambda x: x["upvotes"], reverse=True)
+            all_content[date].extend(posts[:limit_per_subreddit])
 
-        # sort all_content_curr_subreddit by upvote_ratio in descending order
-        all_content_curr_subreddit.sort(key=lambda x: x["upvotes"], reverse=True)
+    return all_content
 
-        all_content.extend(all_content_curr_subreddit[:limit_per_subreddit])
 
-    return all_content
+def fetch_top_from_category(
+    category: Annotated[
+        str, "Category to fetch top post from. Collection of subreddits."
+    ],
+    date: Annotated[str, "Date to fetch top posts from."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch."],
+    query: Annotated[str, "Optional query to search for in the subreddit."] = None,
+    data_path: Annotated[
+        str,
+        "Path to the data folder. Default is 'reddit_data'.",
+    ] = "reddit_data",
+):
+    return fetch_top_from_category_range(category, [date], max_limit, query, data_path)[date]
@@ -6,10 +6,18 @@ Tushare数据接口数据获取工具
 
 import pandas as pd
 import numpy as np
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import warnings
 
+from tradingagents.config.env_utils import parse_int_env, parse_float_env
+from tradingagents.dataflows.technical_indicators import get_indicator_engine
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -51,12 +59,287 @@ except ImportError:
     logger.info(f"💡 安装命令: pip install pytdx")
 
 
+# 单次get_security_bars请求的最大K线条数（服务器限制）
+TDX_MAX_BARS_PER_REQUEST = 800
+# 单次get_security_quotes请求的最大股票数量
+TDX_MAX_QUOTES_PER_REQUEST = 80
+
+# 默认服务器列表（未找到tdx_servers_config.json时使用）
+DEFAULT_TDX_SERVERS = [
+    {'ip': '115.238.56.198', 'port': 7709},
+    {'ip': '115.238.90.165', 'port': 7709},
+    {'ip': '180.153.18.170', 'port': 7709},
+    {'ip': '119.147.212.81', 'port': 7709},  # 备用
+]
+
+
+class _PooledConnection:
+    """连接池中的单个连接"""
+
+    def __init__(self, api, server: Dict):
+        self.api = api
+        self.server = server
+        self.last_checked = time.monotonic()
+
+    @property
+    def address(self) -> str:
+        return f"{self.server['ip']}:{self.server['port']}"
+
+
+class TdxConnectionPool:
+    """
+    通达信连接池
+
+    将多个pytdx连接分散到不同的可用服务器上：
+    - 借出前对空闲超过health_check_interval的连接做心跳检测
+    - 调用失败的连接会被丢弃，并自动从下一个服务器补充新连接
+    - 失败的服务器在server_cooldown秒内不再参与轮询
+    - map()把多个请求并行分发到不同连接上
+    """
+
+    def __init__(self, servers: List[Dict], size: Optional[int] = None,
+                 api_factory: Optional[Callable[[], Any]] = None,
+                 connect_timeout: Optional[float] = None,
+                 acquire_timeout: Optional[float] = None,
+                 health_check_interval: Optional[float] = None,
+                 server_cooldown: float = 60.0):
+        if not servers:
+            raise ValueError("连接池至少需要一个服务器")
+
+        self.servers = list(servers)
+        if size is None:
+            size = parse_int_env('TDX_POOL_SIZE', 4)
+        self.size = max(1, min(size, len(self.servers)))
+        self.api_factory = api_factory or TdxHq_API
+        self.connect_timeout = connect_timeout if connect_timeout is not None else parse_float_env('TDX_CONNECT_TIMEOUT', 3.0)
+        self.acquire_timeout = acquire_timeout if acquire_timeout is not None else parse_float_env('TDX_ACQUIRE_TIMEOUT', 30.0)
+        self.health_check_interval = health_check_interval if health_check_interval is not None else parse_float_env('TDX_HEALTH_CHECK_INTERVAL', 30.0)
+        self.server_cooldown = server_cooldown
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._server_cursor = 0
+        self._failed_servers: Dict[str, float] = {}
+        self._closed = False
+
+    # ---------- 连接管理 ----------
+
+    def _next_servers(self) -> List[Dict]:
+        """按轮询顺序返回服务器列表，冷却中的服务器排在最后"""
+        with self._lock:
+            start = self._server_cursor
+            self._server_cursor = (self._server_cursor + 1) % len(self.servers)
+            now = time.monotonic()
+            failed = {
+                key for key, failed_at in self._failed_servers.items()
+                if now - failed_at < self.server_cooldown
+            }
+
+        ordered = self.servers[start:] + self.servers[:start]
+        healthy = [s for s in ordered if f"{s['ip']}:{s['port']}" not in failed]
+        cooling = [s for s in ordered if f"{s['ip']}:{s['port']}" in failed]
+        return healthy + cooling
+
+    def _open_connection(self) -> Optional[_PooledConnection]:
+        """从下一个可用服务器建立新连接"""
+        for server in self._next_servers():
+            key = f"{server['ip']}:{server['port']}"
+            try:
+                api = self.api_factory()
+                if api.connect(server['ip'], server['port'], time_out=self.connect_timeout):
+                    with self._lock:
+                        self._failed_servers.pop(key, None)
+                    logger.debug(f"🔗 [TDX连接池] 新建连接: {key}")
+                    return _PooledConnection(api, server)
+            except Exception as e:
+                logger.warning(f"⚠️ [TDX连接池] 服务器 {key} 连接失败: {e}")
+
+            with self._lock:
+                self._failed_servers[key] = time.monotonic()
+
+        logger.error(f"❌ [TDX连接池] 所有数据服务器连接失败")
+        return None
+
+    def _ping(self, conn: _PooledConnection) -> bool:
+        """心跳检测"""
+        try:
+            result = conn.api.get_security_count(0)
+            conn.last_checked = time.monotonic()
+            return result is not None and result > 0
+        except Exception as e:
+            logger.debug(f"🔍 [TDX连接池] 连接 {conn.address} 心跳失败: {e}")
+            return False
+
+    def _discard(self, conn: _PooledConnection):
+        """丢弃失效连接"""
+        try:
+            conn.api.disconnect()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+            self._failed_servers[conn.address] = time.monotonic()
+        logger.info(f"🔄 [TDX连接池] 已丢弃失效连接: {conn.address}")
+
+    def start(self) -> int:
+        """并行预建立连接，返回可用连接数"""
+        with self._lock:
+            missing = self.size - self._created
+            self._created += missing
+        if missing <= 0:
+            return self._created
+
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            connections = list(executor.map(lambda _: self._open_connection(), range(missing)))
+
+        for conn in connections:
+            if conn is None:
+                with self._lock:
+                    self._created -= 1
+            else:
+                self._idle.put(conn)
+
+        logger.info(f"✅ [TDX连接池] 可用连接: {self._created}/{self.size}")
+        return self._created
+
+    def acquire(self, timeout: Optional[float] = None) -> _PooledConnection:
+        """借出一个健康的连接"""
+        if self._closed:
+            raise ConnectionError("TDX连接池已关闭")
+
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                with self._lock:
+                    can_grow = self._created < self.size
+                    if can_grow:
+                        self._created += 1
+                if can_grow:
+                    conn = self._open_connection()
+                    if conn is None:
+                        with self._lock:
+                            self._created -= 1
+                            no_connections = self._created <= 0
+                        if no_connections:
+                            raise ConnectionError("所有数据服务器连接失败")
+                if conn is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"等待TDX连接超时 ({timeout}s)")
+                    try:
+                        conn = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        raise TimeoutError(f"等待TDX连接超时 ({timeout}s)")
+
+            if time.monotonic() - conn.last_checked >= self.health_check_interval and not self._ping(conn):
+                self._discard(conn)
+                continue
+            return conn
+
+    def release(self, conn: _PooledConnection, broken: bool = False):
+        """归还连接，broken=True时丢弃该连接"""
+        if broken or self._closed:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """以上下文管理器方式借用连接，异常时自动丢弃"""
+        conn = self.acquire()
+        try:
+            yield conn.api
+        except Exception:
+            self.release(conn, broken=True)
+            raise
+        else:
+            self.release(conn)
+
+    def run(self, func: Callable, *args, retries: int = 1):
+        """
+        在池中连接上执行func(api, *args)
+
+        pytdx出错时返回None而不抛异常，因此None结果同样视为连接失效，
+        丢弃连接后在另一个连接上重试。
+        """
+        last_error = None
+        for _ in range(retries + 1):
+            conn = self.acquire()
+            try:
+                result = func(conn.api, *args)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"⚠️ [TDX连接池] 连接 {conn.address} 调用失败: {e}")
+                self.release(conn, broken=True)
+                continue
+
+            if result is None:
+                logger.warning(f"⚠️ [TDX连接池] 连接 {conn.address} 返回空结果，更换连接重试")
+                self.release(conn, broken=True)
+                continue
+
+            conn.last_checked = time.monotonic()
+            self.release(conn)
+            return result
+
+        if last_error:
+            raise last_error
+        return None
+
+    def map(self, func: Callable, items: List) -> List:
+        """把func(api, item)并行分发到多个连接上，结果保持items顺序"""
+        items = list(items)
+        if len(items) <= 1:
+            return [self.run(func, item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.size, len(items))) as executor:
+            return list(executor.map(lambda item: self.run(func, item), items))
+
+    def health_check(self) -> int:
+        """检测所有空闲连接，替换失效连接，返回可用连接数"""
+        checked = []
+        while True:
+            try:
+                checked.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        for conn in checked:
+            if self._ping(conn):
+                self._idle.put(conn)
+            else:
+                self._discard(conn)
+
+        return self.start()
+
+    def close(self):
+        """关闭所有空闲连接"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.api.disconnect()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+
+
 class TongDaXinDataProvider:
     """通达信数据提供器"""
     
     def __init__(self):
         logger.debug(f"🔍 [DEBUG] 初始化通达信数据提供器...")
-        self.api = None
+        self.pool: Optional[TdxConnectionPool] = None
         self.exapi = None  # 扩展行情API
         self.connected = False
 
@@ -68,7 +351,7 @@ class TongDaXinDataProvider:
         logger.debug(f"✅ [DEBUG] pytdx库检查通过")
     
     def connect(self):
-        """连接数据服务器"""
+        """连接数据服务器（建立连接池）"""
         logger.debug(f"🔍 [DEBUG] 开始连接数据服务器...")
         try:
             # 尝试从配置文件加载可用服务器
@@ -78,32 +361,19 @@ class TongDaXinDataProvider:
             # 如果没有配置文件，使用默认服务器列表
             if not working_servers:
                 logger.debug(f"🔍 [DEBUG] 未找到配置文件，使用默认服务器列表")
-                working_servers = [
-                    {'ip': '115.238.56.198', 'port': 7709},
-                    {'ip': '115.238.90.165', 'port': 7709},
-                    {'ip': '180.153.18.170', 'port': 7709},
-                    {'ip': '119.147.212.81', 'port': 7709},  # 备用
-                ]
+                working_servers = DEFAULT_TDX_SERVERS
             else:
                 logger.debug(f"🔍 [DEBUG] 从配置文件加载了 {len(working_servers)} 个服务器")
 
-            # 尝试连接可用服务器
-            logger.debug(f"🔍 [DEBUG] 创建Tushare数据接口实例...")
-            self.api = TdxHq_API()
-            logger.debug(f"🔍 [DEBUG] 开始尝试连接服务器...")
+            if self.pool:
+                self.pool.close()
+            self.pool = TdxConnectionPool(working_servers)
 
-            for i, server in enumerate(working_servers):
-                try:
-                    logger.debug(f"🔍 [DEBUG] 尝试连接服务器 {i+1}/{len(working_servers)}: {server['ip']}:{server['port']}")
-                    result = self.api.connect(server['ip'], server['port'])
-                    logger.debug(f"🔍 [DEBUG] 连接结果: {result}")
-                    if result:
-                        logger.info(f"✅ Tushare数据接口连接成功: {server['ip']}:{server['port']}")
-                        self.connected = True
-                        return True
-                except Exception as e:
-                    logger.error(f"⚠️ 服务器 {server['ip']}:{server['port']} 连接失败: {e}")
-                    continue
+            live = self.pool.start()
+            if live > 0:
+                logger.info(f"✅ Tushare数据接口连接成功: {live} 个连接")
+                self.connected = True
+                return True
 
             logger.error(f"❌ 所有数据服务器连接失败")
             self.connected = False
@@ -132,8 +402,9 @@ class TongDaXinDataProvider:
     def disconnect(self):
         """断开连接"""
         try:
-            if self.api:
-                self.api.disconnect()
+            if self.pool:
+                self.pool.close()
+                self.pool = None
             if self.exapi:
                 self.exapi.disconnect()
             self.connected = False
@@ -142,81 +413,75 @@ class TongDaXinDataProvider:
             pass
 
     def is_connected(self):
-        """检查连接状态"""
-        if not self.connected or not self.api:
-            return False
-
-        # 尝试简单的API调用来验证连接是否有效
-        try:
-            # 获取市场信息作为连接测试
-            result = self.api.get_security_count(0)  # 获取深圳市场股票数量
-            return result is not None and result > 0
-        except Exception as e:
-            logger.error(f"🔍 [DEBUG] 连接测试失败: {e}")
-            self.connected = False
-            return False
+        """检查连接状态（连接健康检查在借出连接时按health_check_interval进行）"""
+        return bool(self.connected and self.pool is not None)
     
     def _get_stock_name(self, stock_code: str) -> str:
         """
         获取股票名称
-        优先级：缓存 -> MongoDB -> 常用股票映射 -> API获取（仅深圳市场） -> 默认格式
         Args:
             stock_code: 股票代码
         Returns:
             str: 股票名称
         """
-        global _stock_name_cache
-        
-        # 首先检查缓存
-        if stock_code in _stock_name_cache:
-            return _stock_name_cache[stock_code]
-        
-        # 优先从MongoDB获取
-        mongodb_name = _get_stock_name_from_mongodb(stock_code)
-        if mongodb_name:
-            _stock_name_cache[stock_code] = mongodb_name
-            return mongodb_name
-        
-        # 检查常用股票映射表
-        if stock_code in _common_stock_names:
-            name = _common_stock_names[stock_code]
-            _stock_name_cache[stock_code] = name
-            return name
-        
-        # 如果API不可用，直接返回默认格式
-        if not self.connected:
-            if not self.connect():
-                default_name = f'股票{stock_code}'
-                _stock_name_cache[stock_code] = default_name
-                return default_name
-        
-        try:
-            # 仅对深圳市场尝试从API获取（上海市场的get_security_list不可用）
-            market = self._get_market_code(stock_code)
-            if market == 0:  # 深圳市场
-                try:
-                    for start_pos in range(0, 2000, 1000):  # 分批获取
-                        stock_list = self.api.get_security_list(market, start_pos)
-                        if stock_list:
-                            for stock_info in stock_list:
-                                if stock_info.get('code') == stock_code:
-                                    stock_name = stock_info.get('name', '').strip()
-                                    if stock_name:
-                                        _stock_name_cache[stock_code] = stock_name
-                                        return stock_name
-                except Exception as e:
-                    logger.error(f"⚠️ 获取深圳股票列表失败: {e}")
-            
-            # 如果都失败了，返回默认格式并缓存
-            default_name = f'股票{stock_code}'
-            _stock_name_cache[stock_code] = default_name
-            return default_name
-            
-        except Exception as e:
-            logger.error(f"⚠️ 获取股票名称失败: {e}")
-            default_name = f'股票{stock_code}'
-            _stock_name_cache[stock_code] = default_name
-            return default_name
+        return self._get_stock_names([stock_code])[stock_code]
+
+    def _get_stock_names(self, stock_codes: List[str]) -> Dict[str, str]:
+        """
+        批量获取股票名称
+        优先级：缓存 -> MongoDB（一次查询） -> 常用股票映射 -> 深圳证券列表（进程内只加载一次） -> 默认格式
+        Args:
+            stock_codes: 股票代码列表
+        Returns:
+            Dict[str, str]: 股票代码 -> 股票名称
+        """
+        names = {code: _stock_name_cache[code] for code in stock_codes if code in _stock_name_cache}
+        missing = [code for code in dict.fromkeys(stock_codes) if code not in names]
+        if not missing:
+            return names
+
+        resolved = _get_stock_names_from_mongodb(missing)
+        for code in missing:
+            if code not in resolved and code in _common_stock_names:
+                resolved[code] = _common_stock_names[code]
+
+        # 仅深圳市场可从API获取（上海市场的get_security_list不可用）
+        shenzhen = [code for code in missing if code not in resolved and self._get_market_code(code) == 0]
+        if shenzhen:
+            security_names = self._load_security_names()
+            for code in shenzhen:
+                if security_names.get(code):
+                    resolved[code] = security_names[code]
+
+        for code in missing:
+            name = resolved.get(code) or f'股票{code}'
+            _stock_name_cache[code] = name
+            names[code] = name
+        return names
+
+    def _load_security_names(self) -> Dict[str, str]:
+        """深圳市场证券列表（代码 -> 名称），各页并行获取，成功后进程内只加载一次"""
+        global _security_list_names
+        with _security_list_lock:
+            if _security_list_names is not None:
+                return _security_list_names
+            if not self.connected and not self.connect():
+                return {}
+
+            names = {}
+            try:
+                pages = self.pool.map(lambda api, pos: api.get_security_list(0, pos), list(range(0, 2000, 1000)))
+                for page in pages:
+                    for stock_info in page or []:
+                        name = (stock_info.get('name') or '').strip()
+                        if stock_info.get('code') and name:
+                            names[stock_info['code']] = name
+            except Exception as e:
+                logger.error(f"⚠️ 获取深圳股票列表失败: {e}")
+
+            if names:
+                _security_list_names = names
+            return names
     
     def get_real_time_data(self, stock_code: str) -> Dict:
         """
@@ -234,39 +499,78 @@ class TongDaXinDataProvider:
             market = self._get_market_code(stock_code)
             
             # 获取实时数据
-            data = self.api.get_security_quotes([(market, stock_code)])
+            data = self.pool.run(lambda api, stocks: api.get_security_quotes(stocks), [(market, stock_code)])
 
             if not data:
                 return {}
 
-            quote = data[0]
-            
-            # 安全获取字段，避免KeyError
-            def safe_get(key, default=0):
-                return quote.get(key, default)
-
-            return {
-                'code': stock_code,
-                'name': self._get_stock_name(stock_code),  # 使用独立的股票名称获取方法
-                'price': safe_get('price'),
-                'last_close': safe_get('last_close'),
-                'open': safe_get('open'),
-                'high': safe_get('high'),
-                'low': safe_get('low'),
-                'volume': safe_get('vol'),
-                'amount': safe_get('amount'),
-                'change': safe_get('price') - safe_get('last_close'),
-                'change_percent': ((safe_get('price') - safe_get('last_close')) / safe_get('last_close') * 100) if safe_get('last_close') > 0 else 0,
-                'bid_prices': [safe_get(f'bid{i}') for i in range(1, 6)],
-                'bid_volumes': [safe_get(f'bid_vol{i}') for i in range(1, 6)],
-                'ask_prices': [safe_get(f'ask{i}') for i in range(1, 6)],
-                'ask_volumes': [safe_get(f'ask_vol{i}') for i in range(1, 6)],
-                'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            return self._format_quote(stock_code, data[0])
             
         except Exception as e:
             logger.error(f"获取实时数据失败: {e}")
             return {}
+
+    def get_real_time_data_batch(self, stock_codes: List[str]) -> Dict[str, Dict]:
+        """
+        批量获取股票实时数据，按每批TDX_MAX_QUOTES_PER_REQUEST只分组并行请求
+        Args:
+            stock_codes: 股票代码列表
+        Returns:
+            Dict[str, Dict]: 股票代码 -> 实时数据
+        """
+        if not stock_codes:
+            return {}
+        if not self.connected:
+            if not self.connect():
+                return {}
+
+        try:
+            stocks = [(self._get_market_code(code), code) for code in stock_codes]
+            chunks = [
+                stocks[i:i + TDX_MAX_QUOTES_PER_REQUEST]
+                for i in range(0, len(stocks), TDX_MAX_QUOTES_PER_REQUEST)
+            ]
+            pages = self.pool.map(lambda api, chunk: api.get_security_quotes(chunk), chunks)
+
+            quotes = {}
+            for page in pages:
+                for quote in page or []:
+                    code = quote.get('code')
+                    if code:
+                        quotes[code] = quote
+
+            # 名称按批次一次解析，不逐只查询
+            names = self._get_stock_names(list(quotes))
+            return {code: self._format_quote(code, quote, names[code]) for code, quote in quotes.items()}
+
+        except Exception as e:
+            logger.error(f"批量获取实时数据失败: {e}")
+            return {}
+
+    def _format_quote(self, stock_code: str, quote: Dict, name: Optional[str] = None) -> Dict:
+        """将pytdx行情记录转换为实时数据字典（name为空时单独查询名称）"""
+        # 安全获取字段，避免KeyError
+        def safe_get(key, default=0):
+            return quote.get(key, default)
+
+        return {
+            'code': stock_code,
+            'name': name or self._get_stock_name(stock_code),
+            'price': safe_get('price'),
+            'last_close': safe_get('last_close'),
+            'open': safe_get('open'),
+            'high': safe_get('high'),
+            'low': safe_get('low'),
+            'volume': safe_get('vol'),
+            'amount': safe_get('amount'),
+            'change': safe_get('price') - safe_get('last_close'),
+            'change_percent': ((safe_get('price') - safe_get('last_close')) / safe_get('last_close') * 100) if safe_get('last_close') > 0 else 0,
+            'bid_prices': [safe_get(f'bid{i}') for i in range(1, 6)],
+            'bid_volumes': [safe_get(f'bid_vol{i}') for i in range(1, 6)],
+            'ask_prices': [safe_get(f'ask{i}') for i in range(1, 6)],
+            'ask_volumes': [safe_get(f'ask_vol{i}') for i in range(1, 6)],
+            'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
     
     def get_stock_history_data(self, stock_code: str, start_date: str, end_date: str, period: str = 'D') -> pd.DataFrame:
         """
@@ -286,26 +590,25 @@ class TongDaXinDataProvider:
         try:
             market = self._get_market_code(stock_code)
             
-            # 计算需要获取的数据量
+            # 计算需要获取的数据量（K线从最新一根往回数，因此从今天算到开始日期）
             start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-            end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-            days_diff = (end_dt - start_dt).days
+            days_back = max((datetime.now() - start_dt).days, 0)
             
             # 根据周期调整数据量
             if period == 'D':
-                count = min(days_diff + 10, 800)  # 日线最多800条
+                count = days_back + 10
             elif period == 'W':
-                count = min(days_diff // 7 + 10, 800)
+                count = days_back // 7 + 10
             elif period == 'M':
-                count = min(days_diff // 30 + 10, 800)
+                count = days_back // 30 + 10
             else:
-                count = 800
+                count = TDX_MAX_BARS_PER_REQUEST
             
             # 获取K线数据
             category_map = {'D': 9, 'W': 5, 'M': 6}
             category = category_map.get(period, 9)
             
-            data = self.api.get_security_bars(category, market, stock_code, 0, count)
+            data = self._fetch_bars(category, market, stock_code, count)
             
             if not data:
                 return pd.DataFrame()
@@ -316,6 +619,7 @@ class TongDaXinDataProvider:
             # 处理数据格式
             df['datetime'] = pd.to_datetime(df['datetime'])
             df = df.set_index('datetime')
+            df = df[~df.index.duplicated(keep='last')]
             df = df.sort_index()
             
             # 筛选日期范围
@@ -340,58 +644,85 @@ class TongDaXinDataProvider:
             logger.error(f"获取历史数据失败: {e}")
             return pd.DataFrame()
     
-    def get_stock_technical_indicators(self, stock_code: str, period: int = 20) -> Dict:
+    def _fetch_bars(self, category: int, market: int, stock_code: str, count: int) -> List[Dict]:
+        """
+        分页获取K线，超过TDX_MAX_BARS_PER_REQUEST条时把各页并行分发到连接池的不同连接上
+        Args:
+            category: K线类别
+            market: 市场代码
+            stock_code: 股票代码
+            count: 需要的K线条数（从最新一根往回数）
+        Returns:
+            List[Dict]: 按时间升序排列的K线
+        """
+        offsets = list(range(0, max(count, 1), TDX_MAX_BARS_PER_REQUEST))
+
+        def fetch_page(api, offset):
+            size = min(TDX_MAX_BARS_PER_REQUEST, count - offset)
+            return api.get_security_bars(category, market, stock_code, offset, size)
+
+        pages = self.pool.map(fetch_page, offsets)
+
+        bars = []
+        # 第0页是最新的数据，每页内部按时间升序，因此倒序拼接
+        for offset, page in reversed(list(zip(offsets, pages))):
+            if page is None:
+                raise RuntimeError(f"获取K线分页失败: {stock_code} offset={offset}")
+            bars.extend(page)
+        return bars
+
+    def get_stock_technical_indicators(self, stock_code: str, period: int = 20,
+                                       df: Optional[pd.DataFrame] = None) -> Dict:
         """
         计算技术指标
         Args:
             stock_code: 股票代码
             period: 计算周期
+            df: 已获取的历史数据，提供时不再重复获取K线
         Returns:
             Dict: 技术指标数据
         """
         try:
-            # 获取最近的历史数据
-            end_date = datetime.now().strftime('%Y-%m-%d')
-            start_date = (datetime.now() - timedelta(days=period*2)).strftime('%Y-%m-%d')
-            
-            df = self.get_stock_history_data(stock_code, start_date, end_date)
+            if df is None:
+                # 获取最近的历史数据
+                end_date = datetime.now().strftime('%Y-%m-%d')
+                start_date = (datetime.now() - timedelta(days=period*2)).strftime('%Y-%m-%d')
+                df = self.get_stock_history_data(stock_code, start_date, end_date)
             
             if df.empty:
                 return {}
             
-            # 计算技术指标
+            values = get_indicator_engine().latest(
+                df,
+                ['close_5_sma', 'close_10_sma', 'close_20_sma', 'rsi_14',
+                 'macd', 'macds', 'macdh', 'boll', 'boll_ub', 'boll_lb'],
+                symbol=stock_code,
+                adjust='none',
+            )
+            
+            # 计算技术指标（数据不足时不输出对应指标）
             indicators = {}
             
             # 移动平均线
-            indicators['MA5'] = df['Close'].rolling(5).mean().iloc[-1] if len(df) >= 5 else None
-            indicators['MA10'] = df['Close'].rolling(10).mean().iloc[-1] if len(df) >= 10 else None
-            indicators['MA20'] = df['Close'].rolling(20).mean().iloc[-1] if len(df) >= 20 else None
+            indicators['MA5'] = values['close_5_sma'] if len(df) >= 5 else None
+            indicators['MA10'] = values['close_10_sma'] if len(df) >= 10 else None
+            indicators['MA20'] = values['close_20_sma'] if len(df) >= 20 else None
             
             # RSI
             if len(df) >= 14:
-                delta = df['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-                rs = gain / loss
-                indicators['RSI'] = (100 - (100 / (1 + rs))).iloc[-1]
+                indicators['RSI'] = values['rsi_14']
             
             # MACD
             if len(df) >= 26:
-                exp1 = df['Close'].ewm(span=12).mean()
-                exp2 = df['Close'].ewm(span=26).mean()
-                macd = exp1 - exp2
-                signal = macd.ewm(span=9).mean()
-                indicators['MACD'] = macd.iloc[-1]
-                indicators['MACD_Signal'] = signal.iloc[-1]
-                indicators['MACD_Histogram'] = (macd - signal).iloc[-1]
+                indicators['MACD'] = values['macd']
+                indicators['MACD_Signal'] = values['macds']
+                indicators['MACD_Histogram'] = values['macdh']
             
             # 布林带
             if len(df) >= 20:
-                sma = df['Close'].rolling(20).mean()
-                std = df['Close'].rolling(20).std()
-                indicators['BB_Upper'] = (sma + 2 * std).iloc[-1]
-                indicators['BB_Middle'] = sma.iloc[-1]
-                indicators['BB_Lower'] = (sma - 2 * std).iloc[-1]
+                indicators['BB_Upper'] = values['boll_ub']
+                indicators['BB_Middle'] = values['boll']
+                indicators['BB_Lower'] = values['boll_lb']
             
             return indicators
             
@@ -482,17 +813,18 @@ class TongDaXinDataProvider:
             
             market_data = {}
             
-            for name, (market, code) in indices.items():
+            # 一次请求获取所有指数行情
+            stocks = [(int(market), code) for market, code in indices.values()]
+            quotes = self.pool.run(lambda api, items: api.get_security_quotes(items), stocks) or []
+            
+            for name, quote in zip(indices.keys(), quotes):
                 try:
-                    data = self.api.get_security_quotes([(int(market), code)])
-                    if data:
-                        quote = data[0]
-                        market_data[name] = {
-                            'price': quote['price'],
-                            'change': quote['price'] - quote['last_close'],
-                            'change_percent': ((quote['price'] - quote['last_close']) / quote['last_close'] * 100) if quote['last_close'] > 0 else 0,
-                            'volume': quote['vol']
-                        }
+                    market_data[name] = {
+                        'price': quote['price'],
+                        'change': quote['price'] - quote['last_close'],
+                        'change_percent': ((quote['price'] - quote['last_close']) / quote['last_close'] * 100) if quote['last_close'] > 0 else 0,
+                        'volume': quote['vol']
+                    }
                 except:
                     continue
             
@@ -506,6 +838,8 @@ class TongDaXinDataProvider:
 # 全局实例和缓存
 _tdx_provider = None
 _stock_name_cache = {}  # 股票名称缓存，避免重复API调用
+_security_list_names = None  # 深圳证券列表（代码 -> 名称）
+_security_list_lock = threading.Lock()
 _mongodb_client = None
 _mongodb_db = None
 
@@ -555,22 +889,26 @@ def _get_mongodb_connection():
 
 def _get_stock_name_from_mongodb(stock_code: str) -> Optional[str]:
     """从MongoDB获取股票名称"""
+    return _get_stock_names_from_mongodb([stock_code]).get(stock_code)
+
+def _get_stock_names_from_mongodb(stock_codes: List[str]) -> Dict[str, str]:
+    """从MongoDB批量获取股票名称（一次查询）"""
     try:
         client, db = _get_mongodb_connection()
         if db is None:
-            return None
+            return {}
         
         collection = db['stock_basic_info']
-        stock_info = collection.find_one({'code': stock_code})
-        
-        if stock_info and 'name' in stock_info:
-            return stock_info['name'].strip()
-        
-        return None
+        names = {}
+        for stock_info in collection.find({'code': {'$in': list(stock_codes)}}, {'code': 1, 'name': 1}):
+            name = (stock_info.get('name') or '').strip()
+            if name:
+                names[stock_info['code']] = name
+        return names
         
     except Exception as e:
         logger.error(f"⚠️ 从MongoDB获取股票名称失败: {e}")
-        return None
+        return {}
 
 # 精简的常用股票名称映射（仅包含最常见的股票）
 _common_stock_names = {
@@ -618,6 +956,7 @@ def get_tdx_provider() -> TongDaXinDataProvider:
         # 检查连接状态，如果连接断开则重新创建
         if not _tdx_provider.is_connected():
             logger.debug(f"🔍 [DEBUG] 检测到连接断开，重新创建通达信数据提供器...")
+            _tdx_provider.disconnect()
             _tdx_provider = TongDaXinDataProvider()
             logger.debug(f"🔍 [DEBUG] 通达信数据提供器重新创建完成")
     return _tdx_provider
@@ -695,8 +1034,8 @@ def get_china_stock_data(stock_code: str, start_date: str, end_date: str) -> str
         # 获取实时数据
         realtime_data = provider.get_real_time_data(stock_code)
 
-        # 获取技术指标
-        indicators = provider.get_stock_technical_indicators(stock_code)
+        # 获取技术指标（复用已获取的历史数据）
+        indicators = provider.get_stock_technical_indicators(stock_code, df=df)
         
         # 格式化输出
         result = f"""
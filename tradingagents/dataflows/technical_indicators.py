@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+技术指标计算引擎
+对一份K线数据一次性向量化计算所需的全部指标，按(股票代码, 复权方式, 最后一根K线)缓存，
+供各数据提供器和分析工具复用，避免为计算指标重复获取K线
+
+指标命名与stockstats保持一致（close_50_sma、macd、boll_ub、rsi_14等），
+计算公式也与stockstats相同；引擎未内置的指标回退到stockstats计算
+"""
+
+import re
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.config.env_utils import parse_int_env
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    from stockstats import wrap as stockstats_wrap
+    STOCKSTATS_AVAILABLE = True
+except ImportError:
+    stockstats_wrap = None
+    STOCKSTATS_AVAILABLE = False
+
+
+# 默认参数（与stockstats一致）
+DEFAULT_WINDOWS = {
+    'rsi': 14,
+    'atr': 14,
+    'vwma': 14,
+    'mfi': 14,
+    'boll': 20,
+}
+MACD_WINDOWS = (12, 26, 9)  # 快线、慢线、信号线
+BOLL_STD_TIMES = 2
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+DATE_COLUMNS = ('date', 'Date', 'trade_date', 'datetime')
+
+_MOVING_AVERAGE_PATTERN = re.compile(r'^(open|high|low|close|volume)_(\d+)_(sma|ema)$')
+_WINDOWED_PATTERN = re.compile(r'^(rsi|atr|vwma|mfi)(?:_(\d+))?$')
+_GROUPS = {
+    'macd': ('macd', 'macds', 'macdh'),
+    'boll': ('boll', 'boll_ub', 'boll_lb'),
+}
+
+
+def _sma(values: np.ndarray, window: int) -> np.ndarray:
+    """简单移动平均（不足window时使用已有数据，同stockstats）"""
+    return pd.Series(values).rolling(window, min_periods=1).mean().to_numpy()
+
+
+def _ema(values: np.ndarray, window: int) -> np.ndarray:
+    """指数移动平均（span=window）"""
+    return pd.Series(values).ewm(span=window, adjust=True, min_periods=1).mean().to_numpy()
+
+
+def _smma(values: np.ndarray, window: int) -> np.ndarray:
+    """平滑移动平均（Wilder平滑，alpha=1/window）"""
+    return pd.Series(values).ewm(alpha=1.0 / window, adjust=True, min_periods=0).mean().to_numpy()
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """基于累计和的滑动求和（不足window时为部分和）"""
+    cumsum = np.cumsum(values)
+    out = cumsum.astype(float)
+    out[window:] = cumsum[window:] - cumsum[:-window]
+    return out
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(values).rolling(window, min_periods=1).std().to_numpy()
+
+
+class _BarArrays:
+    """一次计算中共享的中间结果（差分、典型价格、真实波幅等），按需计算且只算一次"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._cache:
+            if name not in self.frame.columns:
+                raise ValueError(f"K线数据缺少{name}列")
+            self._cache[name] = self.frame[name].to_numpy(dtype=float)
+        return self._cache[name]
+
+    def _memo(self, key: str, func) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
+    @property
+    def close_diff(self) -> np.ndarray:
+        def compute():
+            close = self.column('close')
+            diff = np.zeros_like(close)
+            diff[1:] = np.diff(close)
+            return diff
+        return self._memo('close_diff', compute)
+
+    @property
+    def typical_price(self) -> np.ndarray:
+        return self._memo('tp', lambda: (self.column('high') + self.column('low') + self.column('close')) / 3.0)
+
+    @property
+    def true_range(self) -> np.ndarray:
+        def compute():
+            close = self.column('close')
+            prev_close = np.empty_like(close)
+            prev_close[:1] = close[:1]
+            prev_close[1:] = close[:-1]
+            high, low = self.column('high'), self.column('low')
+            tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+            return np.nan_to_num(tr)
+        return self._memo('tr', compute)
+
+
+def _compute_rsi(arrays: _BarArrays, window: int) -> np.ndarray:
+    diff = arrays.close_diff
+    up = _smma(np.where(diff > 0, diff, 0.0), window)
+    down = _smma(np.where(diff < 0, -diff, 0.0), window)
+    total = up + down
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(total != 0, 100 * up / total, 50.0)
+    if len(rsi):
+        rsi[0] = 50.0
+    return rsi
+
+
+def _compute_vwma(arrays: _BarArrays, window: int) -> np.ndarray:
+    volume = arrays.column('volume')
+    tpv = _rolling_sum(volume * arrays.typical_price, window)
+    vol = _rolling_sum(volume, window)
+    return np.divide(tpv, vol, out=np.zeros_like(tpv), where=vol != 0)
+
+
+def _compute_mfi(arrays: _BarArrays, window: int) -> np.ndarray:
+    tp = arrays.typical_price
+    money_flow = tp * arrays.column('volume')
+    tp_diff = np.zeros_like(tp)
+    tp_diff[1:] = np.diff(tp)
+
+    pos_sum = _rolling_sum(np.where(tp_diff > 0, money_flow, 0.0), window)
+    neg_sum = _rolling_sum(np.where(tp_diff < 0, money_flow, 0.0), window)
+    total = pos_sum + neg_sum
+    mfi = np.divide(pos_sum, total, out=np.full_like(pos_sum, 0.5), where=total > 0)
+    mfi[:window] = 0.5
+    return mfi
+
+
+def _compute_group(arrays: _BarArrays, group: str) -> Dict[str, np.ndarray]:
+    if group == 'macd':
+        fast, slow, signal = MACD_WINDOWS
+        close = arrays.column('close')
+        macd = _ema(close, fast) - _ema(close, slow)
+        macds = _ema(macd, signal)
+        return {'macd': macd, 'macds': macds, 'macdh': macd - macds}
+
+    window = DEFAULT_WINDOWS['boll']
+    close = arrays.column('close')
+    middle = _sma(close, window)
+    width = BOLL_STD_TIMES * _rolling_std(close, window)
+    return {'boll': middle, 'boll_ub': middle + width, 'boll_lb': middle - width}
+
+
+def _compute_single(arrays: _BarArrays, name: str) -> Optional[np.ndarray]:
+    """计算单个内置指标，不支持时返回None"""
+    match = _MOVING_AVERAGE_PATTERN.match(name)
+    if match:
+        column, window, kind = match.group(1), int(match.group(2)), match.group(3)
+        values = arrays.column(column)
+        return _sma(values, window) if kind == 'sma' else _ema(values, window)
+
+    match = _WINDOWED_PATTERN.match(name)
+    if match:
+        kind = match.group(1)
+        window = int(match.group(2)) if match.group(2) else DEFAULT_WINDOWS[kind]
+        if kind == 'rsi':
+            return _compute_rsi(arrays, window)
+        if kind == 'atr':
+            return _smma(arrays.true_range, window)
+        if kind == 'vwma':
+            return _compute_vwma(arrays, window)
+        return _compute_mfi(arrays, window)
+
+    return None
+
+
+def _to_datetime_index(index: pd.Index) -> pd.Index:
+    """解析日期索引；yfinance离线数据可能包含夏令时导致的混合时区偏移，此时按UTC解析"""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            parsed = pd.to_datetime(index)
+        if not isinstance(parsed, pd.DatetimeIndex):
+            parsed = pd.to_datetime(index, utc=True)
+        return parsed
+    except (ValueError, TypeError):
+        return index
+
+
+def normalize_bars(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    将不同来源的K线统一为小写OHLCV列、日期索引并按日期升序
+
+    支持yfinance/通达信的首字母大写列名（Open/Close）以及date/trade_date/datetime日期列或索引
+    """
+    rename = {col: col.lower() for col in data.columns
+              if isinstance(col, str) and col.lower() in PRICE_COLUMNS and col not in PRICE_COLUMNS}
+    # rename总是返回副本，后续可以直接修改索引
+    frame = data.rename(columns=rename)
+
+    date_col = next((col for col in DATE_COLUMNS if col in frame.columns), None)
+    if date_col is not None:
+        frame = frame.set_index(date_col)
+    if not isinstance(frame.index, pd.DatetimeIndex):
+        frame.index = _to_datetime_index(frame.index)
+    if isinstance(frame.index, pd.DatetimeIndex):
+        if frame.index.tz is not None:
+            frame.index = frame.index.tz_localize(None)
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index(kind='mergesort')
+    frame.index.name = 'date'
+    return frame
+
+
+def compute_indicators(data: pd.DataFrame, indicators: Iterable[str],
+                       normalized: bool = False) -> pd.DataFrame:
+    """
+    一次性计算多个指标（不使用缓存）
+
+    Args:
+        data: K线数据
+        indicators: 指标名称列表（stockstats命名）
+        normalized: data是否已经过normalize_bars处理
+
+    Returns:
+        DataFrame: 与K线日期对齐的指标列
+    """
+    frame = data if normalized else normalize_bars(data)
+    arrays = _BarArrays(frame)
+    results: Dict[str, np.ndarray] = {}
+    fallback: List[str] = []
+
+    for name in indicators:
+        if name in results:
+            continue
+        group = next((g for g, members in _GROUPS.items() if name in members), None)
+        if group is not None:
+            results.update(_compute_group(arrays, group))
+            continue
+        values = _compute_single(arrays, name)
+        if values is None:
+            fallback.append(name)
+        else:
+            results[name] = values
+
+    if fallback:
+        if not STOCKSTATS_AVAILABLE:
+            raise ValueError(f"不支持的技术指标: {fallback}")
+        # 未内置的指标在同一个stockstats对象上一次性计算
+        wrapped = stockstats_wrap(frame.reset_index(drop=True).copy())
+        for name in fallback:
+            results[name] = np.asarray(wrapped[name], dtype=float)
+
+    requested = list(dict.fromkeys(indicators))
+    extra = [name for name in results if name not in requested]
+    return pd.DataFrame({name: results[name] for name in requested + extra}, index=frame.index)
+
+
+class IndicatorEngine:
+    """
+    带缓存的技术指标引擎
+
+    缓存键为(股票代码, 复权方式, 最后一根K线时间)，并以首日期、长度和最后一根K线的OHLCV校验数据是否相同；
+    同一份K线上后续请求的新指标会合并到已有缓存中
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or parse_int_env("INDICATOR_CACHE_SIZE", 256)
+        self._cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(frame: pd.DataFrame) -> Tuple:
+        """
+        K线的首日期、长度和最后一根K线的OHLCV
+
+        首日期和长度识别同一终点但起点不同的数据；盘中K线的时间不变但价格和成交量持续变化，
+        最后一根K线的取值不同时视为新数据
+        """
+        columns = [col for col in PRICE_COLUMNS if col in frame.columns]
+        last_bar = frame[columns].iloc[-1].to_numpy(dtype=float).tobytes()
+        return (frame.index[0], len(frame), last_bar)
+
+    def compute(self, data: pd.DataFrame, indicators: Iterable[str], symbol: Optional[str] = None,
+                adjust: str = 'none') -> pd.DataFrame:
+        """
+        计算（或从缓存读取）指标
+
+        Args:
+            data: K线数据（任意支持的列名格式）
+            indicators: 指标名称列表
+            symbol: 股票代码，为空时不使用缓存
+            adjust: 复权方式标识，如'none'、'forward'、'yfin_auto'
+
+        Returns:
+            DataFrame: 与K线日期对齐、按请求顺序排列的指标列
+        """
+        indicators = list(dict.fromkeys(indicators))
+        frame = normalize_bars(data)
+        if frame.empty:
+            return pd.DataFrame(index=frame.index, columns=indicators, dtype=float)
+        if symbol is None:
+            return compute_indicators(frame, indicators, normalized=True)[indicators]
+
+        key = (symbol, adjust, frame.index[-1])
+        signature = self._signature(frame)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry['signature'] == signature:
+                self._cache.move_to_end(key)
+                missing = [name for name in indicators if name not in entry['values']]
+            else:
+                entry = None
+                missing = indicators
+
+        if not missing:
+            self.hits += 1
+            return entry['values'][indicators]
+
+        self.misses += 1
+        computed = compute_indicators(frame, missing, normalized=True)
+
+        with self._lock:
+            current = self._cache.get(key)
+            if current is not None and current['signature'] == signature:
+                new_columns = [c for c in computed.columns if c not in current['values'].columns]
+                values = pd.concat([current['values'], computed[new_columns]], axis=1)
+            else:
+                values = computed
+            self._cache[key] = {'signature': signature, 'values': values}
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        return values[indicators]
+
+    def latest(self, data: pd.DataFrame, indicators: Iterable[str], symbol: Optional[str] = None,
+               adjust: str = 'none') -> Dict[str, Optional[float]]:
+        """返回各指标最后一根K线上的值"""
+        values = self.compute(data, indicators, symbol=symbol, adjust=adjust)
+        if values.empty:
+            return {name: None for name in values.columns}
+        last = values.iloc[-1]
+        return {name: (None if pd.isna(last[name]) else float(last[name])) for name in values.columns}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._cache), 'hits': self.hits, 'misses': self.misses}
+
+
+# 全局引擎实例
+_indicator_engine = None
+_indicator_engine_lock = threading.Lock()
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """获取全局技术指标引擎"""
+    global _indicator_engine
+    if _indicator_engine is None:
+        with _indicator_engine_lock:
+            if _indicator_engine is None:
+                _indicator_engine = IndicatorEngine()
+    return _indicator_engine
@@ -28,6 +28,8 @@ except ImportError:
     CACHE_AVAILABLE = False
     logger.warning("⚠️ 缓存管理器不可用")
 
+from .price_adjustment import forward_adjust
+
 # 导入Tushare
 try:
     import tushare as ts
@@ -304,49 +306,8 @@ class TushareProvider:
             return data
 
         try:
-            # 复制数据避免修改原始数据
-            adjusted_data = data.copy()
-
-            # 确保数据按日期排序
-            adjusted_data = adjusted_data.sort_values('trade_date').reset_index(drop=True)
-
-            # 保存原始价格列（用于对比）
-            adjusted_data['close_raw'] = adjusted_data['close'].copy()
-            adjusted_data['open_raw'] = adjusted_data['open'].copy()
-            adjusted_data['high_raw'] = adjusted_data['high'].copy()
-            adjusted_data['low_raw'] = adjusted_data['low'].copy()
-
-            # 从最新的收盘价开始，向前计算前复权价格
-            # 使用最后一天的收盘价作为基准
-            latest_close = float(adjusted_data.iloc[-1]['close'])
-
-            # 计算前复权收盘价
-            adjusted_closes = [latest_close]
-
-            # 从倒数第二天开始向前计算
-            for i in range(len(adjusted_data) - 2, -1, -1):
-                pct_change = float(adjusted_data.iloc[i + 1]['pct_chg']) / 100.0  # 转换为小数
-
-                # 前一天的前复权收盘价 = 今天的前复权收盘价 / (1 + 今天的涨跌幅)
-                prev_close = adjusted_closes[0] / (1 + pct_change)
-                adjusted_closes.insert(0, prev_close)
-
-            # 更新收盘价
-            adjusted_data['close'] = adjusted_closes
-
-            # 计算其他价格的调整比例
-            for i in range(len(adjusted_data)):
-                if adjusted_data.iloc[i]['close_raw'] != 0:  # 避免除零
-                    # 计算调整比例
-                    adjustment_ratio = adjusted_data.iloc[i]['close'] / adjusted_data.iloc[i]['close_raw']
-
-                    # 应用调整比例到其他价格
-                    adjusted_data.iloc[i, adjusted_data.columns.get_loc('open')] = adjusted_data.iloc[i]['open_raw'] * adjustment_ratio
-                    adjusted_data.iloc[i, adjusted_data.columns.get_loc('high')] = adjusted_data.iloc[i]['high_raw'] * adjustment_ratio
-                    adjusted_data.iloc[i, adjusted_data.columns.get_loc('low')] = adjusted_data.iloc[i]['low_raw'] * adjustment_ratio
-
-            # 添加标记表示这是前复权价格
-            adjusted_data['price_type'] = 'forward_adjusted'
+            # 向量化计算：累计乘积代替逐行回推，整列缩放代替逐行iloc赋值
+            adjusted_data = forward_adjust(data, source='pct_chg')
 
             logger.info(f"✅ 前复权价格计算完成，数据条数: {len(adjusted_data)}")
             logger.info(f"📊 价格调整范围: 最早调整比例 {adjusted_data.iloc[0]['close'] / adjusted_data.iloc[0]['close_raw']:.4f}")
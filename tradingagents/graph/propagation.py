@@ -10,14 +10,20 @@ from tradingagents.agents.utils.agent_states import (
     InvestDebateState,
     RiskDebateState,
 )
+from tradingagents.agents.utils.google_tool_handler import get_tool_call_max_workers
 
 
 class Propagator:
     """Handles state initialization and propagation through the graph."""
 
-    def __init__(self, max_recur_limit=100):
-        """Initialize with configuration parameters."""
+    def __init__(self, max_recur_limit=100, max_concurrency=None):
+        """Initialize with configuration parameters.
+
+        max_concurrency bounds how many tool calls of one LLM turn the
+        ToolNodes run in parallel (defaults to TOOL_CALL_MAX_WORKERS).
+        """
         self.max_recur_limit = max_recur_limit
+        self.max_concurrency = max_concurrency or get_tool_call_max_workers()
 
     def create_initial_state(
         self, company_name: str, trade_date: str
@@ -45,9 +51,16 @@ class Propagator:
             "news_report": "",
         }
 
-    def get_graph_args(self) -> Dict[str, Any]:
-        """Get arguments for the graph invocation."""
+    def get_graph_args(self, stream_tokens: bool = False) -> Dict[str, Any]:
+        """Get arguments for the graph invocation.
+
+        With stream_tokens, the graph also streams LLM tokens ("messages" mode)
+        and yields (mode, payload) tuples; see graph.streaming.iter_stream_events.
+        """
         return {
-            "stream_mode": "values",
-            "config": {"recursion_limit": self.max_recur_limit},
+            "stream_mode": ["values", "messages"] if stream_tokens else "values",
+            "config": {
+                "recursion_limit": self.max_recur_limit,
+                "max_concurrency": self.max_concurrency,
+            },
         }
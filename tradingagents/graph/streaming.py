@@ -0,0 +1,137 @@
+# TradingAgents/graph/streaming.py
+
+"""
+LLM token流式输出
+把LangGraph messages流模式产生的token按节点累积为各报告章节的实时内容，
+供Web进度页和CLI在节点完成前增量显示
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 图节点 -> 其输出所属的报告章节
+NODE_REPORT_SECTIONS = {
+    "Market Analyst": "market_report",
+    "Social Analyst": "sentiment_report",
+    "News Analyst": "news_report",
+    "Fundamentals Analyst": "fundamentals_report",
+    "Bull Researcher": "investment_plan",
+    "Bear Researcher": "investment_plan",
+    "Research Manager": "investment_plan",
+    "Trader": "trader_investment_plan",
+    "Risky Analyst": "final_trade_decision",
+    "Safe Analyst": "final_trade_decision",
+    "Neutral Analyst": "final_trade_decision",
+    "Risk Judge": "final_trade_decision",
+}
+
+
+@dataclass
+class TokenUpdate:
+    """一次token流更新"""
+    node: str  # 产生输出的图节点
+    section: Optional[str]  # 所属报告章节（非报告节点为None）
+    text: str  # 本次LLM调用到目前为止的完整输出
+    delta: str  # 本次新增的内容
+
+
+TokenCallback = Callable[[TokenUpdate], None]
+
+
+def _content_text(content: Any) -> str:
+    """提取消息内容中的文本（兼容内容块列表格式）"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            item.get("text", "") if isinstance(item, dict) else str(item)
+            for item in content
+            if not isinstance(item, dict) or item.get("type") == "text"
+        )
+    return ""
+
+
+class TokenStreamAccumulator:
+    """按节点累积token，每个节点只保留当前这次LLM调用的输出"""
+
+    def __init__(self):
+        self._outputs: Dict[str, Tuple[Optional[str], str]] = {}
+
+    def feed(self, message: Any, metadata: Dict[str, Any]) -> Optional[TokenUpdate]:
+        """
+        处理messages流中的一项
+
+        Returns:
+            有新文本时返回TokenUpdate；工具消息、工具调用参数等不含文本的块返回None
+        """
+        if not isinstance(message, (AIMessageChunk, AIMessage)):
+            return None
+        delta = _content_text(message.content)
+        if not delta:
+            return None
+
+        node = metadata.get("langgraph_node", "")
+        message_id = getattr(message, "id", None)
+        previous_id, text = self._outputs.get(node, (None, ""))
+        if isinstance(message, AIMessageChunk) and message_id == previous_id:
+            text += delta
+        else:
+            # 新的一次调用，或未流式输出的模型一次性返回的完整消息
+            text = delta
+        self._outputs[node] = (message_id, text)
+        return TokenUpdate(node=node, section=NODE_REPORT_SECTIONS.get(node), text=text, delta=delta)
+
+
+def iter_stream_events(stream: Iterable[Any]) -> Iterator[Tuple[str, Any]]:
+    """把graph.stream的输出统一为(模式, 数据)；单一模式时补上模式名"""
+    for item in stream:
+        if isinstance(item, tuple) and len(item) == 2 and item[0] in ("values", "messages", "updates"):
+            yield item
+        else:
+            yield "values", item
+
+
+class ThrottledTokenCallback:
+    """
+    限制token回调频率
+
+    同一节点两次回调至少间隔min_interval秒；节点切换时立即回调，
+    避免界面按token逐个重绘。回调异常只记录日志，不影响分析
+    """
+
+    def __init__(self, callback: TokenCallback, min_interval: float = 0.25):
+        self.callback = callback
+        self.min_interval = min_interval
+        self._last_node: Optional[str] = None
+        self._last_emit = 0.0
+        self._pending: Optional[TokenUpdate] = None
+
+    def __call__(self, update: TokenUpdate):
+        now = time.monotonic()
+        if update.node == self._last_node and now - self._last_emit < self.min_interval:
+            self._pending = update
+            return
+        if self._pending is not None and self._pending.node != update.node:
+            self._emit(self._pending, now)
+        self._emit(update, now)
+
+    def flush(self):
+        """发送被节流的最后一次更新"""
+        if self._pending is not None:
+            self._emit(self._pending, time.monotonic())
+
+    def _emit(self, update: TokenUpdate, now: float):
+        self._pending = None
+        self._last_node = update.node
+        self._last_emit = now
+        try:
+            self.callback(update)
+        except Exception as e:
+            logger.warning(f"⚠️ [流式输出] 回调失败: {e}")
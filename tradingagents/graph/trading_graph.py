@@ -35,6 +35,8 @@ from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .streaming import TokenCallback, TokenStreamAccumulator, iter_stream_events
+from tradingagents.utils.tool_memo import tool_memo_scope
 
 
 class TradingAgentsGraph:
@@ -260,6 +262,7 @@ class TradingAgentsGraph:
         self.curr_state = None
         self.ticker = None
         self.log_states_dict = {}  # date to full state dict
+        self.tool_memo_summary = {}  # tool memo statistics of the last run
 
         # Set up the graph
         self.graph = self.graph_setup.setup_graph(selected_analysts)
@@ -313,8 +316,13 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def propagate(self, company_name, trade_date, on_token: Optional[TokenCallback] = None):
+        """Run the trading agents graph for a company on a specific date.
+
+        Args:
+            on_token: Optional callback receiving TokenUpdate objects while agents
+                generate, so callers can render report sections incrementally.
+        """
 
         # 添加详细的接收日志
         logger.debug(f"🔍 [GRAPH DEBUG] ===== TradingAgentsGraph.propagate 接收参数 =====")
@@ -331,9 +339,44 @@ class TradingAgentsGraph:
         )
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的company_of_interest: '{init_agent_state.get('company_of_interest', 'NOT_FOUND')}'")
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的trade_date: '{init_agent_state.get('trade_date', 'NOT_FOUND')}'")
-        args = self.propagator.get_graph_args()
+        args = self.propagator.get_graph_args(stream_tokens=on_token is not None)
+
+        # Identical tool calls within this run are served from a shared memo
+        with tool_memo_scope(trade_date) as tool_memo:
+            final_state = self._run_graph(init_agent_state, args, on_token)
+        self.tool_memo_summary = tool_memo.summary()
+        if self.tool_memo_summary["saved_calls"]:
+            logger.info(
+                f"♻️ [工具缓存] 本次运行工具调用 {self.tool_memo_summary['tool_calls']} 次，"
+                f"复用缓存 {self.tool_memo_summary['saved_calls']} 次"
+                f"（约节省 {self.tool_memo_summary['saved_seconds']:.1f}秒）"
+            )
+
+        # Store current state for reflection
+        self.curr_state = final_state
+
+        # Log state
+        self._log_state(trade_date, final_state)
+
+        # Return decision and processed signal
+        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
 
-        if self.debug:
+    def _run_graph(self, init_agent_state, args, on_token: Optional[TokenCallback] = None):
+        """Run the graph and return the final state."""
+        if on_token is not None:
+            # Stream tokens to the caller while tracking the latest full state
+            accumulator = TokenStreamAccumulator()
+            final_state = None
+            for mode, payload in iter_stream_events(self.graph.stream(init_agent_state, **args)):
+                if mode == "messages":
+                    update = accumulator.feed(*payload)
+                    if update is not None:
+                        on_token(update)
+                else:
+                    final_state = payload
+                    if self.debug and payload["messages"]:
+                        payload["messages"][-1].pretty_print()
+        elif self.debug:
             # Debug mode with tracing
             trace = []
             for chunk in self.graph.stream(init_agent_state, **args):
@@ -348,14 +391,7 @@ class TradingAgentsGraph:
             # Standard mode without tracing
             final_state = self.graph.invoke(init_agent_state, **args)
 
-        # Store current state for reflection
-        self.curr_state = final_state
-
-        # Log state
-        self._log_state(trade_date, final_state)
-
-        # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+        return final_state
 
     def _log_state(self, trade_date, final_state):
         """Log the final state to a JSON file."""
@@ -7,8 +7,8 @@ import os
 import json
 from typing import Any, Dict, List, Optional, Union, Iterator, AsyncIterator, Sequence
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 from langchain_core.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 from langchain_core.tools import BaseTool
 from langchain_core.utils.function_calling import convert_to_openai_tool
@@ -93,15 +93,8 @@ class ChatDashScope(BaseChatModel):
         
         return dashscope_messages
     
-    def _generate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> ChatResult:
-        """生成聊天回复"""
-        
+    def _build_request_params(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """构造 DashScope 请求参数"""
         # 转换消息格式
         dashscope_messages = self._convert_messages_to_dashscope_format(messages)
         
@@ -121,6 +114,62 @@ class ChatDashScope(BaseChatModel):
         
         # 合并额外参数
         request_params.update(kwargs)
+        return request_params
+    
+    @staticmethod
+    def _extract_usage(response) -> tuple:
+        """从响应中提取(输入token, 输出token)"""
+        input_tokens = 0
+        output_tokens = 0
+        
+        # DashScope API响应中包含usage信息
+        if hasattr(response, 'usage') and response.usage:
+            usage = response.usage
+            # 根据API文档，usage可能包含input_tokens和output_tokens
+            if hasattr(usage, 'input_tokens'):
+                input_tokens = usage.input_tokens
+            if hasattr(usage, 'output_tokens'):
+                output_tokens = usage.output_tokens
+            # 有些情况下可能是total_tokens
+            elif hasattr(usage, 'total_tokens'):
+                # 估算输入和输出token（如果没有分别提供）
+                total_tokens = usage.total_tokens
+                # 简单估算：假设输入占30%，输出占70%
+                input_tokens = int(total_tokens * 0.3)
+                output_tokens = int(total_tokens * 0.7)
+        return input_tokens, output_tokens
+    
+    def _track_token_usage(self, input_tokens: int, output_tokens: int, messages: List[BaseMessage], kwargs: Dict[str, Any]):
+        """记录token使用量"""
+        if input_tokens > 0 or output_tokens > 0:
+            try:
+                # 生成会话ID（如果没有提供）
+                session_id = kwargs.get('session_id', f"dashscope_{hash(str(messages))%10000}")
+                analysis_type = kwargs.get('analysis_type', 'stock_analysis')
+                
+                # 使用TokenTracker记录使用量
+                token_tracker.track_usage(
+                    provider="dashscope",
+                    model_name=self.model,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    session_id=session_id,
+                    analysis_type=analysis_type
+                )
+            except Exception as track_error:
+                # 记录失败不应该影响主要功能
+                logger.info(f"Token tracking failed: {track_error}")
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """生成聊天回复"""
+        
+        request_params = self._build_request_params(messages, stop, kwargs)
         
         try:
             # 调用 DashScope API
@@ -131,45 +180,8 @@ class ChatDashScope(BaseChatModel):
                 output = response.output
                 message_content = output.choices[0].message.content
                 
-                # 提取token使用量信息
-                input_tokens = 0
-                output_tokens = 0
-                
-                # DashScope API响应中包含usage信息
-                if hasattr(response, 'usage') and response.usage:
-                    usage = response.usage
-                    # 根据API文档，usage可能包含input_tokens和output_tokens
-                    if hasattr(usage, 'input_tokens'):
-                        input_tokens = usage.input_tokens
-                    if hasattr(usage, 'output_tokens'):
-                        output_tokens = usage.output_tokens
-                    # 有些情况下可能是total_tokens
-                    elif hasattr(usage, 'total_tokens'):
-                        # 估算输入和输出token（如果没有分别提供）
-                        total_tokens = usage.total_tokens
-                        # 简单估算：假设输入占30%，输出占70%
-                        input_tokens = int(total_tokens * 0.3)
-                        output_tokens = int(total_tokens * 0.7)
-                
                 # 记录token使用量
-                if input_tokens > 0 or output_tokens > 0:
-                    try:
-                        # 生成会话ID（如果没有提供）
-                        session_id = kwargs.get('session_id', f"dashscope_{hash(str(messages))%10000}")
-                        analysis_type = kwargs.get('analysis_type', 'stock_analysis')
-                        
-                        # 使用TokenTracker记录使用量
-                        token_tracker.track_usage(
-                            provider="dashscope",
-                            model_name=self.model,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
-                            session_id=session_id,
-                            analysis_type=analysis_type
-                        )
-                    except Exception as track_error:
-                        # 记录失败不应该影响主要功能
-                        logger.info(f"Token tracking failed: {track_error}")
+                self._track_token_usage(*self._extract_usage(response), messages, kwargs)
                 
                 # 创建 AI 消息
                 ai_message = AIMessage(content=message_content)
@@ -184,6 +196,38 @@ class ChatDashScope(BaseChatModel):
         except Exception as e:
             raise Exception(f"Error calling DashScope API: {str(e)}")
     
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """流式生成聊天回复（增量输出），结束后记录token使用量"""
+        
+        request_params = self._build_request_params(messages, stop, kwargs)
+        request_params.update({"stream": True, "incremental_output": True})
+        
+        try:
+            response = None
+            for response in Generation.call(**request_params):
+                if response.status_code != 200:
+                    raise Exception(f"DashScope API error: {response.code} - {response.message}")
+                
+                delta = response.output.choices[0].message.content if response.output.choices else ""
+                if delta:
+                    chunk = ChatGenerationChunk(message=AIMessageChunk(content=delta))
+                    if run_manager:
+                        run_manager.on_llm_new_token(delta, chunk=chunk)
+                    yield chunk
+            
+            # 流式响应中的usage为累计值，以最后一个响应为准
+            if response is not None:
+                self._track_token_usage(*self._extract_usage(response), messages, kwargs)
+                
+        except Exception as e:
+            raise Exception(f"Error calling DashScope API: {str(e)}")
+    
     async def _agenerate(
         self,
         messages: List[BaseMessage],
@@ -5,11 +5,13 @@
 """
 
 import os
-from typing import Any, Dict, List, Optional, Union, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Union, Sequence
 from langchain_openai import ChatOpenAI
+from langchain_core.outputs import ChatGenerationChunk
 from langchain_core.tools import BaseTool
 from pydantic import Field, SecretStr
 from ..config.config_manager import token_tracker
+from .stream_usage import StreamUsage
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -32,6 +34,8 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         kwargs.setdefault("model", "qwen-turbo")
         kwargs.setdefault("temperature", 0.1)
         kwargs.setdefault("max_tokens", 2000)
+        # 流式输出时在最后一块返回token用量
+        kwargs.setdefault("stream_usage", True)
         
         # 检查 API 密钥
         if not kwargs.get("api_key"):
@@ -57,6 +61,20 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         result = super()._generate(*args, **kwargs)
         
         # 追踪 token 使用量
+        self._track_token_usage(result, kwargs, f"dashscope_openai_{hash(str(args))%10000}")
+        
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        """重写流式生成方法，流结束后追踪 token 使用量"""
+        usage = StreamUsage()
+        yield from usage.collect(super()._stream(messages, stop, run_manager, **kwargs))
+        if usage:
+            self._track_token_usage(usage.as_chat_result(), kwargs,
+                                    f"dashscope_openai_{hash(str(messages))%10000}")
+
+    def _track_token_usage(self, result, kwargs: Dict[str, Any], default_session_id: str):
+        """从生成结果中提取 token 使用信息并记录"""
         try:
             # 从结果中提取 token 使用信息
             if hasattr(result, 'llm_output') and result.llm_output:
@@ -67,7 +85,7 @@ class ChatDashScopeOpenAI(ChatOpenAI):
                 
                 if input_tokens > 0 or output_tokens > 0:
                     # 生成会话ID
-                    session_id = kwargs.get('session_id', f"dashscope_openai_{hash(str(args))%10000}")
+                    session_id = kwargs.get('session_id', default_session_id)
                     analysis_type = kwargs.get('analysis_type', 'stock_analysis')
                     
                     # 使用 TokenTracker 记录使用量
@@ -83,8 +101,6 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         except Exception as track_error:
             # token 追踪失败不应该影响主要功能
             logger.error(f"⚠️ Token 追踪失败: {track_error}")
-        
-        return result
 
 
 # 支持的模型列表
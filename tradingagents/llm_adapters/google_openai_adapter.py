@@ -31,6 +31,8 @@ class ChatGoogleOpenAI(ChatGoogleGenerativeAI):
         # 设置 Google AI 的默认配置
         kwargs.setdefault("temperature", 0.1)
         kwargs.setdefault("max_tokens", 2000)
+        # 不使用流式输出：_generate会根据完整内容调整新闻格式并记录token，流式调用会绕过这些处理
+        kwargs.setdefault("disable_streaming", True)
         
         # 检查 API 密钥
         google_api_key = kwargs.get("google_api_key") or os.getenv("GOOGLE_API_KEY")
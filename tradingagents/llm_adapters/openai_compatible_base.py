@@ -5,12 +5,14 @@ OpenAI兼容适配器基类
 
 import os
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 from langchain_core.messages import BaseMessage
-from langchain_core.outputs import ChatResult
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
 from langchain_openai import ChatOpenAI
 from langchain_core.callbacks import CallbackManagerForLLMRun
 
+from .stream_usage import StreamUsage
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import setup_llm_logging
 
@@ -77,6 +79,8 @@ class OpenAICompatibleBase(ChatOpenAI):
             "model": model,
             "temperature": temperature,
             "max_tokens": max_tokens,
+            # 流式输出时在最后一块返回token用量
+            "stream_usage": True,
             **kwargs
         }
         
@@ -126,6 +130,26 @@ class OpenAICompatibleBase(ChatOpenAI):
                 logger.error(f"⚠️ {self.provider_name} Token追踪失败: {e}", exc_info=True)
         
         return result
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """
+        流式生成聊天响应，结束后记录token使用量
+        """
+        start_time = time.time()
+        usage = StreamUsage()
+        yield from usage.collect(super()._stream(messages, stop, run_manager, **kwargs))
+
+        if TOKEN_TRACKING_ENABLED and usage:
+            try:
+                self._track_token_usage(usage.as_chat_result(), kwargs, start_time)
+            except Exception as e:
+                logger.error(f"⚠️ {self.provider_name} Token追踪失败: {e}", exc_info=True)
     
     def _track_token_usage(self, result: ChatResult, kwargs: Dict, start_time: float):
         """追踪token使用量"""
@@ -0,0 +1,36 @@
+"""
+流式输出的token使用量统计
+流式调用不经过_generate，由适配器的_stream用它累计各输出块携带的usage_metadata，
+流结束后转换为与非流式结果相同的llm_output格式，复用原有的token追踪逻辑
+"""
+
+from typing import Iterable, Iterator
+
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+
+class StreamUsage:
+    """累计一次流式调用的token使用量"""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def collect(self, chunks: Iterable[ChatGenerationChunk]) -> Iterator[ChatGenerationChunk]:
+        """原样转发输出块，同时累计其usage_metadata（各块为增量，最后一块通常携带全部用量）"""
+        for chunk in chunks:
+            usage = getattr(chunk.message, "usage_metadata", None)
+            if usage:
+                self.input_tokens += usage.get("input_tokens", 0) or 0
+                self.output_tokens += usage.get("output_tokens", 0) or 0
+            yield chunk
+
+    def __bool__(self) -> bool:
+        return self.input_tokens > 0 or self.output_tokens > 0
+
+    def as_chat_result(self) -> ChatResult:
+        """转换为只包含token_usage的ChatResult，供_track_token_usage使用"""
+        return ChatResult(generations=[], llm_output={"token_usage": {
+            "prompt_tokens": self.input_tokens,
+            "completion_tokens": self.output_tokens,
+        }})
@@ -0,0 +1,232 @@
+"""
+共享embedding缓存
+按(提供商, 模型, 文本内容哈希)缓存远程嵌入服务返回的向量，所有记忆实例共用：
+内存层为进程内LRU，持久层为本地SQLite（按最近访问时间淘汰），跨进程、跨次分析复用
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tradingagents.config.env_utils import parse_bool_env, parse_int_env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 2000
+DEFAULT_DISK_ENTRIES = 20000
+CACHE_FILE_NAME = "embedding_cache.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (provider, model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_embeddings_access ON embeddings (last_access);
+"""
+
+CacheKey = Tuple[str, str, str]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    两级embedding缓存
+
+    内存层为LRU，持久层按最近访问时间淘汰（条目超过上限时淘汰最旧的10%），两层的向量均以float32存储。
+    db_path为None时只使用内存层
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_memory_entries: Optional[int] = None,
+                 max_disk_entries: Optional[int] = None):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries or parse_int_env(
+            'MEMORY_EMBEDDING_CACHE_SIZE', DEFAULT_MEMORY_ENTRIES)
+        self.max_disk_entries = max_disk_entries or parse_int_env(
+            'MEMORY_EMBEDDING_CACHE_DISK_SIZE', DEFAULT_DISK_ENTRIES)
+        self._memory: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                conn = self._connection()
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[Embedding缓存] 持久层不可用，仅使用内存缓存: {e}")
+                self.db_path = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """每个线程复用一个连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: CacheKey, vector: np.ndarray):
+        vector.flags.writeable = False
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_many(self, provider: str, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """批量读取，未命中的位置为None"""
+        keys = [(provider, model, text_hash(text)) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.setdefault(key[2], []).append(i)
+                else:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = vector.tolist()
+
+        disk_hits = 0
+        if missing and self.db_path:
+            found = self._load(provider, model, list(missing))
+            for digest, vector in found.items():
+                self._remember((provider, model, digest), vector)
+                for i in missing.pop(digest):
+                    results[i] = vector.tolist()
+                    disk_hits += 1
+
+        with self._lock:
+            self.disk_hits += disk_hits
+            self.misses += sum(len(positions) for positions in missing.values())
+        return results
+
+    def get(self, provider: str, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(provider, model, [text])[0]
+
+    def put_many(self, provider: str, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        rows = []
+        now = time.time()
+        for text, vector in zip(texts, vectors):
+            digest = text_hash(text)
+            array = np.array(vector, dtype=np.float32)
+            self._remember((provider, model, digest), array)
+            rows.append((provider, model, digest, array.tobytes(), now))
+
+        if rows and self.db_path:
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+                    self._evict(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"[Embedding缓存] 写入持久层失败: {e}")
+
+    def put(self, provider: str, model: str, text: str, vector: Sequence[float]):
+        self.put_many(provider, model, [text], [vector])
+
+    def _load(self, provider: str, model: str, digests: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        try:
+            conn = self._connection()
+            with conn:
+                # SQLite单条语句的参数个数有限，分块查询
+                for start in range(0, len(digests), 500):
+                    chunk = digests[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    params = [provider, model, *chunk]
+                    rows = conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE provider = ? AND model = ? "
+                        f"AND text_hash IN ({placeholders})", params
+                    ).fetchall()
+                    for digest, blob in rows:
+                        found[digest] = np.frombuffer(blob, dtype=np.float32)
+                    if rows:
+                        conn.execute(
+                            f"UPDATE embeddings SET last_access = ? WHERE provider = ? AND model = ? "
+                            f"AND text_hash IN ({placeholders})", [time.time(), *params]
+                        )
+        except sqlite3.Error as e:
+            logger.warning(f"[Embedding缓存] 读取持久层失败: {e}")
+        return found
+
+    def _evict(self, conn: sqlite3.Connection):
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count <= self.max_disk_entries:
+            return
+        # 一次多淘汰一部分，避免每次写入都触发淘汰
+        excess = count - int(self.max_disk_entries * 0.9)
+        conn.execute(
+            "DELETE FROM embeddings WHERE (provider, model, text_hash) IN "
+            "(SELECT provider, model, text_hash FROM embeddings ORDER BY last_access LIMIT ?)",
+            (excess,)
+        )
+        logger.debug(f"[Embedding缓存] 淘汰 {excess} 条最久未使用的向量")
+
+    def clear(self):
+        if self.db_path:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM embeddings")
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        disk_entries = 0
+        if self.db_path:
+            disk_entries = self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+            }
+
+
+# 全局缓存实例
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    获取全局embedding缓存（MEMORY_EMBEDDING_CACHE_ENABLED=false时返回None）
+
+    持久层路径由MEMORY_EMBEDDING_CACHE_PATH指定，默认在数据缓存目录下
+    """
+    global _embedding_cache
+    if not parse_bool_env('MEMORY_EMBEDDING_CACHE_ENABLED', True):
+        return None
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                from tradingagents.default_config import DEFAULT_CONFIG
+                db_path = os.getenv('MEMORY_EMBEDDING_CACHE_PATH') or os.path.join(
+                    DEFAULT_CONFIG['data_cache_dir'], CACHE_FILE_NAME)
+                _embedding_cache = EmbeddingCache(db_path)
+    return _embedding_cache
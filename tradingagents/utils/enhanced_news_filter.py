@@ -6,12 +6,19 @@
 import pandas as pd
 import re
 import logging
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence
 from datetime import datetime
 import numpy as np
 
 # 导入基础过滤器
-from .news_filter import NewsRelevanceFilter, create_news_filter, get_company_name
+from .news_filter import (
+    CONTENT_COLUMNS,
+    TITLE_COLUMNS,
+    NewsRelevanceFilter,
+    create_news_filter,
+    get_company_name,
+)
+from .text_models import DEFAULT_CLASSIFICATION_MODEL, DEFAULT_SENTENCE_MODEL, get_text_model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +40,12 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         self.use_local_model = use_local_model
         
         # 语义模型相关
+        self.semantic_model_name = DEFAULT_SENTENCE_MODEL
         self.sentence_model = None
         self.company_embedding = None
         
         # 本地分类模型相关
+        self.classification_model_name = DEFAULT_CLASSIFICATION_MODEL
         self.classification_model = None
         self.tokenizer = None
         
@@ -47,160 +56,161 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             self._init_classification_model()
     
     def _init_semantic_model(self):
-        """初始化语义相似度模型"""
+        """初始化语义相似度模型（从进程内共享注册表获取，同一模型只加载一次）"""
         try:
-            logger.info("[增强过滤器] 正在加载语义相似度模型...")
-            
-            # 尝试使用sentence-transformers
-            try:
-                from sentence_transformers import SentenceTransformer
-                
-                # 使用轻量级中文模型
-                model_name = "paraphrase-multilingual-MiniLM-L12-v2"  # 支持中文的轻量级模型
-                self.sentence_model = SentenceTransformer(model_name)
-                
-                # 预计算公司相关的embedding
-                company_texts = [
-                    self.company_name,
-                    f"{self.company_name}股票",
-                    f"{self.company_name}公司",
-                    f"{self.stock_code}",
-                    f"{self.company_name}业绩",
-                    f"{self.company_name}财报"
-                ]
-                
-                self.company_embedding = self.sentence_model.encode(company_texts)
-                logger.info(f"[增强过滤器] ✅ 语义模型加载成功: {model_name}")
-                
-            except ImportError:
-                logger.warning("[增强过滤器] sentence-transformers未安装，跳过语义过滤")
+            registry = get_text_model_registry()
+            self.sentence_model = registry.get_sentence_model(self.semantic_model_name)
+            if self.sentence_model is None:
+                logger.warning("[增强过滤器] 语义模型不可用，跳过语义过滤")
                 self.use_semantic = False
+                return
+            
+            # 预计算公司相关的embedding
+            company_texts = [
+                self.company_name,
+                f"{self.company_name}股票",
+                f"{self.company_name}公司",
+                f"{self.stock_code}",
+                f"{self.company_name}业绩",
+                f"{self.company_name}财报"
+            ]
+            
+            self.company_embedding = registry.encode(company_texts, self.semantic_model_name)
+            logger.info(f"[增强过滤器] ✅ 语义模型就绪: {self.semantic_model_name}")
                 
         except Exception as e:
             logger.error(f"[增强过滤器] 语义模型初始化失败: {e}")
             self.use_semantic = False
     
     def _init_classification_model(self):
-        """初始化本地分类模型"""
+        """初始化本地分类模型（从进程内共享注册表获取）"""
         try:
-            logger.info("[增强过滤器] 正在加载本地分类模型...")
-            
-            # 尝试使用transformers库的中文分类模型
-            try:
-                from transformers import AutoTokenizer, AutoModelForSequenceClassification
-                import torch
-                
-                # 使用轻量级中文文本分类模型
-                model_name = "uer/roberta-base-finetuned-chinanews-chinese"
-                
-                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                self.classification_model = AutoModelForSequenceClassification.from_pretrained(model_name)
-                
-                logger.info(f"[增强过滤器] ✅ 分类模型加载成功: {model_name}")
-                
-            except ImportError:
-                logger.warning("[增强过滤器] transformers未安装，跳过本地模型分类")
+            loaded = get_text_model_registry().get_classification_model(self.classification_model_name)
+            if loaded is None:
+                logger.warning("[增强过滤器] 本地分类模型不可用，跳过本地模型分类")
                 self.use_local_model = False
+                return
+            
+            self.tokenizer, self.classification_model = loaded
+            logger.info(f"[增强过滤器] ✅ 分类模型就绪: {self.classification_model_name}")
                 
         except Exception as e:
             logger.error(f"[增强过滤器] 本地分类模型初始化失败: {e}")
             self.use_local_model = False
     
-    def calculate_semantic_similarity(self, title: str, content: str) -> float:
+    def calculate_semantic_similarities(self, titles: Sequence[str], contents: Sequence[str]) -> List[float]:
         """
-        计算语义相似度评分
+        批量计算语义相似度评分
         
         Args:
-            title: 新闻标题
-            content: 新闻内容
+            titles: 新闻标题列表
+            contents: 新闻内容列表
             
         Returns:
-            float: 语义相似度评分 (0-100)
+            List[float]: 语义相似度评分 (0-100)
         """
         if not self.use_semantic or self.sentence_model is None:
-            return 0
+            return [0] * len(titles)
         
         try:
             # 组合标题和内容的前200字符
-            text = f"{title} {content[:200]}"
+            texts = [f"{title} {content[:200]}" for title, content in zip(titles, contents)]
+            if not texts:
+                return []
             
-            # 计算文本embedding
-            text_embedding = self.sentence_model.encode([text])
+            # 批量计算文本embedding（命中缓存的文本不重复编码）
+            text_embeddings = get_text_model_registry().encode(texts, self.semantic_model_name).astype(np.float64)
             
-            # 计算与公司相关文本的相似度
-            similarities = []
-            for company_emb in self.company_embedding:
-                similarity = np.dot(text_embedding[0], company_emb) / (
-                    np.linalg.norm(text_embedding[0]) * np.linalg.norm(company_emb)
-                )
-                similarities.append(similarity)
-            
-            # 取最高相似度
-            max_similarity = max(similarities)
+            # 计算与公司相关文本的余弦相似度，取最高相似度
+            text_norm = text_embeddings / np.linalg.norm(text_embeddings, axis=1, keepdims=True)
+            company_embedding = np.asarray(self.company_embedding, dtype=np.float64)
+            company_norm = company_embedding / np.linalg.norm(company_embedding, axis=1, keepdims=True)
+            max_similarity = (text_norm @ company_norm.T).max(axis=1)
             
             # 转换为0-100评分
-            semantic_score = max(0, min(100, max_similarity * 100))
+            semantic_scores = [float(max(0, min(100, similarity * 100))) for similarity in max_similarity]
             
-            logger.debug(f"[增强过滤器] 语义相似度评分: {semantic_score:.1f}")
-            return semantic_score
+            logger.debug(f"[增强过滤器] 语义相似度批量评分完成: {len(semantic_scores)}条")
+            return semantic_scores
             
         except Exception as e:
             logger.error(f"[增强过滤器] 语义相似度计算失败: {e}")
-            return 0
+            return [0] * len(titles)
     
-    def classify_news_relevance(self, title: str, content: str) -> float:
+    def calculate_semantic_similarity(self, title: str, content: str) -> float:
         """
-        使用本地模型分类新闻相关性
+        计算语义相似度评分
         
         Args:
             title: 新闻标题
             content: 新闻内容
             
         Returns:
-            float: 分类相关性评分 (0-100)
+            float: 语义相似度评分 (0-100)
+        """
+        return self.calculate_semantic_similarities([title], [content])[0]
+    
+    def classify_news_relevance_batch(self, titles: Sequence[str], contents: Sequence[str]) -> List[float]:
+        """
+        使用本地模型批量分类新闻相关性
+        
+        Args:
+            titles: 新闻标题列表
+            contents: 新闻内容列表
+            
+        Returns:
+            List[float]: 分类相关性评分 (0-100)
         """
         if not self.use_local_model or self.classification_model is None:
-            return 0
+            return [0] * len(titles)
         
         try:
-            import torch
+            # 构建分类文本，添加公司信息作为上下文
+            context_texts = [
+                f"关于{self.company_name}({self.stock_code})的新闻: {title} {content[:300]}"
+                for title, content in zip(titles, contents)
+            ]
             
-            # 构建分类文本
-            text = f"{title} {content[:300]}"
+            probabilities = get_text_model_registry().classify(context_texts, self.classification_model_name)
             
-            # 添加公司信息作为上下文
-            context_text = f"关于{self.company_name}({self.stock_code})的新闻: {text}"
+            # 假设第一个类别是"相关"，第二个是"不相关"
+            # 这里需要根据具体模型调整
+            classification_scores = [float(p[0] * 100) for p in probabilities]
             
-            # 分词和编码
-            inputs = self.tokenizer(
-                context_text,
-                return_tensors="pt",
-                truncation=True,
-                padding=True,
-                max_length=512
-            )
+            logger.debug(f"[增强过滤器] 分类模型批量评分完成: {len(classification_scores)}条")
+            return classification_scores
             
-            # 模型推理
-            with torch.no_grad():
-                outputs = self.classification_model(**inputs)
-                logits = outputs.logits
-                
-                # 使用softmax获取概率分布
-                probabilities = torch.softmax(logits, dim=-1)
-                
-                # 假设第一个类别是"相关"，第二个是"不相关"
-                # 这里需要根据具体模型调整
-                relevance_prob = probabilities[0][0].item()  # 相关性概率
-                
-                # 转换为0-100评分
-                classification_score = relevance_prob * 100
-                
-                logger.debug(f"[增强过滤器] 分类模型评分: {classification_score:.1f}")
-                return classification_score
-                
         except Exception as e:
             logger.error(f"[增强过滤器] 本地模型分类失败: {e}")
-            return 0
+            return [0] * len(titles)
+    
+    def classify_news_relevance(self, title: str, content: str) -> float:
+        """
+        使用本地模型分类新闻相关性
+        
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+            
+        Returns:
+            float: 分类相关性评分 (0-100)
+        """
+        return self.classify_news_relevance_batch([title], [content])[0]
+    
+    @staticmethod
+    def _combine_scores(rule_score: float, semantic_score: float, classification_score: float) -> float:
+        """综合评分（加权平均）"""
+        weights = {
+            'rule': 0.4,      # 规则过滤权重40%
+            'semantic': 0.35,  # 语义相似度权重35%
+            'classification': 0.25  # 分类模型权重25%
+        }
+        
+        return (
+            weights['rule'] * rule_score +
+            weights['semantic'] * semantic_score +
+            weights['classification'] * classification_score
+        )
     
     def calculate_enhanced_relevance_score(self, title: str, content: str) -> Dict[str, float]:
         """
@@ -234,17 +244,7 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             scores['classification_score'] = 0
         
         # 4. 综合评分（加权平均）
-        weights = {
-            'rule': 0.4,      # 规则过滤权重40%
-            'semantic': 0.35,  # 语义相似度权重35%
-            'classification': 0.25  # 分类模型权重25%
-        }
-        
-        final_score = (
-            weights['rule'] * rule_score +
-            weights['semantic'] * scores['semantic_score'] +
-            weights['classification'] * scores['classification_score']
-        )
+        final_score = self._combine_scores(rule_score, scores['semantic_score'], scores['classification_score'])
         
         scores['final_score'] = final_score
         
@@ -270,27 +270,32 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         
         logger.info(f"[增强过滤器] 开始增强过滤，原始数量: {len(news_df)}条，最低评分阈值: {min_score}")
         
-        filtered_news = []
+        titles = self._text_column(news_df, TITLE_COLUMNS)
+        contents = self._text_column(news_df, CONTENT_COLUMNS)
         
-        for idx, row in news_df.iterrows():
-            title = row.get('新闻标题', row.get('标题', ''))
-            content = row.get('新闻内容', row.get('内容', ''))
-            
-            # 计算增强评分
-            scores = self.calculate_enhanced_relevance_score(title, content)
-            
-            if scores['final_score'] >= min_score:
-                row_dict = row.to_dict()
-                row_dict.update(scores)  # 添加所有评分信息
-                filtered_news.append(row_dict)
-                
-                logger.debug(f"[增强过滤器] 保留新闻 (综合评分: {scores['final_score']:.1f}): {title[:50]}...")
-            else:
-                logger.debug(f"[增强过滤器] 过滤新闻 (综合评分: {scores['final_score']:.1f}): {title[:50]}...")
+        # 1. 规则评分：关键词自动机一次性批量计算
+        rule_scores = self.score_texts(titles, contents)
+        
+        # 2. 语义/分类评分：所有候选新闻分批送入模型
+        semantic_scores = self.calculate_semantic_similarities(titles, contents)
+        classification_scores = self.classify_news_relevance_batch(titles, contents)
+        
+        final_scores = [
+            self._combine_scores(int(rule), semantic, classification)
+            for rule, semantic, classification in zip(rule_scores, semantic_scores, classification_scores)
+        ]
+        keep = np.array(final_scores, dtype=float) >= min_score
+        logger.debug(f"[增强过滤器] 评分完成，保留 {int(keep.sum())}条，过滤 {int((~keep).sum())}条")
         
         # 创建过滤后的DataFrame
-        if filtered_news:
-            filtered_df = pd.DataFrame(filtered_news)
+        if keep.any():
+            filtered_df = news_df.loc[keep].reset_index(drop=True).infer_objects()
+            kept = np.flatnonzero(keep)
+            # 添加所有评分信息
+            filtered_df['rule_score'] = [int(rule_scores[i]) for i in kept]
+            filtered_df['semantic_score'] = [semantic_scores[i] for i in kept]
+            filtered_df['classification_score'] = [classification_scores[i] for i in kept]
+            filtered_df['final_score'] = [final_scores[i] for i in kept]
             # 按综合评分排序
             filtered_df = filtered_df.sort_values('final_score', ascending=False)
             logger.info(f"[增强过滤器] 增强过滤完成，保留 {len(filtered_df)}条 新闻")
@@ -0,0 +1,96 @@
+"""
+多关键词匹配工具
+将一组关键词编译为Aho-Corasick自动机，一次扫描文本即可找出出现过的全部关键词
+（包括相互重叠、互为前缀的关键词），替代逐个关键词的子串查找
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Sequence
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 可选的C实现（pyahocorasick，pip install -e .[speedups]），未安装时使用纯Python自动机（默认）
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordAutomaton:
+    """Aho-Corasick关键词自动机（区分大小写，调用方自行决定是否先转小写）"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build()
+
+    def _build(self):
+        """构建完整转移表的DFA：每个状态对字母表内字符都有确定的转移"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[FrozenSet[str]] = [frozenset()]
+
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(frozenset())
+                state = nxt
+            outputs[state] = outputs[state] | {keyword}
+
+        # 广度优先计算失败指针，并把失败状态的转移和输出合并进来
+        fail = [0] * len(goto)
+        transitions: List[Dict[str, int]] = [dict(goto[0])]
+        transitions.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] | outputs[fail[state]]
+            merged = dict(transitions[fail[state]])
+            merged.update(goto[state])
+            transitions[state] = merged
+            for ch, nxt in goto[state].items():
+                fail[nxt] = transitions[fail[state]].get(ch, 0) if state else 0
+                queue.append(nxt)
+
+        self._transitions = transitions
+        self._outputs = outputs
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """返回text中出现过的关键词集合"""
+        if not text or not self.keywords:
+            return frozenset()
+
+        if self._automaton is not None:
+            return frozenset(keyword for _, keyword in self._automaton.iter(text))
+
+        found = set()
+        transitions = self._transitions
+        outputs = self._outputs
+        root = transitions[0]
+        state = 0
+        for ch in text:
+            state = transitions[state].get(ch)
+            if state is None:
+                state = root.get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return frozenset(found)
+
+    def find_all(self, texts: Sequence[str]) -> List[FrozenSet[str]]:
+        """批量查找，返回与texts一一对应的关键词集合"""
+        return [self.find(text) for text in texts]
@@ -0,0 +1,162 @@
+"""
+记忆集合压缩
+把情况embedding近似重复（余弦相似度不低于阈值）的记忆聚为一条，合并其建议；
+再按"时间衰减 x 合并条数"的保留分数执行每个集合的条数上限
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tradingagents.config.env_utils import parse_float_env, parse_int_env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.97
+# 默认不限制条数：自动压缩会合并和淘汰已存储的记忆，需通过MEMORY_MAX_SIZE显式启用
+DEFAULT_MAX_SIZE = 0
+DEFAULT_HALF_LIFE_DAYS = 365.0
+# 合并后的建议最多保留最近的几条不同建议
+DEFAULT_MAX_MERGED_RECOMMENDATIONS = 3
+RECOMMENDATION_SEPARATOR = "\n\n"
+
+
+def get_compaction_settings() -> Dict[str, float]:
+    """读取压缩参数（MEMORY_DEDUP_THRESHOLD / MEMORY_MAX_SIZE / MEMORY_HALF_LIFE_DAYS）"""
+    return {
+        'similarity_threshold': parse_float_env('MEMORY_DEDUP_THRESHOLD', DEFAULT_SIMILARITY_THRESHOLD),
+        'max_size': parse_int_env('MEMORY_MAX_SIZE', DEFAULT_MAX_SIZE),
+        'half_life_days': parse_float_env('MEMORY_HALF_LIFE_DAYS', DEFAULT_HALF_LIFE_DAYS),
+    }
+
+
+def cluster_near_duplicates(embeddings: np.ndarray, threshold: float, chunk_size: int = 256) -> np.ndarray:
+    """
+    贪心领袖聚类：按行顺序处理，与已有代表的最大余弦相似度不低于阈值时并入该簇，否则成为新代表
+
+    每块行与全部代表只做一次矩阵乘法；块内新产生的代表通过块内相似度矩阵比较
+
+    Returns:
+        np.ndarray: 每行所属簇的代表行号
+    """
+    n = len(embeddings)
+    labels = np.empty(n, dtype=np.int64)
+    if n == 0:
+        return labels
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normed = np.divide(embeddings, norms, out=np.zeros_like(embeddings, dtype=np.float32), where=norms > 0)
+    rep_rows: List[int] = []
+    rep_matrix = np.empty((0, normed.shape[1]), dtype=np.float32)
+
+    for start in range(0, n, chunk_size):
+        chunk = normed[start:start + chunk_size]
+        if len(rep_rows):
+            sims = chunk @ rep_matrix.T
+            best = sims.argmax(axis=1)
+            best_sims = sims[np.arange(len(chunk)), best]
+        within = chunk @ chunk.T
+        new_reps: List[int] = []  # 块内新代表的块内下标
+
+        for j in range(len(chunk)):
+            label, label_sim = -1, threshold
+            if len(rep_rows) and best_sims[j] >= label_sim:
+                label, label_sim = rep_rows[best[j]], best_sims[j]
+            if new_reps:
+                candidates = within[j, new_reps]
+                k = int(candidates.argmax())
+                if candidates[k] >= label_sim:
+                    label = start + new_reps[k]
+            if label < 0:
+                label = start + j
+                new_reps.append(j)
+            labels[start + j] = label
+
+        if new_reps:
+            rep_rows.extend(start + j for j in new_reps)
+            rep_matrix = np.vstack([rep_matrix, chunk[new_reps]])
+    return labels
+
+
+def _merge_recommendations(recommendations: Sequence[str], limit: int) -> str:
+    merged: List[str] = []
+    for recommendation in recommendations:
+        if recommendation and recommendation not in merged:
+            merged.append(recommendation)
+        if len(merged) >= limit:
+            break
+    return RECOMMENDATION_SEPARATOR.join(merged)
+
+
+def compact_entries(ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict[str, Any]],
+                    embeddings: Any, similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                    max_size: int = DEFAULT_MAX_SIZE, half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+                    now: Optional[float] = None,
+                    max_merged_recommendations: int = DEFAULT_MAX_MERGED_RECOMMENDATIONS
+                    ) -> Tuple[List[str], List[Dict[str, Any]], np.ndarray, Dict[str, int]]:
+    """
+    压缩一个记忆集合
+
+    每个簇保留最新一条的情况描述和embedding，建议按从新到旧合并；
+    embedding为零向量的条目（嵌入失败时写入）无法被检索，直接丢弃。
+    没有created_at的旧条目视为最早写入，按ID数字顺序区分先后
+
+    Returns:
+        (documents, metadatas, embeddings, stats)：按从旧到新排列的压缩结果和统计信息
+    """
+    now = now or time.time()
+    matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+    metadatas = [metadata or {} for metadata in metadatas]
+
+    def sort_key(i):
+        id_ = ids[i]
+        return (float(metadatas[i].get('created_at', 0.0)), int(id_) if str(id_).isdigit() else -1)
+
+    valid = [i for i in range(len(ids)) if np.any(matrix[i])]
+    # 从新到旧处理，簇代表即为簇内最新的条目
+    order = sorted(valid, key=sort_key, reverse=True)
+    labels = cluster_near_duplicates(matrix[order], similarity_threshold)
+
+    clusters: Dict[int, List[int]] = {}
+    for position, label in enumerate(labels):
+        clusters.setdefault(int(label), []).append(order[position])
+
+    entries = []
+    for label, members in clusters.items():
+        newest = members[0]
+        merged_count = sum(int(metadatas[i].get('merged_count', 1)) for i in members)
+        created_at = float(metadatas[newest].get('created_at', 0.0))
+        first_seen = min(float(metadatas[i].get('first_seen', metadatas[i].get('created_at', 0.0))) for i in members)
+        metadata = dict(metadatas[newest])
+        metadata.update({
+            'recommendation': _merge_recommendations(
+                [metadatas[i].get('recommendation', '') for i in members], max_merged_recommendations),
+            'created_at': created_at,
+            'first_seen': first_seen,
+            'merged_count': merged_count,
+        })
+        age_days = max(0.0, (now - created_at) / 86400) if created_at else float('inf')
+        recency = 0.5 ** (age_days / half_life_days) if half_life_days > 0 and age_days != float('inf') else 0.0
+        score = recency * (1 + math.log(merged_count))
+        entries.append((score, sort_key(newest), newest, metadata))
+
+    kept = entries
+    if max_size and len(entries) > max_size:
+        # 分数相同时保留较新的条目
+        kept = sorted(entries, key=lambda e: (e[0], e[1]), reverse=True)[:max_size]
+    kept.sort(key=lambda e: e[1])
+
+    stats = {
+        'before': len(ids),
+        'dropped_empty': len(ids) - len(valid),
+        'clusters': len(entries),
+        'after': len(kept),
+    }
+    stats['merged'] = len(valid) - len(entries)
+    stats['evicted'] = len(entries) - len(kept)
+    rows = [e[2] for e in kept]
+    return ([documents[i] for i in rows], [e[3] for e in kept],
+            matrix[rows] if rows else np.empty((0, matrix.shape[1]), dtype=np.float32), stats)
@@ -4,13 +4,20 @@
 """
 
 import pandas as pd
+import numpy as np
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, FrozenSet, Sequence, Tuple
 from datetime import datetime
 import logging
 
+from .keyword_matcher import KeywordAutomaton
+
 logger = logging.getLogger(__name__)
 
+# 新闻标题/内容可能使用的列名（按优先级）
+TITLE_COLUMNS = ('新闻标题', '标题')
+CONTENT_COLUMNS = ('新闻内容', '内容')
+
 class NewsRelevanceFilter:
     """基于规则的新闻相关性过滤器"""
     
@@ -48,89 +55,120 @@ class NewsRelevanceFilter:
             '资产重组', '借壳上市', '退市', '摘帽', 'ST'
         ]
     
-    def calculate_relevance_score(self, title: str, content: str) -> float:
+    def _get_automaton(self) -> KeywordAutomaton:
+        """关键词自动机（每个过滤器编译一次，关键词列表被修改时重新编译）"""
+        signature = (tuple(self.strong_keywords), tuple(self.include_keywords), tuple(self.exclude_keywords))
+        if getattr(self, '_automaton_signature', None) != signature:
+            self._automaton = KeywordAutomaton(
+                self.strong_keywords + self.include_keywords + self.exclude_keywords
+            )
+            self._automaton_signature = signature
+        return self._automaton
+    
+    def _score_from_matches(self, title: str, content: str,
+                            title_matches: FrozenSet[str], content_matches: FrozenSet[str]) -> int:
         """
-        计算新闻相关性评分
+        根据自动机的匹配结果计算评分
         
-        Args:
-            title: 新闻标题
-            content: 新闻内容
-            
-        Returns:
-            float: 相关性评分 (0-100)
+        关键词按小写文本匹配，公司名称和股票代码按原文匹配
         """
         score = 0
-        title_lower = title.lower()
-        content_lower = content.lower()
         
         # 1. 直接提及公司名称
         if self.company_name in title:
             score += 50  # 标题中出现公司名称，高分
-            logger.debug(f"[过滤器] 标题包含公司名称 '{self.company_name}': +50分")
         elif self.company_name in content:
             score += 25  # 内容中出现公司名称，中等分
-            logger.debug(f"[过滤器] 内容包含公司名称 '{self.company_name}': +25分")
             
         # 2. 直接提及股票代码
         if self.stock_code in title:
             score += 40  # 标题中出现股票代码，高分
-            logger.debug(f"[过滤器] 标题包含股票代码 '{self.stock_code}': +40分")
         elif self.stock_code in content:
             score += 20  # 内容中出现股票代码，中等分
-            logger.debug(f"[过滤器] 内容包含股票代码 '{self.stock_code}': +20分")
             
         # 3. 强相关关键词检查
-        strong_matches = []
         for keyword in self.strong_keywords:
-            if keyword in title_lower:
+            if keyword in title_matches:
                 score += 30
-                strong_matches.append(keyword)
-            elif keyword in content_lower:
+            elif keyword in content_matches:
                 score += 15
-                strong_matches.append(keyword)
-        
-        if strong_matches:
-            logger.debug(f"[过滤器] 强相关关键词匹配: {strong_matches}")
             
         # 4. 包含关键词检查
-        include_matches = []
         for keyword in self.include_keywords:
-            if keyword in title_lower:
+            if keyword in title_matches:
                 score += 15
-                include_matches.append(keyword)
-            elif keyword in content_lower:
+            elif keyword in content_matches:
                 score += 8
-                include_matches.append(keyword)
-        
-        if include_matches:
-            logger.debug(f"[过滤器] 相关关键词匹配: {include_matches[:3]}...")  # 只显示前3个
             
         # 5. 排除关键词检查（减分）
-        exclude_matches = []
+        title_has_exclude = False
         for keyword in self.exclude_keywords:
-            if keyword in title_lower:
+            if keyword in title_matches:
                 score -= 40  # 标题中出现排除词，大幅减分
-                exclude_matches.append(keyword)
-            elif keyword in content_lower:
+                title_has_exclude = True
+            elif keyword in content_matches:
                 score -= 20  # 内容中出现排除词，中等减分
-                exclude_matches.append(keyword)
-        
-        if exclude_matches:
-            logger.debug(f"[过滤器] 排除关键词匹配: {exclude_matches[:3]}...")
             
         # 6. 特殊规则：如果标题完全不包含公司信息但包含排除词，严重减分
-        if (self.company_name not in title and self.stock_code not in title and 
-            any(keyword in title_lower for keyword in self.exclude_keywords)):
+        if self.company_name not in title and self.stock_code not in title and title_has_exclude:
             score -= 30
-            logger.debug(f"[过滤器] 标题无公司信息但含排除词: -30分")
         
         # 确保评分在0-100范围内
-        final_score = max(0, min(100, score))
+        return max(0, min(100, score))
+    
+    def calculate_relevance_score(self, title: str, content: str) -> float:
+        """
+        计算新闻相关性评分
         
-        logger.debug(f"[过滤器] 最终评分: {final_score}分 - 标题: {title[:30]}...")
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+            
+        Returns:
+            float: 相关性评分 (0-100)
+        """
+        automaton = self._get_automaton()
+        title_matches = automaton.find(title.lower())
+        content_matches = automaton.find(content.lower())
+        final_score = self._score_from_matches(title, content, title_matches, content_matches)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[过滤器] 标题关键词: {sorted(title_matches)}，内容关键词: {sorted(content_matches)}")
+            logger.debug(f"[过滤器] 最终评分: {final_score}分 - 标题: {title[:30]}...")
         
         return final_score
     
+    def score_texts(self, titles: Sequence[str], contents: Sequence[str]) -> np.ndarray:
+        """
+        批量计算相关性评分（自动机只编译一次，每条文本只扫描一遍）
+        
+        Args:
+            titles: 标题列表
+            contents: 内容列表（与titles等长）
+            
+        Returns:
+            np.ndarray: 相关性评分数组
+        """
+        automaton = self._get_automaton()
+        scores = np.empty(len(titles), dtype=np.int64)
+        for i, (title, content) in enumerate(zip(titles, contents)):
+            title = title if isinstance(title, str) else ''
+            content = content if isinstance(content, str) else ''
+            scores[i] = self._score_from_matches(
+                title, content,
+                automaton.find(title.lower()),
+                automaton.find(content.lower()),
+            )
+        return scores
+    
+    @staticmethod
+    def _text_column(news_df: pd.DataFrame, columns: Tuple[str, ...]) -> List[str]:
+        """取第一个存在的文本列，都不存在时返回空字符串"""
+        for column in columns:
+            if column in news_df.columns:
+                return news_df[column].tolist()
+        return [''] * len(news_df)
+    
     def filter_news(self, news_df: pd.DataFrame, min_score: float = 30) -> pd.DataFrame:
         """
         过滤新闻DataFrame
@@ -148,27 +186,15 @@ class NewsRelevanceFilter:
         
         logger.info(f"[过滤器] 开始过滤新闻，原始数量: {len(news_df)}条，最低评分阈值: {min_score}")
         
-        filtered_news = []
-        
-        for idx, row in news_df.iterrows():
-            title = row.get('新闻标题', row.get('标题', ''))
-            content = row.get('新闻内容', row.get('内容', ''))
-            
-            # 计算相关性评分
-            score = self.calculate_relevance_score(title, content)
-            
-            if score >= min_score:
-                row_dict = row.to_dict()
-                row_dict['relevance_score'] = score
-                filtered_news.append(row_dict)
-                
-                logger.debug(f"[过滤器] 保留新闻 (评分: {score:.1f}): {title[:50]}...")
-            else:
-                logger.debug(f"[过滤器] 过滤新闻 (评分: {score:.1f}): {title[:50]}...")
+        scores = self.score_texts(self._text_column(news_df, TITLE_COLUMNS),
+                                  self._text_column(news_df, CONTENT_COLUMNS))
+        keep = scores >= min_score
+        logger.debug(f"[过滤器] 评分完成，保留 {int(keep.sum())}条，过滤 {int((~keep).sum())}条")
         
         # 创建过滤后的DataFrame
-        if filtered_news:
-            filtered_df = pd.DataFrame(filtered_news)
+        if keep.any():
+            filtered_df = news_df.loc[keep].reset_index(drop=True).infer_objects()
+            filtered_df['relevance_score'] = scores[keep]
             # 按相关性评分排序
             filtered_df = filtered_df.sort_values('relevance_score', ascending=False)
             logger.info(f"[过滤器] 过滤完成，保留 {len(filtered_df)}条 新闻")
@@ -308,18 +308,12 @@ class StockDataPreparer:
         try:
             # 1. 获取基本信息
             logger.debug(f"📊 [A股数据] 获取{stock_code}基本信息...")
-            from tradingagents.dataflows.interface import get_china_stock_info_unified
-
-            stock_info = get_china_stock_info_unified(stock_code)
-
-            if stock_info and "❌" not in stock_info and "未能获取" not in stock_info:
-                # 解析股票名称
-                if "股票名称:" in stock_info:
-                    lines = stock_info.split('\n')
-                    for line in lines:
-                        if "股票名称:" in line:
-                            stock_name = line.split(':')[1].strip()
-                            break
+            from tradingagents.dataflows.data_source_manager import get_data_source_manager
+
+            profile = get_data_source_manager().get_company_profile(stock_code)
+
+            if profile.name:
+                stock_name = profile.name
 
                 # 检查是否为有效的股票名称
                 if stock_name != "未知" and not stock_name.startswith(f"股票{stock_code}"):
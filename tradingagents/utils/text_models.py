@@ -0,0 +1,191 @@
+"""
+本地文本模型注册表
+进程内共享的SentenceTransformer/分类模型（按模型名懒加载，只加载一次），
+批量编码文本并按内容哈希缓存embedding
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tradingagents.config.env_utils import parse_int_env
+
+logger = logging.getLogger(__name__)
+
+# 默认模型
+DEFAULT_SENTENCE_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"  # 支持中文的轻量级模型
+DEFAULT_CLASSIFICATION_MODEL = "uer/roberta-base-finetuned-chinanews-chinese"
+
+
+def _load_sentence_model(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def _load_classification_model(model_name: str):
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    return tokenizer, model
+
+
+class SentenceEmbeddingLRU:
+    """按(模型名, 文本内容哈希)缓存embedding的LRU缓存"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or parse_int_env("TEXT_EMBEDDING_CACHE_SIZE", 20000)
+        self._cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_key(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """批量读取，未命中的位置为None"""
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                key = (model_name, self.content_key(text))
+                vector = self._cache.get(key)
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, model_name: str, texts: Sequence[str], vectors: Sequence[np.ndarray]):
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = (model_name, self.content_key(text))
+                self._cache[key] = vector
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._cache), 'hits': self.hits, 'misses': self.misses}
+
+
+class TextModelRegistry:
+    """
+    进程内共享的本地文本模型
+
+    同一模型名只加载一次，所有过滤器实例共用；加载失败（如依赖未安装）也会被记住，避免反复尝试
+    """
+
+    def __init__(self, embedding_cache: Optional[SentenceEmbeddingLRU] = None,
+                 batch_size: Optional[int] = None):
+        self.embedding_cache = embedding_cache or SentenceEmbeddingLRU()
+        self.batch_size = batch_size or parse_int_env("TEXT_MODEL_BATCH_SIZE", 32)
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, model_name: str, loader: Callable[[str], Any]) -> Any:
+        key = (kind, model_name)
+        if key in self._models:
+            return self._models[key]
+        with self._lock:
+            if key not in self._models:
+                try:
+                    logger.info(f"[模型注册表] 正在加载{kind}模型: {model_name}")
+                    self._models[key] = loader(model_name)
+                    logger.info(f"[模型注册表] ✅ 模型加载成功: {model_name}")
+                except ImportError as e:
+                    logger.warning(f"[模型注册表] 依赖未安装，无法加载模型 {model_name}: {e}")
+                    self._models[key] = None
+                except Exception as e:
+                    logger.error(f"[模型注册表] 模型加载失败 {model_name}: {e}")
+                    self._models[key] = None
+        return self._models[key]
+
+    def register(self, kind: str, model_name: str, model: Any):
+        """注册已加载的模型（kind为'sentence'或'classification'）"""
+        with self._lock:
+            self._models[(kind, model_name)] = model
+
+    def get_sentence_model(self, model_name: str = DEFAULT_SENTENCE_MODEL):
+        """获取SentenceTransformer模型，不可用时返回None"""
+        return self._get('sentence', model_name, _load_sentence_model)
+
+    def get_classification_model(self, model_name: str = DEFAULT_CLASSIFICATION_MODEL):
+        """获取(tokenizer, model)，不可用时返回None"""
+        return self._get('classification', model_name, _load_classification_model)
+
+    def encode(self, texts: Sequence[str], model_name: str = DEFAULT_SENTENCE_MODEL) -> Optional[np.ndarray]:
+        """
+        批量计算embedding（命中缓存的文本不再编码，重复文本只编码一次）
+
+        Returns:
+            np.ndarray: (len(texts), dim) 的矩阵；模型不可用时返回None
+        """
+        model = self.get_sentence_model(model_name)
+        if model is None:
+            return None
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        vectors = self.embedding_cache.get_many(model_name, texts)
+        pending = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if pending:
+            encoded = np.asarray(model.encode(pending, batch_size=self.batch_size))
+            self.embedding_cache.put_many(model_name, pending, list(encoded))
+            lookup = dict(zip(pending, encoded))
+            vectors = [lookup[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return np.vstack(vectors)
+
+    def classify(self, texts: Sequence[str], model_name: str = DEFAULT_CLASSIFICATION_MODEL,
+                 max_length: int = 512) -> Optional[np.ndarray]:
+        """
+        批量分类，返回每条文本的类别概率矩阵 (len(texts), num_labels)；模型不可用时返回None
+        """
+        loaded = self.get_classification_model(model_name)
+        if loaded is None:
+            return None
+        tokenizer, model = loaded
+        import torch
+
+        probabilities = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = tokenizer(
+                list(texts[start:start + self.batch_size]),
+                return_tensors="pt",
+                truncation=True,
+                padding=True,
+                max_length=max_length
+            )
+            with torch.no_grad():
+                logits = model(**inputs).logits
+                probabilities.append(torch.softmax(logits, dim=-1).cpu().numpy())
+        return np.vstack(probabilities) if probabilities else np.empty((0, 0))
+
+
+# 全局注册表实例
+_text_model_registry = None
+_text_model_registry_lock = threading.Lock()
+
+
+def get_text_model_registry() -> TextModelRegistry:
+    """获取全局文本模型注册表"""
+    global _text_model_registry
+    if _text_model_registry is None:
+        with _text_model_registry_lock:
+            if _text_model_registry is None:
+                _text_model_registry = TextModelRegistry()
+    return _text_model_registry
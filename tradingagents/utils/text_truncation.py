@@ -0,0 +1,187 @@
+"""
+按token预算的智能文本截断
+用于embedding输入：优先在句子边界、其次在段落边界截断，最后保留首尾；
+按字符token权重做前缀累加定位截断点，一次切片得到结果，整体为线性时间
+"""
+
+import logging
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 常见embedding模型的单条输入token上限
+EMBEDDING_TOKEN_LIMITS = {
+    "text-embedding-v1": 2048,
+    "text-embedding-v2": 2048,
+    "text-embedding-v3": 8192,
+    "text-embedding-v4": 8192,
+    "text-embedding-3-small": 8191,
+    "text-embedding-3-large": 8191,
+    "text-embedding-ada-002": 8191,
+    "nomic-embed-text": 8192,
+}
+DEFAULT_EMBEDDING_TOKEN_LIMIT = 8192
+
+TRUNCATION_MARKER = "\n...[内容截断]...\n"
+
+# 中日韩文字及全角符号按1个token估算，其余字符按4个字符1个token估算
+_WIDE_RANGES = ((0x2E80, 0x9FFF), (0xAC00, 0xD7AF), (0xF900, 0xFAFF), (0xFF00, 0xFFEF))
+
+
+def get_embedding_token_limit(model_name: Optional[str]) -> int:
+    """embedding模型的单条输入token上限（未知模型使用默认值）"""
+    return EMBEDDING_TOKEN_LIMITS.get(model_name or "", DEFAULT_EMBEDDING_TOKEN_LIMIT)
+
+
+def _build_weight_table() -> np.ndarray:
+    table = np.full(0x10000, 0.25)
+    for low, high in _WIDE_RANGES:
+        table[low:high + 1] = 1.0
+    return table
+
+
+_WEIGHT_TABLE = _build_weight_table()
+
+
+class EstimatedTokenCounter:
+    """
+    不依赖分词器的token估算
+
+    每个字符至少0.25个token，因此定位前缀时只需扫描预算4倍长度的窗口；
+    同一文本的前缀累加结果会被复用（截断过程中多次定位只扫描一次）
+    """
+
+    name = "estimate"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @staticmethod
+    def _char_weights(text: str) -> np.ndarray:
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        # BMP以外的字符（如emoji）按0.25估算
+        return _WEIGHT_TABLE[np.minimum(codes, 0xFFFF)]
+
+    def _cumulative(self, text: str, window: int, reverse: bool = False) -> np.ndarray:
+        """text前window个字符（reverse时为后window个字符，倒序）的token前缀和"""
+        window = min(window, len(text))
+        cached = getattr(self._local, "cache", None)
+        if cached is not None and cached[0] is text and cached[1] == reverse and len(cached[2]) >= window:
+            return cached[2][:window]
+        part = text[len(text) - window:][::-1] if reverse else text[:window]
+        cumulative = np.cumsum(self._char_weights(part))
+        self._local.cache = (text, reverse, cumulative)
+        return cumulative
+
+    def count(self, text: str) -> int:
+        return int(np.ceil(self._char_weights(text).sum())) if text else 0
+
+    def prefix_tokens(self, text: str, chars: int) -> int:
+        """text前chars个字符的token数"""
+        if chars <= 0:
+            return 0
+        return int(np.ceil(self._cumulative(text, chars)[chars - 1]))
+
+    def prefix_chars(self, text: str, tokens: int) -> int:
+        """token数不超过tokens的最长前缀的字符数"""
+        return int(np.searchsorted(self._cumulative(text, tokens * 4 + 1), tokens, side="right"))
+
+    def suffix_chars(self, text: str, tokens: int) -> int:
+        """token数不超过tokens的最长后缀的字符数"""
+        if tokens <= 0:
+            return 0
+        return int(np.searchsorted(self._cumulative(text, tokens * 4 + 1, reverse=True), tokens, side="right"))
+
+
+class TiktokenCounter:
+    """基于tiktoken的计数（cl100k_base，对其他模型为近似）"""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def prefix_tokens(self, text: str, chars: int) -> int:
+        return self.count(text[:chars])
+
+    def _decoded_chars(self, tokens: List[int]) -> int:
+        decoded = self.encoding.decode(tokens)
+        # 截在多字节字符中间时末尾为替换字符，不计入
+        return len(decoded.rstrip("\ufffd")) if decoded.endswith("\ufffd") else len(decoded)
+
+    def prefix_chars(self, text: str, tokens: int) -> int:
+        encoded = self.encoding.encode_ordinary(text)
+        if len(encoded) <= tokens:
+            return len(text)
+        return self._decoded_chars(encoded[:tokens]) if tokens > 0 else 0
+
+    def suffix_chars(self, text: str, tokens: int) -> int:
+        encoded = self.encoding.encode_ordinary(text)
+        if len(encoded) <= tokens:
+            return len(text)
+        if tokens <= 0:
+            return 0
+        decoded = self.encoding.decode(encoded[-tokens:])
+        return len(decoded.lstrip("\ufffd"))
+
+
+_token_counter = None
+_token_counter_lock = threading.Lock()
+
+
+def get_token_counter():
+    """
+    获取token计数器
+
+    EMBEDDING_TOKEN_COUNTER=tiktoken且tiktoken可用时使用tiktoken；
+    默认使用估算（tiktoken首次使用需要下载编码文件，离线环境下不可用）
+    """
+    global _token_counter
+    if _token_counter is None:
+        with _token_counter_lock:
+            if _token_counter is None:
+                counter = EstimatedTokenCounter()
+                if os.getenv("EMBEDDING_TOKEN_COUNTER", "estimate").lower() == "tiktoken":
+                    try:
+                        import tiktoken
+                        counter = TiktokenCounter(tiktoken.get_encoding("cl100k_base"))
+                    except Exception as e:
+                        logger.warning(f"[文本截断] tiktoken不可用，使用token估算: {e}")
+                _token_counter = counter
+    return _token_counter
+
+
+def smart_truncate(text: str, max_tokens: int, counter=None, margin: Optional[int] = None) -> Tuple[str, bool, str]:
+    """
+    把文本截断到max_tokens以内，尽量保持语义完整
+
+    先求出预算内的最长前缀，再在其中找最后一个句号（其次换行）作为截断点，保留内容需超过上限的一半；
+    否则保留首尾各约一半。只扫描预算附近的窗口并一次切片，与输入总长度无关
+
+    Returns:
+        (文本, 是否截断, 策略)：策略为none/sentence/paragraph/head_tail
+    """
+    counter = counter or get_token_counter()
+    if counter.prefix_chars(text, max_tokens) >= len(text):
+        return text, False, "none"
+
+    margin = margin if margin is not None else min(50, max_tokens // 20)
+    budget = max_tokens - margin
+    limit = counter.prefix_chars(text, budget)
+    for delimiter, strategy in (("。", "sentence"), ("\n", "paragraph")):
+        cut = text.rfind(delimiter, 0, limit - len(delimiter) + 1)
+        if cut >= 0 and counter.prefix_tokens(text, cut + len(delimiter)) > max_tokens // 2:
+            return text[:cut + len(delimiter)], True, strategy
+
+    half = (budget - counter.count(TRUNCATION_MARKER)) // 2
+    head = text[:counter.prefix_chars(text, half)]
+    tail_chars = counter.suffix_chars(text, half)
+    tail = text[len(text) - tail_chars:] if tail_chars else ""
+    return head + TRUNCATION_MARKER + tail, True, "head_tail"
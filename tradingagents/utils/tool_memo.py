@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+工具结果的单次运行内缓存
+一次分析中不同分析师（以及同一分析师的多轮调用）经常以相同参数调用同一工具，
+在运行范围内按(工具, 规范化参数, 交易日期)缓存结果，重复调用直接返回缓存
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 股票代码类参数，比较时忽略大小写
+_SYMBOL_ARGS = {"ticker", "symbol", "stock_code"}
+
+# 结果开头出现这些标记时视为失败，不缓存（同一运行中后续调用仍会重试）
+_FAILURE_MARKERS = ("❌", "失败", "错误")
+_FAILURE_SCAN_CHARS = 200
+
+_current_memo: ContextVar[Optional["ToolMemo"]] = ContextVar("tool_memo", default=None)
+
+
+def _normalize_value(name: str, value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return value.upper() if name in _SYMBOL_ARGS else value
+    return value
+
+
+def _is_cacheable(result: Any) -> bool:
+    if result is None:
+        return False
+    if isinstance(result, str):
+        head = result[:_FAILURE_SCAN_CHARS]
+        return bool(head.strip()) and not any(marker in head for marker in _FAILURE_MARKERS)
+    return True
+
+
+class ToolMemo:
+    """
+    一次运行的工具结果缓存
+
+    并发的相同调用只执行一次，其余调用等待同一结果；工具抛出异常或返回失败信息时不缓存
+    """
+
+    def __init__(self, trade_date: Optional[str] = None):
+        self.trade_date = str(trade_date) if trade_date is not None else None
+        self._entries: Dict[Tuple[str, str, Optional[str]], Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hits = 0
+        self.saved_seconds = 0.0
+        self._durations: Dict[Tuple[str, str, Optional[str]], float] = {}
+        self._hits_by_tool: Counter = Counter()
+
+    def make_key(self, tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
+        """缓存键：(工具名, 规范化参数JSON, 交易日期)"""
+        normalized = {name: _normalize_value(name, value) for name, value in arguments.items()}
+        return tool_name, json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str), self.trade_date
+
+    def call(self, tool_name: str, arguments: Dict[str, Any], func: Callable[[], Any]) -> Any:
+        """返回缓存结果，未命中时执行func"""
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            self.calls += 1
+            future = self._entries.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[key] = future
+
+        if not owner:
+            result = future.result()
+            with self._lock:
+                self.hits += 1
+                self._hits_by_tool[tool_name] += 1
+                self.saved_seconds += self._durations.get(key, 0.0)
+            logger.info(f"♻️ [工具缓存] {tool_name} 命中本次运行缓存")
+            return result
+
+        start = time.monotonic()
+        try:
+            result = func()
+        except BaseException as e:
+            with self._lock:
+                self._entries.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if _is_cacheable(result):
+                self._durations[key] = time.monotonic() - start
+            else:
+                self._entries.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """本次运行的缓存统计"""
+        with self._lock:
+            return {
+                "tool_calls": self.calls,
+                "saved_calls": self.hits,
+                "saved_seconds": round(self.saved_seconds, 2),
+                "saved_by_tool": dict(self._hits_by_tool),
+            }
+
+
+def get_current_tool_memo() -> Optional[ToolMemo]:
+    """当前运行的工具缓存（不在运行范围内时为None）"""
+    return _current_memo.get()
+
+
+@contextmanager
+def tool_memo_scope(trade_date: Optional[str] = None) -> Iterator[ToolMemo]:
+    """
+    在with块内启用工具结果缓存
+
+    缓存通过contextvars传递，LangGraph节点和ContextThreadPoolExecutor的工作线程共享同一缓存
+    """
+    memo = ToolMemo(trade_date)
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+
+
+def memoize_tool(tool_name: Optional[str] = None):
+    """
+    工具结果缓存装饰器，放在@tool与工具函数之间
+
+    仅在tool_memo_scope范围内生效；参数按函数签名补全默认值后规范化，
+    位置参数与关键字参数形式的相同调用共用缓存
+    """
+    def decorator(func: Callable) -> Callable:
+        name = tool_name or func.__name__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            memo = _current_memo.get()
+            if memo is None:
+                return func(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return func(*args, **kwargs)
+            bound.apply_defaults()
+            return memo.call(name, bound.arguments, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
@@ -0,0 +1,455 @@
+"""
+轻量级进程内向量索引
+智能体记忆的替代后端：归一化后的float32向量存放在NumPy矩阵中（指定目录时为磁盘内存映射），
+余弦top-k由一次矩阵-向量乘积精确计算；条目数超过阈值且安装了hnswlib时改用HNSW近似索引。
+集合接口与记忆模块用到的ChromaDB集合子集（count/add/upsert/query/get/delete）一致
+"""
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from tradingagents.config.env_utils import parse_int_env
+
+logger = logging.getLogger(__name__)
+
+# 可选依赖：HNSW近似索引
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+# 可选依赖：跨进程文件锁
+try:
+    from filelock import FileLock
+    FILELOCK_AVAILABLE = True
+except ImportError:
+    FILELOCK_AVAILABLE = False
+
+DEFAULT_HNSW_THRESHOLD = 20000
+INITIAL_CAPACITY = 256
+
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "records.jsonl"
+HEADER_FILE = "header.json"
+
+
+class NumpyVectorCollection:
+    """
+    单个记忆集合
+
+    directory为None时只在内存中保存；否则向量写入内存映射文件，文档/元数据/ID逐行追加到records.jsonl，
+    header.json中的条数作为提交点（写入中断时多出的行会被忽略）。
+    删除和覆盖写入时整体重写为新一代的向量/记录文件，替换header后才生效，中断时header仍指向完整的旧文件
+    """
+
+    def __init__(self, name: str, directory: Optional[str] = None, hnsw_threshold: Optional[int] = None):
+        self.name = name
+        self.directory = directory
+        self.hnsw_threshold = hnsw_threshold or parse_int_env('MEMORY_HNSW_THRESHOLD', DEFAULT_HNSW_THRESHOLD)
+        self._lock = threading.RLock()
+        self._dim = 0
+        self._count = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._id_positions: Dict[str, int] = {}
+        self._hnsw = None
+        self._header_state = None
+        self._records_size = 0
+        self._generation = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    # ---------- 持久化 ----------
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+
+    @staticmethod
+    def _file_names(generation: int):
+        """某一代的(向量文件, 记录文件)名，第0代沿用原文件名"""
+        if generation == 0:
+            return VECTORS_FILE, RECORDS_FILE
+        return f"vectors.{generation}.f32", f"records.{generation}.jsonl"
+
+    @property
+    def _vectors_file(self) -> str:
+        return self._path(self._file_names(self._generation)[0])
+
+    @property
+    def _records_file(self) -> str:
+        return self._path(self._file_names(self._generation)[1])
+
+    def _read_header(self) -> Optional[bytes]:
+        """读取header原始内容（文件很小，比较内容比比较修改时间可靠）"""
+        try:
+            with open(self._path(HEADER_FILE), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _load(self):
+        """从磁盘加载（其他进程写入后也通过这里重新加载）"""
+        try:
+            self._load_files()
+        except FileNotFoundError:
+            # 读取header后其他进程完成了重写并删除了旧一代文件，按新header重新加载
+            self._load_files()
+
+    def _load_files(self):
+        self._header_state = self._read_header()
+        self._ids, self._documents, self._metadatas = [], [], []
+        self._count, self._dim, self._vectors, self._hnsw = 0, 0, None, None
+        self._records_size = 0
+        self._generation = 0
+        if self._header_state is None:
+            return
+
+        header = json.loads(self._header_state)
+        self._count, self._dim = header['count'], header['dim']
+        self._records_size = header['records_size']
+        self._generation = header.get('generation', 0)
+        if self._count:
+            self._vectors = np.memmap(self._vectors_file, dtype=np.float32, mode='r+',
+                                      shape=(header['capacity'], self._dim))
+        with open(self._records_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if len(self._ids) >= self._count:
+                    break
+                record = json.loads(line)
+                self._ids.append(record['id'])
+                self._documents.append(record['document'])
+                self._metadatas.append(record['metadata'])
+        self._id_positions = {id_: i for i, id_ in enumerate(self._ids)}
+
+    def refresh(self):
+        """其他进程修改过集合时重新加载"""
+        if self.directory and self._read_header() != self._header_state:
+            with self._lock:
+                self._load()
+
+    def _ensure_capacity(self, required: int):
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity)
+        while new_capacity < required:
+            new_capacity *= 2
+
+        if self.directory:
+            if self._vectors is not None:
+                self._vectors.flush()
+                del self._vectors
+            with open(self._vectors_file, 'ab') as f:
+                f.truncate(new_capacity * self._dim * 4)
+            self._vectors = np.memmap(self._vectors_file, dtype=np.float32, mode='r+',
+                                      shape=(new_capacity, self._dim))
+        else:
+            grown = np.zeros((new_capacity, self._dim), dtype=np.float32)
+            if self._vectors is not None:
+                grown[:self._count] = self._vectors[:self._count]
+            self._vectors = grown
+
+    def _commit(self, start: int):
+        """追加记录并写入header（提交点）"""
+        self._vectors.flush()
+        lines = [
+            json.dumps({'id': self._ids[i], 'document': self._documents[i],
+                        'metadata': self._metadatas[i]}, ensure_ascii=False) + '\n'
+            for i in range(start, self._count)
+        ]
+        data = ''.join(lines).encode('utf-8')
+        records_path = self._records_file
+        with open(records_path, 'r+b' if os.path.exists(records_path) else 'wb') as f:
+            # 丢弃上次中断写入留下的未提交内容
+            f.seek(self._records_size)
+            f.truncate()
+            f.write(data)
+        self._records_size += len(data)
+        header = {'count': self._count, 'dim': self._dim, 'capacity': int(self._vectors.shape[0]),
+                  'records_size': self._records_size, 'generation': self._generation}
+        content = json.dumps(header).encode('utf-8')
+        tmp_path = self._path(HEADER_FILE) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, self._path(HEADER_FILE))
+        self._header_state = content
+
+    # ---------- ChromaDB集合接口子集 ----------
+
+    def count(self) -> int:
+        self.refresh()
+        return self._count
+
+    def add(self, documents: Sequence[str], embeddings: Sequence[Sequence[float]], ids: Sequence[str],
+            metadatas: Optional[Sequence[Dict[str, Any]]] = None):
+        """追加条目（已存在的ID被忽略，与ChromaDB一致）"""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(ids):
+            raise ValueError("embeddings与ids数量不一致")
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in ids]
+
+        self.refresh()
+        with self._lock:
+            if self._dim == 0:
+                self._dim = matrix.shape[1]
+            elif matrix.shape[1] != self._dim:
+                raise ValueError(f"向量维度不一致: {matrix.shape[1]} != {self._dim}")
+
+            keep, seen = [], set(self._id_positions)
+            for i, id_ in enumerate(ids):
+                if id_ not in seen:
+                    seen.add(id_)
+                    keep.append(i)
+            if not keep:
+                return
+            matrix = matrix[keep]
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+            start = self._count
+            self._ensure_capacity(start + len(keep))
+            self._vectors[start:start + len(keep)] = matrix
+            for i in keep:
+                self._id_positions[ids[i]] = len(self._ids)
+                self._ids.append(ids[i])
+                self._documents.append(documents[i])
+                self._metadatas.append(metadatas[i])
+            self._count = start + len(keep)
+
+            if self._hnsw is not None:
+                if self._count > self._hnsw.get_max_elements():
+                    self._hnsw.resize_index(self._count * 2)
+                self._hnsw.add_items(matrix, np.arange(start, self._count))
+            if self.directory:
+                self._commit(start)
+
+    def _build_hnsw(self):
+        index = hnswlib.Index(space='ip', dim=self._dim)
+        index.init_index(max_elements=max(self._count * 2, INITIAL_CAPACITY), ef_construction=200, M=16)
+        index.add_items(self._vectors[:self._count], np.arange(self._count))
+        index.set_ef(64)
+        logger.info(f"[向量索引] 集合 {self.name} 达到{self._count}条，已构建HNSW索引")
+        return index
+
+    def _top_k(self, query: np.ndarray, k: int):
+        """返回(位置, 余弦相似度)，按相似度降序"""
+        if HNSWLIB_AVAILABLE and self._count >= self.hnsw_threshold:
+            if self._hnsw is None:
+                self._hnsw = self._build_hnsw()
+            labels, distances = self._hnsw.knn_query(query, k=k)
+            return labels[0], 1.0 - distances[0]
+
+        scores = self._vectors[:self._count] @ query
+        if k < self._count:
+            positions = np.argpartition(-scores, k - 1)[:k]
+            positions = positions[np.argsort(-scores[positions], kind='stable')]
+        else:
+            positions = np.argsort(-scores, kind='stable')
+        return positions, scores[positions]
+
+    def query(self, query_embeddings: Sequence[Sequence[float]], n_results: int = 1) -> Dict[str, list]:
+        """余弦top-k查询，distances为1-余弦相似度"""
+        self.refresh()
+        result = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        with self._lock:
+            k = min(n_results, self._count)
+            for embedding in query_embeddings:
+                query = np.asarray(embedding, dtype=np.float32)
+                norm = np.linalg.norm(query)
+                if k == 0 or norm == 0:
+                    positions, scores = [], []
+                else:
+                    positions, scores = self._top_k(query / norm, k)
+                result['ids'].append([self._ids[p] for p in positions])
+                result['documents'].append([self._documents[p] for p in positions])
+                result['metadatas'].append([self._metadatas[p] for p in positions])
+                result['distances'].append([float(1.0 - s) for s in scores])
+        return result
+
+    def _replace_all(self, vectors: np.ndarray, ids: List[str], documents: List[str],
+                     metadatas: List[Dict[str, Any]]):
+        """
+        用给定条目整体替换集合内容（调用方持有self._lock，vectors已归一化）
+
+        持久化时写入新一代的向量和记录文件，替换header即提交；提交前中断不影响旧文件
+        """
+        self._ids, self._documents, self._metadatas = list(ids), list(documents), list(metadatas)
+        self._id_positions = {id_: i for i, id_ in enumerate(self._ids)}
+        self._count = len(self._ids)
+        self._hnsw = None
+
+        capacity = INITIAL_CAPACITY
+        while capacity < self._count:
+            capacity *= 2
+        if not self.directory:
+            self._vectors = np.zeros((capacity, self._dim), dtype=np.float32)
+            self._vectors[:self._count] = vectors
+            return
+
+        self._generation += 1
+        try:
+            for path in (self._vectors_file, self._records_file):
+                # 清理上次中断的重写留下的同名未提交文件
+                if os.path.exists(path):
+                    os.remove(path)
+            del self._vectors
+            self._vectors = np.memmap(self._vectors_file, dtype=np.float32, mode='w+', shape=(capacity, self._dim))
+            self._vectors[:self._count] = vectors
+            self._records_size = 0
+            self._commit(0)
+        except BaseException:
+            # 未提交：恢复为磁盘上旧header对应的内容
+            self._load()
+            raise
+        self._remove_stale_files()
+
+    def _remove_stale_files(self):
+        """删除非当前代的向量/记录文件（其他进程仍映射旧文件时删除失败，留待下次重写清理）"""
+        current = set(self._file_names(self._generation))
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith(('vectors.', 'records.')) and file_name not in current:
+                try:
+                    os.remove(self._path(file_name))
+                except OSError:
+                    pass
+
+    def upsert(self, documents: Sequence[str], embeddings: Sequence[Sequence[float]], ids: Sequence[str],
+               metadatas: Optional[Sequence[Dict[str, Any]]] = None):
+        """写入条目，已存在的ID被覆盖（与ChromaDB一致）"""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(ids):
+            raise ValueError("embeddings与ids数量不一致")
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in ids]
+
+        self.refresh()
+        with self._lock:
+            existing = [i for i, id_ in enumerate(ids) if id_ in self._id_positions]
+            if not existing:
+                self.add(documents=documents, embeddings=matrix, ids=ids, metadatas=metadatas)
+                return
+            if matrix.shape[1] != self._dim:
+                raise ValueError(f"向量维度不一致: {matrix.shape[1]} != {self._dim}")
+
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+            vectors = np.array(self._vectors[:self._count], dtype=np.float32)
+            new_ids, new_documents, new_metadatas = list(self._ids), list(self._documents), list(self._metadatas)
+            positions = dict(self._id_positions)
+            appended = []
+            for i, id_ in enumerate(ids):
+                p = positions.get(id_)
+                if p is None:
+                    p = positions[id_] = len(new_ids)
+                    new_ids.append(id_)
+                    new_documents.append(documents[i])
+                    new_metadatas.append(metadatas[i])
+                    appended.append(matrix[i])
+                else:
+                    new_documents[p], new_metadatas[p] = documents[i], metadatas[i]
+                    if p < len(vectors):
+                        vectors[p] = matrix[i]
+                    else:
+                        appended[p - len(vectors)] = matrix[i]
+            if appended:
+                vectors = np.vstack([vectors, np.asarray(appended, dtype=np.float32)])
+            self._replace_all(vectors, new_ids, new_documents, new_metadatas)
+
+    def delete(self, ids: Sequence[str]):
+        """删除条目（重写向量矩阵和记录文件）"""
+        self.refresh()
+        with self._lock:
+            remove = {self._id_positions[id_] for id_ in ids if id_ in self._id_positions}
+            if not remove:
+                return
+            keep = [p for p in range(self._count) if p not in remove]
+            self._replace_all(np.array(self._vectors[keep], dtype=np.float32),
+                              [self._ids[p] for p in keep],
+                              [self._documents[p] for p in keep],
+                              [self._metadatas[p] for p in keep])
+
+    def get(self, ids: Optional[Sequence[str]] = None, include: Optional[Sequence[str]] = None) -> Dict[str, list]:
+        """按ID读取（ids为None时读取全部），embeddings为归一化后的向量"""
+        self.refresh()
+        include = include or ['documents', 'metadatas']
+        with self._lock:
+            if ids is None:
+                positions = list(range(self._count))
+            else:
+                positions = [self._id_positions[id_] for id_ in ids if id_ in self._id_positions]
+            result: Dict[str, list] = {'ids': [self._ids[p] for p in positions]}
+            if 'documents' in include:
+                result['documents'] = [self._documents[p] for p in positions]
+            if 'metadatas' in include:
+                result['metadatas'] = [self._metadatas[p] for p in positions]
+            if 'embeddings' in include:
+                result['embeddings'] = [np.array(self._vectors[p]) for p in positions]
+        return result
+
+
+class NumpyVectorStore:
+    """按名称管理NumpyVectorCollection，接口与ChromaDBManager一致"""
+
+    def __init__(self, directory: Optional[str] = None, hnsw_threshold: Optional[int] = None):
+        self.directory = os.path.abspath(directory) if directory else None
+        self.hnsw_threshold = hnsw_threshold
+        self._collections: Dict[str, NumpyVectorCollection] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._process_lock = None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            if FILELOCK_AVAILABLE:
+                self._process_lock = FileLock(os.path.join(self.directory, ".write.lock"))
+            else:
+                logger.warning("[向量索引] filelock未安装，多进程并发写入记忆可能冲突")
+
+    def get_or_create_collection(self, name: str) -> NumpyVectorCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    directory = os.path.join(self.directory, name) if self.directory else None
+                    collection = NumpyVectorCollection(name, directory, self.hnsw_threshold)
+                    self._collections[name] = collection
+                    logger.info(f"[向量索引] 加载集合 {name}: {collection.count()}条记忆")
+        return collection
+
+    @contextmanager
+    def write_lock(self):
+        """记忆写入锁（指定目录时同时持有跨进程文件锁）"""
+        with self._write_lock:
+            if self._process_lock is None:
+                yield
+            else:
+                with self._process_lock:
+                    yield
+
+
+# 按目录缓存的存储实例
+_vector_stores: Dict[Optional[str], NumpyVectorStore] = {}
+_vector_stores_lock = threading.Lock()
+
+
+def get_numpy_vector_store(directory: Optional[str] = None) -> NumpyVectorStore:
+    """获取目录对应的向量存储（directory为None时为进程内存储）"""
+    key = os.path.abspath(directory) if directory else None
+    store = _vector_stores.get(key)
+    if store is None:
+        with _vector_stores_lock:
+            store = _vector_stores.get(key)
+            if store is None:
+                store = NumpyVectorStore(key)
+                _vector_stores[key] = store
+    return store
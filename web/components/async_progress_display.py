@@ -13,6 +13,41 @@ from web.utils.async_progress_tracker import get_progress_by_id, format_time
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('async_display')
 
+# 实时输出只显示末尾部分（字符数）
+LIVE_OUTPUT_MAX_CHARS = 3000
+
+# 图节点对应的中文名称
+LIVE_OUTPUT_AGENT_NAMES = {
+    "Market Analyst": "📈 市场分析师",
+    "Social Analyst": "💭 社交媒体分析师",
+    "News Analyst": "📰 新闻分析师",
+    "Fundamentals Analyst": "📊 基本面分析师",
+    "Bull Researcher": "🐂 看涨研究员",
+    "Bear Researcher": "🐻 看跌研究员",
+    "Research Manager": "🎯 研究经理",
+    "Trader": "💼 交易员",
+    "Risky Analyst": "🔥 激进风险分析师",
+    "Safe Analyst": "🛡️ 保守风险分析师",
+    "Neutral Analyst": "⚖️ 中性风险分析师",
+    "Risk Judge": "🏛️ 风险管理委员会",
+}
+
+
+def render_live_output(progress_data: Dict[str, Any]):
+    """显示智能体正在流式生成的内容（仅分析运行中）"""
+    live_output = progress_data.get('live_output') or {}
+    text = live_output.get('text')
+    if progress_data.get('status') != 'running' or not text:
+        return
+
+    if len(text) > LIVE_OUTPUT_MAX_CHARS:
+        text = "……\n\n" + text[-LIVE_OUTPUT_MAX_CHARS:]
+    agent = live_output.get('agent', '')
+    agent_name = LIVE_OUTPUT_AGENT_NAMES.get(agent, agent)
+    with st.expander(f"✍️ {agent_name} 正在输出", expanded=True):
+        st.markdown(text)
+
+
 class AsyncProgressDisplay:
     """异步进度显示组件"""
     
@@ -411,6 +446,7 @@ def display_static_progress(analysis_id: str) -> bool:
             st.rerun()
     else:
         st.info(f"{status_icon} **当前状态**: {last_message}")
+        render_live_output(progress_data)
 
         # 添加刷新控制（仅在运行时显示）
         if status == 'running':
@@ -583,6 +619,7 @@ def display_static_progress_with_controls(analysis_id: str, show_refresh_control
         st.error(f"{status_icon} **当前状态**: {last_message}")
     else:
         st.info(f"{status_icon} **当前状态**: {last_message}")
+        render_live_output(progress_data)
 
     # 显示刷新控制的条件：
     # 1. 需要显示刷新控件 AND
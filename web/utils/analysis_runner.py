@@ -97,7 +97,7 @@ def extract_risk_assessment(state):
         logger.info(f"提取风险评估数据时出错: {e}")
         return None
 
-def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, market_type="美股", progress_callback=None):
+def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, market_type="美股", progress_callback=None, stream_callback=None):
     """执行股票分析
 
     Args:
@@ -108,6 +108,7 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         llm_provider: LLM提供商 (dashscope/deepseek/google)
         llm_model: 大模型名称
         progress_callback: 进度回调函数，用于更新UI状态
+        stream_callback: 流式输出回调函数，接收智能体正在生成的内容（TokenUpdate），用于实时显示
     """
 
     def update_progress(message, step=None, total_steps=None):
@@ -218,6 +219,7 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
     try:
         # 导入必要的模块
         from tradingagents.graph.trading_graph import TradingAgentsGraph
+        from tradingagents.graph.streaming import ThrottledTokenCallback
         from tradingagents.default_config import DEFAULT_CONFIG
 
         # 创建配置
@@ -443,7 +445,13 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         logger.debug(f"🔍 [RUNNER DEBUG]   symbol: '{formatted_symbol}'")
         logger.debug(f"🔍 [RUNNER DEBUG]   date: '{analysis_date}'")
 
-        state, decision = graph.propagate(formatted_symbol, analysis_date)
+        # 有流式输出回调时按token实时推送智能体输出（节流，避免频繁写入进度存储）
+        on_token = ThrottledTokenCallback(stream_callback, min_interval=1.0) if stream_callback else None
+        state, decision = graph.propagate(formatted_symbol, analysis_date, on_token=on_token)
+        if on_token is not None:
+            on_token.flush()
+        if graph.tool_memo_summary.get('saved_calls'):
+            update_progress(f"♻️ 工具缓存复用 {graph.tool_memo_summary['saved_calls']} 次，减少重复数据获取")
 
         # 调试信息
         logger.debug(f"🔍 [DEBUG] 分析完成，decision类型: {type(decision)}")
@@ -489,7 +497,8 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
             'decision': decision,
             'success': True,
             'error': None,
-            'session_id': session_id if TOKEN_TRACKING_ENABLED else None
+            'session_id': session_id if TOKEN_TRACKING_ENABLED else None,
+            'tool_memo': graph.tool_memo_summary
         }
 
         # 记录分析完成的详细日志
@@ -515,6 +524,7 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
                        'duration': analysis_duration,
                        'total_cost': total_cost,
                        'analysts_used': analysts,
+                       'tool_calls_saved': graph.tool_memo_summary.get('saved_calls', 0),
                        'success': True,
                        'event_type': 'web_analysis_complete'
                    })
@@ -360,6 +360,21 @@ class AsyncProgressTracker:
         logger.info(f"📊 [进度更新] {self.analysis_id}: {message[:50]}...")
         logger.debug(f"📊 [进度详情] 步骤{self.current_step + 1}/{len(self.analysis_steps)} ({step_name}), 进度{progress_percentage:.1f}%, 耗时{elapsed_time:.1f}s")
     
+    def update_stream(self, update):
+        """
+        记录智能体正在流式生成的内容，供进度页实时显示
+
+        Args:
+            update: tradingagents.graph.streaming.TokenUpdate（调用方负责节流）
+        """
+        self.progress_data['live_output'] = {
+            'agent': update.node,
+            'section': update.section,
+            'text': update.text,
+            'last_update': time.time(),
+        }
+        self._save_progress(verbose=False)
+
     def _detect_step_from_message(self, message: str) -> Optional[int]:
         """根据消息内容智能检测当前步骤"""
         message_lower = message.lower()
@@ -474,8 +489,9 @@ class AsyncProgressTracker:
 
         return remaining
     
-    def _save_progress(self):
-        """保存进度到存储"""
+    def _save_progress(self, verbose: bool = True):
+        """保存进度到存储（verbose=False时写入日志降为debug级别，用于高频的流式输出更新）"""
+        log = logger.info if verbose else logger.debug
         try:
             current_step_name = self.progress_data.get('current_step_name', '未知')
             progress_pct = self.progress_data.get('progress_percentage', 0)
@@ -488,7 +504,7 @@ class AsyncProgressTracker:
                 data_json = json.dumps(safe_data, ensure_ascii=False)
                 self.redis_client.setex(key, 3600, data_json)  # 1小时过期
 
-                logger.info(f"📊 [Redis写入] {self.analysis_id} -> {status} | {current_step_name} | {progress_pct:.1f}%")
+                log(f"📊 [Redis写入] {self.analysis_id} -> {status} | {current_step_name} | {progress_pct:.1f}%")
                 logger.debug(f"📊 [Redis详情] 键: {key}, 数据大小: {len(data_json)} 字节")
             else:
                 # 保存到文件（安全序列化）
@@ -496,7 +512,7 @@ class AsyncProgressTracker:
                 with open(self.progress_file, 'w', encoding='utf-8') as f:
                     json.dump(safe_data, f, ensure_ascii=False, indent=2)
 
-                logger.info(f"📊 [文件写入] {self.analysis_id} -> {status} | {current_step_name} | {progress_pct:.1f}%")
+                log(f"📊 [文件写入] {self.analysis_id} -> {status} | {current_step_name} | {progress_pct:.1f}%")
                 logger.debug(f"📊 [文件详情] 路径: {self.progress_file}")
 
         except Exception as e: